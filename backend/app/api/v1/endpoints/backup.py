@@ -8,6 +8,7 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends, status
 from pydantic import BaseModel, Field
 
 from ....core.backup_manager import backup_manager, BackupType, BackupStatus
+from ....core.config import settings
 from ....core.auth import get_current_admin_user
 import logging
 
@@ -24,6 +25,13 @@ class BackupRequest(BaseModel):
 class RestoreRequest(BaseModel):
     backup_id: str
     target_database: Optional[str] = None
+    parallel_jobs: Optional[int] = Field(default=None, ge=1, le=32, description="pg_restore parallel jobs")
+
+class PointInTimeRestoreRequest(BaseModel):
+    target_time: datetime
+    target_database: Optional[str] = None
+    parallel_jobs: Optional[int] = Field(default=None, ge=1, le=32, description="pg_restore parallel jobs")
+    restore_dir: Optional[str] = Field(default=None, description="Data directory to prepare (WAL mode only)")
 
 class BackupResponse(BaseModel):
     backup_id: str
@@ -164,8 +172,10 @@ async def create_backup(
                     )
                     logger.info(f"Background backup completed: {backup_info.backup_id}")
                 else:
-                    # 증분 백업은 향후 구현
-                    logger.warning("Incremental backup not yet implemented")
+                    backup_info = await backup_manager.create_incremental_backup(
+                        database_name=request.database_name
+                    )
+                    logger.info(f"Background incremental backup completed: {backup_info.backup_id}")
             except Exception as e:
                 logger.error(f"Background backup failed: {e}")
         
@@ -188,6 +198,29 @@ async def create_backup(
             detail=f"Failed to start backup: {str(e)}"
         )
 
+def _claim_restore(backup_id: str, target_database: Optional[str], parallel_jobs: Optional[int]):
+    """복원 진행 상태 선점 (이미 진행 중이면 409)"""
+    progress = backup_manager.claim_restore(backup_id, target_database, parallel_jobs)
+    if progress is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Restore already in progress: {backup_manager.current_restore.backup_id}"
+        )
+    return progress
+
+@router.get("/restore/status")
+async def get_restore_status(admin_user: dict = Depends(require_admin_user)):
+    """복원 진행 상황 조회"""
+    progress = backup_manager.get_restore_progress()
+    if progress is None:
+        return {"in_progress": False, "restore": None, "history": []}
+    
+    return {
+        "in_progress": backup_manager.current_restore is not None,
+        "restore": progress,
+        "history": backup_manager.get_restore_history()
+    }
+
 @router.post("/restore")
 async def restore_backup(
     request: RestoreRequest,
@@ -209,17 +242,22 @@ async def restore_backup(
                 detail=f"Backup not found: {request.backup_id}"
             )
         
+        # 예약 전에 진행 상태를 선점해야 동시 요청 중 하나만 통과함
+        progress = _claim_restore(request.backup_id, request.target_database, request.parallel_jobs)
+        
         # 백그라운드에서 복원 실행
         async def run_restore():
             try:
                 success = await backup_manager.restore_backup(
                     backup_id=request.backup_id,
-                    target_database=request.target_database
+                    target_database=request.target_database,
+                    parallel_jobs=request.parallel_jobs,
+                    progress=progress
                 )
                 if success:
                     logger.info(f"Background restore completed: {request.backup_id}")
                 else:
-                    logger.error(f"Background restore failed: {request.backup_id}")
+                    logger.error(f"Background restore failed: {request.backup_id}: {progress.error}")
             except Exception as e:
                 logger.error(f"Background restore failed: {e}")
         
@@ -228,8 +266,9 @@ async def restore_backup(
         return {
             "message": "Restore started successfully",
             "backup_id": request.backup_id,
-            "target_database": request.target_database,
-            "started_at": datetime.now().isoformat()
+            "target_database": progress.target_database,
+            "parallel_jobs": progress.parallel_jobs,
+            "started_at": progress.started_at.isoformat()
         }
         
     except HTTPException:
@@ -241,6 +280,69 @@ async def restore_backup(
             detail=f"Failed to start restore: {str(e)}"
         )
 
+@router.post("/restore/point-in-time")
+async def restore_point_in_time(
+    request: PointInTimeRestoreRequest,
+    background_tasks: BackgroundTasks,
+    admin_user: dict = Depends(require_admin_user)
+):
+    """특정 시점 복원"""
+    try:
+        if settings.BACKUP_INCREMENTAL_MODE == "wal":
+            # WAL 모드는 서버 재기동이 필요하므로 복구용 데이터 디렉토리만 준비
+            if not request.restore_dir:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="restore_dir is required for WAL based point-in-time restore"
+                )
+            result = await backup_manager.prepare_point_in_time_restore(
+                request.target_time, request.restore_dir
+            )
+            return {
+                "message": "Recovery data directory prepared",
+                **result
+            }
+        
+        progress = _claim_restore("point_in_time", request.target_database, request.parallel_jobs)
+        
+        async def run_restore():
+            try:
+                success = await backup_manager.restore_point_in_time(
+                    target_time=request.target_time,
+                    target_database=request.target_database,
+                    parallel_jobs=request.parallel_jobs,
+                    progress=progress
+                )
+                if success:
+                    logger.info(f"Background point-in-time restore completed: {request.target_time}")
+                else:
+                    logger.error(f"Background point-in-time restore failed: {request.target_time}: {progress.error}")
+            except Exception as e:
+                logger.error(f"Background point-in-time restore failed: {e}")
+        
+        background_tasks.add_task(run_restore)
+        
+        return {
+            "message": "Point-in-time restore started successfully",
+            "target_time": request.target_time.isoformat(),
+            "target_database": progress.target_database,
+            "started_at": progress.started_at.isoformat()
+        }
+    
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Failed to start point-in-time restore: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start point-in-time restore: {str(e)}"
+        )
+
 @router.get("/backup/{backup_id}")
 async def get_backup_details(
     backup_id: str,
@@ -9,18 +9,62 @@ import gzip
 import shutil
 import logging
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 from dataclasses import dataclass, asdict
 from enum import Enum
 import hashlib
+import re
+import tarfile
+import tempfile
 import psutil
 
 from .config import settings
+from .commit_horizon import next_horizon
 
 logger = logging.getLogger(__name__)
 
+# 복원 시 스트리밍 압축 해제 단위 (1MB)
+RESTORE_CHUNK_SIZE = 1024 * 1024
+
+# 메모리에 보관하는 최근 복원 결과 수 (/restore/status 응답용)
+RESTORE_HISTORY_LIMIT = 20
+
+# pg_restore --verbose 출력 중 객체 하나의 처리 완료를 의미하는 패턴
+_RESTORE_OBJECT_PATTERN = re.compile(
+    r"pg_restore: (creating |processing data for table|finished item)"
+)
+
+# 전체 백업 전 진행 중 트랜잭션이 끝나 커서가 확정되기를 기다리는 최대 시간
+CURSOR_SETTLE_SECONDS = 30
+
+# WAL 세그먼트 파일명 패턴 (timeline + log + segment)
+_WAL_SEGMENT_PATTERN = re.compile(r"^[0-9A-F]{24}$")
+
+# pg_basebackup --verbose 출력의 WAL 시작 위치
+_WAL_START_PATTERN = re.compile(
+    r"write-ahead log start point: ([0-9A-F]+)/([0-9A-F]+) on timeline (\d+)"
+)
+
+@dataclass(frozen=True)
+class IncrementalTable:
+    """테이블 단위 증분 백업 대상"""
+    name: str
+    change_column: str  # 변경 시각을 나타내는 컬럼 또는 SQL 식 (특정 시점 복원 시 잘라내는 기준)
+    key_column: str
+    serial_key: bool = False
+    # 추가만 되는 테이블: 변경 시각 대신 발급 순서 컬럼 이후의 행을 내보냄 (클라이언트가 보낸 과거 시각 행도 포함)
+    cursor_column: Optional[str] = None
+
+# 크기가 계속 증가하는 대용량 테이블만 변경분을 추적하고, 나머지는 전체 백업에 맡긴다
+# (user_sessions는 폐기/삭제가 변경 시각을 갱신하지 않아 증분으로는 추적할 수 없으므로 전체 백업 기준으로 복원)
+INCREMENTAL_TABLES: List[IncrementalTable] = [
+    IncrementalTable("personal_test_measurement_data", "timestamp", "id", serial_key=True, cursor_column="id"),
+    IncrementalTable("personal_test_process_flow_versions",
+                     "GREATEST(created_at, published_at)", "id"),
+]
+
 class BackupType(Enum):
     """백업 유형"""
     FULL = "full"           # 전체 백업 (pg_dump)
@@ -51,6 +95,36 @@ class BackupInfo:
     database_name: str
     metadata: Dict[str, Any]
 
+@dataclass
+class RestoreProgress:
+    """복원 진행 상황"""
+    backup_id: str
+    target_database: str
+    started_at: datetime
+    phase: str = "preparing"  # preparing, decompressing, restoring, applying_incrementals, completed, failed
+    backup_format: str = "custom"
+    parallel_jobs: int = 1
+    bytes_total: int = 0
+    bytes_processed: int = 0
+    objects_total: int = 0
+    objects_restored: int = 0
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """API 응답용 딕셔너리 변환"""
+        data = asdict(self)
+        data['started_at'] = self.started_at.isoformat()
+        data['finished_at'] = self.finished_at.isoformat() if self.finished_at else None
+        data['bytes_percent'] = (
+            self.bytes_processed / self.bytes_total * 100 if self.bytes_total else 0
+        )
+        data['objects_percent'] = (
+            min(self.objects_restored, self.objects_total) / self.objects_total * 100
+            if self.objects_total else 0
+        )
+        return data
+
 class DatabaseBackupManager:
     """데이터베이스 백업 관리자"""
     
@@ -63,6 +137,7 @@ class DatabaseBackupManager:
         self.max_backup_size_gb = 10  # 최대 백업 크기 (GB)
         self.compression_enabled = True
         self.verify_after_backup = True
+        self.restore_jobs = min(os.cpu_count() or 1, 8)  # pg_restore 병렬 작업 수
         
         # 백업 기록 파일
         self.backup_log_file = self.backup_dir / "backup_log.json"
@@ -70,6 +145,9 @@ class DatabaseBackupManager:
         
         # 백업 상태 추적
         self.current_backup: Optional[BackupInfo] = None
+        self.current_restore: Optional[RestoreProgress] = None
+        self.last_restore: Optional[RestoreProgress] = None
+        self.restore_history: List[RestoreProgress] = []  # 최근 복원 결과 (최신순)
         
         self._load_backup_history()
     
@@ -187,13 +265,18 @@ class DatabaseBackupManager:
                 metadata={
                     "host": host,
                     "port": port,
-                    "username": username
+                    "username": username,
+                    "format": "custom"
                 }
             )
             
             self.current_backup = backup_info
             logger.info(f"Starting full backup: {backup_id}")
             
+            # 다음 증분 백업의 기준 시각/커서 (덤프 스냅샷 이전이므로 중복은 있어도 누락은 없음)
+            backup_info.metadata["cursors"] = await self._settle_cursors(db_name)
+            backup_info.metadata["until"] = await self._get_database_time(db_name)
+            
             # pg_dump 명령어 구성
             pg_dump_cmd = [
                 "pg_dump",
@@ -321,8 +404,218 @@ class DatabaseBackupManager:
             logger.error(f"Backup verification failed: {e}")
             return False
     
-    async def restore_backup(self, backup_id: str, target_database: Optional[str] = None) -> bool:
-        """백업 복원"""
+    def _detect_backup_format(self, backup_info: BackupInfo) -> str:
+        """백업 파일 포맷 판별 (custom, directory, plain)"""
+        if Path(backup_info.file_path).is_dir():
+            return "directory"
+        return backup_info.metadata.get("format", "custom")
+    
+    def _build_connection_args(self, db_name: str) -> Tuple[List[str], Dict[str, str]]:
+        """pg_restore/psql 공통 연결 인자와 환경 변수 구성"""
+        host, port, username, password, _ = self._parse_database_url()
+        args = ["-h", host, "-p", port, "-U", username, "-d", db_name, "--no-password"]
+        
+        env = os.environ.copy()
+        if password:
+            env["PGPASSWORD"] = password
+        return args, env
+    
+    async def _decompress_to_file(self, source_path: str, target_path: Path,
+                                  progress: RestoreProgress) -> None:
+        """gzip 백업을 청크 단위로 디스크에 풀어 메모리 사용량을 일정하게 유지"""
+        def _copy():
+            with open(source_path, 'rb') as raw, \
+                    gzip.GzipFile(fileobj=raw, mode='rb') as gz, \
+                    open(target_path, 'wb') as out:
+                while True:
+                    chunk = gz.read(RESTORE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    progress.bytes_processed = raw.tell()
+        
+        await asyncio.to_thread(_copy)
+    
+    async def _count_archive_objects(self, archive_path: str, env: Dict[str, str]) -> int:
+        """pg_restore --list 로 아카이브 TOC 항목 수 계산"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "pg_restore", "--list", archive_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env
+            )
+            stdout, _ = await process.communicate()
+            if process.returncode != 0:
+                return 0
+            return sum(
+                1 for line in stdout.decode(errors="replace").splitlines()
+                if line.strip() and not line.startswith(';')
+            )
+        except Exception as e:
+            logger.warning(f"Failed to list archive objects: {e}")
+            return 0
+    
+    async def _track_restore_output(self, stream: asyncio.StreamReader,
+                                    progress: RestoreProgress,
+                                    error_lines: List[str]) -> None:
+        """pg_restore verbose 출력을 읽어 복원된 객체 수 갱신"""
+        while True:
+            line = await stream.readline()
+            if not line:
+                break
+            decoded = line.decode(errors="replace").rstrip()
+            if _RESTORE_OBJECT_PATTERN.search(decoded):
+                progress.objects_restored += 1
+            elif "error" in decoded.lower():
+                error_lines.append(decoded)
+    
+    async def _run_parallel_restore(self, archive_path: str, db_name: str,
+                                    progress: RestoreProgress) -> bool:
+        """custom/directory 포맷 아카이브를 pg_restore -j 로 병렬 복원"""
+        conn_args, env = self._build_connection_args(db_name)
+        
+        progress.objects_total = await self._count_archive_objects(archive_path, env)
+        progress.phase = "restoring"
+        
+        pg_restore_cmd = [
+            "pg_restore",
+            *conn_args,
+            "--verbose",
+            "--clean",
+            "--if-exists",
+            "--no-privileges",
+            "--no-owner",
+            f"--jobs={progress.parallel_jobs}",
+            archive_path
+        ]
+        
+        process = await asyncio.create_subprocess_exec(
+            *pg_restore_cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            env=env
+        )
+        
+        error_lines: List[str] = []
+        await self._track_restore_output(process.stderr, progress, error_lines)
+        await process.wait()
+        
+        if process.returncode != 0:
+            progress.error = "\n".join(error_lines[-20:]) or f"pg_restore exited with {process.returncode}"
+            return False
+        return True
+    
+    async def _run_plain_restore(self, backup_info: BackupInfo, db_name: str,
+                                 progress: RestoreProgress) -> bool:
+        """plain SQL 백업을 psql 표준 입력으로 스트리밍 (drain 으로 역압 적용)"""
+        conn_args, env = self._build_connection_args(db_name)
+        progress.phase = "restoring"
+        progress.parallel_jobs = 1  # plain 포맷은 병렬 복원 불가
+        
+        process = await asyncio.create_subprocess_exec(
+            "psql", *conn_args, "--quiet", "--set", "ON_ERROR_STOP=1",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            env=env
+        )
+        
+        error_lines: List[str] = []
+        stderr_task = asyncio.create_task(
+            self._track_restore_output(process.stderr, progress, error_lines)
+        )
+        
+        raw = open(backup_info.file_path, 'rb')
+        reader = gzip.GzipFile(fileobj=raw, mode='rb') if backup_info.compression else raw
+        try:
+            while True:
+                chunk = await asyncio.to_thread(reader.read, RESTORE_CHUNK_SIZE)
+                if not chunk:
+                    break
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+                progress.bytes_processed = raw.tell()
+                progress.objects_restored += chunk.count(b";\n")
+        except (BrokenPipeError, ConnectionResetError):
+            logger.error("psql closed its input before the backup was fully streamed")
+        finally:
+            reader.close()
+            raw.close()
+            if not process.stdin.is_closing():
+                process.stdin.close()
+        
+        await process.wait()
+        await stderr_task
+        
+        if process.returncode != 0:
+            progress.error = "\n".join(error_lines[-20:]) or f"psql exited with {process.returncode}"
+            return False
+        return True
+    
+    def claim_restore(self, backup_id: str, target_database: Optional[str] = None,
+                      parallel_jobs: Optional[int] = None) -> Optional[RestoreProgress]:
+        """복원 진행 상태 등록 (이미 진행 중이면 None)
+        
+        await 없이 확인과 등록을 함께 하므로 같은 프로세스의 동시 복원 요청 중 하나만 통과한다.
+        API 는 백그라운드 작업을 예약하기 전에 호출하고, 돌려받은 progress 를 복원 메서드에 넘긴다.
+        """
+        if self.current_restore is not None:
+            logger.error(f"Restore already in progress: {self.current_restore.backup_id}")
+            return None
+        self.current_restore = RestoreProgress(
+            backup_id=backup_id,
+            target_database=target_database or self._parse_database_url()[4],
+            started_at=datetime.now(),
+            parallel_jobs=max(1, parallel_jobs or self.restore_jobs)
+        )
+        return self.current_restore
+    
+    def _end_restore(self, progress: RestoreProgress):
+        if progress.phase != "completed":
+            progress.phase = "failed"
+            progress.error = progress.error or "Restore failed"
+        progress.finished_at = datetime.now()
+        self.last_restore = progress
+        self.restore_history.insert(0, progress)
+        del self.restore_history[RESTORE_HISTORY_LIMIT:]
+        if self.current_restore is progress:
+            self.current_restore = None
+    
+    async def restore_backup(self, backup_id: str, target_database: Optional[str] = None,
+                             parallel_jobs: Optional[int] = None,
+                             progress: Optional[RestoreProgress] = None) -> bool:
+        """백업 복원
+        
+        custom/directory 포맷은 압축을 스트리밍으로 해제한 뒤 pg_restore -j 로
+        병렬 복원하고, plain 포맷은 psql 로 스트리밍한다. 진행 상황은
+        current_restore 에, 결과는 restore_history 에 기록된다.
+        progress 가 주어지면 claim_restore() 로 미리 등록한 상태를 사용한다.
+        """
+        backup_info = next((b for b in self.backup_history if b.backup_id == backup_id), None)
+        if backup_info and backup_info.backup_type == BackupType.INCREMENTAL:
+            return await self.restore_point_in_time(
+                target_time=None,
+                target_database=target_database,
+                until_backup_id=backup_id,
+                parallel_jobs=parallel_jobs,
+                progress=progress
+            )
+        
+        progress = progress or self.claim_restore(backup_id, target_database, parallel_jobs)
+        if progress is None:
+            return False
+        try:
+            success = await self._restore_full_backup(backup_id, progress)
+            if success:
+                progress.phase = "completed"
+            return success
+        finally:
+            self._end_restore(progress)
+    
+    async def _restore_full_backup(self, backup_id: str, progress: RestoreProgress) -> bool:
+        """전체 백업 하나를 progress.target_database 에 복원 (진행 상태 등록/해제는 호출자)"""
+        temp_archive: Optional[Path] = None
         try:
             # 백업 정보 찾기
             backup_info = None
@@ -333,91 +626,659 @@ class DatabaseBackupManager:
             
             if not backup_info:
                 logger.error(f"Backup not found: {backup_id}")
+                progress.error = f"Backup not found: {backup_id}"
                 return False
             
             # 백업 파일 존재 확인
             backup_file = Path(backup_info.file_path)
             if not backup_file.exists():
                 logger.error(f"Backup file does not exist: {backup_info.file_path}")
+                progress.error = f"Backup file does not exist: {backup_info.file_path}"
                 return False
             
             # 백업 검증
             if not await self._verify_backup(backup_info):
                 logger.error(f"Backup verification failed before restore: {backup_id}")
+                progress.error = f"Backup verification failed: {backup_id}"
                 return False
             
-            # 데이터베이스 연결 정보
-            host, port, username, password, db_name = self._parse_database_url()
-            if target_database:
-                db_name = target_database
+            backup_format = self._detect_backup_format(backup_info)
+            if backup_format in ("basebackup", "wal"):
+                logger.error(f"Physical backup {backup_id} cannot be restored online; "
+                             f"use prepare_point_in_time_restore()")
+                progress.error = f"Physical backup {backup_id} cannot be restored online"
+                return False
             
-            logger.info(f"Starting restore: {backup_id} to {db_name}")
+            db_name = progress.target_database
+            progress.backup_format = backup_format
+            progress.bytes_total = backup_info.file_size
             
-            # pg_restore 명령어 구성
-            pg_restore_cmd = [
-                "pg_restore",
+            logger.info(f"Starting restore: {backup_id} to {db_name} "
+                        f"(format: {backup_format}, jobs: {progress.parallel_jobs})")
+            
+            if backup_format == "plain":
+                success = await self._run_plain_restore(backup_info, db_name, progress)
+            else:
+                archive_path = backup_info.file_path
+                if backup_info.compression and backup_format == "custom":
+                    # pg_restore -j 는 표준 입력을 지원하지 않으므로 임시 파일로 풀어냄
+                    progress.phase = "decompressing"
+                    fd, temp_name = tempfile.mkstemp(
+                        prefix=f".restore_{backup_id}_", suffix=".dump", dir=self.backup_dir
+                    )
+                    os.close(fd)
+                    temp_archive = Path(temp_name)
+                    await self._decompress_to_file(backup_info.file_path, temp_archive, progress)
+                    archive_path = str(temp_archive)
+                progress.bytes_processed = progress.bytes_total
+                success = await self._run_parallel_restore(archive_path, db_name, progress)
+            
+            if success:
+                logger.info(f"Restore completed successfully: {backup_id}")
+            else:
+                logger.error(f"Restore failed: {progress.error}")
+            return success
+                
+        except Exception as e:
+            logger.error(f"Restore failed: {e}")
+            progress.error = str(e)
+            return False
+        finally:
+            if temp_archive and temp_archive.exists():
+                temp_archive.unlink()
+    
+    def get_restore_progress(self) -> Optional[Dict[str, Any]]:
+        """진행 중이거나 마지막으로 수행된 복원 작업 상태"""
+        progress = self.current_restore or self.last_restore
+        return progress.to_dict() if progress else None
+    
+    def get_restore_history(self) -> List[Dict[str, Any]]:
+        """최근 복원 결과 (실패 원인 포함, 최신순)"""
+        return [progress.to_dict() for progress in self.restore_history]
+    
+    # ------------------------------------------------------------------
+    # 증분 백업 (테이블 변경분 추적 / WAL 아카이브)
+    # ------------------------------------------------------------------
+    
+    def _is_usable(self, backup: BackupInfo) -> bool:
+        """복원에 사용할 수 있는 백업 여부"""
+        return backup.status in (BackupStatus.COMPLETED, BackupStatus.VERIFIED)
+    
+    def _backup_until(self, backup: BackupInfo) -> datetime:
+        """백업에 포함된 데이터의 기준 시각 (UTC)"""
+        until = backup.metadata.get("until")
+        if until:
+            return datetime.fromisoformat(until)
+        return backup.timestamp.astimezone(timezone.utc)
+    
+    def _find_base_backup(self, db_name: str, physical: bool,
+                          before: Optional[datetime] = None) -> Optional[BackupInfo]:
+        """증분 체인의 기준이 되는 최신 전체 백업 조회"""
+        candidates = [
+            b for b in self.backup_history
+            if b.backup_type == BackupType.FULL
+            and b.database_name == db_name
+            and self._is_usable(b)
+            and (b.metadata.get("format") == "basebackup") == physical
+            and (before is None or self._backup_until(b) <= before)
+        ]
+        return max(candidates, key=lambda b: b.timestamp) if candidates else None
+    
+    def _get_chain(self, base: BackupInfo) -> List[BackupInfo]:
+        """기준 백업에 연결된 증분 백업 목록 (시간순)"""
+        chain = [
+            b for b in self.backup_history
+            if b.backup_type == BackupType.INCREMENTAL
+            and b.metadata.get("base_backup_id") == base.backup_id
+            and self._is_usable(b)
+        ]
+        return sorted(chain, key=lambda b: b.timestamp)
+    
+    def _cut_chain(self, chain: List[BackupInfo], target_time: Optional[datetime]) -> List[BackupInfo]:
+        """target_time 을 처음 넘어서는 증분까지만 남김 (넘어선 부분은 적용 시 잘라냄)"""
+        if target_time is None:
+            return chain
+        for i, backup in enumerate(chain):
+            if self._backup_until(backup) >= target_time:
+                return chain[:i + 1]
+        return chain
+    
+    async def _query_row(self, db_name: str, query: str) -> List[str]:
+        """psql -tA 로 한 행 조회 (컬럼 값 문자열 목록, NULL 은 빈 문자열)"""
+        conn_args, env = self._build_connection_args(db_name)
+        process = await asyncio.create_subprocess_exec(
+            "psql", *conn_args, "-tA", "-c", query,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, "psql", stderr)
+        return stdout.decode().strip().split("|")
+    
+    async def _get_database_time(self, db_name: str) -> str:
+        """데이터베이스 서버 기준 현재 시각 (UTC ISO 문자열)"""
+        return (await self._query_row(
+            db_name, "SELECT to_char(now() AT TIME ZONE 'UTC', 'YYYY-MM-DD\"T\"HH24:MI:SS.US\"+00:00\"')"
+        ))[0]
+    
+    async def _get_cursor_horizon(self, db_name: str, table: IncrementalTable) -> Tuple[int, int, Optional[int]]:
+        """현재 스냅샷의 (xmin, xmax, 커서 컬럼 최댓값)"""
+        xmin, xmax, max_value = await self._query_row(db_name, (
+            f"SELECT pg_snapshot_xmin(s)::text::bigint, pg_snapshot_xmax(s)::text::bigint, "
+            f"(SELECT MAX({table.cursor_column}) FROM {table.name}) FROM pg_current_snapshot() s"
+        ))
+        return int(xmin), int(xmax), int(max_value) if max_value else None
+    
+    async def _settle_cursors(self, db_name: str) -> Dict[str, Dict[str, Optional[int]]]:
+        """전체 백업 직전 커서 확정
+        
+        지금 보이는 최댓값을 잡은 뒤 그때 진행 중이던 트랜잭션이 모두 끝나기를 기다리면
+        그 값 이하의 행은 이후 시작하는 덤프에 모두 포함된다. 기다리지 못하면 확정하지 않으며
+        (confirmed=None) 첫 증분 백업은 변경 시각 기준으로 내보낸다.
+        """
+        cursors = {}
+        loop = asyncio.get_running_loop()
+        for table in INCREMENTAL_TABLES:
+            if not table.cursor_column:
+                continue
+            _, xmax, max_value = await self._get_cursor_horizon(db_name, table)
+            deadline = loop.time() + CURSOR_SETTLE_SECONDS
+            confirmed = None
+            while True:
+                xmin, _, _ = await self._get_cursor_horizon(db_name, table)
+                if xmin >= xmax:
+                    confirmed = max_value or 0
+                    break
+                if loop.time() >= deadline:
+                    logger.warning(f"Open transactions kept {table.name} cursor unsettled; "
+                                   f"next incremental falls back to {table.change_column}")
+                    break
+                await asyncio.sleep(0.5)
+            cursors[table.name] = {"confirmed": confirmed, "pending_id": None, "pending_xmax": None}
+        return cursors
+    
+    async def _run_psql(self, db_name: str, *args: str, stdout=None) -> None:
+        """psql 실행 (실패 시 CalledProcessError)"""
+        conn_args, env = self._build_connection_args(db_name)
+        env["PGTZ"] = "UTC"  # timestamp without time zone 컬럼은 UTC 로 저장됨
+        process = await asyncio.create_subprocess_exec(
+            "psql", *conn_args, "--quiet", "-v", "ON_ERROR_STOP=1", *args,
+            stdout=stdout if stdout is not None else asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            env=env
+        )
+        _, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, "psql", stderr)
+    
+    def _new_incremental_info(self, backup_id: str, db_name: str, base: BackupInfo,
+                              file_path: Path, metadata: Dict[str, Any]) -> BackupInfo:
+        """증분 백업 정보 초기화"""
+        return BackupInfo(
+            backup_id=backup_id,
+            backup_type=BackupType.INCREMENTAL,
+            timestamp=datetime.now(),
+            file_path=str(file_path),
+            file_size=0,
+            compression=True,
+            checksum="",
+            status=BackupStatus.RUNNING,
+            duration_seconds=0,
+            database_name=db_name,
+            metadata={"base_backup_id": base.backup_id, **metadata}
+        )
+    
+    async def _finalize_backup(self, backup_info: BackupInfo) -> BackupInfo:
+        """백업 파일 크기/체크섬 기록, 검증 후 기록 저장"""
+        backup_file_path = Path(backup_info.file_path)
+        backup_info.file_size = backup_file_path.stat().st_size
+        backup_info.checksum = self._calculate_checksum(str(backup_file_path))
+        backup_info.status = BackupStatus.COMPLETED
+        backup_info.duration_seconds = (datetime.now() - backup_info.timestamp).total_seconds()
+        
+        if self.verify_after_backup:
+            if await self._verify_backup(backup_info):
+                backup_info.status = BackupStatus.VERIFIED
+            else:
+                backup_info.status = BackupStatus.CORRUPTED
+        
+        self.backup_history.append(backup_info)
+        self._save_backup_history()
+        return backup_info
+    
+    def _record_failed_backup(self, backup_info: BackupInfo, error: Exception):
+        """실패한 백업 정보 기록"""
+        backup_info.status = BackupStatus.FAILED
+        backup_info.metadata["error"] = str(error)
+        self.backup_history.append(backup_info)
+        self._save_backup_history()
+    
+    async def create_incremental_backup(self, database_name: Optional[str] = None) -> BackupInfo:
+        """증분 백업 생성
+        
+        BACKUP_INCREMENTAL_MODE 가 wal 이면 마지막 백업 이후 아카이브된 WAL 세그먼트를,
+        table 이면 대용량 테이블의 변경 행만 저장한다. 기준 백업이 없으면
+        전체 백업(또는 base backup)을 먼저 생성한다.
+        """
+        db_name = database_name or self._parse_database_url()[4]
+        physical = settings.BACKUP_INCREMENTAL_MODE == "wal"
+        
+        base = self._find_base_backup(db_name, physical)
+        if base is None:
+            logger.info("No base backup found for incremental chain, creating one")
+            if physical:
+                return await self.create_base_backup(db_name)
+            return await self.create_full_backup(database_name=db_name)
+        
+        if physical:
+            return await self._create_wal_incremental(db_name, base)
+        return await self._create_table_incremental(db_name, base)
+    
+    async def _create_table_incremental(self, db_name: str, base: BackupInfo) -> BackupInfo:
+        """대용량 테이블의 변경 행을 CSV 로 내보내 tar.gz 로 묶음"""
+        chain = self._get_chain(base)
+        previous = chain[-1] if chain else base
+        since = self._backup_until(previous).isoformat()
+        previous_cursors = previous.metadata.get("cursors", {})
+        
+        backup_id = self._generate_backup_id()
+        backup_file_path = self.backup_dir / f"{backup_id}_{db_name}.incr.tar.gz"
+        backup_info = self._new_incremental_info(backup_id, db_name, base, backup_file_path, {
+            "format": "table_changes",
+            "since": since,
+            "tables": [t.name for t in INCREMENTAL_TABLES]
+        })
+        
+        self.current_backup = backup_info
+        logger.info(f"Starting table-level incremental backup: {backup_id} (since {since})")
+        
+        try:
+            until = await self._get_database_time(db_name)
+            backup_info.metadata["until"] = until
+            
+            cursors = {}
+            with tempfile.TemporaryDirectory(dir=self.backup_dir) as work_dir:
+                exported = []
+                for table in INCREMENTAL_TABLES:
+                    csv_path = Path(work_dir) / f"{table.name}.csv"
+                    condition = (
+                        f"{table.change_column} > '{since}'::timestamptz "
+                        f"AND {table.change_column} <= '{until}'::timestamptz"
+                    )
+                    if table.cursor_column:
+                        condition, cursors[table.name] = await self._cursor_condition(
+                            db_name, table, previous_cursors.get(table.name), condition
+                        )
+                    query = (
+                        f"COPY (SELECT * FROM {table.name} WHERE {condition}) "
+                        f"TO STDOUT WITH (FORMAT csv, HEADER)"
+                    )
+                    with open(csv_path, 'wb') as out:
+                        await self._run_psql(db_name, "-c", query, stdout=out)
+                    exported.append(csv_path)
+                
+                def _pack():
+                    with tarfile.open(backup_file_path, "w:gz") as tar:
+                        for csv_path in exported:
+                            tar.add(csv_path, arcname=csv_path.name)
+                
+                await asyncio.to_thread(_pack)
+                backup_info.metadata["table_bytes"] = {
+                    p.stem: p.stat().st_size for p in exported
+                }
+            backup_info.metadata["cursors"] = cursors
+            
+            backup_info = await self._finalize_backup(backup_info)
+            logger.info(f"Incremental backup completed: {backup_id}, Size: {backup_info.file_size} bytes")
+            return backup_info
+        
+        except Exception as e:
+            self._record_failed_backup(backup_info, e)
+            logger.error(f"Incremental backup failed: {e}")
+            raise
+        finally:
+            self.current_backup = None
+    
+    async def _cursor_condition(self, db_name: str, table: IncrementalTable,
+                                state: Optional[Dict[str, Optional[int]]],
+                                fallback: str) -> Tuple[str, Dict[str, Optional[int]]]:
+        """커서 테이블의 내보내기 조건과 다음 증분 백업에 넘길 커서 상태
+        
+        confirmed 이하의 행은 이미 체인에 포함되어 있으므로 그 이후를 모두 내보낸다
+        (상한이 없어 다음 증분과 겹칠 수 있지만 적용은 키 기준 교체라 중복되지 않음).
+        커서 확정 규칙은 롤업 워터마크와 같다 (commit_horizon.next_horizon).
+        """
+        state = state or {}
+        confirmed = state.get("confirmed")
+        xmin, xmax, max_value = await self._get_cursor_horizon(db_name, table)
+        safe, pending_id, pending_xmax = next_horizon(
+            confirmed or 0, state.get("pending_id"), state.get("pending_xmax"), xmin, xmax, max_value
+        )
+        if confirmed is None:
+            # 커서가 없는 이전 체인: 변경 시각 기준으로 내보내며 커서 추적을 시작
+            condition = fallback
+        else:
+            condition = f"{table.cursor_column} > {int(confirmed)}"
+        return condition, {
+            "confirmed": safe if confirmed is not None or safe > 0 else None,
+            "pending_id": pending_id,
+            "pending_xmax": pending_xmax,
+        }
+    
+    async def create_base_backup(self, database_name: Optional[str] = None) -> BackupInfo:
+        """pg_basebackup 으로 물리 base backup 생성 (WAL 증분 체인의 시작점)"""
+        host, port, username, password, db_name = self._parse_database_url()
+        db_name = database_name or db_name
+        backup_id = self._generate_backup_id()
+        backup_file_path = self.backup_dir / f"{backup_id}_{db_name}.base.tar.gz"
+        
+        backup_info = BackupInfo(
+            backup_id=backup_id,
+            backup_type=BackupType.FULL,
+            timestamp=datetime.now(),
+            file_path=str(backup_file_path),
+            file_size=0,
+            compression=True,
+            checksum="",
+            status=BackupStatus.RUNNING,
+            duration_seconds=0,
+            database_name=db_name,
+            metadata={
+                "host": host,
+                "port": port,
+                "username": username,
+                "format": "basebackup"
+            }
+        )
+        self.current_backup = backup_info
+        logger.info(f"Starting base backup: {backup_id}")
+        
+        try:
+            backup_info.metadata["until"] = await self._get_database_time(db_name)
+            
+            env = os.environ.copy()
+            if password:
+                env["PGPASSWORD"] = password
+            
+            # WAL 은 아카이브에서 가져오므로 -X none, 단일 tar 를 stdout 으로 스트리밍
+            process = await asyncio.create_subprocess_exec(
+                "pg_basebackup",
                 "-h", host,
                 "-p", port,
                 "-U", username,
-                "-d", db_name,
-                "--verbose",
                 "--no-password",
-                "--clean",
-                "--if-exists",
-                "--no-privileges",
-                "--no-owner"
-            ]
+                "-D", "-",
+                "-Ft",
+                "-X", "none",
+                "--checkpoint=fast",
+                "--verbose",
+                f"--label={backup_id}",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=env
+            )
+            stderr_task = asyncio.create_task(process.stderr.read())
             
-            # 환경 변수 설정
-            env = os.environ.copy()
-            if password:
-                env["PGPASSWORD"] = password
+            with gzip.open(backup_file_path, 'wb') as f:
+                while True:
+                    chunk = await process.stdout.read(RESTORE_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    await asyncio.to_thread(f.write, chunk)
             
-            # 복원 실행
-            if backup_info.compression:
-                # 압축된 백업 복원
-                with gzip.open(backup_info.file_path, 'rb') as f:
-                    process = await asyncio.create_subprocess_exec(
-                        *pg_restore_cmd,
-                        stdin=asyncio.subprocess.PIPE,
-                        stdout=asyncio.subprocess.PIPE,
-                        stderr=asyncio.subprocess.PIPE,
-                        env=env
+            await process.wait()
+            stderr = await stderr_task
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, "pg_basebackup", stderr)
+            
+            match = _WAL_START_PATTERN.search(stderr.decode(errors="replace"))
+            if match:
+                log_id = int(match.group(1), 16)
+                segment = int(match.group(2), 16) >> 24  # 16MB 세그먼트 기준
+                timeline = int(match.group(3))
+                backup_info.metadata["wal_start_segment"] = f"{timeline:08X}{log_id:08X}{segment:08X}"
+            
+            backup_info = await self._finalize_backup(backup_info)
+            logger.info(f"Base backup completed: {backup_id}, Size: {backup_info.file_size} bytes")
+            return backup_info
+        
+        except Exception as e:
+            self._record_failed_backup(backup_info, e)
+            logger.error(f"Base backup failed: {e}")
+            raise
+        finally:
+            self.current_backup = None
+    
+    def _list_archived_segments(self) -> List[Path]:
+        """WAL 아카이브 디렉토리의 세그먼트 파일 (이름순 = LSN 순)"""
+        archive_dir = settings.BACKUP_WAL_ARCHIVE_DIR
+        if not archive_dir or not Path(archive_dir).is_dir():
+            raise FileNotFoundError(f"WAL archive directory not configured or missing: {archive_dir}")
+        return sorted(p for p in Path(archive_dir).iterdir() if _WAL_SEGMENT_PATTERN.match(p.name))
+    
+    async def _create_wal_incremental(self, db_name: str, base: BackupInfo) -> BackupInfo:
+        """마지막 백업 이후 아카이브된 WAL 세그먼트를 tar.gz 로 수집"""
+        chain = self._get_chain(base)
+        last_segment = chain[-1].metadata.get("wal_last_segment") if chain else None
+        start_segment = base.metadata.get("wal_start_segment", "")
+        
+        segments = [
+            p for p in self._list_archived_segments()
+            if p.name >= start_segment and (last_segment is None or p.name > last_segment)
+        ]
+        history_files = list(Path(settings.BACKUP_WAL_ARCHIVE_DIR).glob("*.history"))
+        
+        backup_id = self._generate_backup_id()
+        backup_file_path = self.backup_dir / f"{backup_id}_{db_name}.wal.tar.gz"
+        backup_info = self._new_incremental_info(backup_id, db_name, base, backup_file_path, {
+            "format": "wal",
+            "wal_first_segment": segments[0].name if segments else None,
+            "wal_last_segment": segments[-1].name if segments else last_segment,
+            "wal_segment_count": len(segments)
+        })
+        
+        self.current_backup = backup_info
+        logger.info(f"Starting WAL incremental backup: {backup_id} ({len(segments)} segments)")
+        
+        try:
+            backup_info.metadata["until"] = await self._get_database_time(db_name)
+            
+            def _pack():
+                with tarfile.open(backup_file_path, "w:gz") as tar:
+                    for path in [*history_files, *segments]:
+                        tar.add(path, arcname=path.name)
+            
+            await asyncio.to_thread(_pack)
+            backup_info = await self._finalize_backup(backup_info)
+            logger.info(f"WAL incremental backup completed: {backup_id}, Size: {backup_info.file_size} bytes")
+            return backup_info
+        
+        except Exception as e:
+            self._record_failed_backup(backup_info, e)
+            logger.error(f"WAL incremental backup failed: {e}")
+            raise
+        finally:
+            self.current_backup = None
+    
+    async def _apply_table_incremental(self, backup_info: BackupInfo, db_name: str,
+                                       target_time: Optional[datetime]) -> None:
+        """테이블 변경분을 키 기준으로 교체 적용 (target_time 이후 변경은 제외)"""
+        with tempfile.TemporaryDirectory(dir=self.backup_dir) as work_dir:
+            def _extract():
+                with tarfile.open(backup_info.file_path, "r:gz") as tar:
+                    tar.extractall(work_dir, filter="data")
+            
+            await asyncio.to_thread(_extract)
+            
+            for table in INCREMENTAL_TABLES:
+                csv_path = Path(work_dir) / f"{table.name}.csv"
+                if not csv_path.exists() or csv_path.stat().st_size == 0:
+                    continue
+                
+                staging = f"_incr_{table.name}"
+                statements = [
+                    f"CREATE TEMP TABLE {staging} (LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DROP;",
+                    f"\\copy {staging} FROM '{csv_path}' WITH (FORMAT csv, HEADER)",
+                ]
+                if target_time is not None:
+                    statements.append(
+                        f"DELETE FROM {staging} WHERE {table.change_column} > '{target_time.isoformat()}'::timestamptz;"
+                    )
+                statements += [
+                    f"DELETE FROM {table.name} t USING {staging} s WHERE t.{table.key_column} = s.{table.key_column};",
+                    f"INSERT INTO {table.name} SELECT * FROM {staging};",
+                ]
+                if table.serial_key:
+                    statements.append(
+                        f"SELECT setval(pg_get_serial_sequence('{table.name}', '{table.key_column}'), "
+                        f"(SELECT COALESCE(MAX({table.key_column}), 1) FROM {table.name}));"
                     )
-                    
-                    stdout, stderr = await process.communicate(input=f.read())
-            else:
-                # 일반 백업 복원
-                pg_restore_cmd.append(backup_info.file_path)
-                process = await asyncio.create_subprocess_exec(
-                    *pg_restore_cmd,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                    env=env
-                )
                 
-                stdout, stderr = await process.communicate()
+                script_path = Path(work_dir) / f"{table.name}.sql"
+                script_path.write_text("\n".join(statements) + "\n")
+                await self._run_psql(db_name, "--single-transaction", "-f", str(script_path))
+                logger.info(f"Applied incremental changes for {table.name} from {backup_info.backup_id}")
+    
+    async def restore_point_in_time(self, target_time: Optional[datetime],
+                                    target_database: Optional[str] = None,
+                                    until_backup_id: Optional[str] = None,
+                                    parallel_jobs: Optional[int] = None,
+                                    progress: Optional[RestoreProgress] = None) -> bool:
+        """특정 시점 복원 (전체 백업 + 테이블 증분 체인)
+        
+        target_time 이전의 최신 전체 백업을 복원한 뒤 증분 백업을 순서대로 적용한다.
+        until_backup_id 가 주어지면 해당 증분 백업까지 적용한다.
+        증분 적용이 끝날 때까지 current_restore 를 유지하므로 그 사이 다른 복원은 시작되지 않는다.
+        """
+        progress = progress or self.claim_restore(until_backup_id or "point_in_time", target_database, parallel_jobs)
+        if progress is None:
+            return False
+        try:
+            db_name = self._parse_database_url()[4]
+            if target_time is not None and target_time.tzinfo is None:
+                target_time = target_time.astimezone(timezone.utc)
             
-            if process.returncode == 0:
-                logger.info(f"Restore completed successfully: {backup_id}")
-                return True
+            if until_backup_id:
+                backups = {b.backup_id: b for b in self.backup_history}
+                last = backups.get(until_backup_id)
+                base = backups.get(last.metadata.get("base_backup_id")) if last else None
+                if base is None:
+                    logger.error(f"Incremental backup chain is incomplete for {until_backup_id}")
+                    progress.error = f"Incremental backup chain is incomplete for {until_backup_id}"
+                    return False
+                chain = [b for b in self._get_chain(base) if b.timestamp <= last.timestamp]
             else:
-                logger.error(f"Restore failed: {stderr.decode()}")
+                base = self._find_base_backup(db_name, physical=False, before=target_time)
+                if base is None:
+                    logger.error(f"No full backup available before {target_time}")
+                    progress.error = f"No full backup available before {target_time}"
+                    return False
+                chain = self._cut_chain(self._get_chain(base), target_time)
+            
+            logger.info(f"Point-in-time restore: base {base.backup_id} + {len(chain)} incrementals "
+                        f"(target: {target_time or until_backup_id})")
+            
+            if not await self._restore_full_backup(base.backup_id, progress):
                 return False
-                
+            
+            progress.phase = "applying_incrementals"
+            for incremental in chain:
+                if not await self._verify_backup(incremental):
+                    logger.error(f"Incremental backup verification failed: {incremental.backup_id}")
+                    progress.error = f"Incremental backup verification failed: {incremental.backup_id}"
+                    return False
+                await self._apply_table_incremental(incremental, progress.target_database, target_time)
+            
+            progress.phase = "completed"
+            logger.info("Point-in-time restore completed successfully")
+            return True
+        
         except Exception as e:
-            logger.error(f"Restore failed: {e}")
+            logger.error(f"Point-in-time restore failed: {e}")
+            progress.error = str(e)
             return False
+        finally:
+            self._end_restore(progress)
+    
+    async def prepare_point_in_time_restore(self, target_time: datetime,
+                                            restore_dir: str) -> Dict[str, Any]:
+        """WAL 기반 특정 시점 복원용 데이터 디렉토리 준비
+        
+        base backup 과 WAL 세그먼트를 풀고 recovery 설정을 기록한다.
+        PostgreSQL 서버를 restore_dir 로 기동하면 target_time 까지 복구 후 승격된다.
+        """
+        if target_time.tzinfo is None:
+            target_time = target_time.astimezone(timezone.utc)
+        db_name = self._parse_database_url()[4]
+        base = self._find_base_backup(db_name, physical=True, before=target_time)
+        if base is None:
+            raise ValueError(f"No base backup available before {target_time}")
+        
+        data_dir = Path(restore_dir)
+        if data_dir.exists() and any(data_dir.iterdir()):
+            raise ValueError(f"Restore directory is not empty: {restore_dir}")
+        wal_dir = data_dir.parent / f"{data_dir.name}_wal"
+        data_dir.mkdir(parents=True, exist_ok=True)
+        wal_dir.mkdir(parents=True, exist_ok=True)
+        
+        chain = self._cut_chain(self._get_chain(base), target_time)
+        
+        def _extract():
+            with tarfile.open(base.file_path, "r:gz") as tar:
+                tar.extractall(data_dir, filter="data")
+            for incremental in chain:
+                with tarfile.open(incremental.file_path, "r:gz") as tar:
+                    tar.extractall(wal_dir, filter="data")
+            
+            (data_dir / "recovery.signal").touch()
+            with open(data_dir / "postgresql.auto.conf", "a") as conf:
+                conf.write(f"\n# point-in-time restore prepared from {base.backup_id}\n")
+                conf.write(f"restore_command = 'cp \"{wal_dir}/%f\" \"%p\"'\n")
+                conf.write(f"recovery_target_time = '{target_time.isoformat()}'\n")
+                conf.write("recovery_target_action = 'promote'\n")
+        
+        await asyncio.to_thread(_extract)
+        logger.info(f"Prepared point-in-time restore in {data_dir} "
+                    f"(base {base.backup_id}, {len(chain)} WAL archives)")
+        
+        return {
+            "data_directory": str(data_dir),
+            "wal_directory": str(wal_dir),
+            "base_backup_id": base.backup_id,
+            "wal_backups": [b.backup_id for b in chain],
+            "target_time": target_time.isoformat()
+        }
     
     def cleanup_old_backups(self) -> int:
-        """오래된 백업 정리"""
+        """오래된 백업 정리
+        
+        증분 체인은 기준 백업과 함께 하나의 단위로 취급하여, 체인의 가장 최근 백업이
+        보존 기간을 넘긴 경우에만 삭제한다. 가장 최신 체인은 항상 유지한다.
+        """
         try:
             cleanup_count = 0
             cutoff_date = datetime.now() - timedelta(days=self.retention_days)
             
-            backups_to_remove = []
+            # 기준 백업 ID -> 체인 구성원
+            chains: Dict[str, List[BackupInfo]] = {}
             for backup in self.backup_history:
-                if backup.timestamp < cutoff_date:
+                chain_id = backup.metadata.get("base_backup_id", backup.backup_id)
+                chains.setdefault(chain_id, []).append(backup)
+            
+            latest_chain_id = max(
+                chains, key=lambda cid: max(b.timestamp for b in chains[cid]), default=None
+            )
+            
+            backups_to_remove = []
+            for chain_id, members in chains.items():
+                if chain_id == latest_chain_id:
+                    continue
+                if max(b.timestamp for b in members) >= cutoff_date:
+                    continue
+                
+                for backup in members:
                     # 백업 파일 삭제
                     backup_file = Path(backup.file_path)
                     if backup_file.exists():
@@ -434,14 +1295,39 @@ class DatabaseBackupManager:
             # 기록 저장
             if backups_to_remove:
                 self._save_backup_history()
+                self._prune_wal_archive()
             
             logger.info(f"Cleaned up {cleanup_count} old backups")
             return cleanup_count
-            
+        
         except Exception as e:
             logger.error(f"Backup cleanup failed: {e}")
             return 0
     
+    def _prune_wal_archive(self) -> int:
+        """남아있는 가장 오래된 base backup 이전의 WAL 세그먼트 삭제"""
+        if settings.BACKUP_INCREMENTAL_MODE != "wal" or not settings.BACKUP_WAL_ARCHIVE_DIR:
+            return 0
+        
+        start_segments = [
+            b.metadata["wal_start_segment"] for b in self.backup_history
+            if b.metadata.get("format") == "basebackup" and b.metadata.get("wal_start_segment")
+        ]
+        if not start_segments:
+            return 0
+        
+        oldest_needed = min(start_segments)
+        removed = 0
+        for segment in self._list_archived_segments():
+            if segment.name >= oldest_needed:
+                break
+            segment.unlink()
+            removed += 1
+        
+        if removed:
+            logger.info(f"Pruned {removed} WAL segments older than {oldest_needed}")
+        return removed
+    
     def get_backup_statistics(self) -> Dict[str, Any]:
         """백업 통계 정보"""
         try:
@@ -475,6 +1361,8 @@ class DatabaseBackupManager:
                     "backup_directory": str(self.backup_dir)
                 },
                 "retention_days": self.retention_days,
+                "incremental_mode": settings.BACKUP_INCREMENTAL_MODE,
+                "incremental_backups": len([b for b in self.backup_history if b.backup_type == BackupType.INCREMENTAL]),
                 "current_backup_running": self.current_backup is not None
             }
             
@@ -0,0 +1,35 @@
+"""
+커밋 순서 커서
+id처럼 INSERT 시점에 발급되는 값은 커밋 순서와 다르므로, 트랜잭션 스냅샷 경계로 확정된 상한까지만
+커서를 전진시키는 규칙 (측정 롤업 워터마크와 증분 백업 커서가 공유)
+"""
+from typing import Optional, Tuple
+
+
+def next_horizon(
+    watermark: int,
+    pending_id: Optional[int],
+    pending_xmax: Optional[int],
+    snapshot_xmin: int,
+    snapshot_xmax: int,
+    max_id: Optional[int]
+) -> Tuple[int, Optional[int], Optional[int]]:
+    """
+    커서를 전진시켜도 되는 id 상한 계산
+    
+    id는 INSERT 시점에 발급되고 커밋 순서와 무관하므로, 지금 보이는 최대 id까지 바로 반영하면
+    더 작은 id를 가진 진행 중 트랜잭션의 행이 나중에 커밋되어 영구히 누락됩니다.
+    그래서 보이는 최대 id를 그 시점 스냅샷의 xmax와 함께 보류해 두고, 이후 스냅샷의 xmin이
+    그 xmax 이상이 되어(당시 진행 중이던 트랜잭션이 모두 종료) 그 id까지 확정합니다.
+    
+    Returns:
+        Tuple: (반영 가능한 id 상한, 보류 id, 보류 xmax)
+    """
+    safe_upper = watermark
+    if pending_id is not None and snapshot_xmin >= pending_xmax:
+        safe_upper = max(watermark, pending_id)
+        pending_id = pending_xmax = None
+    # 보류 중인 경계는 확정될 때까지 옮기지 않음 (계속 옮기면 부하 중에는 확정되지 않음)
+    if pending_id is None and max_id is not None and max_id > safe_upper:
+        pending_id, pending_xmax = max_id, snapshot_xmax
+    return safe_upper, pending_id, pending_xmax
@@ -152,10 +152,56 @@ class Settings(BaseSettings):
     # 스케줄러 및 자동화 설정
     AUTO_CLOSE_DAYS_DEFAULT: int = 90    # Added for .env compatibility
     
+    # 백업 설정
+    BACKUP_INCREMENTAL_MODE: str = "table"  # table: 대용량 테이블 변경분 추적, wal: base backup + WAL 아카이브
+    BACKUP_WAL_ARCHIVE_DIR: Optional[str] = None  # archive_command 로 WAL 세그먼트가 복사되는 경로
+    BACKUP_FULL_INTERVAL_DAYS: int = 7  # 증분 체인마다 새 전체 백업을 생성하는 주기
+    
     # 정적 파일 설정
     STATIC_FILES_DIR: str = "static"     # 빌드된 React 앱 경로
     SERVE_STATIC_FILES: bool = True      # 정적 파일 서빙 여부
     
+    # 성능 모니터링 설정
+    PERFORMANCE_METRICS_DIR: Optional[str] = None  # 워커 간 지연 시간 히스토그램 집계용 공유 디렉토리
+    METRICS_SCRAPE_TOKEN: Optional[str] = None  # /metrics 스크레이프용 Bearer 토큰 (없으면 관리자 토큰만 허용)
+    METRICS_PUBLIC: bool = False  # True면 인증 없이 /metrics 공개 (스크레이퍼만 닿는 내부망에서만 사용)
+    DATA_SOURCE_HEALTH_INTERVAL_SECONDS: int = 30  # 데이터 소스 상태 점검 주기
+    DATA_SOURCE_PROBE_TIMEOUT_SECONDS: float = 5.0  # 데이터 소스 점검 타임아웃
+    DATA_SOURCE_BREAKER_FAILURE_THRESHOLD: int = 5  # 연속 실패 시 데이터 소스 차단
+    DATA_SOURCE_BREAKER_RESET_SECONDS: float = 30.0  # 차단 후 반개방 점검까지 대기 시간
+    DATA_SOURCE_MAX_CONCURRENCY: int = 10  # 데이터 소스별 동시 호출 제한 (bulkhead)
+    DATA_SOURCE_BULKHEAD_TIMEOUT_SECONDS: float = 2.0  # 동시 호출 슬롯 대기 시간
+    DATA_SOURCE_CONFIG_REVALIDATE_SECONDS: float = 30.0  # 캐시된 데이터 소스 설정의 updated_at 재확인 주기
+    STATUS_MAPPING_REVALIDATE_SECONDS: float = 60.0  # 캐시된 워크스페이스 상태 매핑을 다시 조회하는 주기 (다른 워커/DB 직접 수정 반영)
+    DATA_SOURCE_POOL_MAX_CONNECTIONS: int = 100  # 외부 데이터 소스 풀 전체 최대 연결 수 (초과 시 유휴 풀 LRU 정리)
+    DATA_SOURCE_STATEMENT_TIMEOUT_SECONDS: float = 30.0  # 임시 쿼리 실행 기본 타임아웃 (데이터 소스별 설정이 우선)
+    API_PROVIDER_PAGE_CONCURRENCY: int = 4  # 외부 API 페이지 동시 요청 수 (엔드포인트 pagination_config가 우선)
+    API_PROVIDER_MAX_PAGES: int = 100  # 외부 API 호출당 최대 페이지 수
+    API_PROVIDER_STREAM_THRESHOLD_BYTES: int = 1048576  # 이 크기를 넘거나 길이를 모르는 응답은 증분 파싱 (ijson)
+    API_PROVIDER_CONDITIONAL_CACHE_SIZE: int = 256  # ETag/Last-Modified 조건부 요청 캐시 항목 수
+    SPEC_CACHE_TTL_SECONDS: float = 300.0  # 데이터 소스별 measurement_specs 캐시 TTL (규격 CRUD 시 즉시 무효화)
+    DOWNSAMPLE_MAX_SOURCE_ROWS: int = 100000  # 다운샘플링 시 시리즈 조회에 사용할 최대 원본 행 수
+    DOWNSAMPLE_DEFAULT_RANGE_HOURS: float = 24.0  # start_time 없이 다운샘플링을 요청한 경우 조회 구간
+    MEASUREMENT_PARTITION_INTERVAL: str = "month"  # 측정 데이터 파티션 단위 (day / month)
+    MEASUREMENT_PARTITION_PREMAKE: int = 3  # 현재 구간 이후 미리 만들어 둘 파티션 수
+    MEASUREMENT_RETENTION_DAYS: int = 0  # 이 기간이 지난 파티션은 유지보수 시 삭제 (0이면 보존)
+    MEASUREMENT_PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 3600  # 파티션 생성/기본 파티션 행 이동/보존 기간 정리 주기 (0이면 비활성)
+    MEASUREMENT_BRIN_PAGES_PER_RANGE: int = 32  # timestamp BRIN 인덱스 pages_per_range
+    MEASUREMENT_ROLLUP_SYNC_INTERVAL_SECONDS: int = 60  # 측정 데이터 롤업(1분/1시간) 증분 동기화 주기 (0이면 비활성)
+    MEASUREMENT_ROLLUP_BATCH_SIZE: int = 50000  # 롤업 동기화 1회 트랜잭션에서 반영할 최대 원본 행 수
+    MEASUREMENT_AGGREGATE_MAX_BUCKETS: int = 1000  # interval 없이 집계 조회 시 시리즈당 최대 버킷 수
+    CHANGES_FALLBACK_MAX_ROWS: int = 100000  # {{since}} 미지원 소스의 증분 조회 시 워터마크까지 거슬러 읽는 최대 행 수
+    LATEST_MEASUREMENT_REFRESH_SECONDS: float = 5.0  # 최신값 캐시 증분 갱신 주기 (이보다 오래된 스냅샷은 조회 시 갱신)
+    LATEST_MEASUREMENT_OVERLAP_SECONDS: float = 300.0  # 증분 갱신 시 워터마크보다 이만큼 이전부터 다시 조회 (늦게 커밋된 행 보정)
+    LATEST_MEASUREMENT_FULL_RELOAD_SECONDS: float = 900.0  # 겹침 구간보다 늦게 들어온 행을 잡기 위한 전체 재적재 주기
+    LATEST_MEASUREMENT_IDLE_SECONDS: float = 600.0  # 이 시간 동안 조회가 없는 데이터 소스는 최신값 캐시에서 제거
+    PG_CHANGE_FEED_ENABLED: bool = False  # PostgreSQL 데이터 소스 LISTEN/NOTIFY 변경 피드 사용 (migrations/add_change_feed_triggers.sql 트리거 필요)
+    PG_CHANGE_FEED_QUEUE_SIZE: int = 1000  # 변경 피드 구독자별 대기 이벤트 수 (넘치면 비우고 resync 이벤트 전송)
+    PG_CHANGE_FEED_KEEPALIVE_SECONDS: float = 15.0  # 변경 스트림 keepalive 주기 및 리스너 유휴 점검 주기
+    MEASUREMENT_INGEST_BATCH_SIZE: int = 5000  # 측정 데이터 일괄 적재 시 검증/COPY 1회 행 수
+    MEASUREMENT_INGEST_COMMIT_ROWS: int = 50000  # 일괄 적재 그룹 커밋 단위 행 수 (atomic 요청은 마지막에 한 번 커밋)
+    MEASUREMENT_INGEST_MAX_JSON_BYTES: int = 32 * 1024 * 1024  # ijson이 없을 때 JSON 배열 본문 최대 크기 (큰 적재는 NDJSON/CSV)
+    
     # 로깅 설정
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"  # json 또는 console
@@ -9,6 +9,7 @@ from typing import AsyncGenerator
 import logging
 
 from .config import settings
+from .sql_instrumentation import sql_instrumentation, instrumented_pool_class
 import ssl
 
 logger = logging.getLogger(__name__)
@@ -76,9 +77,13 @@ engine = create_async_engine(
     pool_size=20,         # 기본 커넥션 풀 크기 증가
     max_overflow=30,      # 최대 추가 연결 수
     pool_timeout=30,      # 연결 대기 시간 (초)
+    poolclass=instrumented_pool_class("primary"),  # 체크아웃 대기 시간 계측
     connect_args=_get_database_connect_args()
 )
 
+# 구문 단위 실행 시간/행 수 계측
+sql_instrumentation.instrument_engine(engine, "primary")
+
 # 비동기 세션 팩토리 생성
 AsyncSessionLocal = async_sessionmaker(
     engine,
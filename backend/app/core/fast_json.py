@@ -0,0 +1,64 @@
+"""
+Fast JSON Serialization
+대량 측정/설비 응답을 Pydantic 재검증 없이 바로 직렬화하는 JSON 인코더
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+import json
+import math
+
+from fastapi.responses import JSONResponse
+
+# orjson을 선택적으로 import (없으면 표준 json 사용)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """기본 인코더가 처리하지 못하는 타입 변환 (MeasurementRecord 등 to_dict() 제공 객체 포함)"""
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _finite(value: Any) -> Any:
+    """NaN/Infinity를 None으로 바꾼 사본 (orjson이 null로 쓰는 것과 맞춤)"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def dumps(content: Any) -> bytes:
+    """content를 UTF-8 JSON 바이트로 직렬화"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        _finite(content), default=lambda value: _finite(_default(value)),
+        ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    response_model 검증을 거치지 않고 dumps()로 바로 렌더링하는 응답
+    프로바이더 경계에서 이미 검증된 레코드에만 사용합니다.
+    """
+    
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
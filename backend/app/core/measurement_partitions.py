@@ -0,0 +1,424 @@
+"""
+측정 데이터 시간 파티션 관리
+personal_test_measurement_data를 timestamp 범위 파티션(일/월)으로 전환하고 파티션 생성/보존 기간 정리를 수행
+"""
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .config import settings
+from .database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+MEASUREMENT_TABLE = "personal_test_measurement_data"
+LEGACY_TABLE = f"{MEASUREMENT_TABLE}_legacy"
+# 범위 파티션이 없는 시각의 행을 받는 파티션 (유지보수 시 해당 구간 파티션으로 옮김)
+DEFAULT_PARTITION = f"{MEASUREMENT_TABLE}_default"
+# 적재 중 파티션 생성이 기다릴 최대 잠금 시간 (적재 트랜잭션이 이미 잡은 잠금과 엇갈리면 포기하고 기본 파티션에 기록)
+WRITE_PATH_LOCK_TIMEOUT = "2s"
+PARTITION_INTERVALS = ("day", "month")
+
+
+def period_start(value: date, interval: str) -> date:
+    """value가 속한 파티션 구간의 시작일"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value.replace(day=1) if interval == "month" else value
+
+
+def next_period(start: date, interval: str) -> date:
+    """다음 파티션 구간의 시작일"""
+    if interval == "month":
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+def partition_name(start: date, interval: str) -> str:
+    """파티션 테이블 이름 (월: _p202501, 일: _p20250101)"""
+    suffix = start.strftime("%Y%m") if interval == "month" else start.strftime("%Y%m%d")
+    return f"{MEASUREMENT_TABLE}_p{suffix}"
+
+
+def parse_partition_name(name: str, interval: str) -> Optional[date]:
+    """partition_name()으로 만든 이름이면 구간 시작일, 아니면 None"""
+    prefix = f"{MEASUREMENT_TABLE}_p"
+    if not name.startswith(prefix):
+        return None
+    try:
+        if interval == "month":
+            return datetime.strptime(name[len(prefix):], "%Y%m").date()
+        return datetime.strptime(name[len(prefix):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+def partition_ranges(first: date, last: date, interval: str) -> List[Tuple[str, date, date]]:
+    """first~last를 덮는 (이름, 시작일, 종료일) 목록 (종료일은 다음 구간 시작, 미포함)"""
+    ranges = []
+    start = period_start(first, interval)
+    while start <= last:
+        end = next_period(start, interval)
+        ranges.append((partition_name(start, interval), start, end))
+        start = end
+    return ranges
+
+
+class MeasurementPartitionManager:
+    """측정 데이터 파티션 생성/정리/전환 관리자"""
+    
+    def __init__(
+        self,
+        interval: Optional[str] = None,
+        premake: Optional[int] = None,
+        retention_days: Optional[int] = None,
+        brin_pages_per_range: Optional[int] = None
+    ):
+        self.interval = interval or settings.MEASUREMENT_PARTITION_INTERVAL
+        if self.interval not in PARTITION_INTERVALS:
+            raise ValueError(f"Unsupported partition interval: {self.interval}")
+        self.premake = settings.MEASUREMENT_PARTITION_PREMAKE if premake is None else premake
+        self.retention_days = settings.MEASUREMENT_RETENTION_DAYS if retention_days is None else retention_days
+        self.brin_pages_per_range = brin_pages_per_range or settings.MEASUREMENT_BRIN_PAGES_PER_RANGE
+        self._task: Optional[asyncio.Task] = None
+        self._known_periods: Set[date] = set()
+    
+    async def is_partitioned(self, session: AsyncSession) -> bool:
+        """측정 테이블이 파티션 테이블인지 확인"""
+        result = await session.execute(text("""
+            SELECT c.relkind = 'p'
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = current_schema() AND c.relname = :table
+        """), {"table": MEASUREMENT_TABLE})
+        return bool(result.scalar())
+    
+    async def list_partitions(self, session: AsyncSession) -> List[str]:
+        """현재 연결된 파티션 이름 목록"""
+        result = await session.execute(text("""
+            SELECT child.relname
+            FROM pg_inherits i
+            JOIN pg_class parent ON parent.oid = i.inhparent
+            JOIN pg_class child ON child.oid = i.inhrelid
+            JOIN pg_namespace n ON n.oid = parent.relnamespace
+            WHERE n.nspname = current_schema() AND parent.relname = :table
+            ORDER BY child.relname
+        """), {"table": MEASUREMENT_TABLE})
+        return [row.relname for row in result]
+    
+    def _upcoming_ranges(self, first: date, now: Optional[datetime] = None) -> List[Tuple[str, date, date]]:
+        """first부터 현재 + premake 구간까지"""
+        last = period_start(now or datetime.now(), self.interval)
+        for _ in range(self.premake):
+            last = next_period(last, self.interval)
+        return partition_ranges(first, last, self.interval)
+    
+    async def _create_partitions(self, session: AsyncSession, ranges: List[Tuple[str, date, date]]) -> List[str]:
+        existing = set(await self.list_partitions(session))
+        has_default = DEFAULT_PARTITION in existing
+        created = []
+        for name, start, end in ranges:
+            if name in existing:
+                continue
+            bounds = f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            in_range = f"\"timestamp\" >= '{start.isoformat()}' AND \"timestamp\" < '{end.isoformat()}'"
+            moved = has_default and (await session.execute(text(
+                f'SELECT EXISTS (SELECT 1 FROM "{DEFAULT_PARTITION}" WHERE {in_range})'
+            ))).scalar()
+            if moved:
+                # 기본 파티션에 이 구간 행이 있으면 바로 만들 수 없으므로 새 테이블로 옮긴 뒤 붙임
+                await session.execute(text(
+                    f'CREATE TABLE "{name}" (LIKE {MEASUREMENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+                ))
+                await session.execute(text(f"""
+                    WITH moved AS (DELETE FROM "{DEFAULT_PARTITION}" WHERE {in_range} RETURNING *)
+                    INSERT INTO "{name}" SELECT * FROM moved
+                """))
+                await session.execute(text(f'ALTER TABLE {MEASUREMENT_TABLE} ATTACH PARTITION "{name}" {bounds}'))
+            else:
+                # 인덱스(BRIN 포함)는 부모 테이블에 정의되어 새 파티션에 자동 생성됨
+                await session.execute(text(
+                    f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {MEASUREMENT_TABLE} {bounds}'
+                ))
+            existing.add(name)
+            created.append(name)
+        return created
+    
+    async def _ensure_default_partition(self, session: AsyncSession):
+        await session.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF {MEASUREMENT_TABLE} DEFAULT'
+        ))
+    
+    async def ensure_partitions(
+        self,
+        session: AsyncSession,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[str]:
+        """
+        파티션 생성 (기본: 현재 구간부터 premake개 이후 구간까지)
+        
+        Args:
+            start, end: 과거/미래 데이터 적재 전에 해당 구간 파티션을 미리 만들 때 지정
+        
+        Returns:
+            List[str]: 새로 생성한 파티션 이름
+        """
+        if not await self.is_partitioned(session):
+            return []
+        first = period_start(start or datetime.now(), self.interval)
+        ranges = self._upcoming_ranges(first)
+        if end is not None:
+            last = end.date() if isinstance(end, datetime) else end
+            ranges = partition_ranges(first, max(last, first), self.interval) + ranges
+        created = await self._create_partitions(session, ranges)
+        await self._ensure_default_partition(session)
+        await session.commit()
+        if created:
+            logger.info(f"Created measurement partitions: {', '.join(created)}")
+        return created
+    
+    async def drop_expired_partitions(self, session: AsyncSession, now: Optional[datetime] = None) -> List[str]:
+        """보존 기간(MEASUREMENT_RETENTION_DAYS)이 지난 파티션을 통째로 삭제 (0이면 보존)"""
+        if self.retention_days <= 0 or not await self.is_partitioned(session):
+            return []
+        cutoff = (now or datetime.now()).date() - timedelta(days=self.retention_days)
+        dropped = []
+        for name in await self.list_partitions(session):
+            start = parse_partition_name(name, self.interval)
+            # 구간 전체가 cutoff 이전인 파티션만 삭제 (직접 만든 다른 이름의 파티션은 건드리지 않음)
+            if start is not None and next_period(start, self.interval) <= cutoff:
+                await session.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+                dropped.append(name)
+        await session.commit()
+        if dropped:
+            logger.info(f"Dropped expired measurement partitions: {', '.join(dropped)}")
+        return dropped
+    
+    async def ensure_periods(self, session: AsyncSession, values: Iterable[date]) -> List[str]:
+        """
+        주어진 날짜/시각이 속한 구간의 파티션만 생성 (기본 파티션에 있던 해당 구간 행은 옮김)
+        
+        Returns:
+            List[str]: 새로 생성한 파티션 이름
+        """
+        starts = sorted({period_start(value, self.interval) for value in values})
+        ranges = [(partition_name(start, self.interval), start, next_period(start, self.interval)) for start in starts]
+        created = await self._create_partitions(session, ranges)
+        await session.commit()
+        if created:
+            logger.info(f"Created measurement partitions: {', '.join(created)}")
+        return created
+    
+    async def ensure_for_timestamps(self, values: Iterable[datetime], max_new: int = 4) -> List[str]:
+        """
+        적재 경로용: 기록할 행 시각이 속한 구간의 파티션을 미리 생성
+        
+        이미 확인한 구간은 DB를 조회하지 않으며, 별도 세션에서 DDL을 커밋하므로 호출자 트랜잭션에 섞이지 않음.
+        max_new를 넘는 구간이나 잠금을 얻지 못한 구간의 행은 기본 파티션에 기록되었다가 유지보수 시 옮겨짐
+        """
+        starts = {
+            period_start(value.astimezone() if value.tzinfo else value, self.interval) for value in values
+        } - self._known_periods
+        if not starts:
+            return []
+        starts = sorted(starts)[:max_new]
+        created: List[str] = []
+        try:
+            async with AsyncSessionLocal() as session:
+                if await self.is_partitioned(session):
+                    await session.execute(text(f"SET LOCAL lock_timeout = '{WRITE_PATH_LOCK_TIMEOUT}'"))
+                    created = await self.ensure_periods(session, starts)
+        except Exception as e:
+            logger.warning(f"Could not create measurement partitions for {[str(start) for start in starts]}: {e}")
+        # 실패한 구간도 다시 기다리지 않도록 기록 (유지보수 작업이 기본 파티션 행을 옮김)
+        self._known_periods.update(starts)
+        return created
+    
+    async def rehome_default_rows(self, session: AsyncSession) -> List[str]:
+        """기본 파티션에 들어간 행의 구간 파티션을 만들어 옮김"""
+        exists = await session.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": DEFAULT_PARTITION})
+        if not exists.scalar():
+            return []
+        unit = "month" if self.interval == "month" else "day"
+        result = await session.execute(text(
+            f'SELECT DISTINCT date_trunc(\'{unit}\', "timestamp")::date AS start FROM "{DEFAULT_PARTITION}"'
+        ))
+        starts = [row.start for row in result]
+        return await self.ensure_periods(session, starts) if starts else []
+    
+    async def run_maintenance(self, session: AsyncSession) -> Dict[str, Any]:
+        """예약 작업용: 다가올 파티션 생성 + 기본 파티션 행 이동 + 만료 파티션 삭제"""
+        if not await self.is_partitioned(session):
+            return {"partitioned": False, "created": [], "dropped": []}
+        created = await self.ensure_partitions(session)
+        created += await self.rehome_default_rows(session)
+        dropped = await self.drop_expired_partitions(session)
+        return {
+            "partitioned": True,
+            "created": created,
+            "dropped": dropped,
+            "partitions": len(await self.list_partitions(session))
+        }
+    
+    async def migrate(self, session: AsyncSession, drop_legacy: bool = False) -> Dict[str, Any]:
+        """
+        기존 단일 테이블을 파티션 테이블로 전환 (한 트랜잭션, 전환 중 쓰기 차단)
+        
+        기존 테이블은 personal_test_measurement_data_legacy로 남기며, 트리거/뷰/외래키/시퀀스는
+        새 테이블로 옮깁니다. drop_legacy=True이면 복사 후 기존 테이블을 삭제합니다.
+        
+        Raises:
+            RuntimeError: 이미 전환되었거나 legacy 테이블이 남아 있는 경우
+        """
+        if await self.is_partitioned(session):
+            raise RuntimeError(f"{MEASUREMENT_TABLE} is already partitioned")
+        legacy_exists = await session.execute(text("SELECT to_regclass(:table) IS NOT NULL"), {"table": LEGACY_TABLE})
+        if legacy_exists.scalar():
+            raise RuntimeError(f"{LEGACY_TABLE} already exists; drop it before migrating again")
+        
+        try:
+            await session.execute(text(f"LOCK TABLE {MEASUREMENT_TABLE} IN ACCESS EXCLUSIVE MODE"))
+            
+            # 이름 변경 전에 정의를 저장 (정의 안의 테이블 이름이 그대로 새 테이블을 가리키도록)
+            views = (await session.execute(text("""
+                SELECT DISTINCT v.oid::regclass::text AS name, pg_get_viewdef(v.oid) AS definition
+                FROM pg_depend d
+                JOIN pg_rewrite r ON r.oid = d.objid
+                JOIN pg_class v ON v.oid = r.ev_class
+                WHERE d.refobjid = to_regclass(:table) AND v.oid <> d.refobjid AND v.relkind = 'v'
+            """), {"table": MEASUREMENT_TABLE})).fetchall()
+            triggers = (await session.execute(text("""
+                SELECT pg_get_triggerdef(oid) AS definition
+                FROM pg_trigger
+                WHERE tgrelid = to_regclass(:table) AND NOT tgisinternal
+            """), {"table": MEASUREMENT_TABLE})).fetchall()
+            constraints = (await session.execute(text("""
+                SELECT conname, contype, pg_get_constraintdef(oid) AS definition
+                FROM pg_constraint
+                WHERE conrelid = to_regclass(:table) AND contype IN ('p', 'f')
+            """), {"table": MEASUREMENT_TABLE})).fetchall()
+            columns = [row.column_name for row in await session.execute(text("""
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = :table
+                ORDER BY ordinal_position
+            """), {"table": MEASUREMENT_TABLE})]
+            bounds = (await session.execute(text(
+                f'SELECT MIN("timestamp") AS first, COUNT(*) AS row_count FROM {MEASUREMENT_TABLE}'
+            ))).fetchone()
+            sequence = (await session.execute(text(
+                "SELECT pg_get_serial_sequence(:table, 'id')"
+            ), {"table": MEASUREMENT_TABLE})).scalar()
+            
+            await session.execute(text(f"ALTER TABLE {MEASUREMENT_TABLE} RENAME TO {LEGACY_TABLE}"))
+            for constraint in constraints:
+                if constraint.contype == "p":
+                    # PK 인덱스 이름은 스키마 전체에서 유일해야 하므로 기존 것을 비켜줌
+                    await session.execute(text(
+                        f'ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT "{constraint.conname}" TO "{LEGACY_TABLE}_pkey"'
+                    ))
+            
+            await session.execute(text(f"""
+                CREATE TABLE {MEASUREMENT_TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS)
+                PARTITION BY RANGE ("timestamp")
+            """))
+            await session.execute(text(f'ALTER TABLE {MEASUREMENT_TABLE} ALTER COLUMN "timestamp" SET DEFAULT NOW()'))
+            await session.execute(text(f'ALTER TABLE {MEASUREMENT_TABLE} ALTER COLUMN "timestamp" SET NOT NULL'))
+            # 파티션 테이블의 PK에는 파티션 키가 포함되어야 함
+            await session.execute(text(
+                f'ALTER TABLE {MEASUREMENT_TABLE} ADD CONSTRAINT {MEASUREMENT_TABLE}_pkey PRIMARY KEY (id, "timestamp")'
+            ))
+            for constraint in constraints:
+                if constraint.contype == "f":
+                    await session.execute(text(
+                        f'ALTER TABLE {MEASUREMENT_TABLE} ADD CONSTRAINT "{constraint.conname}" {constraint.definition}'
+                    ))
+            await session.execute(text(f"""
+                CREATE INDEX idx_measurement_data_timestamp_brin ON {MEASUREMENT_TABLE}
+                USING BRIN ("timestamp") WITH (pages_per_range = {int(self.brin_pages_per_range)})
+            """))
+            await session.execute(text(
+                f'CREATE INDEX idx_measurement_data_equipment_ts ON {MEASUREMENT_TABLE} (equipment_code, "timestamp" DESC)'
+            ))
+            await session.execute(text(
+                f'CREATE INDEX idx_measurement_data_code_ts ON {MEASUREMENT_TABLE} (measurement_code, "timestamp" DESC)'
+            ))
+            
+            first = bounds.first or datetime.now()
+            partitions = await self._create_partitions(session, self._upcoming_ranges(period_start(first, self.interval)))
+            # premake 구간 이후(미래) 시각의 행과 이후 파티션이 없는 구간의 쓰기를 받음
+            await self._ensure_default_partition(session)
+            
+            column_list = ", ".join(f'"{column}"' for column in columns)
+            select_list = ", ".join(
+                'COALESCE("timestamp", NOW())' if column == "timestamp" else f'"{column}"' for column in columns
+            )
+            await session.execute(text(
+                f"INSERT INTO {MEASUREMENT_TABLE} ({column_list}) SELECT {select_list} FROM {LEGACY_TABLE}"
+            ))
+            
+            if sequence:
+                await session.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {MEASUREMENT_TABLE}.id"))
+            for trigger in triggers:
+                await session.execute(text(trigger.definition))
+            for view in views:
+                await session.execute(text(f"CREATE OR REPLACE VIEW {view.name} AS {view.definition}"))
+            if drop_legacy:
+                await session.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+            
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        
+        await session.execute(text(f"ANALYZE {MEASUREMENT_TABLE}"))
+        await session.commit()
+        
+        logger.info(f"Migrated {bounds.row_count} measurement rows into {len(partitions)} {self.interval} partitions")
+        return {
+            "rows": bounds.row_count,
+            "partitions": partitions,
+            "views": [view.name for view in views],
+            "triggers": len(triggers),
+            "legacy_table": None if drop_legacy else LEGACY_TABLE
+        }
+
+    
+    async def _run(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    result = await self.run_maintenance(session)
+                if result["created"] or result["dropped"]:
+                    logger.info(f"Partition maintenance: created {result['created']}, dropped {result['dropped']}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Measurement partition maintenance failed: {e}")
+    
+    def start(self, interval: Optional[float] = None):
+        """주기 유지보수 시작 (MEASUREMENT_PARTITION_MAINTENANCE_INTERVAL_SECONDS가 0이면 비활성)"""
+        interval = interval or settings.MEASUREMENT_PARTITION_MAINTENANCE_INTERVAL_SECONDS
+        if not interval or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(interval))
+        logger.info(f"Measurement partition maintenance started (interval: {interval}s)")
+    
+    async def stop(self):
+        """주기 유지보수 중지"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 전역 파티션 관리자
+measurement_partition_manager = MeasurementPartitionManager()
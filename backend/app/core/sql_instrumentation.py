@@ -0,0 +1,306 @@
+"""
+SQL 실행 계측
+엔진 이벤트 훅으로 모든 구문의 실행 시간, 행 수, 커넥션 풀 대기 시간을 수집하고
+현재 요청에 귀속시켜 반복 구문(N+1)과 느린 요청을 탐지합니다.
+"""
+import logging
+import re
+import time
+from collections import deque, OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# 한 요청에서 동일 구문이 이 횟수 이상 실행되면 N+1 의심으로 기록
+REPEATED_STATEMENT_THRESHOLD = 5
+
+# 느린 요청 보고서 기준 (ms) 및 보관 개수
+SLOW_REQUEST_THRESHOLD_MS = 1000
+SLOW_REQUEST_HISTORY = 50
+
+# 전역 구문 통계에 유지할 최대 fingerprint 수
+MAX_TRACKED_FINGERPRINTS = 500
+
+_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_PATTERN = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAM_PATTERN = re.compile(r"(?<!:):\w+|\$\d+|%\(\w+\)s|%s|\?")
+_IN_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """리터럴과 바인드 파라미터를 ? 로 치환한 정규화 구문"""
+    normalized = _COMMENT_PATTERN.sub(" ", statement)
+    normalized = _STRING_PATTERN.sub("?", normalized)
+    normalized = _PARAM_PATTERN.sub("?", normalized)
+    normalized = _NUMBER_PATTERN.sub("?", normalized)
+    normalized = _IN_LIST_PATTERN.sub("(...)", normalized)
+    return _WHITESPACE_PATTERN.sub(" ", normalized).strip()
+
+
+@dataclass
+class StatementStats:
+    """구문 fingerprint 별 누적 통계"""
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    rows: int = 0
+    
+    def record(self, duration_ms: float, rows: int):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.rows += rows
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0,
+            "max_ms": round(self.max_ms, 3),
+            "rows": self.rows
+        }
+
+
+@dataclass
+class RequestTrace:
+    """요청 단위 SQL 실행 기록"""
+    method: str
+    path: str
+    started_at: datetime = field(default_factory=datetime.now)
+    route: Optional[str] = None
+    statements: Dict[str, StatementStats] = field(default_factory=dict)
+    engines: Dict[str, int] = field(default_factory=dict)
+    checkout_wait_ms: float = 0.0
+    checkouts: int = 0
+    
+    @property
+    def statement_count(self) -> int:
+        return sum(s.count for s in self.statements.values())
+    
+    @property
+    def db_time_ms(self) -> float:
+        return sum(s.total_ms for s in self.statements.values())
+    
+    def repeated_statements(self, threshold: int = REPEATED_STATEMENT_THRESHOLD) -> Dict[str, int]:
+        return {fp: s.count for fp, s in self.statements.items() if s.count >= threshold}
+    
+    def report(self, duration_ms: float) -> Dict[str, Any]:
+        """구문별 분해 보고서"""
+        breakdown = sorted(self.statements.items(), key=lambda item: item[1].total_ms, reverse=True)
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "db_time_ms": round(self.db_time_ms, 3),
+            "statement_count": self.statement_count,
+            "checkout_wait_ms": round(self.checkout_wait_ms, 3),
+            "checkouts": self.checkouts,
+            "engines": dict(self.engines),
+            "repeated_statements": self.repeated_statements(),
+            "statements": [{"fingerprint": fp, **stats.to_dict()} for fp, stats in breakdown]
+        }
+
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("sql_request_trace", default=None)
+
+
+class SQLInstrumentation:
+    """엔진 이벤트 기반 SQL 계측기"""
+    
+    def __init__(self):
+        self.enabled = True
+        self.statement_stats: "OrderedDict[str, StatementStats]" = OrderedDict()
+        self.slow_requests: Deque[Dict[str, Any]] = deque(maxlen=SLOW_REQUEST_HISTORY)
+        self.counters = {
+            "statements": 0,
+            "requests_traced": 0,
+            "requests_with_repeated_statements": 0,
+            "slow_requests": 0
+        }
+        self._instrumented: Dict[int, str] = {}
+    
+    # ------------------------------------------------------------------
+    # 엔진 등록
+    # ------------------------------------------------------------------
+    
+    def instrument_engine(self, engine: AsyncEngine, label: str):
+        """엔진에 구문 실행 이벤트 훅 등록 (엔진당 1회)"""
+        sync_engine = engine.sync_engine
+        if id(sync_engine) in self._instrumented:
+            return
+        self._instrumented[id(sync_engine)] = label
+        
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("_maxlab_query_start", []).append(time.perf_counter())
+        
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            starts = conn.info.get("_maxlab_query_start")
+            if not starts:
+                return
+            duration_ms = (time.perf_counter() - starts.pop()) * 1000
+            rowcount = getattr(cursor, "rowcount", -1)
+            self.record_statement(label, statement, duration_ms, rowcount if rowcount and rowcount > 0 else 0)
+        
+        @event.listens_for(sync_engine, "handle_error")
+        def _handle_error(exception_context):
+            conn = exception_context.connection
+            if conn is not None and conn.info.get("_maxlab_query_start"):
+                conn.info["_maxlab_query_start"].pop()
+        
+        logger.info(f"SQL instrumentation enabled for engine: {label}")
+    
+    # ------------------------------------------------------------------
+    # 기록
+    # ------------------------------------------------------------------
+    
+    def record_statement(self, label: str, statement: str, duration_ms: float, rows: int):
+        if not self.enabled:
+            return
+        fp = fingerprint(statement)
+        self.counters["statements"] += 1
+        
+        stats = self.statement_stats.get(fp)
+        if stats is None:
+            if len(self.statement_stats) >= MAX_TRACKED_FINGERPRINTS:
+                self.statement_stats.popitem(last=False)
+            stats = self.statement_stats[fp] = StatementStats()
+        else:
+            self.statement_stats.move_to_end(fp)
+        stats.record(duration_ms, rows)
+        
+        trace = _current_trace.get()
+        if trace is not None:
+            trace_stats = trace.statements.get(fp)
+            if trace_stats is None:
+                trace_stats = trace.statements[fp] = StatementStats()
+            trace_stats.record(duration_ms, rows)
+            trace.engines[label] = trace.engines.get(label, 0) + 1
+        
+        # 엔진별 구문 지연 시간은 성능 모니터 히스토그램으로 (/metrics 노출)
+        from ..services.performance_monitor import performance_monitor
+        performance_monitor.metrics.add_query_time(f"sql:{label}", duration_ms)
+    
+    def record_checkout(self, label: str, wait_ms: float):
+        if not self.enabled:
+            return
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.checkout_wait_ms += wait_ms
+            trace.checkouts += 1
+        
+        from ..services.performance_monitor import performance_monitor
+        performance_monitor.metrics.add_query_time(f"pool_checkout:{label}", wait_ms)
+    
+    # ------------------------------------------------------------------
+    # 요청 추적
+    # ------------------------------------------------------------------
+    
+    def start_request(self, method: str, path: str):
+        """요청 추적 시작 (반환된 토큰은 finish_request 에 전달)"""
+        return _current_trace.set(RequestTrace(method=method, path=path))
+    
+    def finish_request(self, token, duration_ms: float, route: Optional[str] = None):
+        """요청 추적 종료: 반복 구문/느린 요청 판정"""
+        trace = _current_trace.get()
+        _current_trace.reset(token)
+        if trace is None or not trace.statements:
+            return
+        
+        trace.route = route
+        self.counters["requests_traced"] += 1
+        
+        repeated = trace.repeated_statements()
+        if repeated:
+            self.counters["requests_with_repeated_statements"] += 1
+            worst_fp, worst_count = max(repeated.items(), key=lambda item: item[1])
+            logger.warning(
+                f"Repeated statement detected (possible N+1): {trace.method} {route or trace.path} "
+                f"executed {worst_count}x: {worst_fp[:200]}"
+            )
+        
+        if duration_ms >= SLOW_REQUEST_THRESHOLD_MS:
+            self.counters["slow_requests"] += 1
+            self.slow_requests.append(trace.report(duration_ms))
+            logger.warning(
+                f"Slow request: {trace.method} {route or trace.path} took {duration_ms:.1f}ms "
+                f"({trace.statement_count} statements, {trace.db_time_ms:.1f}ms in DB, "
+                f"{trace.checkout_wait_ms:.1f}ms pool wait)"
+            )
+    
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    
+    def get_slow_request_report(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """최근 느린 요청의 구문 분해 보고서 (최신순)"""
+        return list(reversed(self.slow_requests))[:limit]
+    
+    def get_top_statements(self, limit: int = 20, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        """누적 통계 상위 구문"""
+        ranked = sorted(
+            self.statement_stats.items(),
+            key=lambda item: getattr(item[1], order_by, item[1].total_ms),
+            reverse=True
+        )
+        return [{"fingerprint": fp, **stats.to_dict()} for fp, stats in ranked[:limit]]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "tracked_fingerprints": len(self.statement_stats),
+            "instrumented_engines": sorted(set(self._instrumented.values()))
+        }
+    
+    def reset(self):
+        self.statement_stats.clear()
+        self.slow_requests.clear()
+        for key in self.counters:
+            self.counters[key] = 0
+
+
+# 전역 계측기 인스턴스
+sql_instrumentation = SQLInstrumentation()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """커넥션 체크아웃 대기 시간을 기록하는 비동기 큐 풀"""
+    
+    instrumentation_label = "primary"
+    checkout_callback: Optional[Callable[[float], None]] = None
+    
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            wait_ms = (time.perf_counter() - start) * 1000
+            sql_instrumentation.record_checkout(self.instrumentation_label, wait_ms)
+            if self.checkout_callback is not None:
+                self.checkout_callback(wait_ms)
+
+
+def instrumented_pool_class(label: str, on_checkout: Optional[Callable[[float], None]] = None) -> type:
+    """라벨이 지정된 계측 풀 클래스 (create_async_engine 의 poolclass 로 사용)
+    
+    on_checkout 을 지정하면 풀별 체크아웃 대기 시간(ms)도 전달받는다.
+    """
+    attributes = {"instrumentation_label": label}
+    if on_checkout is not None:
+        attributes["checkout_callback"] = staticmethod(on_checkout)
+    return type(f"InstrumentedAsyncQueuePool_{label}", (InstrumentedAsyncQueuePool,), attributes)
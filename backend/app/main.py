@@ -8,6 +8,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, HTMLResponse
 from contextlib import asynccontextmanager
 import os
+import time
 import logging
 from pathlib import Path
 
@@ -22,7 +23,7 @@ from .routers.files import router as files_router
 from .routers.mvp_modules import router as mvp_modules_router
 from .routers.personal_test_process_flow import router as personal_test_process_flow_router
 from .routers.external import router as external_router
-from .routers.metrics import router as metrics_router
+from .routers.metrics import router as metrics_router, exposition_router as metrics_exposition_router
 from .routers.oauth import router as oauth_router
 from .routers.total_monitoring import router as total_monitoring_router
 from .routers.user_sessions import router as user_sessions_router
@@ -34,6 +35,15 @@ from .middleware.csrf_protection import CSRFConfig
 from .middleware.session_middleware import SecureSessionMiddleware
 from .middleware.rate_limiting import RateLimitingConfig
 from .services.session_manager import SessionConfig
+from .services.performance_monitor import performance_monitor
+from .services.metrics_registry import register_default_collectors
+from .services.data_source_health import data_source_health_monitor
+from .services.measurement_rollups import measurement_rollups
+from .core.measurement_partitions import measurement_partition_manager
+from .services.data_providers.latest_cache import latest_measurement_cache
+from .services.data_providers.change_feed import change_feed_manager
+from .services.data_providers.connection_pool import connection_pool_manager
+from .core.sql_instrumentation import sql_instrumentation
 
 # 동적 MVP 로더 임포트
 import sys
@@ -101,6 +111,22 @@ async def lifespan(app: FastAPI):
                     await db.close()
                 break
         
+        # 메트릭 수집기 등록 및 워커 간 성능 통계 집계를 위한 스냅샷 기록
+        register_default_collectors()
+        performance_monitor.start_snapshot_exporter()
+        
+        # 데이터 소스 상태 주기 점검
+        data_source_health_monitor.start()
+        
+        # 측정 데이터 롤업 주기 동기화
+        measurement_rollups.start()
+        
+        # 측정 데이터 파티션 주기 유지보수 (다가올 파티션 생성, 기본 파티션 행 이동)
+        measurement_partition_manager.start()
+        
+        # 설비/측정 코드별 최신값 캐시 증분 갱신
+        latest_measurement_cache.start()
+
         logger.info("✅ Max Lab MVP Platform started successfully")
         
     except Exception as e:
@@ -112,6 +138,13 @@ async def lifespan(app: FastAPI):
     # 종료시 정리
     logger.info("🔄 Shutting down Max Lab MVP Platform...")
     try:
+        await performance_monitor.stop_snapshot_exporter()
+        await data_source_health_monitor.stop()
+        await measurement_rollups.stop()
+        await measurement_partition_manager.stop()
+        await latest_measurement_cache.stop()
+        await change_feed_manager.stop()
+        await connection_pool_manager.close_all()
         await close_db()
         logger.info("✅ Database connections closed")
     except Exception as e:
@@ -149,7 +182,7 @@ app.add_middleware(
     exempt_paths={
         "/docs", "/redoc", "/openapi.json", "/favicon.ico",
         "/api/v1/health", "/api/v1/csrf/", "/static/",
-        "/api/v1/auth/", "/api/oauth/"
+        "/api/v1/auth/", "/api/oauth/", "/metrics"
     }
 )
 
@@ -213,7 +246,22 @@ async def custom_exception_handler(request: Request, exc: Exception):
         headers=headers
     )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """라우트 템플릿 기준 요청 지연 시간 및 SQL 구문 기록 (/metrics 히스토그램)"""
+    start_time = time.perf_counter()
+    trace_token = sql_instrumentation.start_request(request.method, request.url.path)
+    try:
+        return await call_next(request)
+    finally:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", None) or "unmatched"
+        duration_ms = (time.perf_counter() - start_time) * 1000
+        performance_monitor.metrics.add_response_time(f"{request.method} {route_path}", duration_ms)
+        sql_instrumentation.finish_request(trace_token, duration_ms, route=route_path)
+
 # 기본 API 라우터 포함
+app.include_router(metrics_exposition_router, tags=["Performance Metrics"])
 app.include_router(health_router, prefix="/api/v1", tags=["Health"])
 app.include_router(csrf_router, prefix="/api/v1/csrf", tags=["CSRF"])
 app.include_router(session_router, prefix="/api/v1/session", tags=["Session"])
@@ -2,15 +2,61 @@
 성능 메트릭 API 엔드포인트
 OAuth 인증 시스템의 성능 모니터링을 위한 메트릭을 제공합니다.
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials
 from typing import Dict, Any
+import hmac
 import logging
+import time
 
-from ..core.security import require_admin, performance_metrics
+from ..core.config import settings
+from ..core.security import get_current_active_user, get_current_user, require_admin, performance_metrics
+from ..core.sql_instrumentation import sql_instrumentation, SLOW_REQUEST_THRESHOLD_MS
+from ..services.metrics_registry import metrics_registry
 
 router = APIRouter()
+# Prometheus 스크레이프용 (prefix 없이 /metrics 로 등록)
+exposition_router = APIRouter()
 logger = logging.getLogger(__name__)
 
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def _authorize_scrape(request: Request) -> None:
+    """/metrics 접근 확인: 스크레이프 토큰 또는 관리자 Bearer 토큰 (METRICS_PUBLIC이면 생략)"""
+    authorization = request.headers.get("Authorization", "")
+    if settings.METRICS_SCRAPE_TOKEN and hmac.compare_digest(
+        authorization.encode(), f"Bearer {settings.METRICS_SCRAPE_TOKEN}".encode()
+    ):
+        return
+    if settings.METRICS_PUBLIC:
+        return
+    
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Scrape token or admin credentials required",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    user = await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+    require_admin(await get_current_active_user(user))
+
+
+@exposition_router.get("/metrics", include_in_schema=False)
+async def prometheus_metrics(request: Request) -> PlainTextResponse:
+    """
+    Prometheus 텍스트 포맷 메트릭 (METRICS_SCRAPE_TOKEN 또는 관리자 토큰 필요)
+    
+    Returns:
+        PlainTextResponse: 모든 워커의 메트릭을 병합한 exposition
+    """
+    await _authorize_scrape(request)
+    
+    body = await metrics_registry.render()
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
+
 
 @router.get("/performance")
 async def get_performance_metrics(
@@ -74,6 +120,42 @@ async def get_performance_metrics(
         }
 
 
+@router.get("/sql/slow-requests")
+async def get_slow_request_report(
+    limit: int = Query(20, ge=1, le=50),
+    admin_user: Dict[str, Any] = Depends(require_admin)
+) -> Dict[str, Any]:
+    """
+    느린 요청의 SQL 구문 분해 보고서 (관리자 전용)
+    
+    Returns:
+        dict: 요청별 구문 fingerprint, 실행 횟수, 소요 시간, 행 수, 풀 대기 시간
+    """
+    return {
+        "threshold_ms": SLOW_REQUEST_THRESHOLD_MS,
+        "stats": sql_instrumentation.get_stats(),
+        "requests": sql_instrumentation.get_slow_request_report(limit)
+    }
+
+
+@router.get("/sql/statements")
+async def get_top_statements(
+    limit: int = Query(20, ge=1, le=200),
+    order_by: str = Query("total_ms", pattern="^(total_ms|count|max_ms|rows)$"),
+    admin_user: Dict[str, Any] = Depends(require_admin)
+) -> Dict[str, Any]:
+    """
+    누적 실행 통계 상위 SQL 구문 (관리자 전용)
+    
+    Returns:
+        dict: 구문 fingerprint 별 누적 통계
+    """
+    return {
+        "order_by": order_by,
+        "statements": sql_instrumentation.get_top_statements(limit, order_by)
+    }
+
+
 @router.post("/performance/reset")
 async def reset_performance_metrics(
     admin_user: Dict[str, Any] = Depends(require_admin)
@@ -2,20 +2,38 @@
 Personal Test Process Flow System API Router
 공정도 편집기와 모니터링을 위한 API 엔드포인트
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from typing import List, Dict, Any, Optional
 import uuid
 import json
 import secrets
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
 import logging
 import os
 
 from app.core.database import get_db
-from app.core.security import get_current_active_user, require_admin, encrypt_connection_string, decrypt_connection_string
+from app.core.security import (
+    WorkspacePermissionChecker, get_current_active_user, require_admin,
+    encrypt_connection_string, decrypt_connection_string
+)
 from app.core.config import settings
+from app.core.fast_json import FastJSONResponse, dumps as fast_json_dumps
+from app.services.data_providers.resilience import DataSourceUnavailableError
+from app.services.data_providers.config_cache import data_source_config_cache
+from app.services.data_providers.latest_cache import latest_measurement_cache
+from app.services.data_providers.change_feed import change_feed_manager
+from app.services.data_providers.adhoc_query import AdhocQueryError, run_adhoc_query, stream_adhoc_query
+from app.services.query_export import EXPORT_FORMATS, PYARROW_AVAILABLE, encode_export
+from app.services.spec_engine import spec_cache
+from app.services.columnar import ColumnarBatch, columnar_response, negotiate_columnar_format
+from app.services.downsampling import DownsampleRequest
+from app.services.measurement_rollups import MEASUREMENT_TABLE, covers_data_source, measurement_rollups, parse_interval
+from app.services.measurement_ingest import IngestFormatError, detect_format, iter_raw_rows, measurement_ingest
+from app.services.data_providers.base import MEASUREMENT_FIELDS, ChangeSet, Watermark, WatermarkExpiredError
 from app.core.flow_permissions import (
     FlowPermissionChecker, ScopeType, VisibilityScope, PermissionLevel,
     check_flow_permission, get_flow_list_filter, can_create_with_scope
@@ -84,7 +102,8 @@ class MeasurementData(BaseModel):
     timestamp: datetime
     usl: Optional[float] = None
     lsl: Optional[float] = None
-    spec_status: Optional[int] = None  # 0: within spec, 1: out of spec
+    target: Optional[float] = None
+    spec_status: Optional[int] = None  # 0: within spec, 1: below LSL, 2: above USL, 9: no spec
 
 class EquipmentStatusResponse(BaseModel):
     items: List[EquipmentStatus]
@@ -93,6 +112,65 @@ class EquipmentStatusResponse(BaseModel):
     offset: int
     has_more: bool
 
+# EquipmentStatus 응답 필드 (프로바이더 dict에서 그대로 추려서 직렬화)
+EQUIPMENT_STATUS_FIELDS = ("equipment_type", "equipment_code", "equipment_name", "status", "last_run_time")
+
+
+def _equipment_status_payload(rows: List[Dict[str, Any]], total: int, limit: int, offset: int, has_more: bool) -> FastJSONResponse:
+    """설비 상태 응답을 모델 재생성 없이 직렬화 (프로바이더에서 이미 검증됨)"""
+    return FastJSONResponse({
+        "items": [{field: row.get(field) for field in EQUIPMENT_STATUS_FIELDS} for row in rows],
+        "total": total,
+        "limit": limit,
+        "offset": offset,
+        "has_more": has_more
+    })
+
+
+def _measurement_payload(request: Request, records: List[Any], truncated: bool = False):
+    """
+    측정 레코드 응답 (Accept 헤더가 컬럼 형식을 요청하면 컬럼 배열로 인코딩)
+    
+    truncated이면 다운샘플링 원본 행이 상한에 걸려 구간 앞부분이 빠졌을 수 있음을 X-Downsample-Truncated 헤더로 알림
+    """
+    columnar_format = negotiate_columnar_format(request.headers.get("accept"))
+    if columnar_format:
+        response = columnar_response(ColumnarBatch.from_records(records, MEASUREMENT_FIELDS), columnar_format)
+    else:
+        response = FastJSONResponse([record.to_dict() for record in records], headers={"Vary": "Accept"})
+    if truncated:
+        response.headers["X-Downsample-Truncated"] = "true"
+    return response
+
+
+def _parse_watermark(since: Optional[str]) -> Optional[Watermark]:
+    """since 쿼리 파라미터(이전 응답의 watermark 토큰) 해석"""
+    if not since:
+        return None
+    try:
+        return Watermark.decode(since)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _change_set_payload(changes: ChangeSet, items: List[Dict[str, Any]]) -> FastJSONResponse:
+    """증분 조회 응답 (items, 다음 조회에 넘길 watermark, 소스에서 범위를 걸었는지 여부)"""
+    return FastJSONResponse({**changes.to_dict(), "items": items})
+
+
+def _downsample_request(
+    points: Optional[int],
+    method: str,
+    start_time: Optional[datetime],
+    end_time: Optional[datetime]
+) -> Optional[DownsampleRequest]:
+    """points가 지정된 경우에만 다운샘플링 요청 생성"""
+    if not points:
+        return None
+    if start_time and end_time and start_time.timestamp() >= end_time.timestamp():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_time must be before end_time")
+    return DownsampleRequest(points=points, method=method, start_time=start_time, end_time=end_time)
+
 class FlowVersion(BaseModel):
     id: uuid.UUID
     flow_id: uuid.UUID
@@ -112,6 +190,12 @@ class QueryExecutionResponse(BaseModel):
     row_count: int
     error: Optional[str] = None
 
+class QueryExportRequest(BaseModel):
+    query_type: str  # 'equipment_status' or 'measurement_data'
+    custom_query: Optional[str] = None
+    format: str = "csv"  # csv, ndjson, parquet
+    limit: Optional[int] = None  # None exports every row
+
 class FlowVersionCreate(BaseModel):
     name: str
     description: Optional[str] = None
@@ -898,40 +982,27 @@ async def get_public_equipment_status(
             )
             
             # Convert to response format
-            equipment_list = []
+            equipment_rows = []
             total_count = 0
             
             if equipment_data:
                 if isinstance(equipment_data, dict) and 'items' in equipment_data:
-                    equipment_list = [
-                        EquipmentStatus(
-                            equipment_type=row['equipment_type'],
-                            equipment_code=row['equipment_code'],
-                            equipment_name=row['equipment_name'],
-                            status=row['status'],
-                            last_run_time=row.get('last_run_time')
-                        ) for row in equipment_data['items']
-                    ]
-                    total_count = equipment_data.get('total', len(equipment_list))
+                    equipment_rows = equipment_data['items']
+                    total_count = equipment_data.get('total', len(equipment_rows))
                 else:
-                    equipment_list = [
-                        EquipmentStatus(
-                            equipment_type=row['equipment_type'],
-                            equipment_code=row['equipment_code'],
-                            equipment_name=row['equipment_name'],
-                            status=row['status'],
-                            last_run_time=row.get('last_run_time')
-                        ) for row in equipment_data
-                    ]
-                    total_count = len(equipment_list)
+                    equipment_rows = equipment_data
+                    total_count = len(equipment_rows)
             
-            return EquipmentStatusResponse(
-                items=equipment_list,
+            return _equipment_status_payload(
+                equipment_rows,
                 total=total_count,
                 limit=limit,
                 offset=offset,
                 has_more=(offset + limit) < total_count
             )
+        except DataSourceUnavailableError:
+            # Breaker open / bulkhead full: keep the 503 + Retry-After
+            raise
         except Exception as e:
             logger.error(f"Error getting equipment status for public flow: {e}")
             raise HTTPException(
@@ -958,15 +1029,21 @@ async def get_public_equipment_status(
 @router.get("/public/{publish_token}/measurements", response_model=List[MeasurementData])
 async def get_public_measurements(
     publish_token: str,
+    request: Request,
     equipment_code: Optional[str] = Query(None),
     equipment_codes: Optional[str] = Query(None, description="Comma-separated equipment codes"),
     equipment_type: Optional[str] = Query(None),
     measurement_code: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=1000),
+    points: Optional[int] = Query(None, ge=3, le=10000, description="Target points per equipment/measurement series (enables downsampling)"),
+    downsample: str = Query("lttb", regex="^(lttb|minmax|avg)$", description="Downsampling method"),
+    start_time: Optional[datetime] = Query(None, description="Downsampling range start"),
+    end_time: Optional[datetime] = Query(None, description="Downsampling range end (default: now)"),
     db: AsyncSession = Depends(get_db)
 ):
-    """게시된 공정도의 측정 데이터 조회 (공개 접근)"""
+    """게시된 공정도의 측정 데이터 조회 (공개 접근, points 지정 시 시리즈별 다운샘플링)"""
     provider = None
+    downsample_request = _downsample_request(points, downsample, start_time, end_time)
     
     try:
         # Validate publish_token format
@@ -1029,6 +1106,8 @@ async def get_public_measurements(
         # Connect to data source
         try:
             await provider.connect()
+        except DataSourceUnavailableError:
+            raise
         except Exception as connect_error:
             logger.error(f"❌ Failed to connect to data source: {connect_error}")
             raise HTTPException(
@@ -1036,16 +1115,19 @@ async def get_public_measurements(
                 detail=f"Cannot connect to data source for this flow: {str(connect_error)}"
             )
         
-        # Get measurement data
+        # Get measurement records (validated once at the provider boundary)
         try:
-            measurement_data = await provider.get_measurement_data(
+            measurement_data = await provider.get_measurement_records(
                 equipment_code=equipment_code,
                 equipment_codes=equipment_codes,
                 equipment_type=equipment_type,
                 measurement_code=measurement_code,
-                limit=limit
+                limit=limit,
+                downsample=downsample_request
             )
             logger.info(f"✅ Successfully retrieved {len(measurement_data)} measurements")
+        except DataSourceUnavailableError:
+            raise
         except Exception as provider_error:
             logger.error(f"❌ Provider error in public measurements: {provider_error}")
             import traceback
@@ -1055,78 +1137,9 @@ async def get_public_measurements(
                 detail=f"Failed to get measurement data: {str(provider_error)}"
             )
         
-        # Check if measurement_data is already a list of MeasurementData objects
-        if measurement_data and len(measurement_data) > 0:
-            first_item = measurement_data[0]
-            if hasattr(first_item, 'spec_status'):
-                # Already MeasurementData objects - need to convert
-                result = []
-                for item in measurement_data:
-                    if hasattr(item, 'dict'):
-                        # Convert to dict first
-                        item_dict = item.dict()
-                    else:
-                        # Already a dict
-                        item_dict = item
-                    
-                    # Fix spec_status
-                    spec_status = item_dict.get('spec_status', 0)
-                    if isinstance(spec_status, str):
-                        spec_status_mapping = {
-                            'IN_SPEC': 0,
-                            'BELOW_SPEC': 1,
-                            'ABOVE_SPEC': 2,
-                            'NO_SPEC': 9
-                        }
-                        spec_status = spec_status_mapping.get(spec_status, 0)
-                    
-                    # Create new MeasurementData object with corrected spec_status
-                    result.append(MeasurementData(
-                        id=item_dict.get('id', 0),
-                        equipment_type=item_dict.get('equipment_type', ''),
-                        equipment_code=item_dict.get('equipment_code', ''),
-                        measurement_code=item_dict.get('measurement_code', ''),
-                        measurement_desc=item_dict.get('measurement_desc', ''),
-                        measurement_value=item_dict.get('measurement_value', 0.0),
-                        timestamp=item_dict.get('timestamp', datetime.now()),
-                        spec_status=spec_status,
-                        usl=item_dict.get('usl'),
-                        lsl=item_dict.get('lsl')
-                    ))
-                return result
-        
-        # Convert to response format - with explicit spec_status conversion
-        result = []
-        for row in (measurement_data or []):
-            # Ensure spec_status is an integer
-            spec_status = row.get('spec_status', 0)
-            if isinstance(spec_status, str):
-                spec_status_mapping = {
-                    'IN_SPEC': 0,
-                    'BELOW_SPEC': 1,
-                    'ABOVE_SPEC': 2,
-                    'NO_SPEC': 9
-                }
-                spec_status = spec_status_mapping.get(spec_status, 0)
-            elif spec_status is None:
-                spec_status = 0
-            
-            # Create measurement object with proper type conversion
-            measurement_obj = MeasurementData(
-                id=int(row.get('id', 0)),
-                equipment_type=str(row.get('equipment_type', '')),
-                equipment_code=str(row.get('equipment_code', '')),
-                measurement_code=str(row.get('measurement_code', '')),
-                measurement_desc=str(row.get('measurement_desc', '')),
-                measurement_value=float(row.get('measurement_value', 0.0)),
-                timestamp=row.get('timestamp', datetime.now()),
-                spec_status=int(spec_status),
-                usl=row.get('usl'),
-                lsl=row.get('lsl')
-            )
-            result.append(measurement_obj)
-        
-        return result
+        return _measurement_payload(request, measurement_data, provider.downsample_truncated)
+    except DataSourceUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting measurement data for public flow: {e}")
         import traceback
@@ -1198,25 +1211,16 @@ async def get_equipment_status(
         else:
             logger.info(f"📊 Response data keys: {list(response_data.keys()) if isinstance(response_data, dict) else 'Not a dict'}")
         
-        # Convert dict response back to EquipmentStatusResponse
-        equipment_list = []
-        for item in response_data.get('items', []):
-            equipment_list.append(EquipmentStatus(
-                equipment_type=item.get('equipment_type'),
-                equipment_code=item.get('equipment_code'),
-                equipment_name=item.get('equipment_name'),
-                status=item.get('status'),
-                last_run_time=item.get('last_run_time')
-            ))
-        
-        return EquipmentStatusResponse(
-            items=equipment_list,
+        return _equipment_status_payload(
+            response_data.get('items', []),
             total=response_data.get('total', 0),
             limit=response_data.get('limit', limit),
             offset=response_data.get('offset', offset),
             has_more=response_data.get('has_more', False)
         )
         
+    except DataSourceUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"❌ Error getting equipment status from provider: {e}")
         logger.error(f"❌ Exception type: {type(e)}")
@@ -1253,14 +1257,6 @@ async def get_equipment_status(
                 status_code=503,
                 detail=f"Data source connection failed: {str(e)}. Please check your data source configuration in the workspace settings."
             )
-        
-        return EquipmentStatusResponse(
-            items=equipment_list,
-            total=total_count,
-            limit=limit,
-            offset=offset,
-            has_more=(offset + limit) < total_count
-        )
     finally:
         await provider.disconnect()
 
@@ -1298,18 +1294,25 @@ async def update_equipment_status(
 # Measurement Data endpoints
 @router.get("/measurements", response_model=List[MeasurementData])
 async def get_measurement_data(
+    request: Request,
     workspace_id: str = Query('personaltest', description="Workspace ID"),
     equipment_code: Optional[str] = Query(None),
     equipment_codes: Optional[str] = Query(None, description="Comma-separated equipment codes"),
     equipment_type: Optional[str] = Query(None),
     measurement_code: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=1000),
+    points: Optional[int] = Query(None, ge=3, le=10000, description="Target points per equipment/measurement series (enables downsampling)"),
+    downsample: str = Query("lttb", regex="^(lttb|minmax|avg)$", description="Downsampling method"),
+    start_time: Optional[datetime] = Query(None, description="Downsampling range start"),
+    end_time: Optional[datetime] = Query(None, description="Downsampling range end (default: now)"),
     data_source_id: Optional[str] = Query(None, description="Data Source ID"),
     db: AsyncSession = Depends(get_db)
 ):
-    """측정 데이터 조회 (Dynamic Provider 사용)"""
+    """측정 데이터 조회 (Dynamic Provider 사용, points 지정 시 시리즈별 다운샘플링)"""
     from app.services.data_providers.dynamic import DynamicProvider
     
+    downsample_request = _downsample_request(points, downsample, start_time, end_time)
+    
     # Create dynamic provider with optional data_source_id
     provider = DynamicProvider(db, workspace_id, data_source_id)
     
@@ -1317,36 +1320,20 @@ async def get_measurement_data(
         # Connect to data source
         await provider.connect()
         
-        # Get measurement data
-        measurements_raw = await provider.get_measurement_data(
+        # Get measurement records (validated once at the provider boundary)
+        measurements = await provider.get_measurement_records(
             equipment_code=equipment_code,
+            equipment_codes=equipment_codes,
             equipment_type=equipment_type,
-            limit=limit
+            measurement_code=measurement_code,
+            limit=limit,
+            downsample=downsample_request
         )
         
-        # Convert to response format
-        measurements = []
-        for item in measurements_raw:
-            # Handle dict format from provider
-            if isinstance(item, dict):
-                measurements.append(MeasurementData(
-                    id=item.get('id', 0),
-                    equipment_type=item.get('equipment_type', ''),
-                    equipment_code=item.get('equipment_code', ''),
-                    measurement_code=item.get('measurement_code', ''),
-                    measurement_desc=item.get('measurement_desc', ''),
-                    measurement_value=float(item.get('measurement_value', 0)),
-                    timestamp=item.get('timestamp', datetime.now()),
-                    usl=item.get('usl'),
-                    lsl=item.get('lsl'),
-                    spec_status=item.get('spec_status')
-                ))
-            else:
-                # Already a MeasurementData object
-                measurements.append(item)
-        
-        return measurements
+        return _measurement_payload(request, measurements, provider.downsample_truncated)
         
+    except DataSourceUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Error getting measurements from provider: {e}")
         
@@ -1408,12 +1395,251 @@ async def add_measurement_data(
             "measurement_value": measurement.measurement_value
         }
     )
+    measurement_id = result.scalar()
     await db.commit()
     
-    measurement_id = result.scalar()
+    # 롤업은 주기 동기화가 반영 (그 전까지는 집계 조회가 미반영 행을 원본에서 직접 집계)
     return {"message": "Measurement data added", "id": measurement_id}
 
 
+@router.post("/measurements/bulk")
+async def add_measurement_data_bulk(
+    request: Request,
+    input_format: Optional[str] = Query(None, alias="format", description="json / ndjson / csv (default: from Content-Type)"),
+    atomic: bool = Query(False, description="Commit once at the end (any database error rolls back every row)"),
+    batch_size: Optional[int] = Query(None, ge=1, le=100000, description="Rows validated and written per batch"),
+    current_user: Dict[str, Any] = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    측정 데이터 일괄 적재 (JSON 배열 / NDJSON / CSV 스트림)
+    
+    본문을 스트림으로 읽어 배치 단위로 검증하고 COPY로 기록하며, MEASUREMENT_INGEST_COMMIT_ROWS행마다 커밋합니다.
+    잘못된 행은 거부 목록에 담고 나머지는 적재하며, 응답에 배치별 통계와 초당 적재 행 수를 돌려줍니다.
+    """
+    try:
+        ingest_format = detect_format(request.headers.get("content-type"), input_format)
+    except IngestFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    result = await measurement_ingest.ingest(
+        db,
+        iter_raw_rows(request.stream(), ingest_format),
+        batch_size=batch_size,
+        atomic=atomic
+    )
+    
+    if result.error:
+        # 중단 전에 커밋된 배치는 유지되므로 통계를 그대로 돌려줌
+        status_code = 400 if result.error_type == "format" else 500
+        return FastJSONResponse(result.to_dict(), status_code=status_code)
+    return FastJSONResponse(result.to_dict())
+
+
+@router.get("/measurements/changes")
+async def get_measurement_changes(
+    workspace_id: str = Query('personaltest', description="Workspace ID"),
+    since: Optional[str] = Query(None, description="Watermark token from the previous response"),
+    equipment_code: Optional[str] = Query(None),
+    equipment_type: Optional[str] = Query(None),
+    limit: int = Query(1000, ge=1, le=10000),
+    data_source_id: Optional[str] = Query(None, description="Data Source ID"),
+    db: AsyncSession = Depends(get_db)
+):
+    """since 워터마크 이후 추가된 측정 데이터 조회 (오래된 순, has_more이면 받은 watermark로 다시 조회, 410이면 since 없이 재시작)"""
+    from app.services.data_providers.dynamic import DynamicProvider
+    
+    watermark = _parse_watermark(since)
+    provider = DynamicProvider(db, workspace_id, data_source_id)
+    try:
+        await provider.connect()
+        changes = await provider.get_measurement_changes(
+            since=watermark,
+            equipment_code=equipment_code,
+            equipment_type=equipment_type,
+            limit=limit
+        )
+        return _change_set_payload(changes, [record.to_dict() for record in changes.items])
+    except DataSourceUnavailableError:
+        raise
+    except WatermarkExpiredError as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting measurement changes: {e}")
+        raise HTTPException(status_code=503, detail=f"Data source connection failed: {str(e)}")
+    finally:
+        await provider.disconnect()
+
+
+@router.get("/equipment/status/changes")
+async def get_equipment_status_changes(
+    workspace_id: str = Query('personaltest', description="Workspace ID"),
+    since: Optional[str] = Query(None, description="Watermark token from the previous response"),
+    equipment_type: Optional[str] = Query(None),
+    limit: int = Query(1000, ge=1, le=10000),
+    data_source_id: Optional[str] = Query(None, description="Data Source ID"),
+    db: AsyncSession = Depends(get_db)
+):
+    """since 워터마크 이후 상태가 바뀐 설비 조회"""
+    from app.services.data_providers.dynamic import DynamicProvider
+    
+    watermark = _parse_watermark(since)
+    provider = DynamicProvider(db, workspace_id, data_source_id)
+    try:
+        await provider.connect()
+        changes = await provider.get_equipment_status_changes(
+            since=watermark,
+            equipment_type=equipment_type,
+            limit=limit
+        )
+        return _change_set_payload(
+            changes,
+            [{field: getattr(item, field) for field in EQUIPMENT_STATUS_FIELDS} for item in changes.items]
+        )
+    except DataSourceUnavailableError:
+        raise
+    except WatermarkExpiredError as e:
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error getting equipment status changes: {e}")
+        raise HTTPException(status_code=503, detail=f"Data source connection failed: {str(e)}")
+    finally:
+        await provider.disconnect()
+
+
+@router.get("/changes/stream")
+async def stream_changes(
+    request: Request,
+    workspace_id: str = Query('personaltest', description="Workspace ID"),
+    data_source_id: Optional[str] = Query(None, description="Data Source ID"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    PostgreSQL 데이터 소스의 변경 피드(LISTEN/NOTIFY)를 Server-Sent Events로 전달
+    
+    이벤트 종류는 equipment_status / measurement / resync이며, resync를 받으면
+    /measurements/changes, /equipment/status/changes로 마지막 watermark 이후를 다시 조회합니다.
+    """
+    from app.services.data_providers.dynamic import DynamicProvider
+    
+    provider = DynamicProvider(db, workspace_id, data_source_id)
+    try:
+        config = await provider._load_config()
+        live = await provider.ensure_change_feed()
+    except Exception as e:
+        logger.error(f"Error starting change feed: {e}")
+        raise HTTPException(status_code=503, detail=f"Data source connection failed: {str(e)}")
+    finally:
+        await provider.disconnect()
+    
+    if not live:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Change feed is only available for PostgreSQL data sources with PG_CHANGE_FEED_ENABLED"
+        )
+    
+    source_id = str(config.get("data_source_id"))
+    queue = change_feed_manager.subscribe(source_id)
+    
+    async def events():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.PG_CHANGE_FEED_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield b": keepalive\n\n"
+                    continue
+                yield b"event: " + event.kind.encode() + b"\ndata: " + fast_json_dumps(event.to_dict()) + b"\n\n"
+        finally:
+            change_feed_manager.unsubscribe(source_id, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/measurements/latest", response_model=List[MeasurementData])
+async def get_latest_measurements(
+    request: Request,
+    workspace_id: str = Query('personaltest', description="Workspace ID"),
+    equipment_codes: Optional[str] = Query(None, description="Comma-separated equipment codes (default: all cached)"),
+    data_source_id: Optional[str] = Query(None, description="Data Source ID"),
+    db: AsyncSession = Depends(get_db)
+):
+    """설비/측정 코드별 최신 측정값 일괄 조회 (메모리 최신값 캐시 사용)"""
+    from app.services.data_providers.dynamic import DynamicProvider
+    
+    code_list = [code.strip() for code in equipment_codes.split(',') if code.strip()] if equipment_codes else None
+    provider = DynamicProvider(db, workspace_id, data_source_id)
+    try:
+        await provider.connect()
+        measurements = await provider.get_latest_measurements(code_list)
+        return _measurement_payload(request, measurements)
+    except DataSourceUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting latest measurements: {e}")
+        raise HTTPException(status_code=503, detail=f"Data source connection failed: {str(e)}")
+    finally:
+        await provider.disconnect()
+
+
+@router.get("/measurements/aggregate")
+async def get_measurement_aggregates(
+    workspace_id: str = Query('personaltest', description="Workspace ID"),
+    data_source_id: Optional[str] = Query(None, description="Data Source ID"),
+    equipment_code: Optional[str] = Query(None),
+    equipment_codes: Optional[str] = Query(None, description="Comma-separated equipment codes"),
+    measurement_code: Optional[str] = Query(None),
+    start_time: Optional[datetime] = Query(None, description="Range start (default: end_time - DOWNSAMPLE_DEFAULT_RANGE_HOURS)"),
+    end_time: Optional[datetime] = Query(None, description="Range end, exclusive (default: now)"),
+    interval: Optional[str] = Query(None, description="Bucket size such as 30s, 15m, 1h, 1d (default: automatic)"),
+    db: AsyncSession = Depends(get_db)
+):
+    """측정 데이터 구간 집계 (건수/최소/최대/평균/규격 이탈 건수, 1분/1시간 롤업 우선 사용)"""
+    end_time = end_time or datetime.now()
+    start_time = start_time or end_time - timedelta(hours=settings.DOWNSAMPLE_DEFAULT_RANGE_HOURS)
+    if start_time.timestamp() >= end_time.timestamp():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_time must be before end_time")
+    
+    try:
+        interval_seconds = parse_interval(interval) if interval else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    # 원본 측정 조회와 같은 방식으로 워크스페이스/데이터 소스를 해석하고, 롤업이 그 소스를 집계하는 경우에만 응답
+    from app.services.data_providers.dynamic import DynamicProvider
+    try:
+        config = await DynamicProvider(db, workspace_id, data_source_id)._load_config()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not covers_data_source(config):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Aggregates are only available for data sources reading {MEASUREMENT_TABLE}; "
+                   f"use /measurements with points for {config.get('source_type')} sources"
+        )
+    
+    result = await measurement_rollups.aggregate(
+        db,
+        start_time,
+        end_time,
+        interval_seconds=interval_seconds,
+        equipment_code=equipment_code,
+        equipment_codes=equipment_codes,
+        measurement_code=measurement_code
+    )
+    return FastJSONResponse(result)
+
+
 # Equipment Types endpoint
 @router.get("/equipment/types")
 async def get_equipment_types(db: AsyncSession = Depends(get_db)):
@@ -1519,6 +1745,7 @@ async def execute_public_query(
     publish_token: str,
     data_source_id: str,
     request: QueryExecutionRequest,
+    http_request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     """Execute a query against the data source for published flows (public access)"""
@@ -1552,7 +1779,7 @@ async def execute_public_query(
         # Get data source configuration
         config_query = """
             SELECT source_type, api_url, mssql_connection_string, 
-                   custom_queries, api_key, api_headers
+                   custom_queries, api_key, api_headers, statement_timeout_seconds
             FROM data_source_configs
             WHERE id = :data_source_id
         """
@@ -1602,61 +1829,36 @@ async def execute_public_query(
                 error="No query specified and no matching predefined query found"
             )
         
-        # Execute the query based on source type
+        # Execute the query based on source type (shared pool, per-source statement timeout)
         if config.source_type in ['POSTGRESQL', 'MSSQL']:
             if config.source_type == 'POSTGRESQL':
-                import asyncpg
-                conn = await asyncpg.connect(connection_string)
-                try:
-                    # Execute query with limit
-                    limited_query = f"SELECT * FROM ({query_to_execute}) AS subquery LIMIT {request.limit}"
-                    result = await conn.fetch(limited_query)
-                    
-                    if result:
-                        columns = list(result[0].keys())
-                        sample_data = [dict(row) for row in result]
-                        row_count = len(sample_data)
-                    else:
-                        columns = []
-                        sample_data = []
-                        row_count = 0
-                    
-                    return QueryExecutionResponse(
-                        columns=columns,
-                        sample_data=sample_data,
-                        row_count=row_count
-                    )
-                finally:
-                    await conn.close()
+                limited_query = f"SELECT * FROM ({query_to_execute}) AS subquery LIMIT {request.limit}"
+            else:
+                limited_query = f"SELECT TOP {request.limit} * FROM ({query_to_execute}) AS subquery"
             
-            elif config.source_type == 'MSSQL':
-                import pyodbc
-                conn = pyodbc.connect(connection_string)
-                try:
-                    cursor = conn.cursor()
-                    # Execute query with limit
-                    limited_query = f"SELECT TOP {request.limit} * FROM ({query_to_execute}) AS subquery"
-                    cursor.execute(limited_query)
-                    
-                    # Get column names
-                    columns = [desc[0] for desc in cursor.description] if cursor.description else []
-                    
-                    # Get sample data
-                    rows = cursor.fetchall()
-                    sample_data = []
-                    for row in rows:
-                        row_dict = {}
-                        for i, value in enumerate(row):
-                            row_dict[columns[i]] = value
-                        sample_data.append(row_dict)
-                    
-                    return QueryExecutionResponse(
-                        columns=columns,
-                        sample_data=sample_data,
-                        row_count=len(sample_data)
-                    )
-                finally:
-                    conn.close()
+            if not connection_string:
+                return QueryExecutionResponse(
+                    columns=[],
+                    sample_data=[],
+                    row_count=0,
+                    error="Data source has no connection string configured"
+                )
+            
+            result = await run_adhoc_query(
+                data_source_id,
+                config.source_type,
+                connection_string,
+                limited_query,
+                statement_timeout=config.statement_timeout_seconds,
+                request=http_request
+            )
+            sample_data = [dict(zip(result.columns, row)) for row in result.rows]
+            
+            return QueryExecutionResponse(
+                columns=result.columns,
+                sample_data=sample_data,
+                row_count=len(sample_data)
+            )
         
         return QueryExecutionResponse(
             columns=[],
@@ -1687,6 +1889,7 @@ class DataSourceConfig(BaseModel):
     custom_queries: Optional[Dict[str, Dict[str, str]]] = None  # {"equipment_status": {"query": "...", "description": "..."}}
     priority: int = 0
     is_active: bool = True
+    statement_timeout_seconds: Optional[int] = None  # Ad-hoc query timeout (None uses the server default)
 
 class DataSourceConfigResponse(DataSourceConfig):
     id: uuid.UUID
@@ -1721,7 +1924,7 @@ async def get_data_sources(
         SELECT 
             id, workspace_id, config_name, source_type, 
             api_url, api_key, api_headers, mssql_connection_string,
-            custom_queries, is_active, created_at, updated_at
+            custom_queries, is_active, statement_timeout_seconds, created_at, updated_at
         FROM data_source_configs
         WHERE workspace_id = :workspace_id
         ORDER BY created_at DESC
@@ -1742,6 +1945,7 @@ async def get_data_sources(
             "custom_queries": row.custom_queries if row.custom_queries else None,  # Already a dict/JSONB
             "priority": 0,  # Priority column doesn't exist in table
             "is_active": row.is_active if row.is_active is not None else True,
+            "statement_timeout_seconds": row.statement_timeout_seconds,
             "created_at": row.created_at,
             "updated_at": row.updated_at
         })
@@ -1777,11 +1981,11 @@ async def create_data_source(
         INSERT INTO data_source_configs (
             id, workspace_id, config_name, source_type, 
             api_url, api_key, api_headers, mssql_connection_string,
-            custom_queries, is_active, created_by
+            custom_queries, is_active, statement_timeout_seconds, created_by
         ) VALUES (
             :id, :workspace_id, :config_name, :source_type,
             :api_url, :api_key, :api_headers, :mssql_connection_string,
-            :custom_queries, :is_active, :created_by
+            :custom_queries, :is_active, :statement_timeout_seconds, :created_by
         )
     """
     
@@ -1801,10 +2005,13 @@ async def create_data_source(
         "mssql_connection_string": encrypted_mssql_connection,
         "custom_queries": json.dumps(config.custom_queries) if config.custom_queries else None,
         "is_active": config.is_active,
+        "statement_timeout_seconds": config.statement_timeout_seconds,
         "created_by": current_user.get("username", "unknown")
     })
     
     await db.commit()
+    # A new config may become the workspace default
+    data_source_config_cache.invalidate(workspace_id=workspace_uuid)
     
     # Fetch the created record
     result = await db.execute(
@@ -1824,6 +2031,7 @@ async def create_data_source(
         "custom_queries": row.custom_queries if row.custom_queries else None,  # Already a dict/JSONB
         "priority": 0,
         "is_active": row.is_active if row.is_active is not None else True,
+        "statement_timeout_seconds": row.statement_timeout_seconds,
         "created_at": row.created_at,
         "updated_at": row.updated_at
     }
@@ -1858,6 +2066,7 @@ async def update_data_source(
                     api_headers = :api_headers,
                     custom_queries = :custom_queries,
                     is_active = :is_active,
+                    statement_timeout_seconds = :statement_timeout_seconds,
                     updated_at = CURRENT_TIMESTAMP
                 WHERE id = :id AND workspace_id = :workspace_id
             """
@@ -1869,6 +2078,7 @@ async def update_data_source(
                     api_headers = :api_headers,
                     custom_queries = :custom_queries,
                     is_active = :is_active,
+                    statement_timeout_seconds = :statement_timeout_seconds,
                     updated_at = CURRENT_TIMESTAMP
                 WHERE id = :id AND workspace_id = :workspace_id
             """
@@ -1894,7 +2104,8 @@ async def update_data_source(
             "source_type": config.source_type.upper(),
             "api_headers": json.dumps(config.headers) if config.headers else None,
             "custom_queries": json.dumps(config.custom_queries) if config.custom_queries else None,
-            "is_active": config.is_active
+            "is_active": config.is_active,
+            "statement_timeout_seconds": config.statement_timeout_seconds
         }
         
         if update_connection:
@@ -1915,6 +2126,8 @@ async def update_data_source(
             raise HTTPException(status_code=404, detail="Data source not found")
         
         await db.commit()
+        data_source_config_cache.invalidate(data_source_id=source_id, workspace_id=workspace_uuid)
+        latest_measurement_cache.invalidate(data_source_id=source_id)
         
         # Fetch the updated record
         result = await db.execute(
@@ -1934,6 +2147,7 @@ async def update_data_source(
             "custom_queries": row.custom_queries if row.custom_queries else None,  # Already a dict/JSONB
             "priority": 0,
             "is_active": row.is_active,
+            "statement_timeout_seconds": row.statement_timeout_seconds,
             "created_at": row.created_at,
             "updated_at": row.updated_at
         }
@@ -1972,19 +2186,68 @@ async def delete_data_source(
         raise HTTPException(status_code=404, detail="Data source not found")
     
     await db.commit()
+    data_source_config_cache.invalidate(data_source_id=source_id, workspace_id=workspace_uuid)
+    latest_measurement_cache.invalidate(data_source_id=source_id)
+    
+    from app.services.data_providers.connection_pool import connection_pool_manager
+    from app.services.data_providers.api_fetch import conditional_cache
+    from app.services.data_providers.field_mapping import invalidate_compiled_mappings
+    from app.services.data_source_mapping import mapping_cache
+    await connection_pool_manager.close_data_source_pools(str(source_id))
+    mapping_cache.invalidate(data_source_id=str(source_id))
+    invalidate_compiled_mappings(str(source_id))
+    spec_cache.invalidate(data_source_id=str(source_id))
+    conditional_cache.invalidate(str(source_id))
     
     return {"message": "Data source deleted successfully"}
 
+@router.get("/data-sources/status")
+async def get_data_source_statuses(
+    workspace_id: str = Query(..., description="Workspace ID"),
+    current_user: dict = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the latest background health snapshot for the workspace's active data sources."""
+    from app.services.data_source_health import data_source_health_monitor
+    
+    if workspace_id in ['personal_test', 'personaltest']:
+        workspace_uuid = uuid.UUID('21ee03db-90c4-4592-b00f-c44801e0b164')
+    else:
+        try:
+            workspace_uuid = uuid.UUID(workspace_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid workspace_id"
+            )
+    
+    # Snapshots include connection details, so require read access to the workspace
+    await WorkspacePermissionChecker("read")(workspace_uuid, current_user, db)
+    
+    return data_source_health_monitor.get_statuses(str(workspace_uuid))
+
 @router.get("/data-sources/{source_id}/status")
 async def get_data_source_status(
     source_id: uuid.UUID,
+    refresh: bool = Query(False, description="Probe the data source now instead of using the last background check"),
     current_user: dict = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get real-time connection status for a data source."""
-    # Get the data source configuration
+    """Get connection status for a data source from the background health monitor."""
+    from app.services.data_source_health import data_source_health_monitor
+    
+    from app.services.data_providers.resilience import data_source_guards
+    
+    snapshot = None if refresh else data_source_health_monitor.get_status(str(source_id))
+    if snapshot is None:
+        snapshot = await data_source_health_monitor.probe(str(source_id))
+    if snapshot is not None:
+        guard = data_source_guards.find(source_id)
+        return {**snapshot, "circuit_breaker": guard.get_stats()} if guard else snapshot
+    
+    # Not probed: either missing or inactive
     result = await db.execute(
-        text("SELECT * FROM data_source_configs WHERE id = :id"),
+        text("SELECT source_type FROM data_source_configs WHERE id = :id"),
         {"id": str(source_id)}
     )
     config = result.fetchone()
@@ -1992,66 +2255,14 @@ async def get_data_source_status(
     if not config:
         raise HTTPException(status_code=404, detail="Data source not found")
     
-    from app.core.security import decrypt_connection_string
-    
-    try:
-        source_type_lower = config.source_type.lower() if config.source_type else "postgresql"
-        
-        if source_type_lower == "postgresql":
-            # For PostgreSQL, test the current database connection
-            test_result = await db.execute(text("SELECT 1"))
-            success = test_result.scalar() == 1
-            connection_info = "Current PostgreSQL database"
-            
-        elif source_type_lower == "mssql":
-            if config.mssql_connection_string:
-                connection_string = decrypt_connection_string(config.mssql_connection_string)
-                from app.services.data_providers.mssql import MSSQLProvider
-                provider = MSSQLProvider(connection_string)
-                await provider.connect()
-                await provider.disconnect()
-                success = True
-                # Extract server info from connection string
-                import re
-                server_match = re.search(r'server=([^;]+)', connection_string, re.IGNORECASE)
-                database_match = re.search(r'database=([^;]+)', connection_string, re.IGNORECASE)
-                server = server_match.group(1) if server_match else "Unknown"
-                database = database_match.group(1) if database_match else "Unknown"
-                connection_info = f"MSSQL Server: {server}, Database: {database}"
-            else:
-                raise Exception("No connection string configured")
-                
-        elif source_type_lower == "api":
-            if config.api_url:
-                api_url = decrypt_connection_string(config.api_url)
-                import httpx
-                async with httpx.AsyncClient(timeout=5.0) as client:
-                    response = await client.get(api_url)
-                    success = response.status_code < 400
-                connection_info = f"API Endpoint: {api_url}"
-            else:
-                raise Exception("No API URL configured")
-        else:
-            raise Exception(f"Unsupported source type: {source_type_lower}")
-            
-        return {
-            "id": str(source_id),
-            "source_type": source_type_lower,
-            "status": "connected" if success else "disconnected",
-            "connection_info": connection_info,
-            "last_checked": datetime.now().isoformat(),
-            "error": None
-        }
-        
-    except Exception as e:
-        return {
-            "id": str(source_id),
-            "source_type": config.source_type.lower() if config.source_type else "unknown",
-            "status": "error",
-            "connection_info": "Connection failed",
-            "last_checked": datetime.now().isoformat(),
-            "error": str(e)
-        }
+    return {
+        "id": str(source_id),
+        "source_type": config.source_type.lower() if config.source_type else "unknown",
+        "status": "inactive",
+        "connection_info": "Data source is inactive",
+        "last_checked": datetime.now().isoformat(),
+        "error": None
+    }
 
 @router.post("/data-sources/{source_id}/test")
 async def test_data_source(
@@ -2083,9 +2294,14 @@ async def test_data_source(
             from app.services.data_providers.postgresql_provider import PostgreSQLProvider
             provider = PostgreSQLProvider(db)
         elif source_type_lower == "mssql":
-            # Decrypt connection string
-            decrypted_connection = decrypt_connection_string(config.mssql_connection_string)
-            provider = MSSQLProvider(connection_string=decrypted_connection)
+            # Reuse the health monitor's warm pool instead of building a new one
+            from app.services.data_source_health import data_source_health_monitor
+            provider = await data_source_health_monitor.get_mssql_provider(str(source_id))
+            if provider is None:
+                decrypted_connection = decrypt_connection_string(config.mssql_connection_string)
+                provider = MSSQLProvider(connection_string=decrypted_connection)
+            else:
+                return await provider.test_connection()
         elif source_type_lower == "api":
             # Decrypt API URL and key
             decrypted_url = decrypt_connection_string(config.api_url)
@@ -2216,6 +2432,8 @@ async def create_measurement_spec(
     
     await db.commit()
     row = result.fetchone()
+    # measurement_specs is shared by every workspace/data source reading the primary database
+    spec_cache.invalidate()
     
     return {
         "measurement_code": row.measurement_code,
@@ -2242,6 +2460,7 @@ async def delete_measurement_spec(
         raise HTTPException(status_code=404, detail="Measurement spec not found")
     
     await db.commit()
+    spec_cache.invalidate()
     
     return {"message": "Measurement spec deleted successfully"}
 
@@ -2414,10 +2633,38 @@ async def delete_field_mapping(
 
 # Query Execution API (classes moved to top of file)
 
+# Default queries used when a data source has no custom query for the type
+DEFAULT_QUERIES = {
+    'equipment_status': """
+        SELECT equipment_type, equipment_code, equipment_name, 
+               status, last_run_time
+        FROM personal_test_equipment_status
+        WHERE 1=1
+    """,
+    'measurement_data': """
+        SELECT equipment_type, equipment_code, measurement_code,
+               measurement_desc, measurement_value, timestamp
+        FROM personal_test_measurement_data
+        WHERE 1=1
+    """
+}
+
+def _resolve_query_text(custom_query: Optional[str], custom_queries: Optional[Dict[str, Any]], query_type: str) -> Optional[str]:
+    """Request override > data source custom query > default query for the type"""
+    if custom_query:
+        return custom_query
+    # custom_queries is already a dict/JSONB from PostgreSQL
+    if custom_queries and query_type in custom_queries:
+        query = custom_queries[query_type].get('query')
+        if query:
+            return query
+    return DEFAULT_QUERIES.get(query_type)
+
 @router.post("/data-sources/{data_source_id}/execute-query", response_model=QueryExecutionResponse)
 async def execute_query(
     data_source_id: str,
     request: QueryExecutionRequest,
+    http_request: Request,
     current_user: dict = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -2426,7 +2673,7 @@ async def execute_query(
         # Get data source configuration
         config_query = """
             SELECT source_type, api_url, mssql_connection_string, 
-                   custom_queries, api_key, api_headers
+                   custom_queries, api_key, api_headers, statement_timeout_seconds
             FROM data_source_configs
             WHERE id = :data_source_id
         """
@@ -2462,36 +2709,14 @@ async def execute_query(
             )
         
         # Get the query to execute
-        query_to_execute = request.custom_query
-        if not query_to_execute and config.custom_queries:
-            # custom_queries is already a dict/JSONB from PostgreSQL
-            custom_queries = config.custom_queries
-            if request.query_type in custom_queries:
-                query_to_execute = custom_queries[request.query_type].get('query')
-        
+        query_to_execute = _resolve_query_text(request.custom_query, config.custom_queries, request.query_type)
         if not query_to_execute:
-            # Use default query based on type
-            if request.query_type == 'equipment_status':
-                query_to_execute = """
-                    SELECT equipment_type, equipment_code, equipment_name, 
-                           status, last_run_time
-                    FROM personal_test_equipment_status
-                    WHERE 1=1
-                """
-            elif request.query_type == 'measurement_data':
-                query_to_execute = """
-                    SELECT equipment_type, equipment_code, measurement_code,
-                           measurement_desc, measurement_value, timestamp
-                    FROM personal_test_measurement_data
-                    WHERE 1=1
-                """
-            else:
-                return QueryExecutionResponse(
-                    columns=[],
-                    sample_data=[],
-                    row_count=0,
-                    error=f"Unknown query type: {request.query_type}"
-                )
+            return QueryExecutionResponse(
+                columns=[],
+                sample_data=[],
+                row_count=0,
+                error=f"Unknown query type: {request.query_type}"
+            )
         
         # Add LIMIT/TOP to the query if not present based on source type
         if 'limit' not in query_to_execute.lower() and 'top' not in query_to_execute.lower():
@@ -2506,92 +2731,22 @@ async def execute_query(
                 # For PostgreSQL and other databases, use LIMIT
                 query_to_execute += f" LIMIT {request.limit}"
         
-        # Execute the query
-        if config.source_type == 'POSTGRESQL':
-            # Log for debugging
-            logger.info(f"Executing query for PostgreSQL - Connection string available: {bool(connection_string)}")
-            logger.info(f"Query to execute: {query_to_execute[:100]}...")
-            
-            # Use existing connection if no custom connection string
-            if not connection_string:
-                result = await db.execute(text(query_to_execute))
-            else:
-                # Create new connection for external database
-                from sqlalchemy.ext.asyncio import create_async_engine
-                try:
-                    # Make sure the connection string starts with postgresql://
-                    if not connection_string.startswith('postgresql://'):
-                        connection_string = f'postgresql://{connection_string}'
-                    
-                    engine = create_async_engine(connection_string)
-                    async with engine.begin() as conn:
-                        result = await conn.execute(text(query_to_execute))
-                    await engine.dispose()
-                except Exception as conn_error:
-                    logger.error(f"Connection error with external database: {conn_error}")
-                    # Fallback to default connection
-                    logger.info("Falling back to default database connection")
-                    result = await db.execute(text(query_to_execute))
-        elif config.source_type.upper() == "MSSQL":
-            # MSSQL query execution
-            try:
-                from app.services.data_providers.mssql import MSSQLProvider
-                
-                # Decrypt connection string
-                decrypted_connection = decrypt_connection_string(config.mssql_connection_string)
-                
-                # Create MSSQL provider
-                provider = MSSQLProvider(connection_string=decrypted_connection)
-                
-                # Execute query using the provider's connection
-                async with provider.get_connection() as cursor:
-                    await cursor.execute(query_to_execute)
-                    
-                    # Get column names
-                    columns = [column[0] for column in cursor.description]
-                    
-                    # Fetch results
-                    rows = await cursor.fetchall()
-                    
-                    # Convert to list of tuples for compatibility
-                    result_rows = [tuple(row) for row in rows]
-                    
-                    # Create a mock result object for consistency
-                    class MockResult:
-                        def __init__(self, columns, rows):
-                            self.columns = columns
-                            self.rows = rows
-                            
-                        def keys(self):
-                            return self.columns
-                            
-                        def fetchall(self):
-                            return self.rows
-                    
-                    result = MockResult(columns, result_rows)
-                    
-                await provider.disconnect()
-                
-            except Exception as e:
-                logger.error(f"MSSQL query execution failed: {e}")
-                return QueryExecutionResponse(
-                    columns=[],
-                    sample_data=[],
-                    row_count=0,
-                    error=f"MSSQL query execution failed: {str(e)}"
-                )
-        else:
-            # Unsupported source type
-            return QueryExecutionResponse(
-                columns=[],
-                sample_data=[],
-                row_count=0,
-                error=f"Query execution not yet implemented for {config.source_type}"
-            )
+        # Execute the query on the data source's shared pool (no fallback to the primary database)
+        logger.info(f"Executing query for {config.source_type} - Connection string available: {bool(connection_string)}")
+        logger.info(f"Query to execute: {query_to_execute[:100]}...")
+        result = await run_adhoc_query(
+            data_source_id,
+            config.source_type,
+            connection_string,
+            query_to_execute,
+            statement_timeout=config.statement_timeout_seconds,
+            request=http_request,
+            db=db
+        )
         
         # Get column names and data
-        columns = list(result.keys())
-        rows = result.fetchall()
+        columns = result.columns
+        rows = result.rows
         
         # Convert rows to dictionaries
         sample_data = []
@@ -2620,6 +2775,83 @@ async def execute_query(
             error=str(e)
         )
 
+@router.post("/data-sources/{data_source_id}/export")
+async def export_query_results(
+    data_source_id: str,
+    request: QueryExportRequest,
+    current_user: dict = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stream query results as CSV, NDJSON or Parquet using a server-side cursor (constant memory)"""
+    export_format = request.format.lower()
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {request.format}")
+    if export_format == "parquet" and not PYARROW_AVAILABLE:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow on the server")
+    
+    config_query = """
+        SELECT source_type, mssql_connection_string, custom_queries, statement_timeout_seconds
+        FROM data_source_configs
+        WHERE id = :data_source_id
+    """
+    result = await db.execute(text(config_query), {"data_source_id": data_source_id})
+    config = result.fetchone()
+    
+    if not config:
+        raise HTTPException(status_code=404, detail="Data source not found")
+    if config.source_type not in ['POSTGRESQL', 'MSSQL']:
+        raise HTTPException(status_code=400, detail=f"Query export is not supported for {config.source_type} data sources")
+    
+    try:
+        connection_string = decrypt_connection_string(config.mssql_connection_string) if config.mssql_connection_string else None
+    except Exception as decrypt_error:
+        logger.error(f"Failed to decrypt connection string: {decrypt_error}")
+        raise HTTPException(status_code=500, detail="Failed to decrypt data source credentials")
+    
+    query_to_export = _resolve_query_text(request.custom_query, config.custom_queries, request.query_type)
+    if not query_to_export:
+        raise HTTPException(status_code=400, detail=f"Unknown query type: {request.query_type}")
+    if request.limit:
+        if config.source_type == 'MSSQL':
+            query_to_export = f"SELECT TOP {int(request.limit)} * FROM ({query_to_export}) AS subquery"
+        else:
+            query_to_export = f"SELECT * FROM ({query_to_export}) AS subquery LIMIT {int(request.limit)}"
+    
+    batches = stream_adhoc_query(
+        data_source_id,
+        config.source_type,
+        connection_string,
+        query_to_export,
+        statement_timeout=config.statement_timeout_seconds
+    )
+    
+    # Run the statement before sending headers so connection/SQL errors still produce a proper status code
+    try:
+        first_batch = await batches.__anext__()
+    except AdhocQueryError as e:
+        await batches.aclose()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        await batches.aclose()
+        logger.error(f"Query export failed for data source {data_source_id}: {e}")
+        raise HTTPException(status_code=502, detail=f"Query export failed: {str(e)}")
+    
+    async def all_batches():
+        try:
+            yield first_batch
+            async for batch in batches:
+                yield batch
+        finally:
+            await batches.aclose()
+    
+    media_type, extension = EXPORT_FORMATS[export_format]
+    filename = f"{request.query_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    return StreamingResponse(
+        encode_export(all_batches(), export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 # Data Preview API
 class DataPreviewRequest(BaseModel):
     data_type: str  # 'equipment_status' or 'measurement_data'
@@ -2634,6 +2866,7 @@ class DataPreviewResponse(BaseModel):
 async def preview_data_mapping(
     data_source_id: str,
     request: DataPreviewRequest,
+    http_request: Request,
     current_user: dict = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -2646,6 +2879,7 @@ async def preview_data_mapping(
                 query_type=request.data_type,
                 limit=request.limit
             ),
+            http_request=http_request,
             current_user=current_user,
             db=db
         )
@@ -2944,8 +3178,25 @@ class MonitoringDataResponse(BaseModel):
     table_data: Dict[str, Dict[str, Any]]  # nodeId -> table data
     last_update: datetime
 
+
+def _columnar_monitoring_payload(payload: Dict[str, Any], columnar_format: str):
+    """통합 모니터링 응답의 목록(설비/측정/테이블 행)을 컬럼 배열로 인코딩"""
+    table_data = {}
+    for node_id, table in payload["table_data"].items():
+        rows = table.get("data") or []
+        if all(isinstance(row, dict) for row in rows):
+            table = {**table, "data": ColumnarBatch.from_rows(rows)}
+        table_data[node_id] = table
+    return columnar_response({
+        **payload,
+        "equipment_statuses": ColumnarBatch.from_rows(payload["equipment_statuses"]),
+        "measurements": ColumnarBatch.from_rows(payload["measurements"]),
+        "table_data": table_data
+    }, columnar_format)
+
 @router.get("/monitoring/integrated-data", response_model=MonitoringDataResponse)
 async def get_integrated_monitoring_data(
+    request: Request,
     workspace_id: str = Query(..., description="Workspace ID"),
     flow_data: Optional[str] = Query(None, description="JSON string of flow data to extract table nodes"),
     data_source_id: Optional[str] = Query(None, description="Data source ID for equipment/measurement data"),
@@ -3055,6 +3306,16 @@ async def get_integrated_monitoring_data(
             except Exception as e:
                 logger.error(f"Error processing flow data for table nodes: {e}")
 
+        # 여러 목록이 섞인 응답이므로 Arrow IPC(단일 테이블)는 제외
+        columnar_format = negotiate_columnar_format(request.headers.get("accept"), allowed=("json", "msgpack"))
+        if columnar_format:
+            return _columnar_monitoring_payload({
+                "equipment_statuses": equipment_statuses,
+                "measurements": measurements,
+                "table_data": table_data,
+                "last_update": datetime.now().isoformat()
+            }, columnar_format)
+        
         return MonitoringDataResponse(
             equipment_statuses=equipment_statuses,
             measurements=measurements,
@@ -3069,6 +3330,7 @@ async def get_integrated_monitoring_data(
 @router.get("/public/{publish_token}/monitoring/integrated-data")
 async def get_public_integrated_monitoring_data(
     publish_token: str,
+    request: Request,
     flow_data: Optional[str] = Query(None, description="JSON string of flow data to extract table nodes"),
     db: AsyncSession = Depends(get_db)
 ):
@@ -3204,12 +3466,16 @@ async def get_public_integrated_monitoring_data(
             except Exception as e:
                 logger.error(f"Error processing flow data for table nodes: {e}")
 
-        return {
+        payload = {
             "equipment_statuses": equipment_statuses,
             "measurements": measurements,
             "table_data": table_data,
             "last_update": datetime.now().isoformat()
         }
+        columnar_format = negotiate_columnar_format(request.headers.get("accept"), allowed=("json", "msgpack"))
+        if columnar_format:
+            return _columnar_monitoring_payload(payload, columnar_format)
+        return payload
         
     except Exception as e:
         logger.error(f"Error getting public integrated monitoring data: {e}")
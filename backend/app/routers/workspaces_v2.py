@@ -22,6 +22,7 @@ from ..services.permission_service import permission_service, PermissionContext,
 from ..services.query_builder import standard_query_builder
 from ..repositories.workspace_repository import WorkspaceRepository
 from ..services.performance_monitor import performance_monitor
+from ..services.metrics_registry import metrics_registry, counter_family
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +31,15 @@ router = APIRouter(tags=["Workspaces v2"], prefix="/v2")
 # Repository instance
 workspace_repository = WorkspaceRepository(permission_service, standard_query_builder)
 
+metrics_registry.register_local("workspace_repository", lambda: [
+    counter_family(
+        "maxlab_workspace_repository_operations_total",
+        "Workspace repository operations by kind",
+        workspace_repository.get_operation_stats(),
+        "operation"
+    )
+])
+
 
 # 테스트 엔드포인트
 @router.get("/workspaces/test")
@@ -0,0 +1,223 @@
+"""
+Columnar Wire Format Service
+대량 측정 응답을 컬럼 배열(JSON) / MessagePack / Arrow IPC로 인코딩하는 서비스
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+from datetime import date, datetime, time
+from decimal import Decimal
+import logging
+import uuid
+
+from fastapi.responses import Response
+
+from ..core.fast_json import dumps
+
+logger = logging.getLogger(__name__)
+
+# msgpack을 선택적으로 import (MessagePack 응답용)
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+    msgpack = None
+
+# pyarrow를 선택적으로 import (Arrow IPC 응답용)
+try:
+    import pyarrow as pa
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+
+# 형식별 media type (Accept 헤더로 선택)
+COLUMNAR_FORMATS: Dict[str, str] = {
+    "json": "application/vnd.maxlab.columnar+json",
+    "msgpack": "application/vnd.maxlab.columnar+msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+_MEDIA_TYPE_FORMATS: Dict[str, str] = {
+    **{media_type: name for name, media_type in COLUMNAR_FORMATS.items()},
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+}
+
+# 고유값 수가 행 수의 절반 이하인 문자열 컬럼만 사전 인코딩
+DICTIONARY_MAX_RATIO = 0.5
+
+
+def format_available(columnar_format: str) -> bool:
+    """해당 형식을 인코딩할 수 있는지 (선택 의존성 설치 여부)"""
+    if columnar_format == "msgpack":
+        return MSGPACK_AVAILABLE
+    if columnar_format == "arrow":
+        return PYARROW_AVAILABLE
+    return columnar_format in COLUMNAR_FORMATS
+
+
+def negotiate_columnar_format(accept: Optional[str], allowed: Iterable[str] = tuple(COLUMNAR_FORMATS)) -> Optional[str]:
+    """
+    Accept 헤더에서 컬럼 형식 선택
+    
+    Returns:
+        Optional[str]: "json" / "msgpack" / "arrow", 행 단위 JSON이 우선이거나 지원 형식이 없으면 None
+    """
+    if not accept:
+        return None
+    
+    allowed = set(allowed)
+    candidates = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = [item.strip() for item in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            candidates.append((-quality, position, media_type.lower()))
+    
+    for _, _, media_type in sorted(candidates):
+        columnar_format = _MEDIA_TYPE_FORMATS.get(media_type)
+        if columnar_format is None:
+            # application/json, */* 등 기본 형식이 더 선호되면 행 단위 응답 유지
+            if media_type in ("application/json", "application/*", "*/*"):
+                return None
+            continue
+        if columnar_format in allowed and format_available(columnar_format):
+            return columnar_format
+    return None
+
+
+def _encode_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not serializable")
+
+
+class ColumnarBatch:
+    """컬럼 이름 -> 값 배열로 보관한 행 묶음"""
+    
+    __slots__ = ("columns", "row_count")
+    
+    def __init__(self, columns: Dict[str, List[Any]], row_count: int):
+        self.columns = columns
+        self.row_count = row_count
+    
+    @classmethod
+    def from_rows(cls, rows: Sequence[Mapping[str, Any]], fields: Optional[Sequence[str]] = None) -> "ColumnarBatch":
+        """dict 행 목록을 컬럼으로 전치 (fields가 없으면 처음 나타난 순서대로 모든 키 사용)"""
+        if fields is None:
+            fields = list(dict.fromkeys(key for row in rows for key in row))
+        return cls({field: [row.get(field) for row in rows] for field in fields}, len(rows))
+    
+    @classmethod
+    def from_records(cls, records: Sequence[Any], fields: Sequence[str]) -> "ColumnarBatch":
+        """MeasurementRecord 등 속성 기반 레코드를 dict 변환 없이 컬럼으로 전치"""
+        return cls({field: [getattr(record, field) for record in records] for field in fields}, len(records))
+    
+    @staticmethod
+    def _dictionary(values: List[Any]):
+        """사전 인코딩 대상이면 (dictionary, codes), 아니면 None"""
+        if not values:
+            return None
+        dictionary: Dict[str, int] = {}
+        for value in values:
+            if value is None:
+                continue
+            if not isinstance(value, str):
+                return None
+            dictionary.setdefault(value, len(dictionary))
+        if not dictionary or len(dictionary) > len(values) * DICTIONARY_MAX_RATIO:
+            return None
+        return list(dictionary), [None if value is None else dictionary[value] for value in values]
+    
+    def to_document(self) -> Dict[str, Any]:
+        """
+        JSON/MessagePack용 문서
+        
+        사전 인코딩된 컬럼은 columns에 정수 코드, dictionaries에 고유값 목록이 들어갑니다.
+        """
+        columns: Dict[str, List[Any]] = {}
+        dictionaries: Dict[str, List[str]] = {}
+        for name, values in self.columns.items():
+            encoded = self._dictionary(values)
+            if encoded is None:
+                columns[name] = values
+            else:
+                dictionaries[name], columns[name] = encoded
+        return {"format": "columnar", "row_count": self.row_count, "columns": columns, "dictionaries": dictionaries}
+    
+    def to_arrow(self):
+        """pyarrow Table로 변환 (문자열 컬럼은 DictionaryArray)"""
+        arrays, names = [], []
+        for name, values in self.columns.items():
+            encoded = self._dictionary(values)
+            if encoded is not None:
+                dictionary, codes = encoded
+                array = pa.DictionaryArray.from_arrays(pa.array(codes, pa.int32()), pa.array(dictionary, pa.string()))
+            else:
+                try:
+                    array = pa.array(values)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                    # 타입이 섞인 컬럼(외부 API 응답 등)은 문자열로 통일
+                    array = pa.array([None if value is None else str(value) for value in values], pa.string())
+            arrays.append(array)
+            names.append(name)
+        return pa.Table.from_arrays(arrays, names=names)
+
+
+def _to_documents(content: Any) -> Any:
+    """중첩 dict/list 안의 ColumnarBatch를 문서로 치환"""
+    if isinstance(content, ColumnarBatch):
+        return content.to_document()
+    if isinstance(content, dict):
+        return {key: _to_documents(value) for key, value in content.items()}
+    if isinstance(content, list):
+        return [_to_documents(value) for value in content]
+    return content
+
+
+def encode_columnar(content: Any, columnar_format: str) -> bytes:
+    """
+    ColumnarBatch(또는 ColumnarBatch를 포함한 dict)를 지정 형식으로 인코딩
+    
+    Raises:
+        ValueError: 지원하지 않는 형식이거나 Arrow에 단일 배치가 아닌 content를 전달한 경우
+        RuntimeError: 형식에 필요한 라이브러리가 설치되지 않은 경우
+    """
+    if columnar_format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unsupported columnar format: {columnar_format}")
+    if not format_available(columnar_format):
+        raise RuntimeError(f"{columnar_format} encoding requires an optional dependency that is not installed")
+    
+    if columnar_format == "arrow":
+        if not isinstance(content, ColumnarBatch):
+            raise ValueError("Arrow IPC responses carry a single columnar batch")
+        table = content.to_arrow()
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    
+    document = _to_documents(content)
+    if columnar_format == "msgpack":
+        return msgpack.packb(document, default=_encode_default, use_bin_type=True)
+    return dumps(document)
+
+
+def columnar_response(content: Any, columnar_format: str) -> Response:
+    """협상된 형식의 응답 생성 (Accept에 따라 달라지므로 Vary 헤더 포함)"""
+    return Response(
+        content=encode_columnar(content, columnar_format),
+        media_type=COLUMNAR_FORMATS[columnar_format],
+        headers={"Vary": "Accept"}
+    )
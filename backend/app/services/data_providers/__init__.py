@@ -4,7 +4,7 @@ Data Providers for Multi-Database Support
 """
 import logging
 
-from .base import IDataProvider, EquipmentData, MeasurementData, EquipmentStatusResponse
+from .base import IDataProvider, EquipmentData, MeasurementData, MeasurementRecord, EquipmentStatusResponse
 from .postgresql_provider import PostgreSQLProvider
 from .dynamic import DynamicProvider
 from .api import APIProvider
@@ -25,6 +25,7 @@ try:
         'IDataProvider',
         'EquipmentData', 
         'MeasurementData',
+        'MeasurementRecord',
         'EquipmentStatusResponse',
         'PostgreSQLProvider',
         'DynamicProvider',
@@ -44,6 +45,7 @@ except ImportError as import_error:
         'IDataProvider',
         'EquipmentData', 
         'MeasurementData',
+        'MeasurementRecord',
         'EquipmentStatusResponse',
         'PostgreSQLProvider',
         'DynamicProvider',
@@ -0,0 +1,237 @@
+"""
+Ad-hoc query execution for the execute-query and preview endpoints.
+
+Statements run on the shared per-data-source pools (never on a throwaway
+engine and never silently on the primary database), under a per-source
+statement timeout, and are cancelled on the server when the client goes
+away before the result is ready.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from .connection_pool import connection_pool_manager
+
+logger = logging.getLogger(__name__)
+
+# How often the client connection is checked while a query is running
+DISCONNECT_POLL_SECONDS = 0.5
+# Client-side deadline slack on top of the server-side statement timeout
+DEADLINE_GRACE_SECONDS = 2.0
+# Rows fetched per round trip when streaming exports
+STREAM_BATCH_SIZE = 5000
+
+
+class AdhocQueryError(Exception):
+    """Query could not be completed (timeout, client gone, unsupported source)."""
+
+
+@dataclass
+class AdhocQueryResult:
+    columns: List[str]
+    rows: List[tuple]
+
+
+def resolve_statement_timeout(configured: Optional[Any]) -> float:
+    """Per-source statement timeout in seconds, falling back to the global default."""
+    try:
+        if configured is not None and float(configured) > 0:
+            return float(configured)
+    except (TypeError, ValueError):
+        logger.warning(f"Ignoring invalid statement timeout: {configured!r}")
+    return settings.DATA_SOURCE_STATEMENT_TIMEOUT_SECONDS
+
+
+async def _set_local_timeout(conn: Any, timeout: float) -> None:
+    # SET does not accept bind parameters; the value is always an int we computed
+    await conn.execute(text(f"SET LOCAL statement_timeout = {max(1, int(timeout * 1000))}"))
+
+
+async def _run_postgresql(data_source_id: str, connection_string: str, query: str, timeout: float) -> AdhocQueryResult:
+    engine = await connection_pool_manager.get_engine(data_source_id, "postgresql", connection_string)
+    async with engine.connect() as conn:
+        async with conn.begin():
+            await _set_local_timeout(conn, timeout)
+            result = await conn.execute(text(query))
+            return AdhocQueryResult(list(result.keys()), [tuple(row) for row in result.fetchall()])
+
+
+async def _run_on_session(db: AsyncSession, query: str, timeout: float) -> AdhocQueryResult:
+    await _set_local_timeout(db, timeout)
+    result = await db.execute(text(query))
+    return AdhocQueryResult(list(result.keys()), [tuple(row) for row in result.fetchall()])
+
+
+async def _run_mssql(data_source_id: str, connection_string: str, query: str) -> AdhocQueryResult:
+    from .mssql import MSSQLProvider
+    
+    provider = MSSQLProvider(connection_string=connection_string, data_source_id=data_source_id)
+    async with provider.get_connection() as cursor:
+        try:
+            await cursor.execute(query)
+            columns = [column[0] for column in cursor.description] if cursor.description else []
+            rows = await cursor.fetchall() if cursor.description else []
+        except asyncio.CancelledError:
+            _cancel_mssql_statement(cursor, data_source_id)
+            raise
+    return AdhocQueryResult(columns, [tuple(row) for row in rows])
+
+
+def _cancel_mssql_statement(cursor: Any, data_source_id: str) -> None:
+    # aioodbc runs the statement in a worker thread; SQLCancel stops it on the server
+    try:
+        getattr(cursor, "_impl", cursor).cancel()
+    except Exception as e:
+        logger.warning(f"Failed to cancel MSSQL statement for data source {data_source_id}: {e}")
+
+
+async def _await_cancellable(coro, deadline: float, request: Optional[Any]):
+    """Await ``coro``, cancelling it when the deadline passes or the client disconnects."""
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise AdhocQueryError("Query exceeded the statement timeout")
+            done, _ = await asyncio.wait({task}, timeout=min(DISCONNECT_POLL_SECONDS, remaining))
+            if done:
+                return task.result()
+            if request is not None and await request.is_disconnected():
+                raise AdhocQueryError("Client disconnected, query cancelled")
+    finally:
+        if not task.done():
+            task.cancel()
+            # Let the driver send its cancel request before the connection goes back to the pool
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def run_adhoc_query(
+    data_source_id: str,
+    source_type: str,
+    connection_string: Optional[str],
+    query: str,
+    statement_timeout: Optional[Any] = None,
+    request: Optional[Any] = None,
+    db: Optional[AsyncSession] = None
+) -> AdhocQueryResult:
+    """
+    Execute a single ad-hoc statement against a data source.
+    
+    Args:
+        data_source_id: Data source id (connection pool key)
+        source_type: postgresql or mssql
+        connection_string: Decrypted connection string; a PostgreSQL source without one
+            is the primary database and runs on ``db``
+        query: SQL to execute
+        statement_timeout: Per-source timeout in seconds (None uses the global default)
+        request: Starlette request used to detect client disconnects
+        db: Primary database session
+    
+    Raises:
+        AdhocQueryError: on timeout, client disconnect or unsupported source type
+    """
+    source_type = (source_type or "").lower()
+    timeout = resolve_statement_timeout(statement_timeout)
+    
+    if source_type == "postgresql":
+        if connection_string:
+            coro = _run_postgresql(str(data_source_id), connection_string, query, timeout)
+        elif db is not None:
+            coro = _run_on_session(db, query, timeout)
+        else:
+            raise AdhocQueryError("PostgreSQL data source has no connection string")
+    elif source_type == "mssql":
+        if not connection_string:
+            raise AdhocQueryError("MSSQL data source has no connection string")
+        coro = _run_mssql(str(data_source_id), connection_string, query)
+    else:
+        raise AdhocQueryError(f"Query execution not yet implemented for {source_type}")
+    
+    return await _await_cancellable(coro, time.monotonic() + timeout + DEADLINE_GRACE_SECONDS, request)
+
+
+async def _stream_postgresql(engine: Any, query: str, timeout: float, batch_size: int):
+    async with engine.connect() as conn:
+        async with conn.begin():
+            await _set_local_timeout(conn, timeout)
+            # AsyncConnection.stream uses a server-side cursor; rows arrive partition by partition
+            result = await conn.stream(text(query))
+            columns = list(result.keys())
+            yield columns, []
+            async for rows in result.partitions(batch_size):
+                yield columns, [tuple(row) for row in rows]
+
+
+async def _stream_mssql(data_source_id: str, connection_string: str, query: str, timeout: float, batch_size: int):
+    from .mssql import MSSQLProvider
+    
+    async def round_trip(coro):
+        # MSSQL has no SET LOCAL statement_timeout, so each round trip gets its own
+        # client-side deadline (like a per-FETCH statement_timeout on PostgreSQL)
+        try:
+            return await _await_cancellable(coro, time.monotonic() + timeout + DEADLINE_GRACE_SECONDS, None)
+        except (AdhocQueryError, asyncio.CancelledError):
+            _cancel_mssql_statement(cursor, data_source_id)
+            raise
+    
+    provider = MSSQLProvider(connection_string=connection_string, data_source_id=data_source_id)
+    async with provider.get_connection() as cursor:
+        await round_trip(cursor.execute(query))
+        columns = [column[0] for column in cursor.description] if cursor.description else []
+        yield columns, []
+        while columns:
+            rows = await round_trip(cursor.fetchmany(batch_size))
+            if not rows:
+                break
+            yield columns, [tuple(row) for row in rows]
+
+
+async def stream_adhoc_query(
+    data_source_id: str,
+    source_type: str,
+    connection_string: Optional[str],
+    query: str,
+    statement_timeout: Optional[Any] = None,
+    batch_size: int = STREAM_BATCH_SIZE
+) -> AsyncIterator[Tuple[List[str], List[tuple]]]:
+    """
+    Stream a query result in constant memory.
+    
+    Yields ``(columns, rows)``: first once with no rows (so empty results still
+    carry their header), then one batch of at most ``batch_size`` rows at a time.
+    Closing the generator (e.g. the client went away) closes the cursor and
+    returns the connection to its pool.
+    
+    Raises:
+        AdhocQueryError: on unsupported source type, missing connection string, or
+            a round trip exceeding the statement timeout
+    """
+    source_type = (source_type or "").lower()
+    timeout = resolve_statement_timeout(statement_timeout)
+    
+    if source_type == "postgresql":
+        if connection_string:
+            engine = await connection_pool_manager.get_engine(str(data_source_id), "postgresql", connection_string)
+        else:
+            # Streaming outlives the request-scoped session, so use the primary engine directly
+            from app.core.database import engine
+        batches = _stream_postgresql(engine, query, timeout, batch_size)
+    elif source_type == "mssql":
+        if not connection_string:
+            raise AdhocQueryError("MSSQL data source has no connection string")
+        batches = _stream_mssql(str(data_source_id), connection_string, query, timeout, batch_size)
+    else:
+        raise AdhocQueryError(f"Query export not yet implemented for {source_type}")
+    
+    try:
+        async for batch in batches:
+            yield batch
+    finally:
+        # Propagate close/cancel so the cursor and connection are released right away
+        await batches.aclose()
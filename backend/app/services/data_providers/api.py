@@ -1,14 +1,17 @@
 """
 External API data provider implementation.
 """
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Iterable
 import httpx
 import json
 from urllib.parse import urljoin
 import logging
 
-from .base import IDataProvider, EquipmentStatusResponse, EquipmentData, MeasurementData
+from .base import IDataProvider, EquipmentStatusResponse, EquipmentData, MeasurementRecord
+from .field_mapping import CompiledFieldMapping, compile_converter, compile_path, get_compiled_field_mapping
+from .api_fetch import (
+    PageResponse, PaginationConfig, PagedResult, conditional_cache, fetch_paginated, parse_json_stream, should_stream
+)
 from sqlalchemy import text
 
 logger = logging.getLogger(__name__)
@@ -46,6 +49,7 @@ class APIProvider(IDataProvider):
         self.data_source_id = data_source_id
         self._endpoint_mappings = {}
         self._field_mappings = {}
+        self._compiled_mappings: Dict[str, CompiledFieldMapping] = {}
     
     async def _load_endpoint_mappings(self) -> Dict[str, Dict[str, Any]]:
         """Load API endpoint mappings from configuration."""
@@ -71,7 +75,7 @@ class APIProvider(IDataProvider):
         
         query = """
             SELECT data_type, endpoint_path, http_method, request_headers,
-                   request_body_template, response_path
+                   request_body_template, response_path, pagination_config
             FROM data_source_endpoint_mappings
             WHERE data_source_id = :data_source_id AND is_active = true
         """
@@ -85,7 +89,8 @@ class APIProvider(IDataProvider):
                 "http_method": row.http_method or "GET",
                 "request_headers": row.request_headers or {},
                 "request_body_template": row.request_body_template,
-                "response_path": row.response_path or "$.data"
+                "response_path": row.response_path or "$.data",
+                "pagination": PaginationConfig.from_mapping(row.pagination_config)
             }
         
         return mappings
@@ -143,6 +148,11 @@ class APIProvider(IDataProvider):
         # Load endpoint and field mappings
         self._endpoint_mappings = await self._load_endpoint_mappings()
         self._field_mappings = await self._load_field_mappings()
+        self._compiled_mappings = {
+            data_type: get_compiled_field_mapping(self.data_source_id, data_type, field_mappings)
+            for data_type, field_mappings in self._field_mappings.items()
+            if field_mappings
+        }
     
     async def disconnect(self) -> None:
         """Close HTTP session."""
@@ -158,82 +168,97 @@ class APIProvider(IDataProvider):
         json_data: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Make HTTP request to API."""
+        payload, _ = await self._send(method, endpoint, params=params, json_data=json_data)
+        return payload
+    
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        json_data: Optional[Dict[str, Any]] = None,
+        data_paths: Iterable[str] = ()
+    ) -> PageResponse:
+        """
+        Make HTTP request and return (payload, next Link URL).
+        
+        GET responses carrying ETag/Last-Modified are revalidated on the next identical
+        request, and a 304 returns the cached payload. Large bodies are parsed incrementally,
+        keeping only `data_paths` (all of the body when no paths are given).
+        """
         if not self.session:
             await self.connect()
         
-        response = await self.session.request(
-            method=method,
-            url=endpoint,
-            params=params,
-            json=json_data
-        )
-        response.raise_for_status()
-        return response.json()
+        data_paths = tuple(data_paths)
+        scope = str(self.data_source_id or self.base_url)
+        cache_key = None
+        cached = None
+        headers = {}
+        if method == "GET":
+            cache_key = conditional_cache.make_key(scope, endpoint, params, data_paths)
+            cached = conditional_cache.get(cache_key)
+            if cached is not None:
+                headers.update(cached.validators())
+        
+        request = self.session.build_request(method, endpoint, params=params, json=json_data, headers=headers)
+        response = await self.session.send(request, stream=True)
+        try:
+            if response.status_code == 304 and cached is not None:
+                conditional_cache.record_not_modified()
+                return cached.payload, cached.next_url
+            response.raise_for_status()
+            
+            if data_paths and should_stream(response.headers):
+                payload = await parse_json_stream(response.aiter_bytes(), data_paths)
+            else:
+                await response.aread()
+                payload = response.json()
+            
+            next_url = response.links.get("next", {}).get("url")
+            if cache_key is not None:
+                conditional_cache.store(cache_key, scope, response.headers, payload, next_url)
+            return payload, next_url
+        finally:
+            await response.aclose()
     
-    def _extract_data_from_response(self, response_data: Any, response_path: str) -> List[Dict[str, Any]]:
-        """Extract data array from API response using JSONPath-like syntax."""
-        if not response_path or response_path == "$":
-            return response_data if isinstance(response_data, list) else [response_data]
+    async def _fetch_records(
+        self,
+        mapping: Dict[str, Any],
+        params: Dict[str, Any],
+        limit: int,
+        offset: int = 0
+    ) -> PagedResult:
+        """Fetch records of an endpoint mapping, following its pagination strategy."""
+        pagination = mapping.get("pagination") or PaginationConfig()
+        extract = compile_path(mapping["response_path"])
+        data_paths = (mapping["response_path"], "$.total", "$.has_more") + pagination.metadata_paths()
         
-        # Handle common JSONPath patterns
-        if response_path == "$.data":
-            return response_data.get("data", []) if isinstance(response_data, dict) else []
-        elif response_path == "$.result":
-            return response_data.get("result", []) if isinstance(response_data, dict) else []
-        elif response_path == "$.items":
-            return response_data.get("items", []) if isinstance(response_data, dict) else []
-        elif response_path.startswith("$.") and "." not in response_path[2:]:
-            # Simple field access like $.records
-            field = response_path[2:]
-            return response_data.get(field, []) if isinstance(response_data, dict) else []
-        else:
-            # For complex paths, try to parse
-            parts = response_path.split(".")
-            data = response_data
-            for part in parts[1:]:  # Skip $
-                if isinstance(data, dict):
-                    data = data.get(part, [])
-                else:
-                    return []
-            return data if isinstance(data, list) else [data]
+        async def request_page(page_params: Dict[str, Any], url: Optional[str]) -> PageResponse:
+            if url:
+                return await self._send("GET", url, data_paths=data_paths)
+            if mapping["http_method"] == "POST":
+                # For POST requests, send params in body
+                body = {"filters": page_params} if mapping.get("request_body_template") else page_params
+                return await self._send("POST", mapping["endpoint_path"], json_data=body, data_paths=data_paths)
+            return await self._send("GET", mapping["endpoint_path"], params=page_params, data_paths=data_paths)
+        
+        result = await fetch_paginated(request_page, pagination, extract, params, limit, offset)
+        if result.pages > 1:
+            logger.debug(f"Fetched {len(result.items)} records in {result.pages} pages from {mapping['endpoint_path']}")
+        return result
+    
+    def _extract_data_from_response(self, response_data: Any, response_path: str) -> List[Dict[str, Any]]:
+        """Extract data array from API response using JSONPath-like syntax (accessor compiled once per path)."""
+        return compile_path(response_path)(response_data)
     
     def _transform_field_value(self, value: Any, mapping: Dict[str, Any]) -> Any:
         """Transform field value based on mapping configuration."""
-        if value is None and mapping.get("default_value"):
-            value = mapping["default_value"]
-        
-        # Data type conversion
-        conversion = mapping.get("data_type_conversion")
-        if conversion and value is not None:
-            try:
-                if conversion == "int":
-                    value = int(value)
-                elif conversion == "float":
-                    value = float(value)
-                elif conversion == "string":
-                    value = str(value)
-                elif conversion == "boolean":
-                    value = bool(value)
-                elif conversion == "datetime":
-                    # Handle various datetime formats
-                    if isinstance(value, str):
-                        # Try ISO format first
-                        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
-            except:
-                pass  # Keep original value if conversion fails
-        
-        return value
+        convert = compile_converter(mapping)
+        return value if convert is None else convert(value)
     
     def _map_fields(self, source_data: Dict[str, Any], field_mappings: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
         """Map source fields to target fields."""
-        mapped_data = {}
-        
-        for target_field, mapping in field_mappings.items():
-            source_field = mapping["source_field"]
-            value = source_data.get(source_field)
-            mapped_data[target_field] = self._transform_field_value(value, mapping)
-        
-        return mapped_data
+        return CompiledFieldMapping(field_mappings)(source_data)
     
     async def get_equipment_status(
         self,
@@ -249,9 +274,11 @@ class APIProvider(IDataProvider):
             "http_method": "GET",
             "response_path": "$.data"
         })
-        field_mappings = self._field_mappings.get("equipment_status", {})
+        field_mapper = self._compiled_mappings.get("equipment_status")
+        pagination = mapping.get("pagination") or PaginationConfig()
         
-        params = {
+        # Paginated endpoints get limit/offset per page from the pagination strategy
+        params = {} if pagination.enabled else {
             "limit": limit,
             "offset": offset
         }
@@ -261,22 +288,14 @@ class APIProvider(IDataProvider):
             params["status"] = status
         
         try:
-            # Make request based on method
-            if mapping["http_method"] == "POST":
-                # For POST requests, send params in body
-                body = {"filters": params} if mapping.get("request_body_template") else params
-                response = await self._make_request("POST", mapping["endpoint_path"], json_data=body)
-            else:
-                response = await self._make_request("GET", mapping["endpoint_path"], params=params)
-            
-            # Extract data array from response
-            items_raw = self._extract_data_from_response(response, mapping["response_path"])
+            fetched = await self._fetch_records(mapping, params, limit, offset)
+            response = fetched.payload if isinstance(fetched.payload, dict) else {}
+            items_raw = fetched.items
             
             # Map fields
             items = []
-            if field_mappings:
-                for item in items_raw:
-                    mapped_item = self._map_fields(item, field_mappings)
+            if field_mapper:
+                for mapped_item in field_mapper.map_records(items_raw):
                     items.append(EquipmentData(
                         equipment_type=mapped_item.get("equipment_type", ""),
                         equipment_code=mapped_item.get("equipment_code", ""),
@@ -297,8 +316,13 @@ class APIProvider(IDataProvider):
             
             # Handle response format based on API specification
             # Expected format: {"query_id": "xxx", "data": [...]}
-            total = response.get("total", len(items))
-            has_more = response.get("has_more", (offset + limit) < total)
+            if pagination.enabled:
+                # Upstreams without a total only tell us whether another page exists
+                total = fetched.total if fetched.total is not None else offset + len(items)
+                has_more = bool(fetched.has_more)
+            else:
+                total = response.get("total", len(items))
+                has_more = response.get("has_more", (offset + limit) < total)
             
             return EquipmentStatusResponse(
                 items=items,
@@ -316,7 +340,7 @@ class APIProvider(IDataProvider):
         equipment_code: Optional[str] = None,
         equipment_type: Optional[str] = None,
         limit: int = 1000
-    ) -> List[MeasurementData]:
+    ) -> List[MeasurementRecord]:
         """Get measurement data from API."""
         # Get endpoint mapping
         mapping = self._endpoint_mappings.get("measurement_data", {
@@ -324,9 +348,10 @@ class APIProvider(IDataProvider):
             "http_method": "GET",
             "response_path": "$.data"
         })
-        field_mappings = self._field_mappings.get("measurement_data", {})
+        field_mapper = self._compiled_mappings.get("measurement_data")
+        pagination = mapping.get("pagination") or PaginationConfig()
         
-        params = {
+        params = {} if pagination.enabled else {
             "limit": limit
         }
         
@@ -336,50 +361,14 @@ class APIProvider(IDataProvider):
             params["equipment_type"] = equipment_type
         
         try:
-            # Make request based on method
-            if mapping["http_method"] == "POST":
-                body = {"filters": params} if mapping.get("request_body_template") else params
-                response = await self._make_request("POST", mapping["endpoint_path"], json_data=body)
-            else:
-                response = await self._make_request("GET", mapping["endpoint_path"], params=params)
-            
-            # Extract data array from response
-            items_raw = self._extract_data_from_response(response, mapping["response_path"])
+            items_raw = (await self._fetch_records(mapping, params, limit)).items
             
             # Map fields
-            results = []
-            if field_mappings:
-                for item in items_raw:
-                    mapped_item = self._map_fields(item, field_mappings)
-                    results.append(MeasurementData(
-                        id=mapped_item.get("id", 0),
-                        equipment_type=mapped_item.get("equipment_type", ""),
-                        equipment_code=mapped_item.get("equipment_code", ""),
-                        measurement_code=mapped_item.get("measurement_code", ""),
-                        measurement_desc=mapped_item.get("measurement_desc", ""),
-                        measurement_value=float(mapped_item.get("measurement_value", 0)),
-                        timestamp=mapped_item.get("timestamp", datetime.now()),
-                        spec_status=mapped_item.get("spec_status", 0),
-                        usl=mapped_item.get("usl"),
-                        lsl=mapped_item.get("lsl"),
-                        target=mapped_item.get("target")
-                    ))
+            if field_mapper:
+                results = [MeasurementRecord.from_row(item) for item in field_mapper.map_records(items_raw)]
             else:
                 # Use direct mapping if no field mappings defined
-                for item in items_raw:
-                    results.append(MeasurementData(
-                        id=item.get("id", 0),
-                        equipment_type=item.get("equipment_type", ""),
-                        equipment_code=item.get("equipment_code", ""),
-                        measurement_code=item.get("measurement_code", ""),
-                        measurement_desc=item.get("measurement_desc", ""),
-                        measurement_value=float(item.get("measurement_value", 0)),
-                        timestamp=item.get("timestamp", datetime.now()),
-                        spec_status=item.get("spec_status", 0),
-                        usl=item.get("usl"),
-                        lsl=item.get("lsl"),
-                        target=item.get("target")
-                    ))
+                results = [MeasurementRecord.from_row(item) for item in items_raw]
             
             return results
         except Exception as e:
@@ -389,7 +378,7 @@ class APIProvider(IDataProvider):
     async def get_latest_measurement(
         self,
         equipment_code: str
-    ) -> Optional[MeasurementData]:
+    ) -> Optional[MeasurementRecord]:
         """Get latest measurement for specific equipment."""
         measurements = await self.get_measurement_data(
             equipment_code=equipment_code,
@@ -0,0 +1,369 @@
+"""
+Pagination, conditional requests and incremental JSON parsing for API data sources.
+
+APIProvider endpoints can declare a pagination strategy in
+data_source_endpoint_mappings.pagination_config (JSON):
+
+    {"strategy": "offset", "page_size": 500, "concurrency": 4}
+    {"strategy": "page", "page_param": "page", "first_page": 1, "page_size": 100}
+    {"strategy": "cursor", "cursor_param": "cursor", "cursor_path": "$.meta.next_cursor"}
+    {"strategy": "link"}   # follow the RFC 8288 Link: <...>; rel="next" header
+
+Offset/page strategies fetch pages concurrently (all at once when the upstream
+reports a total, otherwise in waves until a short page). Cursor and link
+strategies are sequential by nature.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import math
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# ijson is optional; without it responses are decoded in one piece
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    ijson = None
+
+PAGINATION_STRATEGIES = ("none", "offset", "page", "cursor", "link")
+
+# (payload, next link URL) for one upstream request
+PageResponse = Tuple[Any, Optional[str]]
+# request_page(params, url) -> PageResponse; url is only set when following a Link header
+RequestPage = Callable[[Dict[str, Any], Optional[str]], Awaitable[PageResponse]]
+
+
+@dataclass
+class PaginationConfig:
+    """Pagination settings of one endpoint mapping."""
+    
+    strategy: str = "none"
+    page_size: int = 100
+    max_pages: int = field(default_factory=lambda: settings.API_PROVIDER_MAX_PAGES)
+    concurrency: int = field(default_factory=lambda: settings.API_PROVIDER_PAGE_CONCURRENCY)
+    limit_param: str = "limit"
+    offset_param: str = "offset"
+    page_param: str = "page"
+    first_page: int = 1
+    cursor_param: str = "cursor"
+    cursor_path: str = "$.next_cursor"
+    total_path: str = "$.total"
+    
+    @classmethod
+    def from_mapping(cls, config: Any) -> "PaginationConfig":
+        """Parse the pagination_config column (dict or JSON text); unknown strategies disable paging."""
+        if not config:
+            return cls()
+        if isinstance(config, str):
+            try:
+                config = json.loads(config)
+            except ValueError:
+                logger.warning(f"Ignoring invalid pagination_config: {config!r}")
+                return cls()
+        
+        known = {f.name for f in fields(cls)}
+        pagination = cls(**{key: value for key, value in config.items() if key in known})
+        if pagination.strategy not in PAGINATION_STRATEGIES:
+            logger.warning(f"Unknown pagination strategy '{pagination.strategy}', fetching a single page")
+            pagination.strategy = "none"
+        pagination.page_size = max(1, int(pagination.page_size))
+        pagination.max_pages = max(1, int(pagination.max_pages))
+        pagination.concurrency = max(1, int(pagination.concurrency))
+        return pagination
+    
+    @property
+    def enabled(self) -> bool:
+        return self.strategy != "none"
+    
+    def metadata_paths(self) -> Tuple[str, ...]:
+        """Response paths besides the data array that paging needs to read."""
+        if self.strategy == "cursor":
+            return (self.total_path, self.cursor_path)
+        return (self.total_path,)
+
+
+@dataclass
+class PagedResult:
+    items: List[Dict[str, Any]]
+    payload: Any  # first page, for response-level fields such as total
+    total: Optional[int] = None
+    has_more: Optional[bool] = None
+    pages: int = 1
+
+
+def get_path_value(data: Any, path: Optional[str]) -> Any:
+    """Scalar value at a "$.a.b" path (None when missing)."""
+    if not path or path == "$":
+        return data
+    for part in path[2:].split(".") if path.startswith("$.") else path.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(part)
+    return data
+
+
+def _as_int(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+async def fetch_paginated(
+    request_page: RequestPage,
+    pagination: PaginationConfig,
+    extract: Callable[[Any], List[Dict[str, Any]]],
+    params: Dict[str, Any],
+    limit: int,
+    offset: int = 0
+) -> PagedResult:
+    """
+    Fetch up to `limit` records starting at `offset`, following the endpoint's pagination.
+    
+    With pagination, `params` holds the filters only and limit/offset/page/cursor
+    parameters are added per page; without it `params` is sent as is in one request.
+    """
+    if pagination.strategy in ("offset", "page"):
+        return await _fetch_numbered(request_page, pagination, extract, params, limit, offset)
+    return await _fetch_sequential(request_page, pagination, extract, params, limit, offset)
+
+
+async def _fetch_numbered(request_page, pagination, extract, params, limit, offset) -> PagedResult:
+    page_size = pagination.page_size
+    if pagination.strategy == "offset":
+        skip = 0
+        
+        def page_params(index: int) -> Dict[str, Any]:
+            return {**params, pagination.limit_param: page_size, pagination.offset_param: offset + index * page_size}
+    else:
+        # Page numbers address whole pages; trim the head of the first page instead
+        skip = offset % page_size
+        start_page = pagination.first_page + offset // page_size
+        
+        def page_params(index: int) -> Dict[str, Any]:
+            return {**params, pagination.limit_param: page_size, pagination.page_param: start_page + index}
+    
+    wanted = limit + skip
+    page_count = min(math.ceil(wanted / page_size), pagination.max_pages)
+    
+    first_payload, _ = await request_page(page_params(0), None)
+    pages = [extract(first_payload)]
+    total = _as_int(get_path_value(first_payload, pagination.total_path))
+    
+    if total is not None:
+        remaining = max(0, total - (offset - skip))
+        page_count = min(page_count, math.ceil(remaining / page_size))
+    
+    if page_count > 1 and len(pages[0]) >= page_size:
+        semaphore = asyncio.Semaphore(pagination.concurrency)
+        
+        async def fetch(index: int) -> List[Dict[str, Any]]:
+            async with semaphore:
+                payload, _ = await request_page(page_params(index), None)
+                return extract(payload)
+        
+        indexes = list(range(1, page_count))
+        if total is not None:
+            pages.extend(await asyncio.gather(*(fetch(index) for index in indexes)))
+        else:
+            # Unknown total: fetch a wave of pages at a time and stop at the first short page
+            for start in range(0, len(indexes), pagination.concurrency):
+                wave = await asyncio.gather(*(fetch(index) for index in indexes[start:start + pagination.concurrency]))
+                pages.extend(wave)
+                if any(len(page) < page_size for page in wave):
+                    break
+    
+    items = [item for page in pages for item in page]
+    if total is not None:
+        has_more = offset + min(limit, len(items) - skip) < total
+    else:
+        has_more = len(items) > wanted or (len(pages) == page_count and len(pages[-1]) >= page_size)
+    
+    return PagedResult(
+        items=items[skip:wanted],
+        payload=first_payload,
+        total=total,
+        has_more=has_more,
+        pages=len(pages)
+    )
+
+
+async def _fetch_sequential(request_page, pagination, extract, params, limit, offset) -> PagedResult:
+    # Cursor/link pagination (and "none") cannot jump ahead, so the offset is skipped client side
+    wanted = offset + limit
+    page_params = dict(params)
+    if pagination.enabled:
+        page_params[pagination.limit_param] = min(pagination.page_size, wanted)
+    
+    first_payload, next_url = await request_page(page_params, None)
+    items = list(extract(first_payload))
+    pages = 1
+    
+    if not pagination.enabled:
+        return PagedResult(items=items, payload=first_payload)
+    
+    cursor = get_path_value(first_payload, pagination.cursor_path) if pagination.strategy == "cursor" else None
+    while len(items) < wanted and pages < pagination.max_pages:
+        if pagination.strategy == "cursor":
+            if not cursor:
+                break
+            payload, _ = await request_page({**page_params, pagination.cursor_param: cursor}, None)
+            cursor = get_path_value(payload, pagination.cursor_path)
+        else:
+            if not next_url:
+                break
+            payload, next_url = await request_page({}, next_url)
+        page = extract(payload)
+        pages += 1
+        if not page:
+            break
+        items.extend(page)
+    
+    has_more = len(items) > wanted or bool(cursor if pagination.strategy == "cursor" else next_url)
+    return PagedResult(
+        items=items[offset:wanted],
+        payload=first_payload,
+        total=_as_int(get_path_value(first_payload, pagination.total_path)),
+        has_more=has_more,
+        pages=pages
+    )
+
+
+class CachedResponse:
+    """Validators and decoded payload of a GET response that carried ETag/Last-Modified."""
+    
+    __slots__ = ("scope", "etag", "last_modified", "payload", "next_url")
+    
+    def __init__(self, scope: str, etag: Optional[str], last_modified: Optional[str], payload: Any, next_url: Optional[str]):
+        self.scope = scope
+        self.etag = etag
+        self.last_modified = last_modified
+        self.payload = payload
+        self.next_url = next_url
+    
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ConditionalRequestCache:
+    """
+    Process-wide LRU of upstream GET responses keyed by data source, URL and parameters.
+    Revalidated with If-None-Match / If-Modified-Since so unchanged pages cost a 304.
+    """
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.stats = {"not_modified": 0, "modified": 0, "stored": 0, "evictions": 0}
+    
+    @staticmethod
+    def make_key(scope: str, url: str, params: Optional[Dict[str, Any]], paths: Iterable[str] = ()) -> str:
+        return json.dumps([scope, url, params or {}, sorted(paths)], sort_keys=True, default=str)
+    
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def store(self, key: str, scope: str, headers: Any, payload: Any, next_url: Optional[str]) -> None:
+        """Remember a 200 response if it carried validators."""
+        etag = headers.get("etag")
+        last_modified = headers.get("last-modified")
+        if key in self._entries:
+            self.stats["modified"] += 1
+        if not etag and not last_modified:
+            self._entries.pop(key, None)
+            return
+        
+        self._entries[key] = CachedResponse(scope, etag, last_modified, payload, next_url)
+        self._entries.move_to_end(key)
+        self.stats["stored"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+    
+    def record_not_modified(self) -> None:
+        self.stats["not_modified"] += 1
+    
+    def invalidate(self, scope: Optional[str] = None) -> None:
+        """Drop cached responses of one data source (everything when scope is None)."""
+        if scope is None:
+            self._entries.clear()
+            return
+        for key in [key for key, entry in self._entries.items() if entry.scope == str(scope)]:
+            del self._entries[key]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._entries), "max_entries": self.max_entries}
+
+
+# Global conditional request cache
+conditional_cache = ConditionalRequestCache(settings.API_PROVIDER_CONDITIONAL_CACHE_SIZE)
+
+
+def _ijson_prefix(path: str) -> str:
+    if not path or path == "$":
+        return ""
+    return path[2:] if path.startswith("$.") else path
+
+
+def should_stream(headers: Any) -> bool:
+    """Parse incrementally when ijson is available and the body is large or of unknown length."""
+    if not IJSON_AVAILABLE:
+        return False
+    length = _as_int(headers.get("content-length"))
+    return length is None or length > settings.API_PROVIDER_STREAM_THRESHOLD_BYTES
+
+
+async def parse_json_stream(chunks: Any, paths: Iterable[str]) -> Any:
+    """
+    Parse a streamed JSON body, keeping only the values at `paths`.
+    
+    Returns a sparse document with the original nesting so the usual path
+    accessors work on it unchanged; the raw body is never held in memory.
+    """
+    prefixes = sorted({_ijson_prefix(path) for path in paths if path is not None}, key=len)
+    # A value is built whole, so paths below another selected path need no parser of their own
+    prefixes = [
+        prefix for prefix in prefixes
+        if prefix == "" or not any(prefix.startswith(other + ".") for other in prefixes if other and other != prefix)
+    ]
+    if "" in prefixes:
+        prefixes = [""]
+    
+    sinks = {prefix: ijson.sendable_list() for prefix in prefixes}
+    parsers = [ijson.items_coro(sinks[prefix], prefix, use_float=True) for prefix in prefixes]
+    
+    async for chunk in chunks:
+        for parser in parsers:
+            parser.send(chunk)
+    for parser in parsers:
+        parser.close()
+    
+    if "" in sinks:
+        return sinks[""][0] if sinks[""] else None
+    
+    document: Dict[str, Any] = {}
+    for prefix, values in sinks.items():
+        if not values:
+            continue
+        *parents, leaf = prefix.split(".")
+        node = document
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = values[0]
+    return document
@@ -3,13 +3,17 @@ Base Data Provider Interface
 데이터 프로바이더 인터페이스 정의
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional, Dict, Any, TYPE_CHECKING
+from typing import List, Optional, Dict, Any, Awaitable, Callable, Mapping, NamedTuple, Sequence, TYPE_CHECKING
 from datetime import datetime
 from pydantic import BaseModel
 
+from ...core.config import settings
+from ..spec_engine import coerce_spec_status
+
 if TYPE_CHECKING:
     from ..data_source_mapping import MappingService
     from ..status_normalizer import StatusNormalizer
+    from ..downsampling import DownsampleRequest
 
 class EquipmentData(BaseModel):
     """설비 데이터 모델"""
@@ -35,6 +39,297 @@ class MeasurementData(BaseModel):
     lsl: Optional[float] = None  # Lower Spec Limit
     target: Optional[float] = None
 
+MEASUREMENT_FIELDS = (
+    "id", "equipment_type", "equipment_code", "measurement_code", "measurement_desc",
+    "measurement_value", "timestamp", "spec_status", "usl", "lsl", "target"
+)
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    return None if value is None else float(value)
+
+
+def _text(value: Any) -> str:
+    return "" if value is None else str(value)
+
+
+def _timestamp(value: Any) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and value:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return datetime.now() if value is None else value
+
+
+class MeasurementRecord:
+    """
+    측정 데이터 내부 표현 (MeasurementData와 같은 필드, 슬롯 기반)
+    프로바이더 경계에서 from_row()로 한 번만 타입을 맞추고 이후에는 복사/재검증 없이 직렬화합니다.
+    """
+    
+    __slots__ = MEASUREMENT_FIELDS
+    
+    def __init__(
+        self,
+        id: int,
+        equipment_type: str,
+        equipment_code: str,
+        measurement_code: str,
+        measurement_desc: str,
+        measurement_value: float,
+        timestamp: datetime,
+        spec_status: int = 0,
+        usl: Optional[float] = None,
+        lsl: Optional[float] = None,
+        target: Optional[float] = None
+    ):
+        self.id = id
+        self.equipment_type = equipment_type
+        self.equipment_code = equipment_code
+        self.measurement_code = measurement_code
+        self.measurement_desc = measurement_desc
+        self.measurement_value = measurement_value
+        self.timestamp = timestamp
+        self.spec_status = spec_status
+        self.usl = usl
+        self.lsl = lsl
+        self.target = target
+    
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> "MeasurementRecord":
+        """
+        DB 행/API 응답 dict를 검증된 레코드로 변환
+        
+        usl/lsl/target 대신 upper_spec_limit/lower_spec_limit/target_value 컬럼명도 허용합니다.
+        
+        Raises:
+            ValueError, TypeError: 숫자/시간 필드를 변환할 수 없는 경우
+        """
+        get = row.get
+        usl = get("usl")
+        lsl = get("lsl")
+        target = get("target")
+        return cls(
+            int(get("id") or 0),
+            _text(get("equipment_type")),
+            _text(get("equipment_code")),
+            _text(get("measurement_code")),
+            _text(get("measurement_desc")),
+            float(get("measurement_value") or 0.0),
+            _timestamp(get("timestamp")),
+            coerce_spec_status(get("spec_status")),
+            _optional_float(usl if usl is not None else get("upper_spec_limit")),
+            _optional_float(lsl if lsl is not None else get("lower_spec_limit")),
+            _optional_float(target if target is not None else get("target_value"))
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in MEASUREMENT_FIELDS}
+    
+    # MeasurementData(pydantic)와 같은 방식으로 쓰던 호출부 호환
+    dict = to_dict
+    
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, MeasurementRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in MEASUREMENT_FIELDS)
+    
+    def __repr__(self) -> str:
+        return f"MeasurementRecord({self.equipment_code}/{self.measurement_code}={self.measurement_value} @ {self.timestamp})"
+
+
+# 증분 조회 워터마크 종류
+WATERMARK_TIMESTAMP = "timestamp"
+WATERMARK_ROWVERSION = "rowversion"  # MSSQL rowversion (BIGINT로 변환한 값)
+
+
+class WatermarkExpiredError(ValueError):
+    """워터마크 이후 행을 모두 읽을 수 없음 (클라이언트는 since 없이 다시 시작)"""
+
+
+class Watermark(NamedTuple):
+    """
+    증분 조회 기준점 (종류와 값)
+    
+    timestamp 워터마크의 key는 같은 시각의 행을 구분하는 보조 키(측정 데이터 id, 설비 코드)로,
+    (timestamp, key) 순서로 페이지를 넘겨 같은 시각의 행이 페이지 경계에서 빠지지 않게 합니다.
+    """
+    kind: str
+    value: Any
+    key: Optional[str] = None
+    
+    def encode(self) -> str:
+        """API로 주고받는 문자열 토큰 (예: timestamp:2025-01-01T08:00:00|1234, rowversion:2001)"""
+        value = self.value.isoformat() if isinstance(self.value, datetime) else str(self.value)
+        if self.key is not None:
+            value = f"{value}|{self.key}"
+        return f"{self.kind}:{value}"
+    
+    @classmethod
+    def decode(cls, token: str) -> "Watermark":
+        """
+        encode()로 만든 토큰 해석
+        
+        Raises:
+            ValueError: 형식이 잘못된 경우
+        """
+        kind, _, value = (token or "").partition(":")
+        if kind == WATERMARK_TIMESTAMP and value:
+            # ISO 시각에는 '|'가 없으므로 첫 '|' 이후는 모두 키
+            value, separator, key = value.partition("|")
+            return cls(kind, datetime.fromisoformat(value.replace("Z", "+00:00")), key if separator else None)
+        if kind == WATERMARK_ROWVERSION:
+            return cls(kind, int(value))
+        raise ValueError(f"Invalid watermark: {token!r}")
+    
+    def timestamp_value(self) -> Optional[datetime]:
+        return self.value if self.kind == WATERMARK_TIMESTAMP else None
+    
+    def typed_key(self, key_type: type = str) -> Any:
+        """토큰의 문자열 키를 키 컬럼 타입으로 변환 (예: 측정 데이터 id는 int)"""
+        return key_type(self.key) if self.key is not None else None
+
+
+def _epoch(value: Any) -> float:
+    return _timestamp(value).timestamp() if value is not None else float("-inf")
+
+
+def _position(item: Any, field: str, key_field: Optional[str]) -> tuple:
+    """(timestamp, key) 정렬 키 (키가 없는 행은 같은 시각의 키 있는 행보다 앞)"""
+    key = getattr(item, key_field, None) if key_field else None
+    return (_epoch(getattr(item, field)), key is not None, key)
+
+
+class ChangeSet:
+    """
+    증분 조회 결과
+    
+    items는 since 이후 추가/변경된 행(오래된 순), watermark는 다음 조회에 넘길 기준점입니다.
+    incremental이 False이면 데이터 소스가 since를 쓰지 못해 전체를 읽은 뒤 걸러낸 결과이고,
+    has_more가 True이면 watermark 이후 아직 전달하지 않은 행이 남아 있습니다.
+    """
+    
+    __slots__ = ("items", "watermark", "incremental", "has_more")
+    
+    def __init__(
+        self,
+        items: List[Any],
+        watermark: Optional[Watermark],
+        incremental: bool = True,
+        has_more: bool = False
+    ):
+        self.items = items
+        self.watermark = watermark
+        self.incremental = incremental
+        self.has_more = has_more
+    
+    @classmethod
+    def from_items(
+        cls,
+        items: List[Any],
+        since: Optional[Watermark],
+        field: str,
+        versions: Optional[Sequence[int]] = None,
+        incremental: bool = True,
+        key_field: Optional[str] = None
+    ) -> "ChangeSet":
+        """
+        결과 행으로 다음 워터마크 계산
+        
+        Args:
+            field: timestamp 워터마크로 쓸 속성 (timestamp, last_run_time)
+            versions: items와 같은 순서의 rowversion 값 (있으면 rowversion 워터마크)
+            key_field: 같은 시각의 행을 구분하는 속성 (있으면 (timestamp, key) 워터마크)
+        """
+        if versions:
+            return cls(items, Watermark(WATERMARK_ROWVERSION, max(versions)), incremental)
+        if not items:
+            return cls(items, since, incremental)
+        newest = max(items, key=lambda item: _position(item, field, key_field))
+        newest_time = getattr(newest, field)
+        if newest_time is None:
+            return cls(items, since, incremental)
+        key = getattr(newest, key_field, None) if key_field else None
+        watermark = Watermark(WATERMARK_TIMESTAMP, newest_time, str(key) if key is not None else None)
+        if since is not None and since.kind == WATERMARK_TIMESTAMP and not cls._is_after(newest, since, field, key_field):
+            return cls(items, since, incremental)
+        return cls(items, watermark, incremental)
+    
+    @staticmethod
+    def _is_after(item: Any, since: Watermark, field: str, key_field: Optional[str]) -> bool:
+        """행이 (timestamp, key) 워터마크보다 뒤인지 (워터마크에 키가 없으면 timestamp만 비교)"""
+        item_epoch, since_epoch = _epoch(getattr(item, field)), _epoch(since.value)
+        if item_epoch != since_epoch or since.key is None or not key_field:
+            return item_epoch > since_epoch
+        key = getattr(item, key_field, None)
+        return key is not None and key > since.typed_key(type(key))
+    
+    @classmethod
+    async def fetch_overlapping(
+        cls,
+        fetch: Callable[[int], Awaitable[List[Any]]],
+        since: Optional[Watermark],
+        field: str,
+        key_field: str,
+        limit: int
+    ) -> "ChangeSet":
+        """
+        {{since}}에 워터마크 시각만 바인드하는 커스텀 쿼리용 페이지 조회
+        
+        쿼리는 timestamp >= since로 걸고 timestamp, key 순으로 정렬해야 합니다. 이미 전달한 같은 시각의
+        행을 제외하고, 페이지가 그런 행으로 채워지면 그만큼 더 읽어 (timestamp, key) 순서로 이어갑니다.
+        
+        Args:
+            fetch: 조회 행 수를 받아 오래된 순 결과를 반환하는 함수
+        """
+        fetch_limit = limit
+        while True:
+            items = await fetch(fetch_limit)
+            fresh = items
+            if since is not None and since.kind == WATERMARK_TIMESTAMP:
+                fresh = [item for item in items if cls._is_after(item, since, field, key_field)]
+            if len(fresh) >= limit or len(items) < fetch_limit:
+                break
+            # 전달한 행 수만큼 더 읽음 (새 행이 하나도 없으면 같은 시각 행이 더 남았을 수 있으므로 두 배)
+            fetch_limit = limit + len(items) - len(fresh) if fresh else fetch_limit * 2
+        fresh = sorted(fresh, key=lambda item: _position(item, field, key_field))
+        changes = cls.from_items(fresh[:limit], since, field, key_field=key_field)
+        changes.has_more = len(fresh) > limit or len(items) >= fetch_limit
+        return changes
+    
+    @classmethod
+    def filter_since(
+        cls,
+        items: List[Any],
+        since: Optional[Watermark],
+        field: str,
+        key_field: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> "ChangeSet":
+        """
+        since를 지원하지 않는 소스용: 읽어 온 행에서 워터마크 이후 행만 남겨 오래된 순으로 limit개 반환
+        
+        items는 워터마크까지 거슬러 올라간 구간이어야 합니다 (IDataProvider.get_measurement_changes 참고).
+        """
+        if since is not None and since.kind == WATERMARK_TIMESTAMP:
+            items = [item for item in items if cls._is_after(item, since, field, key_field)]
+        items = sorted(items, key=lambda item: _position(item, field, key_field))
+        has_more = limit is not None and len(items) > limit
+        if has_more:
+            items = items[:limit]
+        changes = cls.from_items(items, since, field, incremental=False, key_field=key_field)
+        changes.has_more = has_more
+        return changes
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "watermark": self.watermark.encode() if self.watermark else None,
+            "incremental": self.incremental,
+            "has_more": self.has_more
+        }
+
+
 class EquipmentStatusResponse(BaseModel):
     """설비 상태 응답 모델"""
     items: List[EquipmentData]
@@ -84,6 +379,29 @@ class IDataProvider(ABC):
             equipment_data["status"] = normalized_status
         return equipment_data
     
+    async def _normalize_equipment_statuses(self, equipment_items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Normalize the status of every equipment row in one pass
+        
+        Args:
+            equipment_items: Equipment data dictionaries (modified in place)
+        
+        Returns:
+            List[Dict[str, Any]]: The same list with normalized statuses
+        """
+        if not self.status_normalizer or not equipment_items:
+            return equipment_items
+        
+        await self.status_normalizer.prepare(self.workspace_id)
+        statuses = self.status_normalizer.normalize_many(
+            (item.get("status") for item in equipment_items),
+            self.workspace_id
+        )
+        for item, normalized_status in zip(equipment_items, statuses):
+            if "status" in item:
+                item["status"] = normalized_status
+        return equipment_items
+    
     @abstractmethod
     async def get_equipment_status(
         self,
@@ -112,7 +430,7 @@ class IDataProvider(ABC):
         equipment_code: Optional[str] = None,
         equipment_type: Optional[str] = None,
         limit: int = 1000
-    ) -> List[MeasurementData]:
+    ) -> List[MeasurementRecord]:
         """
         측정 데이터 조회
         
@@ -122,7 +440,7 @@ class IDataProvider(ABC):
             limit: 조회 개수
             
         Returns:
-            List[MeasurementData]: 측정 데이터 목록
+            List[MeasurementRecord]: 측정 데이터 목록
         """
         pass
     
@@ -130,7 +448,7 @@ class IDataProvider(ABC):
     async def get_latest_measurement(
         self,
         equipment_code: str
-    ) -> Optional[MeasurementData]:
+    ) -> Optional[MeasurementRecord]:
         """
         특정 설비의 최신 측정 데이터 조회
         
@@ -138,10 +456,134 @@ class IDataProvider(ABC):
             equipment_code: 설비 코드
             
         Returns:
-            Optional[MeasurementData]: 최신 측정 데이터
+            Optional[MeasurementRecord]: 최신 측정 데이터
         """
         pass
     
+    async def get_measurement_changes(
+        self,
+        since: Optional[Watermark] = None,
+        equipment_code: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        limit: int = 1000
+    ) -> ChangeSet:
+        """
+        since 워터마크 이후 추가된 측정 데이터 조회
+        
+        기본 구현은 get_measurement_data()(최신 limit개)를 걸러내며(incremental=False), 읽은 구간이
+        워터마크까지 닿지 않으면 조회 행 수를 늘려 다시 읽습니다. 쿼리에서 직접 범위를 거는
+        프로바이더가 재정의합니다. 행은 오래된 순이고 has_more이면 반환된 워터마크로 다시 조회합니다.
+        
+        Args:
+            since: 이전 조회에서 받은 워터마크, None이면 최신 limit개부터
+        
+        Returns:
+            ChangeSet: 새 행과 다음 워터마크
+        
+        Raises:
+            WatermarkExpiredError: CHANGES_FALLBACK_MAX_ROWS개를 읽어도 워터마크까지 닿지 않는 경우
+        """
+        fetch_limit = limit
+        while True:
+            records = await self.get_measurement_data(
+                equipment_code=equipment_code, equipment_type=equipment_type, limit=fetch_limit
+            )
+            if since is None or len(records) < fetch_limit or any(
+                not ChangeSet._is_after(record, since, "timestamp", "id") for record in records
+            ):
+                return ChangeSet.filter_since(records, since, "timestamp", "id", limit)
+            # 최신 fetch_limit개가 모두 워터마크 이후: 그 사이 행이 더 있을 수 있음
+            if fetch_limit >= settings.CHANGES_FALLBACK_MAX_ROWS:
+                raise WatermarkExpiredError(
+                    f"More than {fetch_limit} measurements were added after the watermark; restart without since"
+                )
+            fetch_limit = min(fetch_limit * 4, settings.CHANGES_FALLBACK_MAX_ROWS)
+    
+    async def get_equipment_status_changes(
+        self,
+        since: Optional[Watermark] = None,
+        equipment_type: Optional[str] = None,
+        limit: int = 1000
+    ) -> ChangeSet:
+        """
+        since 워터마크 이후 상태가 바뀐 설비 조회
+        
+        기본 구현은 설비 목록 전체를 페이지 단위로 읽어 last_run_time 기준으로 걸러냅니다.
+        
+        Returns:
+            ChangeSet: EquipmentData 목록과 다음 워터마크
+        """
+        items: Dict[str, EquipmentData] = {}
+        while len(items) < settings.CHANGES_FALLBACK_MAX_ROWS:
+            response = await self.get_equipment_status(equipment_type=equipment_type, limit=limit, offset=len(items))
+            page = [item for item in response.items if item.equipment_code not in items]
+            items.update((item.equipment_code, item) for item in page)
+            # offset을 무시하는 커스텀 쿼리는 같은 페이지를 반복하므로 새 설비가 없으면 중단
+            if not response.has_more or not page:
+                break
+        return ChangeSet.filter_since(list(items.values()), since, "last_run_time", "equipment_code", limit)
+    
+    async def get_latest_measurements_since(
+        self,
+        since: Optional[datetime] = None
+    ) -> Optional[List[MeasurementRecord]]:
+        """
+        (설비, 측정 코드)별 최신 측정 데이터 조회 (최신값 캐시의 증분 갱신용)
+        
+        Args:
+            since: 이 시각 이후(포함) 행만 대상, None이면 전체
+        
+        Returns:
+            Optional[List[MeasurementRecord]]: 조합별 최신 행, 지원하지 않으면 None (설비별 get_latest_measurement 사용)
+        """
+        return None
+    
+    def start_change_feed(self, data_source_id: str) -> bool:
+        """
+        변경 피드(LISTEN/NOTIFY 등 push) 리스너 시작
+        
+        Returns:
+            bool: 리스너가 동작 중이면 True, 지원하지 않거나 비활성이면 False (폴링 유지)
+        """
+        return False
+
+    async def get_bucketed_measurements(
+        self,
+        request: 'DownsampleRequest',
+        equipment_code: Optional[str] = None,
+        equipment_codes: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        measurement_code: Optional[str] = None
+    ) -> Optional[List[MeasurementRecord]]:
+        """
+        시간 버킷 집계(minmax/avg)를 데이터 소스 쿼리에서 수행
+        
+        Args:
+            request: 다운샘플링 요청 (방식, 목표 포인트 수, 조회 구간)
+        
+        Returns:
+            Optional[List[MeasurementRecord]]: 버킷 집계 결과, 지원하지 않으면 None (Python에서 다운샘플링)
+        """
+        return None
+    
+    async def get_measurements_in_range(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        equipment_code: Optional[str] = None,
+        equipment_codes: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        measurement_code: Optional[str] = None,
+        limit: int = 1000
+    ) -> Optional[List[MeasurementRecord]]:
+        """
+        조회 구간 안의 원본 측정 데이터 (Python 다운샘플링용, 최신순 최대 limit행)
+        
+        Returns:
+            Optional[List[MeasurementRecord]]: 구간 조회 결과, 데이터 소스에서 구간을 걸 수 없으면 None
+        """
+        return None
+    
     @abstractmethod
     async def update_equipment_status(
         self,
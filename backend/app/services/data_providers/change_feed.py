@@ -0,0 +1,348 @@
+"""
+LISTEN/NOTIFY change feed for PostgreSQL data sources.
+
+Triggers on the equipment status and measurement tables publish JSON payloads
+on CHANGE_FEED_CHANNEL (see migrations/add_change_feed_triggers.sql). One
+dedicated asyncpg connection per data source listens on it and pushes every
+change into the latest measurement cache and into subscriber queues (served as
+Server-Sent Events), so writes made through update_equipment_status or by
+external writers reach readers without polling. While a listener is down the
+latest measurement cache goes back to watermark polling, and subscribers get a
+``resync`` event telling them to catch up through the watermark change APIs.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.measurement_partitions import MEASUREMENT_TABLE
+from .base import MeasurementRecord
+from .connection_pool import async_database_url
+from .latest_cache import latest_measurement_cache
+
+logger = logging.getLogger(__name__)
+
+CHANGE_FEED_CHANNEL = "maxlab_changes"
+EQUIPMENT_STATUS_TABLE = "personal_test_equipment_status"
+
+EVENT_KINDS = {
+    EQUIPMENT_STATUS_TABLE: "equipment_status",
+    MEASUREMENT_TABLE: "measurement",
+}
+
+# Same statements as migrations/add_change_feed_triggers.sql
+CHANGE_FEED_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION notify_equipment_status_change()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM pg_notify(
+            '{CHANGE_FEED_CHANNEL}',
+            json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'row', row_to_json(NEW))::text
+        );
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION notify_measurement_change()
+    RETURNS TRIGGER AS $$
+    DECLARE
+        latest RECORD;
+    BEGIN
+        FOR latest IN
+            SELECT DISTINCT ON (equipment_code, measurement_code) *
+            FROM new_rows
+            ORDER BY equipment_code, measurement_code, "timestamp" DESC
+        LOOP
+            PERFORM pg_notify(
+                '{CHANGE_FEED_CHANNEL}',
+                json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'row', row_to_json(latest))::text
+            );
+        END LOOP;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"DROP TRIGGER IF EXISTS equipment_status_change_notify ON {EQUIPMENT_STATUS_TABLE}",
+    f"""
+    CREATE TRIGGER equipment_status_change_notify
+    AFTER INSERT OR UPDATE ON {EQUIPMENT_STATUS_TABLE}
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_equipment_status_change()
+    """,
+    f"DROP TRIGGER IF EXISTS measurement_insert_notify ON {MEASUREMENT_TABLE}",
+    f"""
+    CREATE TRIGGER measurement_insert_notify
+    AFTER INSERT ON {MEASUREMENT_TABLE}
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_measurement_change()
+    """,
+    f"DROP TRIGGER IF EXISTS measurement_update_notify ON {MEASUREMENT_TABLE}",
+    f"""
+    CREATE TRIGGER measurement_update_notify
+    AFTER UPDATE ON {MEASUREMENT_TABLE}
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_measurement_change()
+    """,
+]
+
+
+async def install_change_triggers(session: AsyncSession) -> bool:
+    """Create or replace the notify functions and triggers; False when the tables do not exist."""
+    result = await session.execute(text(
+        f"SELECT to_regclass('{EQUIPMENT_STATUS_TABLE}') IS NOT NULL AND to_regclass('{MEASUREMENT_TABLE}') IS NOT NULL"
+    ))
+    if not result.scalar():
+        return False
+    for statement in CHANGE_FEED_DDL:
+        await session.execute(text(statement))
+    await session.commit()
+    return True
+
+
+def listener_dsn(connection_string: str) -> str:
+    """asyncpg.connect() wants a plain postgresql:// URL, without the SQLAlchemy driver suffix."""
+    return async_database_url("postgresql", connection_string).replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+@dataclass
+class ChangeEvent:
+    """One change pushed by the database (kind: equipment_status / measurement / resync)."""
+    kind: str
+    op: str = ""
+    row: Dict[str, Any] = field(default_factory=dict)
+    
+    def to_measurement(self) -> MeasurementRecord:
+        return MeasurementRecord.from_row(self.row)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "op": self.op, "data": self.row}
+
+
+RESYNC = ChangeEvent("resync")
+
+
+def parse_notification(payload: str) -> Optional[ChangeEvent]:
+    """Decode a trigger payload; None for malformed payloads or unknown tables."""
+    try:
+        data = json.loads(payload)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    kind = EVENT_KINDS.get(data.get("table"))
+    row = data.get("row")
+    if kind is None or not isinstance(row, dict):
+        return None
+    return ChangeEvent(kind, str(data.get("op") or ""), row)
+
+
+@dataclass
+class _SourceFeed:
+    data_source_id: str
+    dsn: str
+    subscribers: Set[asyncio.Queue] = field(default_factory=set)
+    # Source reads the measurement table the triggers are on, so pushed rows can feed the latest cache
+    push_measurements: bool = True
+    # push_measurements and the measurement trigger exists in the listened database
+    live_measurements: bool = False
+    connected: bool = False
+    last_used: float = field(default_factory=time.monotonic)
+    task: Optional[asyncio.Task] = None
+    
+    def idle(self, now: float) -> bool:
+        return not self.subscribers and now - self.last_used > settings.LATEST_MEASUREMENT_IDLE_SECONDS
+
+
+class ChangeFeedManager:
+    """Dedicated LISTEN connection per PostgreSQL data source, started on first use."""
+    
+    def __init__(self):
+        self._feeds: Dict[str, _SourceFeed] = {}
+        self.stats = {
+            "events": 0,
+            "malformed": 0,
+            "dropped": 0,
+            "reconnects": 0
+        }
+    
+    def ensure(self, data_source_id: str, connection_string: str, push_measurements: bool = True) -> bool:
+        """
+        Start (or keep alive) the listener for a data source.
+        
+        Args:
+            data_source_id: Resolved data source ID (one listener each)
+            connection_string: Source connection string (SQLAlchemy or plain URL)
+            push_measurements: Whether pushed measurement rows may update the latest measurement cache
+        
+        Returns False when the change feed is disabled in settings.
+        """
+        if not settings.PG_CHANGE_FEED_ENABLED:
+            return False
+        data_source_id = str(data_source_id)
+        dsn = listener_dsn(connection_string)
+        feed = self._feeds.get(data_source_id)
+        subscribers: Set[asyncio.Queue] = set()
+        if feed is not None and (feed.dsn != dsn or feed.task is None or feed.task.done()):
+            # Connection string changed or the listener exited: start over, keeping the subscribers
+            subscribers = feed.subscribers
+            self._discard(feed)
+            feed = None
+        if feed is None:
+            feed = self._feeds[data_source_id] = _SourceFeed(data_source_id, dsn, subscribers)
+            feed.task = asyncio.create_task(self._listen(feed))
+        if feed.push_measurements != push_measurements:
+            feed.push_measurements = push_measurements
+            feed.live_measurements = False
+            latest_measurement_cache.set_live(data_source_id, False)
+        feed.last_used = time.monotonic()
+        return True
+    
+    def is_live(self, data_source_id: str) -> bool:
+        feed = self._feeds.get(str(data_source_id))
+        return feed is not None and feed.connected
+    
+    def subscribe(self, data_source_id: str) -> asyncio.Queue:
+        """Queue receiving ChangeEvents for the data source (call ensure() first)."""
+        feed = self._feeds[str(data_source_id)]
+        queue: asyncio.Queue = asyncio.Queue(maxsize=settings.PG_CHANGE_FEED_QUEUE_SIZE)
+        feed.subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, data_source_id: str, queue: asyncio.Queue) -> None:
+        feed = self._feeds.get(str(data_source_id))
+        if feed is not None:
+            feed.subscribers.discard(queue)
+            feed.last_used = time.monotonic()
+    
+    def _publish(self, feed: _SourceFeed, event: ChangeEvent) -> None:
+        for queue in list(feed.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and let it catch up through the change APIs
+                self.stats["dropped"] += queue.qsize()
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC)
+    
+    def dispatch(self, feed: _SourceFeed, payload: str) -> Optional[ChangeEvent]:
+        """Apply one notification to the caches and subscribers."""
+        event = parse_notification(payload)
+        if event is None:
+            self.stats["malformed"] += 1
+            logger.debug(f"Ignoring change feed payload for {feed.data_source_id}: {payload[:200]}")
+            return None
+        self.stats["events"] += 1
+        if event.kind == "measurement" and feed.live_measurements:
+            try:
+                latest_measurement_cache.apply(feed.data_source_id, [event.to_measurement()])
+            except (TypeError, ValueError) as e:
+                logger.debug(f"Cannot apply pushed measurement for {feed.data_source_id}: {e}")
+        self._publish(feed, event)
+        return event
+    
+    def _set_connected(self, feed: _SourceFeed, connected: bool) -> None:
+        feed.connected = connected
+        if self._feeds.get(feed.data_source_id, feed) is not feed:
+            return  # replaced by a listener for a new connection string
+        # Without the measurement trigger the latest cache has to keep polling
+        latest_measurement_cache.set_live(feed.data_source_id, connected and feed.live_measurements)
+        if connected:
+            # Changes made while the listener was down are only reachable through the watermark APIs
+            self._publish(feed, RESYNC)
+    
+    async def _listen(self, feed: _SourceFeed):
+        import asyncpg
+        
+        backoff = 1.0
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(feed.dsn, timeout=10)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _connection: lost.set())
+                await connection.add_listener(
+                    CHANGE_FEED_CHANNEL,
+                    lambda _connection, _pid, _channel, payload: self.dispatch(feed, payload)
+                )
+                has_trigger = await connection.fetchval(
+                    "SELECT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'measurement_insert_notify')"
+                )
+                if not has_trigger:
+                    logger.warning(
+                        f"Data source {feed.data_source_id} has no change feed triggers "
+                        f"(migrations/add_change_feed_triggers.sql); latest values keep polling"
+                    )
+                feed.live_measurements = feed.push_measurements and bool(has_trigger)
+                self._set_connected(feed, True)
+                backoff = 1.0
+                logger.info(f"Change feed listening for data source {feed.data_source_id}")
+                
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=settings.PG_CHANGE_FEED_KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        if feed.idle(time.monotonic()):
+                            logger.info(f"Change feed for data source {feed.data_source_id} idle, closing")
+                            self._feeds.pop(feed.data_source_id, None)
+                            return
+                logger.warning(f"Change feed connection lost for data source {feed.data_source_id}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Change feed for data source {feed.data_source_id} failed: {e}")
+            finally:
+                if feed.connected:
+                    self._set_connected(feed, False)
+                if connection is not None and not connection.is_closed():
+                    try:
+                        await connection.close(timeout=5)
+                    except Exception:
+                        connection.terminate()
+            
+            if feed.idle(time.monotonic()):
+                self._feeds.pop(feed.data_source_id, None)
+                return
+            self.stats["reconnects"] += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+    
+    def _discard(self, feed: _SourceFeed) -> None:
+        if feed.task is not None and not feed.task.done():
+            feed.task.cancel()
+        if self._feeds.get(feed.data_source_id) is feed:
+            self._feeds.pop(feed.data_source_id, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "sources": len(self._feeds),
+            "connected": sum(1 for feed in self._feeds.values() if feed.connected),
+            "subscribers": sum(len(feed.subscribers) for feed in self._feeds.values())
+        }
+    
+    async def stop(self):
+        """Close every listener connection (application shutdown)."""
+        feeds = list(self._feeds.values())
+        self._feeds.clear()
+        for feed in feeds:
+            if feed.task is not None and not feed.task.done():
+                feed.task.cancel()
+                try:
+                    await feed.task
+                except asyncio.CancelledError:
+                    pass
+
+
+# Global change feed listeners
+change_feed_manager = ChangeFeedManager()
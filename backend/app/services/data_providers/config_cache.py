@@ -0,0 +1,246 @@
+"""
+Process-wide cache of decrypted data source configurations.
+
+DynamicProvider instances are created per request; resolving the workspace
+slug, reading data_source_configs and Fernet-decrypting secrets on every
+request is pure overhead. Entries are invalidated explicitly by the data
+source CRUD endpoints and revalidated against ``updated_at`` at most every
+DATA_SOURCE_CONFIG_REVALIDATE_SECONDS so changes made by other workers are
+picked up without a round trip on every hot request.
+"""
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import decrypt_connection_string
+
+logger = logging.getLogger(__name__)
+
+# Slug -> UUID mappings practically never change
+SLUG_CACHE_TTL_SECONDS = 600
+
+_CONFIG_COLUMNS = """
+    id as data_source_id,
+    workspace_id,
+    source_type,
+    api_url,
+    mssql_connection_string,
+    api_key,
+    api_headers,
+    is_active,
+    custom_queries,
+    updated_at
+"""
+
+_CONFIG_BY_ID = text(f"""
+    SELECT {_CONFIG_COLUMNS}
+    FROM data_source_configs
+    WHERE id = :data_source_id AND is_active = true
+    LIMIT 1
+""")
+
+_CONFIG_BY_WORKSPACE = text(f"""
+    SELECT {_CONFIG_COLUMNS}
+    FROM data_source_configs
+    WHERE workspace_id = :workspace_id AND is_active = true
+    ORDER BY created_at DESC
+    LIMIT 1
+""")
+
+_VERSION_BY_ID = text("""
+    SELECT id, updated_at
+    FROM data_source_configs
+    WHERE id = :data_source_id AND is_active = true
+""")
+
+_VERSION_BY_WORKSPACE = text("""
+    SELECT id, updated_at
+    FROM data_source_configs
+    WHERE workspace_id = :workspace_id AND is_active = true
+    ORDER BY created_at DESC
+    LIMIT 1
+""")
+
+_WORKSPACE_BY_SLUG = text("""
+    SELECT id
+    FROM workspaces
+    WHERE slug = :workspace_id
+       OR name = :workspace_id
+       OR slug = :workspace_id_no_underscore
+    LIMIT 1
+""")
+
+
+@dataclass
+class _CacheEntry:
+    config: Dict[str, Any]
+    version: Tuple[str, Any]
+    checked_at: float
+
+
+def _is_valid_uuid(value: str) -> bool:
+    try:
+        uuid.UUID(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def build_config(row: Any) -> Dict[str, Any]:
+    """Turn a data_source_configs row into the decrypted provider config."""
+    config = dict(row._mapping)
+    config['data_source_id'] = str(config['data_source_id'])
+    config['workspace_id'] = str(config['workspace_id'])
+    # Convert source_type to lowercase for internal use
+    if config.get('source_type'):
+        config['source_type'] = config['source_type'].lower()
+    
+    # Decrypt sensitive data (if decryption fails the original value is used as plain text)
+    if config.get('api_url'):
+        config['connection_string'] = decrypt_connection_string(config['api_url'])
+    elif config.get('mssql_connection_string'):
+        config['connection_string'] = decrypt_connection_string(config['mssql_connection_string'])
+    else:
+        config['connection_string'] = None
+    
+    if config.get('api_key'):
+        config['api_key'] = decrypt_connection_string(config['api_key'])
+    
+    headers = config.get('api_headers')
+    if isinstance(headers, str):
+        headers = json.loads(headers) if headers else None
+    config['headers'] = headers or None
+    
+    # Custom queries are already a dict from JSONB column
+    if not isinstance(config.get('custom_queries'), dict):
+        config['custom_queries'] = None
+    
+    return config
+
+
+class DataSourceConfigCache:
+    """Decrypted configs keyed by data_source_id or resolved workspace UUID."""
+    
+    def __init__(self):
+        self._configs: Dict[str, _CacheEntry] = {}
+        self._workspace_ids: Dict[str, Tuple[str, float]] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "invalidations": 0,
+            "slug_hits": 0,
+            "slug_misses": 0
+        }
+    
+    async def resolve_workspace_id(self, db: AsyncSession, workspace_id: Any) -> str:
+        """Resolve a workspace slug/name to its UUID (memoised)."""
+        workspace_id_str = str(workspace_id)
+        if _is_valid_uuid(workspace_id_str):
+            return workspace_id_str
+        
+        cached = self._workspace_ids.get(workspace_id_str)
+        if cached and time.monotonic() - cached[1] < SLUG_CACHE_TTL_SECONDS:
+            self.stats["slug_hits"] += 1
+            return cached[0]
+        
+        self.stats["slug_misses"] += 1
+        logger.info(f"Workspace ID '{workspace_id_str}' is not a UUID, looking up workspace...")
+        # Handle cases like 'personal_test' vs 'personaltest'
+        result = await db.execute(_WORKSPACE_BY_SLUG, {
+            "workspace_id": workspace_id_str,
+            "workspace_id_no_underscore": workspace_id_str.replace('_', '')
+        })
+        row = result.fetchone()
+        if not row:
+            logger.warning(f"No workspace found for '{workspace_id_str}'")
+            return workspace_id_str  # Fallback to original
+        
+        workspace_uuid = str(row.id)
+        self._workspace_ids[workspace_id_str] = (workspace_uuid, time.monotonic())
+        logger.info(f"Found workspace UUID: {workspace_uuid} for '{workspace_id_str}'")
+        return workspace_uuid
+    
+    async def get_config(
+        self,
+        db: AsyncSession,
+        workspace_id: Any,
+        data_source_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Get the decrypted config for a specific data source, or the workspace default.
+        
+        Raises:
+            ValueError: if no active configuration exists
+        """
+        if data_source_id:
+            key = f"id:{data_source_id}"
+            params = {"data_source_id": str(data_source_id)}
+            version_query, config_query = _VERSION_BY_ID, _CONFIG_BY_ID
+        else:
+            workspace_uuid = await self.resolve_workspace_id(db, workspace_id)
+            key = f"ws:{workspace_uuid}"
+            params = {"workspace_id": workspace_uuid}
+            version_query, config_query = _VERSION_BY_WORKSPACE, _CONFIG_BY_WORKSPACE
+        
+        entry = self._configs.get(key)
+        if entry is not None:
+            if time.monotonic() - entry.checked_at < settings.DATA_SOURCE_CONFIG_REVALIDATE_SECONDS:
+                self.stats["hits"] += 1
+                return dict(entry.config)
+            
+            # Cheap version check instead of reloading and decrypting
+            self.stats["revalidations"] += 1
+            result = await db.execute(version_query, params)
+            row = result.fetchone()
+            if row is not None and (str(row.id), row.updated_at) == entry.version:
+                entry.checked_at = time.monotonic()
+                self.stats["hits"] += 1
+                return dict(entry.config)
+            self._configs.pop(key, None)
+        
+        self.stats["misses"] += 1
+        result = await db.execute(config_query, params)
+        row = result.fetchone()
+        if not row:
+            if data_source_id:
+                raise ValueError(f"Data source {data_source_id} not found or inactive")
+            raise ValueError(f"No active data source configuration found for workspace {workspace_id}")
+        
+        config = build_config(row)
+        self._configs[key] = _CacheEntry(
+            config=config,
+            version=(config['data_source_id'], config['updated_at']),
+            checked_at=time.monotonic()
+        )
+        return dict(config)
+    
+    def invalidate(self, data_source_id: Optional[Any] = None, workspace_id: Optional[Any] = None):
+        """Drop cached configs for a data source and/or every entry of a workspace."""
+        data_source_id = str(data_source_id) if data_source_id else None
+        workspace_id = str(workspace_id) if workspace_id else None
+        for key, entry in list(self._configs.items()):
+            if (data_source_id and entry.config['data_source_id'] == data_source_id) or \
+                    (workspace_id and entry.config['workspace_id'] == workspace_id):
+                del self._configs[key]
+        if workspace_id:
+            self._configs.pop(f"ws:{workspace_id}", None)
+        self.stats["invalidations"] += 1
+    
+    def clear(self):
+        self._configs.clear()
+        self._workspace_ids.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._configs), "workspace_slugs": len(self._workspace_ids)}
+
+
+# Global config cache instance
+data_source_config_cache = DataSourceConfigCache()
@@ -1,35 +1,121 @@
 """
 Connection pool manager for data providers.
-Manages database connections per workspace/data source.
+Manages database connections per data source (SQLAlchemy engines and aioodbc pools)
+under a global connection budget.
 """
-from typing import Dict, Optional, Any
-from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from collections import OrderedDict
+from datetime import datetime
 import asyncio
+import hashlib
 import logging
 from contextlib import asynccontextmanager
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlalchemy.pool import NullPool, QueuePool
 
+from ...core.config import settings
+from ...core.sql_instrumentation import sql_instrumentation, instrumented_pool_class
+
 logger = logging.getLogger(__name__)
 
+# Engine pool sizes per source type: (pool_size, max_overflow)
+ENGINE_POOL_SIZES = {
+    "postgresql": (5, 5),
+    "mssql": (3, 2),
+}
+
+
+class PoolBudgetExceededError(RuntimeError):
+    """Raised when a new pool would exceed the global connection budget and nothing idle can be evicted."""
+
+
+def async_database_url(source_type: str, connection_string: str) -> str:
+    """Make sure SQLAlchemy gets an asyncio driver (plain postgresql:// URLs default to psycopg2)."""
+    if source_type != "postgresql":
+        return connection_string
+    for prefix in ("postgresql://", "postgres://"):
+        if connection_string.startswith(prefix):
+            return "postgresql+asyncpg://" + connection_string[len(prefix):]
+    if "://" not in connection_string:
+        return "postgresql+asyncpg://" + connection_string
+    return connection_string
+
+
+def connection_fingerprint(connection_string: str) -> str:
+    """Short stable hash of a connection string (pool key component, never logged in clear)."""
+    return hashlib.sha256(connection_string.encode()).hexdigest()[:16]
+
 
 class ConnectionInfo:
     """Information about a pooled connection."""
-    def __init__(self, engine: AsyncEngine, source_type: str, connection_string: str):
-        self.engine = engine
+    def __init__(
+        self,
+        pool_key: str,
+        data_source_id: str,
+        source_type: str,
+        capacity: int,
+        engine: Optional[AsyncEngine] = None,
+        odbc_pool: Any = None
+    ):
+        self.pool_key = pool_key
+        self.data_source_id = data_source_id
         self.source_type = source_type
-        self.connection_string = connection_string
+        self.capacity = capacity
+        self.engine = engine
+        self.odbc_pool = odbc_pool
         self.created_at = datetime.now()
         self.last_used = datetime.now()
         self.usage_count = 0
-        self.lock = asyncio.Lock()
+        self.checkouts = 0
+        self.checkout_wait_ms_total = 0.0
+        self.checkout_wait_ms_max = 0.0
+    
+    def touch(self):
+        self.last_used = datetime.now()
+        self.usage_count += 1
+    
+    def record_checkout(self, wait_ms: float):
+        """Record how long a connection checkout waited."""
+        self.checkouts += 1
+        self.checkout_wait_ms_total += wait_ms
+        if wait_ms > self.checkout_wait_ms_max:
+            self.checkout_wait_ms_max = wait_ms
+    
+    def in_use(self) -> int:
+        if self.odbc_pool is not None:
+            return self.odbc_pool.size - self.odbc_pool.freesize
+        pool = self.engine.pool
+        return pool.checkedout() if isinstance(pool, QueuePool) else 0
+    
+    def overflow(self) -> int:
+        if self.engine is not None and isinstance(self.engine.pool, QueuePool):
+            return max(self.engine.pool.overflow(), 0)
+        return 0
+    
+    def pool_size(self) -> int:
+        if self.odbc_pool is not None:
+            return self.odbc_pool.size
+        pool = self.engine.pool
+        return pool.size() if isinstance(pool, QueuePool) else 0
+    
+    def idle_seconds(self) -> float:
+        return (datetime.now() - self.last_used).total_seconds()
+    
+    async def close(self):
+        if self.engine is not None:
+            await self.engine.dispose()
+        if self.odbc_pool is not None:
+            self.odbc_pool.close()
+            await self.odbc_pool.wait_closed()
 
 
 class ConnectionPoolManager:
     """
     Manages connection pools for different data sources.
-    Implements connection pooling, lifecycle management, and cleanup.
+    Pools are keyed by data source id and connection string hash, so sources
+    never evict each other on lookup; the total connection capacity is capped
+    and the least recently used idle pool is evicted to make room.
     """
     
     # Class-level singleton instance
@@ -43,81 +129,209 @@ class ConnectionPoolManager:
     
     def __init__(self):
         if not hasattr(self, '_initialized'):
-            self._pools: Dict[str, ConnectionInfo] = {}
-            self._max_pool_size = 10
+            self._pools: "OrderedDict[str, ConnectionInfo]" = OrderedDict()
+            # pool_key -> creation in flight (waiters share it) and the capacity it reserved
+            self._creating: Dict[str, asyncio.Future] = {}
+            self._reserved: Dict[str, int] = {}
+            self._max_connections = settings.DATA_SOURCE_POOL_MAX_CONNECTIONS
             self._pool_recycle_seconds = 3600  # 1 hour
             self._idle_timeout_seconds = 1800  # 30 minutes
             self._cleanup_task = None
+            self._evictions = 0
             self._initialized = True
     
+    @staticmethod
+    def _pool_key(data_source_id: str, connection_string: str) -> str:
+        return f"{data_source_id}:{connection_fingerprint(connection_string)}"
+    
+    def _lookup(self, pool_key: str) -> Optional[ConnectionInfo]:
+        """Return the live pool for the key (LRU touch); caller holds the lock."""
+        conn_info = self._pools.get(pool_key)
+        if conn_info is not None:
+            conn_info.touch()
+            self._pools.move_to_end(pool_key)
+        return conn_info
+    
+    def _detach(self, pool_keys: List[str]) -> List[ConnectionInfo]:
+        """Remove pools from the registry without closing them; caller holds the lock."""
+        return [self._pools.pop(key) for key in pool_keys if key in self._pools]
+    
+    def _detach_stale(self, data_source_id: str, pool_key: str) -> List[ConnectionInfo]:
+        """Detach pools of the same data source built from an older connection string."""
+        stale = [k for k, info in self._pools.items() if info.data_source_id == data_source_id and k != pool_key]
+        if stale:
+            logger.info(f"Connection string changed for data source {data_source_id}, closing old pool")
+        return self._detach(stale)
+    
+    def _capacity_in_use(self) -> int:
+        return sum(info.capacity for info in self._pools.values()) + sum(self._reserved.values())
+    
+    def _reserve(self, capacity: int) -> List[ConnectionInfo]:
+        """Detach idle pools (least recently used first) until capacity fits the budget; caller holds the lock."""
+        victims: List[ConnectionInfo] = []
+        while self._capacity_in_use() + capacity > self._max_connections:
+            victim = next((key for key, info in self._pools.items() if info.in_use() == 0), None)
+            if victim is None:
+                # Put the already detached victims back; nothing was closed yet
+                for conn_info in reversed(victims):
+                    self._pools[conn_info.pool_key] = conn_info
+                    self._pools.move_to_end(conn_info.pool_key, last=False)
+                raise PoolBudgetExceededError(
+                    f"Data source connection budget of {self._max_connections} exhausted "
+                    f"({len(self._pools)} pools, all busy)"
+                )
+            logger.info(f"Evicting least recently used pool {victim} to stay within connection budget")
+            victims.extend(self._detach([victim]))
+        self._evictions += len(victims)
+        return victims
+    
+    async def _close_detached(self, detached: List[ConnectionInfo]) -> None:
+        """Close pools already removed from the registry (never called with the lock held)."""
+        for conn_info in detached:
+            try:
+                await conn_info.close()
+                logger.info(f"Closed connection pool for data source {conn_info.data_source_id}")
+            except Exception as e:
+                logger.error(f"Error closing pool {conn_info.pool_key}: {e}")
+    
+    def _register(self, conn_info: ConnectionInfo) -> None:
+        conn_info.touch()
+        self._pools[conn_info.pool_key] = conn_info
+        # Start cleanup task if not running
+        if self._cleanup_task is None:
+            self._cleanup_task = asyncio.create_task(self._cleanup_idle_pools())
+    
+    async def _get_or_create(
+        self,
+        data_source_id: str,
+        pool_key: str,
+        source_type: str,
+        capacity: int,
+        build: Callable[[ConnectionInfo], Awaitable[None]]
+    ) -> ConnectionInfo:
+        """
+        Return the pool for the key, creating it at most once.
+        
+        The registry lock only guards dictionary bookkeeping: connecting and
+        closing happen outside it, so a slow or unreachable server delays only
+        callers of that pool key, who wait on the shared creation future.
+        """
+        while True:
+            async with self._lock:
+                conn_info = self._lookup(pool_key)
+                if conn_info is not None:
+                    return conn_info
+                pending = self._creating.get(pool_key)
+                if pending is None:
+                    detached = self._detach_stale(data_source_id, pool_key)
+                    try:
+                        detached += self._reserve(capacity)
+                    except PoolBudgetExceededError:
+                        for stale in detached:
+                            self._pools[stale.pool_key] = stale
+                        raise
+                    pending = self._creating[pool_key] = asyncio.get_running_loop().create_future()
+                    self._reserved[pool_key] = capacity
+                    break
+            
+            await asyncio.wait({pending})
+            if not pending.cancelled() and pending.exception() is not None:
+                raise pending.exception()
+            # Created (or the creator was cancelled): look it up again
+        
+        conn_info = ConnectionInfo(pool_key, data_source_id, source_type, capacity=capacity)
+        try:
+            await self._close_detached(detached)
+            await build(conn_info)
+        except BaseException as e:
+            async with self._lock:
+                self._creating.pop(pool_key, None)
+                self._reserved.pop(pool_key, None)
+            if isinstance(e, asyncio.CancelledError):
+                pending.cancel()
+            else:
+                pending.set_exception(e)
+                pending.exception()  # retrieved here; waiters re-raise it themselves
+            raise
+        
+        async with self._lock:
+            self._creating.pop(pool_key, None)
+            self._reserved.pop(pool_key, None)
+            self._register(conn_info)
+        pending.set_result(conn_info)
+        return conn_info
+    
     async def get_engine(
-        self, 
-        workspace_id: str, 
+        self,
+        data_source_id: str,
         source_type: str,
         connection_string: str
     ) -> AsyncEngine:
         """
-        Get or create a database engine for the given workspace.
+        Get or create a database engine for the given data source.
         
         Args:
-            workspace_id: Workspace identifier
+            data_source_id: Data source identifier (falls back to workspace id for legacy callers)
             source_type: Type of data source (postgresql, mssql, etc.)
             connection_string: Database connection string
-            
+        
         Returns:
             AsyncEngine instance
         """
-        pool_key = f"{workspace_id}:{source_type}"
+        data_source_id = str(data_source_id)
+        pool_size, max_overflow = ENGINE_POOL_SIZES.get(source_type, (1, 0))
         
-        async with self._lock:
-            # Check if pool exists and is still valid
-            if pool_key in self._pools:
-                conn_info = self._pools[pool_key]
-                
-                # Check if connection string has changed
-                if conn_info.connection_string != connection_string:
-                    logger.info(f"Connection string changed for {pool_key}, recreating pool")
-                    await self._close_pool(pool_key)
-                else:
-                    # Update last used time
-                    conn_info.last_used = datetime.now()
-                    conn_info.usage_count += 1
-                    return conn_info.engine
-            
-            # Create new engine
-            logger.info(f"Creating new connection pool for {pool_key}")
-            engine = await self._create_engine(source_type, connection_string)
-            
-            self._pools[pool_key] = ConnectionInfo(
-                engine=engine,
-                source_type=source_type,
-                connection_string=connection_string
-            )
-            
-            # Start cleanup task if not running
-            if self._cleanup_task is None:
-                self._cleanup_task = asyncio.create_task(self._cleanup_idle_pools())
-            
-            return engine
+        async def build(conn_info: ConnectionInfo) -> None:
+            logger.info(f"Creating new connection pool for data source {data_source_id} ({source_type})")
+            conn_info.engine = await self._create_engine(source_type, connection_string, conn_info)
+        
+        conn_info = await self._get_or_create(
+            data_source_id, self._pool_key(data_source_id, connection_string), source_type,
+            pool_size + max_overflow, build
+        )
+        return conn_info.engine
     
-    async def _create_engine(self, source_type: str, connection_string: str) -> AsyncEngine:
+    async def get_odbc_pool(
+        self,
+        data_source_id: str,
+        dsn: str,
+        pool_settings: Dict[str, Any]
+    ) -> ConnectionInfo:
+        """
+        Get or create a shared aioodbc pool for an MSSQL data source.
+        
+        Returns:
+            ConnectionInfo whose ``odbc_pool`` is the aioodbc pool
+        """
+        import aioodbc
+        
+        data_source_id = str(data_source_id)
+        
+        async def build(conn_info: ConnectionInfo) -> None:
+            logger.info(f"Creating new aioodbc pool for data source {data_source_id}")
+            conn_info.odbc_pool = await aioodbc.create_pool(dsn=dsn, **pool_settings)
+        
+        return await self._get_or_create(
+            data_source_id, self._pool_key(data_source_id, dsn), "mssql",
+            pool_settings.get("maxsize", 10), build
+        )
+    
+    async def _create_engine(self, source_type: str, connection_string: str, conn_info: ConnectionInfo) -> AsyncEngine:
+        """Create a new database engine with statement-level instrumentation."""
+        engine = self._build_engine(source_type, connection_string, conn_info)
+        sql_instrumentation.instrument_engine(engine, f"datasource:{source_type}")
+        return engine
+    
+    def _build_engine(self, source_type: str, connection_string: str, conn_info: ConnectionInfo) -> AsyncEngine:
         """Create a new database engine with appropriate settings."""
-        if source_type == "postgresql":
-            # PostgreSQL optimized settings
+        if source_type in ENGINE_POOL_SIZES:
+            # PostgreSQL / MSSQL: queue pool sized per source type
+            pool_size, max_overflow = ENGINE_POOL_SIZES[source_type]
             return create_async_engine(
-                connection_string,
-                pool_size=5,
-                max_overflow=5,
-                pool_recycle=self._pool_recycle_seconds,
-                pool_pre_ping=True,
-                echo=False
-            )
-        elif source_type == "mssql":
-            # MSSQL with different pool settings
-            return create_async_engine(
-                connection_string,
-                pool_size=3,
-                max_overflow=2,
+                async_database_url(source_type, connection_string),
+                poolclass=instrumented_pool_class(f"datasource:{source_type}", conn_info.record_checkout),
+                pool_size=pool_size,
+                max_overflow=max_overflow,
                 pool_recycle=self._pool_recycle_seconds,
                 pool_pre_ping=True,
                 echo=False
@@ -130,52 +344,38 @@ class ConnectionPoolManager:
                 echo=False
             )
     
-    async def _close_pool(self, pool_key: str) -> None:
-        """Close and remove a connection pool."""
-        if pool_key in self._pools:
-            conn_info = self._pools[pool_key]
-            try:
-                await conn_info.engine.dispose()
-                logger.info(f"Closed connection pool for {pool_key}")
-            except Exception as e:
-                logger.error(f"Error closing pool {pool_key}: {e}")
-            finally:
-                del self._pools[pool_key]
-    
     async def _cleanup_idle_pools(self) -> None:
         """Background task to clean up idle connection pools."""
         while True:
             try:
                 await asyncio.sleep(300)  # Check every 5 minutes
                 
-                current_time = datetime.now()
-                idle_pools = []
-                
                 async with self._lock:
-                    for pool_key, conn_info in self._pools.items():
-                        idle_time = (current_time - conn_info.last_used).total_seconds()
-                        
-                        if idle_time > self._idle_timeout_seconds:
-                            idle_pools.append(pool_key)
-                    
-                    # Close idle pools
+                    idle_pools = [
+                        pool_key for pool_key, conn_info in self._pools.items()
+                        if conn_info.idle_seconds() > self._idle_timeout_seconds and conn_info.in_use() == 0
+                    ]
                     for pool_key in idle_pools:
                         logger.info(f"Closing idle pool: {pool_key}")
-                        await self._close_pool(pool_key)
+                    detached = self._detach(idle_pools)
                 
+                # Close idle pools
+                await self._close_detached(detached)
+            
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in cleanup task: {e}")
     
-    async def close_workspace_pools(self, workspace_id: str) -> None:
-        """Close all connection pools for a workspace."""
+    async def close_data_source_pools(self, data_source_id: str) -> None:
+        """Close all connection pools for a data source (e.g. after it was deleted)."""
         async with self._lock:
             pools_to_close = [
-                key for key in self._pools.keys() 
-                if key.startswith(f"{workspace_id}:")
+                key for key, info in self._pools.items()
+                if info.data_source_id == str(data_source_id)
             ]
-            
-            for pool_key in pools_to_close:
-                await self._close_pool(pool_key)
+            detached = self._detach(pools_to_close)
+        await self._close_detached(detached)
     
     async def close_all(self) -> None:
         """Close all connection pools and stop cleanup task."""
@@ -184,23 +384,34 @@ class ConnectionPoolManager:
             self._cleanup_task = None
         
         async with self._lock:
-            for pool_key in list(self._pools.keys()):
-                await self._close_pool(pool_key)
+            detached = self._detach(list(self._pools.keys()))
+        await self._close_detached(detached)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get statistics about connection pools."""
         stats = {
             "total_pools": len(self._pools),
+            "max_connections": self._max_connections,
+            "reserved_connections": self._capacity_in_use(),
+            "evictions": self._evictions,
             "pools": {}
         }
         
         for pool_key, conn_info in self._pools.items():
             stats["pools"][pool_key] = {
+                "data_source_id": conn_info.data_source_id,
                 "source_type": conn_info.source_type,
                 "created_at": conn_info.created_at.isoformat(),
                 "last_used": conn_info.last_used.isoformat(),
                 "usage_count": conn_info.usage_count,
-                "idle_seconds": (datetime.now() - conn_info.last_used).total_seconds()
+                "idle_seconds": conn_info.idle_seconds(),
+                "capacity": conn_info.capacity,
+                "pool_size": conn_info.pool_size(),
+                "checked_out": conn_info.in_use(),
+                "overflow": conn_info.overflow(),
+                "checkouts": conn_info.checkouts,
+                "checkout_wait_ms_total": round(conn_info.checkout_wait_ms_total, 3),
+                "checkout_wait_ms_max": round(conn_info.checkout_wait_ms_max, 3)
             }
         
         return stats
@@ -211,17 +422,17 @@ connection_pool_manager = ConnectionPoolManager()
 
 
 @asynccontextmanager
-async def get_pooled_engine(workspace_id: str, source_type: str, connection_string: str):
+async def get_pooled_engine(data_source_id: str, source_type: str, connection_string: str):
     """
     Context manager to get a pooled database engine.
     
     Usage:
-        async with get_pooled_engine(workspace_id, source_type, connection_string) as engine:
+        async with get_pooled_engine(data_source_id, source_type, connection_string) as engine:
             # Use engine
     """
-    engine = await connection_pool_manager.get_engine(workspace_id, source_type, connection_string)
+    engine = await connection_pool_manager.get_engine(data_source_id, source_type, connection_string)
     try:
         yield engine
     finally:
         # Engine remains in pool, no cleanup needed
-        pass
\ No newline at end of file
+        pass
@@ -6,13 +6,15 @@ from datetime import datetime
 import asyncio
 import asyncpg
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 import logging
-import json
-import uuid
 
-from .base import IDataProvider
-from app.core.security import decrypt_connection_string
+from .base import IDataProvider, MeasurementRecord, ChangeSet, Watermark
+from .resilience import data_source_guards, DataSourceGuard
+from .config_cache import data_source_config_cache
+from .latest_cache import latest_measurement_cache
+from ..spec_engine import spec_cache
+from ..downsampling import DownsampleRequest, SQL_BUCKET_METHODS, downsample_records
+from ...core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -37,141 +39,19 @@ class DynamicProvider(IDataProvider):
         self.data_source_id = data_source_id
         self._provider: Optional[IDataProvider] = None
         self._config: Optional[Dict[str, Any]] = None
-    
-    def _is_valid_uuid(self, value: str) -> bool:
-        """Check if a string is a valid UUID."""
-        try:
-            uuid.UUID(value)
-            return True
-        except (ValueError, TypeError):
-            return False
+        # Set by get_measurement_records when the Python downsample fallback may be missing older rows of the range
+        self.downsample_truncated = False
     
     async def _load_config(self) -> Dict[str, Any]:
-        """Load data source configuration from database."""
+        """Load data source configuration (shared, decrypted process-wide cache)."""
         if self._config is not None:
             return self._config
             
         try:
-            # Convert workspace_id to string for consistent handling
-            workspace_id_str = str(self.workspace_id)
-            workspace_uuid = workspace_id_str
-            
-            # If not a valid UUID format, try to find by slug or name
-            if not self._is_valid_uuid(workspace_id_str):
-                logger.info(f"Workspace ID '{workspace_id_str}' is not a UUID, looking up workspace...")
-                
-                # Try to find workspace by slug or name
-                workspace_query = text("""
-                    SELECT id 
-                    FROM workspaces 
-                    WHERE slug = :workspace_id 
-                       OR name = :workspace_id
-                       OR slug = :workspace_id_no_underscore
-                    LIMIT 1
-                """)
-                
-                # Handle cases like 'personal_test' vs 'personaltest'
-                workspace_id_no_underscore = workspace_id_str.replace('_', '')
-                
-                ws_result = await self.db_session.execute(workspace_query, {
-                    "workspace_id": workspace_id_str,
-                    "workspace_id_no_underscore": workspace_id_no_underscore
-                })
-                ws_row = ws_result.fetchone()
-                
-                if ws_row:
-                    workspace_uuid = str(ws_row.id)
-                    logger.info(f"Found workspace UUID: {workspace_uuid} for '{workspace_id_str}'")
-                else:
-                    logger.warning(f"No workspace found for '{workspace_id_str}'")
-                    workspace_uuid = workspace_id_str  # Fallback to original
-            
-            # Query data source configuration
-            if self.data_source_id:
-                # If data_source_id is specified, load that specific data source
-                logger.info(f"Loading specific data source: {self.data_source_id}")
-                query = text("""
-                    SELECT 
-                        id as data_source_id,
-                        source_type,
-                        api_url,
-                        mssql_connection_string,
-                        api_key,
-                        api_headers,
-                        is_active,
-                        custom_queries
-                    FROM data_source_configs
-                    WHERE id = :data_source_id AND is_active = true
-                    LIMIT 1
-                """)
-                result = await self.db_session.execute(query, {"data_source_id": self.data_source_id})
-            else:
-                # Default behavior: load workspace default data source
-                query = text("""
-                    SELECT 
-                        id as data_source_id,
-                        source_type,
-                        api_url,
-                        mssql_connection_string,
-                        api_key,
-                        api_headers,
-                        is_active,
-                        custom_queries
-                    FROM data_source_configs
-                    WHERE workspace_id = :workspace_id AND is_active = true
-                    ORDER BY created_at DESC
-                    LIMIT 1
-                """)
-                result = await self.db_session.execute(query, {"workspace_id": workspace_uuid})
-            config = result.fetchone()
-            
-            if not config:
-                if self.data_source_id:
-                    logger.error(f"Specific data source {self.data_source_id} not found or inactive")
-                    raise ValueError(f"Data source {self.data_source_id} not found or inactive")
-                else:
-                    logger.error(f"No active data source config found for workspace {self.workspace_id}")
-                    raise ValueError(f"No active data source configuration found for workspace {self.workspace_id}")
-            else:
-                self._config = dict(config._mapping)
-                # Convert source_type to lowercase for internal use
-                if 'source_type' in self._config:
-                    self._config['source_type'] = self._config['source_type'].lower()
-                    
-                # Decrypt sensitive data
-                if self._config.get('api_url'):
-                    decrypted = decrypt_connection_string(self._config['api_url'])
-                    # If decryption fails, it returns the original value
-                    if decrypted != self._config['api_url']:
-                        self._config['connection_string'] = decrypted
-                    else:
-                        # Try using as plain text if decryption failed
-                        self._config['connection_string'] = self._config['api_url']
-                elif self._config.get('mssql_connection_string'):
-                    decrypted = decrypt_connection_string(self._config['mssql_connection_string'])
-                    # If decryption fails, it returns the original value
-                    if decrypted != self._config['mssql_connection_string']:
-                        self._config['connection_string'] = decrypted
-                    else:
-                        # Try using as plain text if decryption failed
-                        self._config['connection_string'] = self._config['mssql_connection_string']
-                else:
-                    self._config['connection_string'] = None
-                    
-                if self._config.get('api_key'):
-                    self._config['api_key'] = decrypt_connection_string(self._config['api_key'])
-                    
-                if self._config.get('api_headers'):
-                    self._config['headers'] = json.loads(self._config['api_headers'])
-                else:
-                    self._config['headers'] = None
-                
-                # Custom queries are already a dict from JSONB column
-                if not isinstance(self._config.get('custom_queries'), dict):
-                    self._config['custom_queries'] = None
-                    
-                logger.info(f"Loaded data source config for workspace {self.workspace_id}: {self._config.get('source_type')}")
-                
+            self._config = await data_source_config_cache.get_config(
+                self.db_session, self.workspace_id, self.data_source_id
+            )
+            logger.debug(f"Loaded data source config for workspace {self.workspace_id}: {self._config.get('source_type')}")
         except Exception as e:
             logger.error(f"Error loading data source config: {e}")
             # Don't fallback - raise the error to indicate configuration issue
@@ -201,7 +81,8 @@ class DynamicProvider(IDataProvider):
                     self._provider = PostgreSQLProvider(
                         config.get("connection_string"),
                         workspace_id=self.workspace_id,
-                        custom_queries=config.get("custom_queries")
+                        custom_queries=config.get("custom_queries"),
+                        data_source_id=config.get("data_source_id")
                     )
             elif source_type == "mssql":
                 from .mssql import MSSQLProvider
@@ -214,7 +95,8 @@ class DynamicProvider(IDataProvider):
                     connection_string=config.get("connection_string"),
                     workspace_id=self.workspace_id,
                     custom_queries=config.get("custom_queries"),
-                    db_session=self.db_session
+                    db_session=self.db_session,
+                    data_source_id=config.get("data_source_id")
                 )
                 logger.info(f"✅ MSSQL provider created successfully")
             elif source_type == "api":
@@ -244,10 +126,28 @@ class DynamicProvider(IDataProvider):
             
         return self._provider
     
+    async def _apply_specs(self, provider: IDataProvider, measurements: List[Any]) -> List[Any]:
+        """Apply cached measurement specs of the data source to a batch in one vectorised pass."""
+        if not measurements:
+            return measurements
+        config = await self._load_config()
+        table = await spec_cache.get_table(
+            self.workspace_id,
+            config.get("data_source_id"),
+            getattr(provider, "load_measurement_specs", None)
+        )
+        return table.apply(measurements)
+    
+    async def _guard(self) -> DataSourceGuard:
+        """Circuit breaker/bulkhead for the resolved data source."""
+        config = await self._load_config()
+        return data_source_guards.get(config.get("data_source_id"))
+    
     async def connect(self) -> None:
         """Connect to the configured data source."""
         provider = await self._get_provider()
-        await provider.connect()
+        async with (await self._guard()).call():
+            await provider.connect()
     
     async def disconnect(self) -> None:
         """Disconnect from the data source."""
@@ -264,12 +164,13 @@ class DynamicProvider(IDataProvider):
         """Get equipment status using configured provider."""
         provider = await self._get_provider()
         # Call provider and return full response
-        response = await provider.get_equipment_status(
-            equipment_type=equipment_type,
-            status=status,
-            limit=limit,
-            offset=offset
-        )
+        async with (await self._guard()).call():
+            response = await provider.get_equipment_status(
+                equipment_type=equipment_type,
+                status=status,
+                limit=limit,
+                offset=offset
+            )
         # Convert response to dict for API usage
         return response.dict()
     
@@ -282,68 +183,154 @@ class DynamicProvider(IDataProvider):
         limit: int = 1000
     ) -> List[Dict[str, Any]]:
         """Get measurement data using configured provider."""
+        records = await self.get_measurement_records(
+            equipment_code=equipment_code,
+            equipment_codes=equipment_codes,
+            equipment_type=equipment_type,
+            measurement_code=measurement_code,
+            limit=limit
+        )
+        # Convert to list of dicts for backward compatibility
+        return [record.to_dict() for record in records]
+    
+    async def get_measurement_records(
+        self,
+        equipment_code: Optional[str] = None,
+        equipment_codes: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        measurement_code: Optional[str] = None,
+        limit: int = 1000,
+        downsample: Optional[DownsampleRequest] = None
+    ) -> List[MeasurementRecord]:
+        """
+        Get measurement records with specs applied, without per-row dict conversion.
+        
+        With ``downsample`` each (equipment, measurement) series is reduced to the target point
+        count: min/max and average buckets run in the source database when the provider supports
+        it, otherwise (and for LTTB) up to DOWNSAMPLE_MAX_SOURCE_ROWS raw rows of the range are reduced
+        here. ``downsample_truncated`` is set when that row cap may have cut off the start of the range.
+        """
         provider = await self._get_provider()
+        self.downsample_truncated = False
+        
+        if downsample is None:
+            measurements = await self._fetch_measurements(
+                provider, equipment_code, equipment_codes, equipment_type, measurement_code, limit
+            )
+            return await self._apply_specs(provider, measurements)
+        
+        measurements = None
+        if downsample.method in SQL_BUCKET_METHODS:
+            async with (await self._guard()).call():
+                measurements = await provider.get_bucketed_measurements(
+                    downsample,
+                    equipment_code=equipment_code,
+                    equipment_codes=equipment_codes,
+                    equipment_type=equipment_type,
+                    measurement_code=measurement_code
+                )
+        if measurements is None:
+            raw = await self._fetch_range(
+                provider, downsample, equipment_code, equipment_codes, equipment_type, measurement_code
+            )
+            measurements = downsample_records(raw, downsample)
+        # Specs are evaluated after downsampling so averaged buckets get their own status
+        return await self._apply_specs(provider, measurements)
+    
+    async def _fetch_range(
+        self,
+        provider: IDataProvider,
+        downsample: DownsampleRequest,
+        equipment_code: Optional[str],
+        equipment_codes: Optional[str],
+        equipment_type: Optional[str],
+        measurement_code: Optional[str]
+    ) -> List[MeasurementRecord]:
+        """Raw rows of the downsample range, capped at DOWNSAMPLE_MAX_SOURCE_ROWS (newest first)."""
+        start, end = downsample.resolve_range()
+        cap = settings.DOWNSAMPLE_MAX_SOURCE_ROWS
+        async with (await self._guard()).call():
+            raw = await provider.get_measurements_in_range(
+                start, end,
+                equipment_code=equipment_code,
+                equipment_codes=equipment_codes,
+                equipment_type=equipment_type,
+                measurement_code=measurement_code,
+                limit=cap
+            )
+        if raw is not None:
+            self.downsample_truncated = len(raw) >= cap
+        else:
+            # The source cannot apply the range: the newest rows are fetched without a time bound, so a
+            # full page that ends after the range start may be hiding older rows of the range
+            pages: List[List[MeasurementRecord]] = []
+            raw = await self._fetch_measurements(
+                provider, equipment_code, equipment_codes, equipment_type, measurement_code, cap, pages
+            )
+            self.downsample_truncated = any(
+                len(page) >= cap and min(record.timestamp.timestamp() for record in page) > start.timestamp()
+                for page in pages
+            )
+        if self.downsample_truncated:
+            logger.warning(
+                f"Downsample source rows hit the {cap} row cap for workspace {self.workspace_id}; "
+                f"the start of the requested range may be missing"
+            )
+        return raw
+    
+    async def _fetch_measurements(
+        self,
+        provider: IDataProvider,
+        equipment_code: Optional[str],
+        equipment_codes: Optional[str],
+        equipment_type: Optional[str],
+        measurement_code: Optional[str],
+        limit: int,
+        pages: Optional[List[List[MeasurementRecord]]] = None
+    ) -> List[MeasurementRecord]:
+        """
+        Fetch raw measurement records (one provider call per equipment code when several are given).
         
+        ``pages`` collects each provider call's rows before the measurement_code filter.
+        """
+        if pages is None:
+            pages = []
         # Handle multiple equipment codes if provided
         if equipment_codes:
             # Parse comma-separated equipment codes
             code_list = [code.strip() for code in equipment_codes.split(',')]
             all_measurements = []
             
-            for code in code_list:
-                measurements = await provider.get_measurement_data(
-                    equipment_code=code,
-                    equipment_type=equipment_type,
-                    limit=limit
-                )
-                all_measurements.extend(measurements)
+            async with (await self._guard()).call():
+                for code in code_list:
+                    measurements = await provider.get_measurement_data(
+                        equipment_code=code,
+                        equipment_type=equipment_type,
+                        limit=limit
+                    )
+                    pages.append(measurements)
+                    all_measurements.extend(measurements)
             
             # Filter by measurement_code if provided
             if measurement_code:
                 all_measurements = [m for m in all_measurements if m.measurement_code == measurement_code]
             
-            # Convert to list of dicts for backward compatibility
-            result = []
-            for item in all_measurements:
-                item_dict = item.dict()
-                # Ensure spec_status is an integer
-                if 'spec_status' in item_dict and isinstance(item_dict['spec_status'], str):
-                    spec_status_mapping = {
-                        'IN_SPEC': 0,
-                        'BELOW_SPEC': 1,
-                        'ABOVE_SPEC': 2,
-                        'NO_SPEC': 9
-                    }
-                    item_dict['spec_status'] = spec_status_mapping.get(item_dict['spec_status'], 0)
-                result.append(item_dict)
-            return result
+            return all_measurements
         else:
             # Single equipment code or no equipment code filter
-            measurements = await provider.get_measurement_data(
-                equipment_code=equipment_code,
-                equipment_type=equipment_type,
-                limit=limit
-            )
+            async with (await self._guard()).call():
+                measurements = await provider.get_measurement_data(
+                    equipment_code=equipment_code,
+                    equipment_type=equipment_type,
+                    limit=limit
+                )
+                pages.append(measurements)
             
             # Filter by measurement_code if provided
             if measurement_code:
                 measurements = [m for m in measurements if m.measurement_code == measurement_code]
             
-            # Convert to list of dicts for backward compatibility
-            result = []
-            for item in measurements:
-                item_dict = item.dict()
-                # Ensure spec_status is an integer
-                if 'spec_status' in item_dict and isinstance(item_dict['spec_status'], str):
-                    spec_status_mapping = {
-                        'IN_SPEC': 0,
-                        'BELOW_SPEC': 1,
-                        'ABOVE_SPEC': 2,
-                        'NO_SPEC': 9
-                    }
-                    item_dict['spec_status'] = spec_status_mapping.get(item_dict['spec_status'], 0)
-                result.append(item_dict)
-            return result
+            return measurements
     
     async def get_measurement_specs(
         self,
@@ -387,14 +374,84 @@ class DynamicProvider(IDataProvider):
                 "message": str(e)
             }
     
+    async def get_measurement_changes(
+        self,
+        since: Optional[Watermark] = None,
+        equipment_code: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        limit: int = 1000
+    ) -> ChangeSet:
+        """Measurements added after the watermark, with specs applied."""
+        provider = await self._get_provider()
+        async with (await self._guard()).call():
+            changes = await provider.get_measurement_changes(
+                since=since,
+                equipment_code=equipment_code,
+                equipment_type=equipment_type,
+                limit=limit
+            )
+        await self._apply_specs(provider, changes.items)
+        return changes
+    
+    async def get_equipment_status_changes(
+        self,
+        since: Optional[Watermark] = None,
+        equipment_type: Optional[str] = None,
+        limit: int = 1000
+    ) -> ChangeSet:
+        """Equipment rows changed after the watermark."""
+        provider = await self._get_provider()
+        async with (await self._guard()).call():
+            return await provider.get_equipment_status_changes(
+                since=since,
+                equipment_type=equipment_type,
+                limit=limit
+            )
+    
+    async def fetch_latest_since(self, since: Optional[datetime]) -> Optional[List[MeasurementRecord]]:
+        """Incremental latest-value fetch used by the latest measurement cache (None if unsupported)."""
+        provider = await self._get_provider()
+        async with (await self._guard()).call():
+            return await provider.get_latest_measurements_since(since)
+    
+    async def ensure_change_feed(self) -> bool:
+        """Start (or keep alive) the push change feed of the resolved data source (False when unsupported or disabled)."""
+        provider = await self._get_provider()
+        config = await self._load_config()
+        return provider.start_change_feed(str(config.get("data_source_id")))
+    
+    async def get_latest_measurements(
+        self,
+        equipment_codes: Optional[List[str]] = None
+    ) -> List[MeasurementRecord]:
+        """
+        Latest measurement per equipment/measurement code, answered from the
+        process-wide snapshot (all cached codes when equipment_codes is None).
+        """
+        provider = await self._get_provider()
+        # Keeps the source's listener alive; pushed rows then replace polling of the snapshot
+        await self.ensure_change_feed()
+        records = await latest_measurement_cache.get_latest(self, equipment_codes)
+        if records is None:
+            # Source without incremental support: one latest row per requested equipment code
+            records = []
+            async with (await self._guard()).call():
+                for code in equipment_codes or []:
+                    measurement = await provider.get_latest_measurement(code)
+                    if measurement:
+                        records.append(measurement)
+        return await self._apply_specs(provider, records)
+    
     async def get_latest_measurement(
         self,
         equipment_code: str
     ) -> Optional[Dict[str, Any]]:
-        """Get latest measurement for equipment using configured provider."""
-        provider = await self._get_provider()
-        measurement = await provider.get_latest_measurement(equipment_code)
-        return measurement.dict() if measurement else None
+        """Get latest measurement for equipment (newest across its measurement codes)."""
+        measurements = await self.get_latest_measurements([equipment_code])
+        if not measurements:
+            return None
+        latest = max(measurements, key=lambda measurement: measurement.timestamp.timestamp())
+        return latest.to_dict()
     
     async def update_equipment_status(
         self,
@@ -403,7 +460,8 @@ class DynamicProvider(IDataProvider):
     ) -> bool:
         """Update equipment status using configured provider."""
         provider = await self._get_provider()
-        return await provider.update_equipment_status(equipment_code, status)
+        async with (await self._guard()).call():
+            return await provider.update_equipment_status(equipment_code, status)
     
     async def refresh_config(self) -> None:
         """Refresh configuration from database."""
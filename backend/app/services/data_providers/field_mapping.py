@@ -0,0 +1,160 @@
+"""
+Compiled field mappings and response-path accessors for API data sources.
+
+APIProvider used to interpret every field's mapping dict for every record.
+Here each mapping is compiled once into a per-field converter callable and
+each response path into an accessor, so mapping tens of thousands of
+records is a tight loop of dict lookups and direct calls.
+"""
+import json
+import logging
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Converter = Callable[[Any], Any]
+
+# Errors a failed conversion may raise; the original value is kept in that case
+_CONVERSION_ERRORS = (TypeError, ValueError, OverflowError, AttributeError)
+
+
+def _parse_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+
+_CONVERSIONS: Dict[str, Converter] = {
+    "int": int,
+    "float": float,
+    "string": str,
+    "boolean": bool,
+    "datetime": _parse_datetime,
+}
+
+
+def compile_converter(mapping: Dict[str, Any]) -> Optional[Converter]:
+    """
+    Build the value converter for one field mapping.
+    
+    Returns None when the field is copied as is (no default, no conversion),
+    so callers can skip the call entirely.
+    """
+    default = mapping.get("default_value") or None
+    conversion = _CONVERSIONS.get(mapping.get("data_type_conversion") or "")
+    
+    if default is None and conversion is None:
+        return None
+    
+    if conversion is None:
+        return lambda value: default if value is None else value
+    
+    def convert(value: Any) -> Any:
+        if value is None:
+            if default is None:
+                return None
+            value = default
+        try:
+            return conversion(value)
+        except _CONVERSION_ERRORS:
+            return value  # Keep original value if conversion fails
+    
+    return convert
+
+
+class CompiledFieldMapping:
+    """Field mappings of one data type compiled into (target, source, converter) tuples."""
+    
+    __slots__ = ("fields",)
+    
+    def __init__(self, field_mappings: Dict[str, Dict[str, Any]]):
+        self.fields: Tuple[Tuple[str, str, Optional[Converter]], ...] = tuple(
+            (target_field, mapping["source_field"], compile_converter(mapping))
+            for target_field, mapping in field_mappings.items()
+        )
+    
+    def __call__(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        get = record.get
+        return {
+            target: get(source) if convert is None else convert(get(source))
+            for target, source, convert in self.fields
+        }
+    
+    def map_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        fields = self.fields
+        mapped = []
+        append = mapped.append
+        for record in records:
+            get = record.get
+            append({
+                target: get(source) if convert is None else convert(get(source))
+                for target, source, convert in fields
+            })
+        return mapped
+
+
+# (data_source_id, data_type) -> (mapping signature, compiled mapping)
+_compiled_cache: Dict[Tuple[str, str], Tuple[str, CompiledFieldMapping]] = {}
+
+
+def get_compiled_field_mapping(
+    data_source_id: Optional[str],
+    data_type: str,
+    field_mappings: Dict[str, Dict[str, Any]]
+) -> CompiledFieldMapping:
+    """Compiled mapping for a data source/data type, recompiled only when the mapping rows change."""
+    if not data_source_id:
+        return CompiledFieldMapping(field_mappings)
+    
+    signature = json.dumps(field_mappings, sort_keys=True, default=str)
+    key = (str(data_source_id), data_type)
+    cached = _compiled_cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    
+    compiled = CompiledFieldMapping(field_mappings)
+    _compiled_cache[key] = (signature, compiled)
+    logger.debug(f"Compiled {len(compiled.fields)} field mappings for {data_type} (data source {data_source_id})")
+    return compiled
+
+
+def invalidate_compiled_mappings(data_source_id: Optional[str] = None) -> None:
+    """Drop compiled mappings of one data source (or all)."""
+    if data_source_id is None:
+        _compiled_cache.clear()
+        return
+    for key in [key for key in _compiled_cache if key[0] == str(data_source_id)]:
+        del _compiled_cache[key]
+
+
+def _field_or_empty(field: str) -> Callable[[Any], Any]:
+    return lambda data: data.get(field, []) if isinstance(data, dict) else []
+
+
+@lru_cache(maxsize=256)
+def compile_path(response_path: Optional[str]) -> Callable[[Any], Any]:
+    """
+    Compile a JSONPath-like response path ("$", "$.data", "$.result.items") into an accessor.
+    
+    Accessors return the data array found at the path.
+    """
+    if not response_path or response_path == "$":
+        return lambda data: data if isinstance(data, list) else [data]
+    
+    if response_path.startswith("$.") and "." not in response_path[2:]:
+        # Simple field access like $.data or $.records
+        return _field_or_empty(response_path[2:])
+    
+    parts = tuple(response_path.split(".")[1:])  # Skip $
+    
+    def access(data: Any) -> Any:
+        for part in parts:
+            if isinstance(data, dict):
+                data = data.get(part, [])
+            else:
+                return []
+        return data if isinstance(data, list) else [data]
+    
+    return access
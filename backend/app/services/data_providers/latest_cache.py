@@ -0,0 +1,250 @@
+"""
+Process-wide last-value snapshot per (data source, equipment, measurement).
+
+Flow views render the latest value on every node, and asking the data source
+for ``TOP 1 ... ORDER BY timestamp DESC`` per equipment code multiplies round
+trips by the node count. A snapshot is loaded once per data source and then
+refreshed incrementally by a background loop, so bulk lookups are answered
+from memory. The incremental query starts LATEST_MEASUREMENT_OVERLAP_SECONDS
+before the newest timestamp already seen: the watermark is a data timestamp,
+not a commit-order cursor, so rows committed late (NOW() defaults on long
+transactions, devices that buffer, backfills) can carry a timestamp below it.
+Rows later than the overlap are caught by a full reload every
+LATEST_MEASUREMENT_FULL_RELOAD_SECONDS, which bounds how long a late row can
+be missing from the snapshot. Sources that cannot run the incremental query (REST
+APIs) are marked unsupported and keep using per-equipment calls.
+
+When a PostgreSQL source has a live LISTEN/NOTIFY change feed (change_feed.py)
+the feed pushes new rows into the snapshot and polling is suspended; one
+refresh after each (re)connect closes the gap while the listener was down.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from app.core.config import settings
+from .base import MeasurementRecord
+
+if TYPE_CHECKING:
+    from .dynamic import DynamicProvider
+
+logger = logging.getLogger(__name__)
+
+
+def _sort_key(value: datetime) -> float:
+    # Providers may return naive or aware datetimes; compare on the epoch
+    return value.timestamp() if isinstance(value, datetime) else float("-inf")
+
+
+@dataclass
+class _Snapshot:
+    workspace_id: str
+    data_source_id: str
+    values: Dict[Tuple[str, str], MeasurementRecord] = field(default_factory=dict)
+    watermark: Optional[datetime] = None
+    refreshed_at: float = 0.0
+    loaded_at: float = 0.0
+    accessed_at: float = 0.0
+    supported: bool = True
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    
+    def merge(self, records: Iterable[MeasurementRecord]) -> int:
+        """Keep the newest record per key and advance the watermark; returns updated keys."""
+        updated = 0
+        for record in records:
+            key = (record.equipment_code, record.measurement_code)
+            current = self.values.get(key)
+            timestamp = _sort_key(record.timestamp)
+            if current is None or timestamp > _sort_key(current.timestamp):
+                self.values[key] = record
+                updated += 1
+            elif timestamp == _sort_key(current.timestamp) and record.to_dict() != current.to_dict():
+                # The overlap window re-reads rows already merged; only count real changes
+                self.values[key] = record
+                updated += 1
+            if self.watermark is None or timestamp > _sort_key(self.watermark):
+                self.watermark = record.timestamp
+        return updated
+    
+    def select(self, equipment_codes: Optional[Iterable[str]]) -> List[MeasurementRecord]:
+        """Copies of the cached records (callers apply specs in place)."""
+        codes = set(equipment_codes) if equipment_codes is not None else None
+        return [
+            MeasurementRecord(**record.to_dict())
+            for (equipment_code, _), record in self.values.items()
+            if codes is None or equipment_code in codes
+        ]
+
+
+class LatestMeasurementCache:
+    """Latest measurement per equipment/measurement code, keyed by resolved data_source_id."""
+    
+    def __init__(self):
+        self._snapshots: Dict[str, _Snapshot] = {}
+        # data_source_id -> monotonic time its change feed (re)connected
+        self._live: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "hits": 0,
+            "full_loads": 0,
+            "refreshes": 0,
+            "pushed": 0,
+            "unsupported": 0,
+            "invalidations": 0
+        }
+    
+    def _is_fresh(self, snapshot: _Snapshot, now: float) -> bool:
+        live_since = self._live.get(snapshot.data_source_id)
+        if live_since is not None:
+            # Kept current by the change feed once refreshed after it connected
+            return snapshot.refreshed_at >= live_since
+        return now - snapshot.refreshed_at < settings.LATEST_MEASUREMENT_REFRESH_SECONDS
+    
+    async def refresh(self, snapshot: _Snapshot, provider: "DynamicProvider", force: bool = False) -> int:
+        """Fetch rows from the overlap window before the watermark (or everything on a full reload) and merge them."""
+        async with snapshot.lock:
+            if not force and self._is_fresh(snapshot, time.monotonic()):
+                return 0  # refreshed while we were waiting for the lock
+            
+            # Stamp with the start time so a change feed connecting mid-fetch still triggers a catch-up refresh
+            started = time.monotonic()
+            full_load = (
+                snapshot.watermark is None
+                or started - snapshot.loaded_at >= settings.LATEST_MEASUREMENT_FULL_RELOAD_SECONDS
+            )
+            since = None if full_load else snapshot.watermark - timedelta(
+                seconds=settings.LATEST_MEASUREMENT_OVERLAP_SECONDS
+            )
+            records = await provider.fetch_latest_since(since)
+            if records is None:
+                snapshot.supported = False
+                self.stats["unsupported"] += 1
+                logger.info(f"Data source {snapshot.data_source_id} does not support incremental latest-value fetch")
+                return 0
+            
+            updated = snapshot.merge(records)
+            snapshot.refreshed_at = started
+            if full_load:
+                snapshot.loaded_at = started
+            self.stats["full_loads" if full_load else "refreshes"] += 1
+            return updated
+    
+    async def get_latest(
+        self,
+        provider: "DynamicProvider",
+        equipment_codes: Optional[Iterable[str]] = None
+    ) -> Optional[List[MeasurementRecord]]:
+        """
+        Latest records for the given equipment codes (all when None).
+        
+        Returns None when the data source does not support the incremental
+        query; the caller then falls back to per-equipment provider calls.
+        """
+        config = await provider._load_config()
+        data_source_id = str(config.get("data_source_id"))
+        snapshot = self._snapshots.get(data_source_id)
+        if snapshot is None:
+            snapshot = self._snapshots[data_source_id] = _Snapshot(str(provider.workspace_id), data_source_id)
+        snapshot.accessed_at = time.monotonic()
+        
+        if not snapshot.supported:
+            return None
+        if not self._is_fresh(snapshot, time.monotonic()):
+            # First use, the background loop is not running / behind, or the change feed just (re)connected
+            await self.refresh(snapshot, provider)
+            if not snapshot.supported:
+                return None
+        else:
+            self.stats["hits"] += 1
+        return snapshot.select(equipment_codes)
+    
+    def apply(self, data_source_id: str, records: Iterable[MeasurementRecord]) -> int:
+        """Merge rows pushed by the change feed (ignored before the snapshot's first load has started)."""
+        snapshot = self._snapshots.get(str(data_source_id))
+        if snapshot is None or (not snapshot.refreshed_at and not snapshot.lock.locked()):
+            # A watermark from one pushed row would turn the first full load into an incremental one
+            return 0
+        updated = snapshot.merge(records)
+        self.stats["pushed"] += updated
+        return updated
+    
+    def set_live(self, data_source_id: str, live: bool) -> None:
+        """Suspend (live) or resume polling for a data source whose change feed connected/disconnected."""
+        if live:
+            self._live[str(data_source_id)] = time.monotonic()
+        else:
+            self._live.pop(str(data_source_id), None)
+    
+    def invalidate(self, data_source_id: Optional[str] = None) -> None:
+        """Drop one data source's snapshot (or all of them), e.g. after its config changed."""
+        if data_source_id is None:
+            self._snapshots.clear()
+        else:
+            self._snapshots.pop(str(data_source_id), None)
+        self.stats["invalidations"] += 1
+    
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "sources": len(self._snapshots),
+            "live_sources": len(self._live),
+            "entries": sum(len(snapshot.values) for snapshot in self._snapshots.values())
+        }
+    
+    async def _refresh_snapshot(self, snapshot: _Snapshot) -> None:
+        from app.core.database import AsyncSessionLocal
+        from .dynamic import DynamicProvider
+        
+        async with AsyncSessionLocal() as session:
+            provider = DynamicProvider(session, snapshot.workspace_id, snapshot.data_source_id)
+            try:
+                await provider.connect()
+                await self.refresh(snapshot, provider, force=True)
+            finally:
+                await provider.disconnect()
+    
+    async def _run(self, interval: float):
+        while True:
+            try:
+                now = time.monotonic()
+                for data_source_id, snapshot in list(self._snapshots.items()):
+                    # Stop polling sources nobody has read for a while
+                    if now - snapshot.accessed_at > settings.LATEST_MEASUREMENT_IDLE_SECONDS:
+                        self._snapshots.pop(data_source_id, None)
+                        continue
+                    if not snapshot.supported or (data_source_id in self._live and self._is_fresh(snapshot, now)):
+                        continue
+                    try:
+                        await self._refresh_snapshot(snapshot)
+                    except Exception as e:
+                        logger.warning(f"Latest measurement refresh failed for {data_source_id}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Latest measurement refresh cycle failed: {e}")
+            await asyncio.sleep(interval)
+    
+    def start(self, interval: Optional[float] = None):
+        """Start background refresh (application startup)."""
+        if self._task is not None and not self._task.done():
+            return
+        interval = interval or settings.LATEST_MEASUREMENT_REFRESH_SECONDS
+        self._task = asyncio.create_task(self._run(interval))
+        logger.info(f"Latest measurement cache refresh started (interval: {interval}s)")
+    
+    async def stop(self):
+        """Stop background refresh."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# Global latest-value cache
+latest_measurement_cache = LatestMeasurementCache()
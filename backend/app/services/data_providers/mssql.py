@@ -8,13 +8,25 @@ import aioodbc
 import pyodbc
 import logging
 import asyncio
+import re
+import time
 from contextlib import asynccontextmanager
 
-from .base import IDataProvider, EquipmentStatusResponse, MeasurementData
-from ..status_normalizer import StatusNormalizer
+from .base import (
+    IDataProvider, EquipmentData, EquipmentStatusResponse, MeasurementRecord,
+    ChangeSet, Watermark, WATERMARK_ROWVERSION, WATERMARK_TIMESTAMP
+)
+from ..downsampling import DownsampleRequest, to_local_naive
+from ..status_normalizer import status_normalizer
 
 logger = logging.getLogger(__name__)
 
+# (data source, table) -> rowversion column name or None, detected once per process
+_ROWVERSION_COLUMNS: Dict[tuple, Optional[str]] = {}
+
+# Lower bound for {{since}} in custom queries on the first incremental call
+_TIMESTAMP_FLOOR = datetime(1900, 1, 1)
+
 
 class MSSQLProvider(IDataProvider):
     """
@@ -27,7 +39,8 @@ class MSSQLProvider(IDataProvider):
         connection_string: Optional[str] = None,
         workspace_id: Optional[str] = None,
         custom_queries: Optional[Dict[str, Any]] = None,
-        db_session: Optional[Any] = None
+        db_session: Optional[Any] = None,
+        data_source_id: Optional[str] = None
     ):
         """
         Initialize enhanced MSSQL provider.
@@ -36,18 +49,21 @@ class MSSQLProvider(IDataProvider):
             connection_string: ODBC connection string for SQL Server
             workspace_id: Workspace identifier for connection pooling
             custom_queries: Custom query configurations from database
-            db_session: Database session for status normalization
+            db_session: When given, statuses are normalized with the shared status normalizer
+            data_source_id: Data source id; when given the pool is shared through ConnectionPoolManager
         """
         super().__init__()
         self.connection_string = self._convert_connection_string(connection_string or "")
         self.workspace_id = workspace_id or "default"
         self.custom_queries = custom_queries or {}
+        self.data_source_id = data_source_id
         self.pool: Optional[aioodbc.Pool] = None
+        self._pool_info = None  # ConnectionInfo when the pool is managed (shared)
         self._connection_lock = asyncio.Lock()
         
-        # Initialize status normalizer
+        # Share the process-wide normalizer so workspace mapping tables survive provider re-creation
         if db_session:
-            self.status_normalizer = StatusNormalizer(db_session)
+            self.status_normalizer = status_normalizer
         
         # Connection pool settings optimized for ODBC 17
         self.pool_settings = {
@@ -188,6 +204,15 @@ class MSSQLProvider(IDataProvider):
                 return
                 
             try:
+                if self.data_source_id:
+                    # Shared pool: created once per data source, reused across requests
+                    from .connection_pool import connection_pool_manager
+                    self._pool_info = await connection_pool_manager.get_odbc_pool(
+                        self.data_source_id, self.connection_string, self.pool_settings
+                    )
+                    self.pool = self._pool_info.odbc_pool
+                    return
+                
                 logger.info(f"Creating MSSQL connection pool for workspace: {self.workspace_id}")
                 logger.debug(f"Connection string: {self._mask_connection_string()}")
                 
@@ -206,8 +231,12 @@ class MSSQLProvider(IDataProvider):
                 raise
     
     async def disconnect(self) -> None:
-        """Close connection pool with proper cleanup."""
+        """Close connection pool with proper cleanup (shared pools are only released)."""
         async with self._connection_lock:
+            if self._pool_info is not None:
+                self.pool = None
+                self._pool_info = None
+                return
             if self.pool:
                 try:
                     logger.info(f"Closing MSSQL connection pool for workspace: {self.workspace_id}")
@@ -234,27 +263,45 @@ class MSSQLProvider(IDataProvider):
                 result = await cursor.fetchone()
                 logger.debug(f"MSSQL Server version: {result[0] if result else 'Unknown'}")
     
+    @staticmethod
+    def _is_connection_error(error: Exception) -> bool:
+        """Whether the error means the connection itself is unusable (SQLSTATE class 08, driver/link errors)."""
+        if isinstance(error, (pyodbc.OperationalError, pyodbc.InterfaceError, asyncio.TimeoutError, ConnectionError)):
+            return True
+        sqlstate = error.args[0] if getattr(error, "args", None) else ""
+        return isinstance(sqlstate, str) and (sqlstate.startswith("08") or sqlstate in ("HYT00", "HYT01"))
+    
     @asynccontextmanager
     async def get_connection(self):
-        """Get connection from pool with enhanced error handling."""
+        """Get connection from pool, evicting only the broken connection on connection errors."""
+        if self._pool_info is not None and self.pool is not None and self.pool.closed:
+            # Shared pool was evicted by the pool manager; fetch a fresh one
+            self.pool = None
+            self._pool_info = None
         if not self.pool:
             await self.connect()
         
+        pool = self.pool
+        start = time.perf_counter()
+        conn = await pool.acquire()
+        if self._pool_info is not None:
+            self._pool_info.record_checkout((time.perf_counter() - start) * 1000)
         try:
-            async with self.pool.acquire() as conn:
-                async with conn.cursor() as cursor:
-                    yield cursor
+            async with conn.cursor() as cursor:
+                yield cursor
         except Exception as e:
-            logger.error(f"Database connection error: {e}")
-            # Reset pool on connection errors
-            if self.pool:
+            if self._is_connection_error(e):
+                logger.error(f"Database connection error, evicting connection: {e}")
+                # A closed connection is dropped by the pool on release and replaced lazily
                 try:
-                    self.pool.close()
-                    await self.pool.wait_closed()
-                except:
+                    await conn.close()
+                except Exception:
                     pass
-                self.pool = None
+            else:
+                logger.error(f"Database query error: {e}")
             raise
+        finally:
+            await pool.release(conn)
     
     async def get_equipment_status(
         self,
@@ -334,11 +381,11 @@ class MSSQLProvider(IDataProvider):
                         "last_run_time": row_dict.get("last_run_time"),
                         "active_alarm_count": row_dict.get("active_alarm_count", 0)
                     }
-                    
-                    # Normalize status if normalizer is available
-                    equipment_item = await self._normalize_equipment_status(equipment_item)
                     equipment_data.append(equipment_item)
                 
+                # Normalize statuses of the whole result set in one pass
+                await self._normalize_equipment_statuses(equipment_data)
+                
                 # Get total count for pagination
                 count_query = """
                     SELECT COUNT(*) as total
@@ -424,11 +471,11 @@ class MSSQLProvider(IDataProvider):
                         "last_run_time": row_dict.get("last_run_time"),
                         "active_alarm_count": row_dict.get("active_alarm_count", 0)
                     }
-                    
-                    # Normalize status if normalizer is available
-                    equipment_item = await self._normalize_equipment_status(equipment_item)
                     equipment_data.append(equipment_item)
                 
+                # Normalize statuses of the whole result set in one pass
+                await self._normalize_equipment_statuses(equipment_data)
+                
                 return EquipmentStatusResponse(
                     items=equipment_data,
                     total=len(equipment_data),
@@ -456,16 +503,18 @@ class MSSQLProvider(IDataProvider):
         if not query_template:
             raise ValueError(f"Custom query '{query_name}' template is empty")
         
-        # Simple parameter substitution
-        query = query_template
+        # Positional parameters must follow the order placeholders appear in the query
+        parameters = parameters or {}
         params = []
         
-        if parameters:
-            for key, value in parameters.items():
-                placeholder = f"{{{{{key}}}}}"
-                if placeholder in query:
-                    query = query.replace(placeholder, "?")
-                    params.append(value)
+        def substitute(match):
+            key = match.group(1)
+            if key not in parameters:
+                return match.group(0)
+            params.append(parameters[key])
+            return "?"
+        
+        query = re.sub(r"\{\{(\w+)\}\}", substitute, query_template)
         
         async with self.get_connection() as cursor:
             logger.debug(f"Executing custom query '{query_name}': {query}")
@@ -486,8 +535,8 @@ class MSSQLProvider(IDataProvider):
         equipment_type: Optional[str] = None,
         measurement_code: Optional[str] = None,
         limit: int = 1000
-    ) -> List[MeasurementData]:
-        """Get measurement data with optional filtering and spec calculations."""
+    ) -> List[MeasurementRecord]:
+        """Get measurement data with optional filtering (specs are applied by the spec engine)."""
         try:
             # Check for custom measurement query
             if self.custom_queries and "measurement_data" in self.custom_queries:
@@ -495,7 +544,7 @@ class MSSQLProvider(IDataProvider):
                     "measurement_data",
                     {"equipment_code": equipment_code, "equipment_codes": equipment_codes, "equipment_type": equipment_type, "measurement_code": measurement_code, "limit": limit}
                 )
-                # Convert to MeasurementData objects
+                # Convert to MeasurementRecord objects
                 return [self._dict_to_measurement_data(row) for row in custom_results]
             
             async with self.get_connection() as cursor:
@@ -507,42 +556,14 @@ class MSSQLProvider(IDataProvider):
                         m.measurement_code,
                         m.measurement_desc,
                         m.measurement_value,
-                        m.timestamp,
-                        s.usl,
-                        s.lsl,
-                        s.target,
-                        CASE 
-                            WHEN s.usl IS NOT NULL AND m.measurement_value > s.usl THEN 1
-                            WHEN s.lsl IS NOT NULL AND m.measurement_value < s.lsl THEN 1
-                            ELSE 0
-                        END as spec_status
+                        m.timestamp
                     FROM personal_test_measurement_data m
-                    LEFT JOIN measurement_specs s 
-                        ON m.measurement_code = s.measurement_code
                     WHERE 1=1
                 """
                 
-                params = [limit]
-                
-                if equipment_code:
-                    base_query += " AND m.equipment_code = ?"
-                    params.append(equipment_code)
-                elif equipment_codes:
-                    # Handle multiple equipment codes
-                    code_list = [code.strip() for code in equipment_codes.split(',')]
-                    placeholders = ','.join(['?' for _ in code_list])
-                    base_query += f" AND m.equipment_code IN ({placeholders})"
-                    params.extend(code_list)
-                
-                if equipment_type:
-                    base_query += " AND m.equipment_type = ?"
-                    params.append(equipment_type)
-                
-                if measurement_code:
-                    base_query += " AND m.measurement_code = ?"
-                    params.append(measurement_code)
-                
-                base_query += " ORDER BY m.timestamp DESC"
+                filters, filter_params = self._measurement_filters(equipment_code, equipment_codes, equipment_type, measurement_code)
+                base_query += filters + " ORDER BY m.timestamp DESC"
+                params = [limit] + filter_params
                 
                 logger.debug(f"Executing measurement data query: {base_query}")
                 await cursor.execute(base_query, params)
@@ -560,39 +581,359 @@ class MSSQLProvider(IDataProvider):
             logger.error(f"Error getting measurement data: {e}")
             raise
     
-    def _dict_to_measurement_data(self, row_dict: Dict[str, Any]) -> MeasurementData:
-        """Convert database row to MeasurementData object."""
-        # Convert spec_status safely
-        spec_status = row_dict.get("spec_status", 0)
-        if isinstance(spec_status, str):
-            # Handle Korean number characters or other string formats
-            try:
-                # Try to parse as integer first
-                spec_status = int(spec_status)
-            except ValueError:
-                # If string parsing fails, use default value
-                spec_status = 0
-        elif spec_status is None:
-            spec_status = 0
-        
-        return MeasurementData(
-            id=row_dict.get("id", 0),
-            equipment_type=row_dict.get("equipment_type", ""),
-            equipment_code=row_dict.get("equipment_code", ""),
-            measurement_code=row_dict.get("measurement_code", ""),
-            measurement_desc=row_dict.get("measurement_desc", ""),
-            measurement_value=float(row_dict.get("measurement_value", 0.0)),
-            timestamp=row_dict.get("timestamp", datetime.now()),
-            spec_status=spec_status,
-            usl=row_dict.get("usl"),
-            lsl=row_dict.get("lsl"),
-            target=row_dict.get("target")
+    def _measurement_filters(
+        self,
+        equipment_code: Optional[str],
+        equipment_codes: Optional[str],
+        equipment_type: Optional[str],
+        measurement_code: Optional[str]
+    ) -> tuple:
+        """Build the WHERE clause fragment and parameters shared by the measurement queries."""
+        filters = ""
+        params: List[Any] = []
+        
+        if equipment_code:
+            filters += " AND m.equipment_code = ?"
+            params.append(equipment_code)
+        elif equipment_codes:
+            # Handle multiple equipment codes
+            code_list = [code.strip() for code in equipment_codes.split(',')]
+            placeholders = ','.join(['?' for _ in code_list])
+            filters += f" AND m.equipment_code IN ({placeholders})"
+            params.extend(code_list)
+        
+        if equipment_type:
+            filters += " AND m.equipment_type = ?"
+            params.append(equipment_type)
+        
+        if measurement_code:
+            filters += " AND m.measurement_code = ?"
+            params.append(measurement_code)
+        
+        return filters, params
+    
+    async def get_measurements_in_range(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        equipment_code: Optional[str] = None,
+        equipment_codes: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        measurement_code: Optional[str] = None,
+        limit: int = 1000
+    ) -> Optional[List[MeasurementRecord]]:
+        """Newest raw rows inside [start_time, end_time] for Python downsampling (None for custom queries)."""
+        if self.custom_queries and "measurement_data" in self.custom_queries:
+            # Custom queries have no range placeholders on MSSQL
+            return None
+        
+        filters, filter_params = self._measurement_filters(equipment_code, equipment_codes, equipment_type, measurement_code)
+        query = f"""
+            SELECT TOP (?)
+                m.id, m.equipment_type, m.equipment_code, m.measurement_code,
+                m.measurement_desc, m.measurement_value, m.timestamp
+            FROM personal_test_measurement_data m
+            WHERE m.timestamp >= ? AND m.timestamp <= ?{filters}
+            ORDER BY m.timestamp DESC
+        """
+        params = [limit, to_local_naive(start_time), to_local_naive(end_time)] + filter_params
+        
+        async with self.get_connection() as cursor:
+            await cursor.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            return [self._dict_to_measurement_data(dict(zip(columns, row))) async for row in cursor]
+    
+    async def get_bucketed_measurements(
+        self,
+        request: DownsampleRequest,
+        equipment_code: Optional[str] = None,
+        equipment_codes: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        measurement_code: Optional[str] = None
+    ) -> Optional[List[MeasurementRecord]]:
+        """Bucket measurements per (equipment, measurement) in T-SQL (min/max rows or averages)."""
+        if self.custom_queries and "measurement_data" in self.custom_queries:
+            # Custom queries have arbitrary shapes; downsample their rows in Python instead
+            return None
+        
+        start, end = (to_local_naive(value) for value in request.resolve_range())
+        # Integer bucket width rounded up so rows at end_time still fall into the last bucket
+        bucket_ms = int((end - start).total_seconds() * 1000) // request.bucket_count + 1
+        filters, filter_params = self._measurement_filters(equipment_code, equipment_codes, equipment_type, measurement_code)
+        
+        source = f"""
+            WITH ranged AS (
+                SELECT
+                    m.id, m.equipment_type, m.equipment_code, m.measurement_code,
+                    m.measurement_desc, m.measurement_value, m.timestamp,
+                    DATEDIFF_BIG(MILLISECOND, ?, m.timestamp) / ? AS bucket
+                FROM personal_test_measurement_data m
+                WHERE m.timestamp >= ? AND m.timestamp <= ?{filters}
+            )
+        """
+        if request.method == "minmax":
+            query = source + """
+                , ranked AS (
+                    SELECT *,
+                        ROW_NUMBER() OVER (PARTITION BY equipment_code, measurement_code, bucket ORDER BY measurement_value ASC, timestamp) AS low_rank,
+                        ROW_NUMBER() OVER (PARTITION BY equipment_code, measurement_code, bucket ORDER BY measurement_value DESC, timestamp) AS high_rank
+                    FROM ranged
+                )
+                SELECT id, equipment_type, equipment_code, measurement_code, measurement_desc, measurement_value, timestamp
+                FROM ranked
+                WHERE low_rank = 1 OR high_rank = 1
+                ORDER BY timestamp DESC
+            """
+        else:
+            query = source + """
+                SELECT
+                    MIN(id) AS id, MIN(equipment_type) AS equipment_type, equipment_code, measurement_code,
+                    MIN(measurement_desc) AS measurement_desc,
+                    AVG(CAST(measurement_value AS FLOAT)) AS measurement_value,
+                    MIN(timestamp) AS timestamp
+                FROM ranged
+                GROUP BY equipment_code, measurement_code, bucket
+                ORDER BY timestamp DESC
+            """
+        params = [start, bucket_ms, start, end] + filter_params
+        
+        async with self.get_connection() as cursor:
+            await cursor.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            return [self._dict_to_measurement_data(dict(zip(columns, row))) async for row in cursor]
+    
+    def _dict_to_measurement_data(self, row_dict: Dict[str, Any]) -> MeasurementRecord:
+        """Convert database row to a MeasurementRecord."""
+        return MeasurementRecord.from_row(row_dict)
+    
+    async def _rowversion_column(self, table: str) -> Optional[str]:
+        """Name of the table's rowversion column, if it has one (detected once per data source)."""
+        key = (self.data_source_id or self.workspace_id, table)
+        if key not in _ROWVERSION_COLUMNS:
+            async with self.get_connection() as cursor:
+                await cursor.execute(
+                    "SELECT TOP (1) name FROM sys.columns WHERE object_id = OBJECT_ID(?) AND system_type_id = 189",
+                    [table]
+                )
+                row = await cursor.fetchone()
+            _ROWVERSION_COLUMNS[key] = row[0] if row else None
+        return _ROWVERSION_COLUMNS[key]
+    
+    def _watermark_clause(
+        self,
+        since: Optional[Watermark],
+        version_column: Optional[str],
+        alias: str,
+        timestamp_column: str,
+        key_column: str,
+        key_type: type = str
+    ) -> tuple:
+        """
+        WHERE fragment, parameters, ORDER BY and extra select column for an incremental query.
+        
+        rowversion is used when the table has one (rows still being written are excluded via
+        MIN_ACTIVE_ROWVERSION so none are skipped); otherwise rows after the (timestamp, key)
+        watermark are returned in (timestamp, key) order, so rows sharing a timestamp are not
+        lost when TOP cuts a page between them.
+        """
+        if version_column and (since is None or since.kind == WATERMARK_ROWVERSION):
+            column = f"{alias}.[{version_column}]"
+            clause = f" AND {column} < MIN_ACTIVE_ROWVERSION()"
+            params: List[Any] = []
+            if since is not None:
+                clause += f" AND {column} > CONVERT(BINARY(8), CAST(? AS BIGINT))"
+                params.append(since.value)
+            return clause, params, f"{column} ASC", f", CONVERT(BIGINT, {column}) AS row_version"
+        
+        if since is not None and since.kind == WATERMARK_ROWVERSION:
+            raise ValueError("rowversion watermark given but the table has no rowversion column")
+        order_by = f"{timestamp_column} ASC, {key_column} ASC"
+        if since is None:
+            return "", [], order_by, ""
+        value = to_local_naive(since.value)
+        if since.key is None:
+            # Token issued before keys were added
+            return f" AND {timestamp_column} > ?", [value], order_by, ""
+        clause = f" AND ({timestamp_column} > ? OR ({timestamp_column} = ? AND {key_column} > ?))"
+        return clause, [value, value, since.typed_key(key_type)], order_by, ""
+    
+    def _custom_watermark_kind(self, query_name: str) -> Optional[str]:
+        """Watermark kind of an incremental custom query, or None if it has no {{since}}."""
+        config = self.custom_queries[query_name]
+        if "{{since}}" not in config.get("query", ""):
+            return None
+        return config.get("watermark", WATERMARK_TIMESTAMP)
+    
+    async def _custom_changes(
+        self,
+        query_name: str,
+        since: Optional[Watermark],
+        limit: int,
+        parameters: Dict[str, Any]
+    ) -> tuple:
+        """
+        Run a custom query that contains {{since}}; returns (rows, versions).
+        
+        The query config may set "watermark": "rowversion" and return a BIGINT row_version column;
+        otherwise {{since}} is bound to the watermark timestamp. Timestamp queries should filter
+        with ``>= {{since}}`` and order by timestamp then key so {{limit}} pages forward; rows
+        already delivered at the watermark timestamp are dropped by ChangeSet.fetch_overlapping().
+        """
+        kind = self._custom_watermark_kind(query_name)
+        if since is not None and since.kind != kind:
+            raise ValueError(f"Custom query '{query_name}' uses {kind} watermarks, got {since.kind}")
+        if kind == WATERMARK_ROWVERSION:
+            value = since.value if since is not None else 0
+        else:
+            value = to_local_naive(since.value) if since is not None else _TIMESTAMP_FLOOR
+        
+        rows = await self._execute_custom_query(query_name, {**parameters, "since": value, "limit": limit})
+        if kind == WATERMARK_ROWVERSION:
+            rows.sort(key=lambda row: row.get("row_version") or 0)
+            return rows, [row.pop("row_version") for row in rows if row.get("row_version") is not None]
+        return rows, None
+    
+    async def get_measurement_changes(
+        self,
+        since: Optional[Watermark] = None,
+        equipment_code: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        limit: int = 1000
+    ) -> ChangeSet:
+        """Measurements added after ``since``, oldest first (rowversion when available, else timestamp)."""
+        if self.custom_queries and "measurement_data" in self.custom_queries:
+            kind = self._custom_watermark_kind("measurement_data")
+            if kind is None:
+                return await super().get_measurement_changes(since, equipment_code, equipment_type, limit)
+            parameters = {"equipment_code": equipment_code, "equipment_type": equipment_type}
+            
+            async def fetch(fetch_limit: int) -> List[MeasurementRecord]:
+                rows, _ = await self._custom_changes("measurement_data", since, fetch_limit, parameters)
+                return [self._dict_to_measurement_data(row) for row in rows]
+            
+            if kind == WATERMARK_TIMESTAMP:
+                return await ChangeSet.fetch_overlapping(fetch, since, "timestamp", "id", limit)
+            rows, versions = await self._custom_changes("measurement_data", since, limit, parameters)
+            changes = ChangeSet.from_items([self._dict_to_measurement_data(row) for row in rows], since, "timestamp", versions)
+            changes.has_more = len(rows) >= limit
+            return changes
+        
+        version_column = await self._rowversion_column("personal_test_measurement_data")
+        since_filter, since_params, order_by, version_select = self._watermark_clause(
+            since, version_column, "m", "m.timestamp", "m.id", int
+        )
+        filters, filter_params = self._measurement_filters(equipment_code, None, equipment_type, None)
+        query = f"""
+            SELECT TOP (?)
+                m.id,
+                m.equipment_type,
+                m.equipment_code,
+                m.measurement_code,
+                m.measurement_desc,
+                m.measurement_value,
+                m.timestamp{version_select}
+            FROM personal_test_measurement_data m
+            WHERE 1=1{since_filter}{filters}
+            ORDER BY {order_by}
+        """
+        
+        async with self.get_connection() as cursor:
+            await cursor.execute(query, [limit] + since_params + filter_params)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) async for row in cursor]
+        
+        versions = [row.pop("row_version") for row in rows] if version_select else None
+        changes = ChangeSet.from_items(
+            [self._dict_to_measurement_data(row) for row in rows], since, "timestamp", versions, key_field="id"
+        )
+        changes.has_more = len(rows) >= limit
+        return changes
+    
+    async def get_equipment_status_changes(
+        self,
+        since: Optional[Watermark] = None,
+        equipment_type: Optional[str] = None,
+        limit: int = 1000
+    ) -> ChangeSet:
+        """Equipment whose row changed after ``since`` (rowversion when available, else last_run_time)."""
+        if self.custom_queries and "equipment_status" in self.custom_queries:
+            kind = self._custom_watermark_kind("equipment_status")
+            if kind is None:
+                return await super().get_equipment_status_changes(since, equipment_type, limit)
+            parameters = {"equipment_type": equipment_type}
+            
+            async def fetch(fetch_limit: int) -> List[EquipmentData]:
+                rows, _ = await self._custom_changes("equipment_status", since, fetch_limit, parameters)
+                for row in rows:
+                    row.setdefault("equipment_code", row.get("equipment_id", ""))
+                return await self._equipment_change_items(rows)
+            
+            if kind == WATERMARK_TIMESTAMP:
+                return await ChangeSet.fetch_overlapping(fetch, since, "last_run_time", "equipment_code", limit)
+            rows, versions = await self._custom_changes("equipment_status", since, limit, parameters)
+            for row in rows:
+                row.setdefault("equipment_code", row.get("equipment_id", ""))
+            changes = ChangeSet.from_items(await self._equipment_change_items(rows), since, "last_run_time", versions)
+            changes.has_more = len(rows) >= limit
+            return changes
+        
+        version_column = await self._rowversion_column("personal_test_equipment_status")
+        since_filter, since_params, order_by, version_select = self._watermark_clause(
+            since, version_column, "e", "e.last_run_time", "e.equipment_code"
+        )
+        type_filter, type_params = (" AND e.equipment_type = ?", [equipment_type]) if equipment_type else ("", [])
+        query = f"""
+            SELECT TOP (?)
+                e.equipment_code,
+                e.equipment_name,
+                e.equipment_type,
+                e.status,
+                e.last_run_time,
+                ISNULL(a.active_alarm_count, 0) as active_alarm_count{version_select}
+            FROM personal_test_equipment_status e
+            LEFT JOIN (
+                SELECT 
+                    equipment_code,
+                    COUNT(*) as active_alarm_count
+                FROM equipment_alarms 
+                WHERE is_active = 1
+                GROUP BY equipment_code
+            ) a ON e.equipment_code = a.equipment_code
+            WHERE 1=1{since_filter}{type_filter}
+            ORDER BY {order_by}
+        """
+        
+        async with self.get_connection() as cursor:
+            await cursor.execute(query, [limit] + since_params + type_params)
+            columns = [column[0] for column in cursor.description]
+            rows = [dict(zip(columns, row)) async for row in cursor]
+        versions = [row.pop("row_version") for row in rows] if version_select else None
+        changes = ChangeSet.from_items(
+            await self._equipment_change_items(rows), since, "last_run_time", versions, key_field="equipment_code"
         )
+        changes.has_more = len(rows) >= limit
+        return changes
+    
+    async def _equipment_change_items(self, rows: List[Dict[str, Any]]) -> List[EquipmentData]:
+        """Incremental equipment rows to EquipmentData with normalized statuses."""
+        equipment_data = [
+            {
+                "equipment_type": row.get("equipment_type") or "",
+                "equipment_code": row.get("equipment_code") or "",
+                "equipment_name": row.get("equipment_name") or "",
+                "status": row.get("status") or "",
+                "last_run_time": row.get("last_run_time"),
+                "active_alarm_count": row.get("active_alarm_count", 0)
+            }
+            for row in rows
+        ]
+        await self._normalize_equipment_statuses(equipment_data)
+        return [EquipmentData(**item) for item in equipment_data]
     
     async def get_latest_measurement(
         self,
         equipment_code: str
-    ) -> Optional[MeasurementData]:
+    ) -> Optional[MeasurementRecord]:
         """Get latest measurement for equipment."""
         try:
             async with self.get_connection() as cursor:
@@ -604,18 +945,8 @@ class MSSQLProvider(IDataProvider):
                         m.measurement_code,
                         m.measurement_desc,
                         m.measurement_value,
-                        m.timestamp,
-                        s.usl,
-                        s.lsl,
-                        s.target,
-                        CASE 
-                            WHEN s.usl IS NOT NULL AND m.measurement_value > s.usl THEN 1
-                            WHEN s.lsl IS NOT NULL AND m.measurement_value < s.lsl THEN 1
-                            ELSE 0
-                        END as spec_status
+                        m.timestamp
                     FROM personal_test_measurement_data m
-                    LEFT JOIN measurement_specs s 
-                        ON m.measurement_code = s.measurement_code
                     WHERE m.equipment_code = ?
                     ORDER BY m.timestamp DESC
                 """
@@ -634,6 +965,45 @@ class MSSQLProvider(IDataProvider):
             logger.error(f"Error getting latest measurement: {e}")
             raise
     
+    async def get_latest_measurements_since(
+        self,
+        since: Optional[datetime] = None
+    ) -> Optional[List[MeasurementRecord]]:
+        """Latest measurement per equipment/measurement code, limited to rows at or after ``since``."""
+        where_clause = "WHERE m.timestamp >= ?" if since is not None else ""
+        params = [to_local_naive(since)] if since is not None else []
+        query = f"""
+            SELECT id, equipment_type, equipment_code, measurement_code,
+                   measurement_desc, measurement_value, timestamp
+            FROM (
+                SELECT
+                    m.id,
+                    m.equipment_type,
+                    m.equipment_code,
+                    m.measurement_code,
+                    m.measurement_desc,
+                    m.measurement_value,
+                    m.timestamp,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY m.equipment_code, m.measurement_code ORDER BY m.timestamp DESC
+                    ) AS rn
+                FROM personal_test_measurement_data m
+                {where_clause}
+            ) latest
+            WHERE rn = 1
+        """
+        
+        async with self.get_connection() as cursor:
+            await cursor.execute(query, params)
+            columns = [column[0] for column in cursor.description]
+            return [self._dict_to_measurement_data(dict(zip(columns, row))) async for row in cursor]
+
+    async def load_measurement_specs(self) -> List[tuple]:
+        """Load measurement_specs of this database for the spec engine."""
+        async with self.get_connection() as cursor:
+            await cursor.execute("SELECT measurement_code, usl, lsl, target FROM measurement_specs")
+            return [tuple(row) for row in await cursor.fetchall()]
+    
     async def update_equipment_status(
         self,
         equipment_code: str,
@@ -10,27 +10,33 @@ from sqlalchemy import text
 import logging
 import uuid
 
-from .base import IDataProvider, EquipmentData, MeasurementData, EquipmentStatusResponse
+from .base import IDataProvider, EquipmentData, MeasurementRecord, EquipmentStatusResponse, ChangeSet, Watermark
 from .connection_pool import connection_pool_manager
+from .change_feed import change_feed_manager
+from ...core.measurement_partitions import MEASUREMENT_TABLE
+from ..downsampling import DownsampleRequest
+from ...core.config import settings
 
 logger = logging.getLogger(__name__)
 
 class PostgreSQLProvider(IDataProvider):
     """PostgreSQL 데이터베이스 프로바이더"""
     
-    def __init__(self, db_or_connection_string: Union[AsyncSession, str], workspace_id: Optional[str] = None, custom_queries: Optional[Dict[str, Dict[str, str]]] = None):
+    def __init__(self, db_or_connection_string: Union[AsyncSession, str], workspace_id: Optional[str] = None, custom_queries: Optional[Dict[str, Dict[str, str]]] = None, data_source_id: Optional[str] = None):
         """
         Initialize PostgreSQL provider.
         
         Args:
             db_or_connection_string: Either an existing AsyncSession or a connection string
-            workspace_id: Optional workspace ID for connection pooling
+            workspace_id: Optional workspace ID (pool key fallback)
             custom_queries: Optional custom queries for each data type
+            data_source_id: Optional data source ID used as the connection pool key
         """
         if isinstance(db_or_connection_string, str):
             # Create new connection from connection string
             self.connection_string = db_or_connection_string
             self.workspace_id = workspace_id or str(uuid.uuid4())
+            self.data_source_id = data_source_id or self.workspace_id
             self.engine = None
             self.session_factory = None
             self.db = None
@@ -55,7 +61,7 @@ class PostgreSQLProvider(IDataProvider):
                 if self.use_pool:
                     # Use connection pool
                     self.engine = await connection_pool_manager.get_engine(
-                        self.workspace_id,
+                        self.data_source_id,
                         "postgresql",
                         self.connection_string
                     )
@@ -85,6 +91,20 @@ class PostgreSQLProvider(IDataProvider):
             except Exception as e:
                 logger.error(f"Error disconnecting from PostgreSQL: {e}")
     
+    def start_change_feed(self, data_source_id: str) -> bool:
+        """
+        LISTEN/NOTIFY 변경 피드 리스너 시작 (데이터 소스당 전용 연결 1개, PG_CHANGE_FEED_ENABLED일 때만)
+        
+        측정 커스텀 쿼리가 트리거가 걸린 측정 테이블을 읽는 경우에만 push된 행을 최신값 캐시에 반영합니다.
+        """
+        custom_query_info = self.custom_queries.get('measurement_data', {})
+        custom_query = custom_query_info.get('query') if isinstance(custom_query_info, dict) else None
+        return change_feed_manager.ensure(
+            data_source_id,
+            self.connection_string or settings.DATABASE_URL,
+            push_measurements=bool(custom_query) and MEASUREMENT_TABLE in custom_query
+        )
+    
     async def get_equipment_status(
         self,
         equipment_type: Optional[str] = None,
@@ -94,33 +114,7 @@ class PostgreSQLProvider(IDataProvider):
     ) -> EquipmentStatusResponse:
         """설비 상태 조회"""
         try:
-            # Always require custom query configuration - no default query
-            custom_query_info = self.custom_queries.get('equipment_status', {})
-            custom_query = custom_query_info.get('query') if isinstance(custom_query_info, dict) else None
-            
-            if not custom_query:
-                raise ValueError("PostgreSQL provider requires custom equipment_status query configuration")
-            
-            # Process custom query with parameter substitution (PostgreSQL style)
-            params = {}
-            final_query = custom_query
-            
-            # Replace placeholders with PostgreSQL parameter format
-            if equipment_type and "{{equipment_type}}" in final_query:
-                final_query = final_query.replace("{{equipment_type}}", ":equipment_type")
-                params["equipment_type"] = equipment_type
-            
-            if status and "{{status}}" in final_query:
-                final_query = final_query.replace("{{status}}", ":status")
-                params["status"] = status
-            
-            if "{{limit}}" in final_query:
-                final_query = final_query.replace("{{limit}}", ":limit")
-                params["limit"] = limit
-                
-            if "{{offset}}" in final_query:
-                final_query = final_query.replace("{{offset}}", ":offset")
-                params["offset"] = offset
+            final_query, params = self._build_equipment_query(equipment_type, status, limit, offset)
             
             logger.debug(f"Executing PostgreSQL equipment status query: {final_query}")
             logger.debug(f"Parameters: {params}")
@@ -139,14 +133,7 @@ class PostgreSQLProvider(IDataProvider):
                 if 'total' in row_dict:
                     total_count = int(row_dict['total'])
                 
-                equipment_item = EquipmentData(
-                    equipment_type=str(row_dict.get('equipment_type', '')),
-                    equipment_code=str(row_dict.get('equipment_code', '')),
-                    equipment_name=str(row_dict.get('equipment_name', '')),
-                    status=str(row_dict.get('status', '')),
-                    last_run_time=row_dict.get('last_run_time')
-                )
-                equipment_list.append(equipment_item)
+                equipment_list.append(self._equipment_from_row(row_dict))
             
             # If no total count was provided, use the length of results
             if total_count == 0:
@@ -164,6 +151,118 @@ class PostgreSQLProvider(IDataProvider):
             logger.error(f"Error getting equipment status: {e}")
             raise
     
+    def _build_equipment_query(
+        self,
+        equipment_type: Optional[str],
+        status: Optional[str],
+        limit: int,
+        offset: int
+    ) -> tuple:
+        """설비 상태 커스텀 쿼리의 {{...}} 플레이스홀더를 바인드 파라미터로 치환"""
+        # Always require custom query configuration - no default query
+        custom_query_info = self.custom_queries.get('equipment_status', {})
+        custom_query = custom_query_info.get('query') if isinstance(custom_query_info, dict) else None
+        
+        if not custom_query:
+            raise ValueError("PostgreSQL provider requires custom equipment_status query configuration")
+        
+        # Process custom query with parameter substitution (PostgreSQL style)
+        params = {}
+        final_query = custom_query
+        
+        # Replace placeholders with PostgreSQL parameter format
+        if equipment_type and "{{equipment_type}}" in final_query:
+            final_query = final_query.replace("{{equipment_type}}", ":equipment_type")
+            params["equipment_type"] = equipment_type
+        
+        if status and "{{status}}" in final_query:
+            final_query = final_query.replace("{{status}}", ":status")
+            params["status"] = status
+        
+        if "{{limit}}" in final_query:
+            final_query = final_query.replace("{{limit}}", ":limit")
+            params["limit"] = limit
+        
+        if "{{offset}}" in final_query:
+            final_query = final_query.replace("{{offset}}", ":offset")
+            params["offset"] = offset
+        
+        return final_query, params
+    
+    @staticmethod
+    def _equipment_from_row(row_dict: Dict[str, Any]) -> EquipmentData:
+        return EquipmentData(
+            equipment_type=str(row_dict.get('equipment_type', '')),
+            equipment_code=str(row_dict.get('equipment_code', '')),
+            equipment_name=str(row_dict.get('equipment_name', '')),
+            status=str(row_dict.get('status', '')),
+            last_run_time=row_dict.get('last_run_time')
+        )
+    
+    @staticmethod
+    def _bind_since(final_query: str, params: Dict[str, Any], since: Optional[Watermark]) -> str:
+        """
+        {{since}} 치환 (첫 조회는 '-infinity'로 timestamp/timestamptz 컬럼 모두 전체 범위)
+        
+        워터마크의 시각만 바인드하므로 쿼리는 >= {{since}}로 걸고 시각, 키(id, equipment_code) 순으로
+        정렬해야 합니다. 이미 전달한 같은 시각의 행은 ChangeSet.fetch_overlapping()이 제외합니다.
+        """
+        if since is None:
+            return final_query.replace("{{since}}", "'-infinity'")
+        if since.timestamp_value() is None:
+            raise ValueError("PostgreSQL data sources only support timestamp watermarks")
+        params["since"] = since.value
+        return final_query.replace("{{since}}", ":since")
+    
+    @staticmethod
+    def _with_limit(params: Dict[str, Any], limit: int) -> Dict[str, Any]:
+        """{{limit}}을 쓰는 쿼리의 조회 행 수만 바꾼 파라미터"""
+        return {**params, "limit": limit} if "limit" in params else params
+    
+    def _supports_since(self, query_name: str) -> bool:
+        custom_query_info = self.custom_queries.get(query_name, {})
+        custom_query = custom_query_info.get('query') if isinstance(custom_query_info, dict) else None
+        return bool(custom_query) and "{{since}}" in custom_query
+    
+    async def get_measurement_changes(
+        self,
+        since: Optional[Watermark] = None,
+        equipment_code: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        limit: int = 1000
+    ) -> ChangeSet:
+        """since 이후 측정 데이터 조회 (커스텀 쿼리에 {{since}}가 있으면 쿼리에서 범위 지정, timestamp, id 순으로 정렬해야 함)"""
+        if not self._supports_since('measurement_data'):
+            return await super().get_measurement_changes(since, equipment_code, equipment_type, limit)
+        
+        final_query, params = self._build_measurement_query(equipment_code, None, equipment_type, None, limit)
+        final_query = self._bind_since(final_query, params, since)
+        
+        async def fetch(fetch_limit: int) -> List[MeasurementRecord]:
+            result = await self.db.execute(text(final_query), self._with_limit(params, fetch_limit))
+            return [MeasurementRecord.from_row(row._mapping) for row in result]
+        
+        return await ChangeSet.fetch_overlapping(fetch, since, "timestamp", "id", limit)
+    
+    async def get_equipment_status_changes(
+        self,
+        since: Optional[Watermark] = None,
+        equipment_type: Optional[str] = None,
+        limit: int = 1000
+    ) -> ChangeSet:
+        """since 이후 상태가 바뀐 설비 조회 (커스텀 쿼리의 {{since}}를 last_run_time 조건에 사용)"""
+        if not self._supports_since('equipment_status'):
+            return await super().get_equipment_status_changes(since, equipment_type, limit)
+        
+        final_query, params = self._build_equipment_query(equipment_type, None, limit, 0)
+        final_query = self._bind_since(final_query, params, since)
+        
+        async def fetch(fetch_limit: int) -> List[EquipmentData]:
+            result = await self.db.execute(text(final_query), self._with_limit(params, fetch_limit))
+            return [self._equipment_from_row(dict(row._mapping)) for row in result]
+        
+        return await ChangeSet.fetch_overlapping(fetch, since, "last_run_time", "equipment_code", limit)
+    
     async def get_measurement_data(
         self,
         equipment_code: Optional[str] = None,
@@ -171,43 +270,12 @@ class PostgreSQLProvider(IDataProvider):
         equipment_type: Optional[str] = None,
         measurement_code: Optional[str] = None,
         limit: int = 100
-    ) -> List[MeasurementData]:
+    ) -> List[MeasurementRecord]:
         """측정 데이터 조회 (Spec 정보 포함) - Requires custom query configuration"""
         try:
-            # Always require custom query configuration - no default query
-            custom_query_info = self.custom_queries.get('measurement_data', {})
-            custom_query = custom_query_info.get('query') if isinstance(custom_query_info, dict) else None
-            
-            if not custom_query:
-                raise ValueError("PostgreSQL provider requires custom measurement_data query configuration")
-            
-            # Process custom query with parameter substitution (PostgreSQL style)
-            params = {}
-            final_query = custom_query
-            
-            # Replace placeholders with PostgreSQL parameter format
-            if equipment_code and "{{equipment_code}}" in final_query:
-                final_query = final_query.replace("{{equipment_code}}", ":equipment_code")
-                params["equipment_code"] = equipment_code
-            elif equipment_codes and "{{equipment_codes}}" in final_query:
-                # Handle multiple equipment codes
-                code_list = [code.strip() for code in equipment_codes.split(',')]
-                placeholders = ','.join([f':equipment_code_{i}' for i in range(len(code_list))])
-                final_query = final_query.replace("{{equipment_codes}}", placeholders)
-                for i, code in enumerate(code_list):
-                    params[f"equipment_code_{i}"] = code
-            
-            if equipment_type and "{{equipment_type}}" in final_query:
-                final_query = final_query.replace("{{equipment_type}}", ":equipment_type")
-                params["equipment_type"] = equipment_type
-                
-            if measurement_code and "{{measurement_code}}" in final_query:
-                final_query = final_query.replace("{{measurement_code}}", ":measurement_code")
-                params["measurement_code"] = measurement_code
-            
-            if "{{limit}}" in final_query:
-                final_query = final_query.replace("{{limit}}", ":limit")
-                params["limit"] = limit
+            final_query, params = self._build_measurement_query(
+                equipment_code, equipment_codes, equipment_type, measurement_code, limit
+            )
             
             logger.debug(f"Executing PostgreSQL measurement query: {final_query}")
             logger.debug(f"Parameters: {params}")
@@ -215,37 +283,171 @@ class PostgreSQLProvider(IDataProvider):
             # Execute the query
             result = await self.db.execute(text(final_query), params)
             
-            measurement_list = []
-            for row in result:
-                # Convert row to dict for easier handling
-                row_dict = dict(row._mapping)
-                
-                # Convert to MeasurementData object
-                measurement_obj = MeasurementData(
-                    id=int(row_dict.get('id', 0)),
-                    equipment_type=str(row_dict.get('equipment_type', '')),
-                    equipment_code=str(row_dict.get('equipment_code', '')),
-                    measurement_code=str(row_dict.get('measurement_code', '')),
-                    measurement_desc=str(row_dict.get('measurement_desc', '')),
-                    measurement_value=float(row_dict.get('measurement_value', 0.0)),
-                    timestamp=row_dict.get('timestamp'),
-                    spec_status=int(row_dict.get('spec_status', 0)),
-                    upper_spec_limit=row_dict.get('upper_spec_limit') or row_dict.get('usl'),
-                    lower_spec_limit=row_dict.get('lower_spec_limit') or row_dict.get('lsl'),
-                    target_value=row_dict.get('target_value') or row_dict.get('target')
-                )
-                measurement_list.append(measurement_obj)
+            # Convert rows to MeasurementRecord objects (custom queries may use upper_spec_limit etc.)
+            measurement_list = [MeasurementRecord.from_row(row._mapping) for row in result]
             
             return measurement_list
-            
+        
         except Exception as e:
             logger.error(f"Error getting measurement data: {e}")
             raise
     
+    def _build_measurement_query(
+        self,
+        equipment_code: Optional[str],
+        equipment_codes: Optional[str],
+        equipment_type: Optional[str],
+        measurement_code: Optional[str],
+        limit: int,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> tuple:
+        """측정 데이터 커스텀 쿼리의 {{...}} 플레이스홀더를 바인드 파라미터로 치환"""
+        # Always require custom query configuration - no default query
+        custom_query_info = self.custom_queries.get('measurement_data', {})
+        custom_query = custom_query_info.get('query') if isinstance(custom_query_info, dict) else None
+        
+        if not custom_query:
+            raise ValueError("PostgreSQL provider requires custom measurement_data query configuration")
+        
+        # Process custom query with parameter substitution (PostgreSQL style)
+        params = {}
+        final_query = custom_query
+        
+        # Replace placeholders with PostgreSQL parameter format
+        if equipment_code and "{{equipment_code}}" in final_query:
+            final_query = final_query.replace("{{equipment_code}}", ":equipment_code")
+            params["equipment_code"] = equipment_code
+        elif equipment_codes and "{{equipment_codes}}" in final_query:
+            # Handle multiple equipment codes
+            code_list = [code.strip() for code in equipment_codes.split(',')]
+            placeholders = ','.join([f':equipment_code_{i}' for i in range(len(code_list))])
+            final_query = final_query.replace("{{equipment_codes}}", placeholders)
+            for i, code in enumerate(code_list):
+                params[f"equipment_code_{i}"] = code
+        
+        if equipment_type and "{{equipment_type}}" in final_query:
+            final_query = final_query.replace("{{equipment_type}}", ":equipment_type")
+            params["equipment_type"] = equipment_type
+        
+        if measurement_code and "{{measurement_code}}" in final_query:
+            final_query = final_query.replace("{{measurement_code}}", ":measurement_code")
+            params["measurement_code"] = measurement_code
+        
+        if "{{limit}}" in final_query:
+            final_query = final_query.replace("{{limit}}", ":limit")
+            params["limit"] = limit
+        
+        # 다운샘플링 조회 구간 (쿼리가 지원하면 인덱스 범위 조건으로 사용)
+        if start_time and "{{start_time}}" in final_query:
+            final_query = final_query.replace("{{start_time}}", ":start_time")
+            params["start_time"] = start_time
+        
+        if end_time and "{{end_time}}" in final_query:
+            final_query = final_query.replace("{{end_time}}", ":end_time")
+            params["end_time"] = end_time
+        
+        return final_query, params
+    
+    async def get_measurements_in_range(
+        self,
+        start_time: datetime,
+        end_time: datetime,
+        equipment_code: Optional[str] = None,
+        equipment_codes: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        measurement_code: Optional[str] = None,
+        limit: int = 1000
+    ) -> Optional[List[MeasurementRecord]]:
+        """커스텀 측정 쿼리를 감싸 조회 구간 안의 원본 행만 최신순으로 조회 (Python 다운샘플링용)"""
+        source_query, params = self._build_measurement_query(
+            equipment_code, equipment_codes, equipment_type, measurement_code, limit, start_time, end_time
+        )
+        params.update({"ds_start": start_time.timestamp(), "ds_end": end_time.timestamp(), "ds_limit": limit})
+        
+        # 버킷 집계와 같은 epoch 비교 (timestamp/timestamptz 컬럼 모두 동일하게 처리)
+        query = f"""
+            WITH source AS ({source_query.strip().rstrip(';')})
+            SELECT source.* FROM source
+            WHERE CAST(EXTRACT(EPOCH FROM source."timestamp") AS DOUBLE PRECISION)
+                BETWEEN CAST(:ds_start AS DOUBLE PRECISION) AND CAST(:ds_end AS DOUBLE PRECISION)
+            ORDER BY source."timestamp" DESC
+            LIMIT :ds_limit
+        """
+        result = await self.db.execute(text(query), params)
+        return [MeasurementRecord.from_row(row._mapping) for row in result]
+    
+    async def get_bucketed_measurements(
+        self,
+        request: DownsampleRequest,
+        equipment_code: Optional[str] = None,
+        equipment_codes: Optional[str] = None,
+        equipment_type: Optional[str] = None,
+        measurement_code: Optional[str] = None
+    ) -> Optional[List[MeasurementRecord]]:
+        """커스텀 측정 쿼리를 감싸 (설비, 측정 코드, 시간 버킷)별 min/max 행 또는 평균을 SQL에서 계산"""
+        start, end = request.resolve_range()
+        source_query, params = self._build_measurement_query(
+            equipment_code, equipment_codes, equipment_type, measurement_code,
+            settings.DOWNSAMPLE_MAX_SOURCE_ROWS, start, end
+        )
+        params.update({
+            "ds_start": start.timestamp(),
+            "ds_end": end.timestamp(),
+            "ds_width": request.bucket_seconds(start, end),
+            "ds_last": request.bucket_count - 1,
+        })
+        
+        # 커스텀 쿼리 컬럼명(upper_spec_limit 등)은 from_row가 처리하므로 버킷 키만 추가
+        ranged = f"""
+            WITH source AS ({source_query.strip().rstrip(';')}),
+            epochs AS (
+                SELECT source.*, CAST(EXTRACT(EPOCH FROM source."timestamp") AS DOUBLE PRECISION) AS ds_epoch
+                FROM source
+            ),
+            ranged AS (
+                SELECT epochs.*, LEAST(
+                    FLOOR((ds_epoch - CAST(:ds_start AS DOUBLE PRECISION)) / CAST(:ds_width AS DOUBLE PRECISION)),
+                    CAST(:ds_last AS INTEGER)
+                ) AS ds_bucket
+                FROM epochs
+                WHERE ds_epoch BETWEEN CAST(:ds_start AS DOUBLE PRECISION) AND CAST(:ds_end AS DOUBLE PRECISION)
+            )
+        """
+        if request.method == "minmax":
+            query = ranged + """
+                , ranked AS (
+                    SELECT ranged.*,
+                        ROW_NUMBER() OVER (PARTITION BY equipment_code, measurement_code, ds_bucket ORDER BY measurement_value ASC, "timestamp") AS ds_low,
+                        ROW_NUMBER() OVER (PARTITION BY equipment_code, measurement_code, ds_bucket ORDER BY measurement_value DESC, "timestamp") AS ds_high
+                    FROM ranged
+                )
+                SELECT * FROM ranked WHERE ds_low = 1 OR ds_high = 1 ORDER BY "timestamp" DESC
+            """
+        else:
+            # DISTINCT ON으로 버킷 첫 행의 나머지 컬럼(규격 한계 등)을 유지하고 값만 평균으로 교체
+            query = ranged + """
+                SELECT DISTINCT ON (equipment_code, measurement_code, ds_bucket) ranged.*,
+                    AVG(measurement_value) OVER (PARTITION BY equipment_code, measurement_code, ds_bucket) AS ds_avg
+                FROM ranged
+                ORDER BY equipment_code, measurement_code, ds_bucket, "timestamp"
+            """
+        
+        result = await self.db.execute(text(query), params)
+        records = []
+        for row in result:
+            row_dict = dict(row._mapping)
+            if "ds_avg" in row_dict:
+                row_dict["measurement_value"] = row_dict["ds_avg"]
+            records.append(MeasurementRecord.from_row(row_dict))
+        if request.method == "avg":
+            records.sort(key=lambda record: record.timestamp, reverse=True)
+        return records
+    
     async def get_latest_measurement(
         self,
         equipment_code: str
-    ) -> Optional[MeasurementData]:
+    ) -> Optional[MeasurementRecord]:
         """특정 설비의 최신 측정 데이터 조회"""
         try:
             query = """
@@ -256,12 +458,8 @@ class PostgreSQLProvider(IDataProvider):
                     measurement_code,
                     measurement_desc,
                     measurement_value,
-                    timestamp,
-                    usl,
-                    lsl,
-                    target,
-                    spec_status
-                FROM v_measurement_data_with_spec
+                    timestamp
+                FROM personal_test_measurement_data
                 WHERE equipment_code = :equipment_code
                 ORDER BY timestamp DESC
                 LIMIT 1
@@ -274,19 +472,7 @@ class PostgreSQLProvider(IDataProvider):
             row = result.first()
             
             if row:
-                return MeasurementData(
-                    id=row.id,
-                    equipment_type=row.equipment_type,
-                    equipment_code=row.equipment_code,
-                    measurement_code=row.measurement_code,
-                    measurement_desc=row.measurement_desc,
-                    measurement_value=row.measurement_value,
-                    timestamp=row.timestamp,
-                    usl=row.usl,
-                    lsl=row.lsl,
-                    target=row.target,
-                    spec_status=row.spec_status
-                )
+                return MeasurementRecord.from_row(row._mapping)
             
             return None
             
@@ -294,6 +480,35 @@ class PostgreSQLProvider(IDataProvider):
             logger.error(f"Error getting latest measurement: {e}")
             raise
     
+    async def get_latest_measurements_since(
+        self,
+        since: Optional[datetime] = None
+    ) -> Optional[List[MeasurementRecord]]:
+        """(설비, 측정 코드)별 최신 측정 데이터 조회 (since 이후 행만, 최신값 캐시 증분 갱신용)"""
+        where_clause = 'WHERE "timestamp" >= :since' if since is not None else ""
+        query = f"""
+            SELECT DISTINCT ON (equipment_code, measurement_code)
+                id,
+                equipment_type,
+                equipment_code,
+                measurement_code,
+                measurement_desc,
+                measurement_value,
+                timestamp
+            FROM personal_test_measurement_data
+            {where_clause}
+            ORDER BY equipment_code, measurement_code, timestamp DESC
+        """
+        
+        result = await self.db.execute(text(query), {"since": since} if since is not None else {})
+        return [MeasurementRecord.from_row(row._mapping) for row in result]
+
+    async def load_measurement_specs(self) -> List[tuple]:
+        """spec engine용 measurement_specs 로드 (실패해도 세션 트랜잭션이 깨지지 않도록 savepoint 사용)"""
+        async with self.db.begin_nested():
+            result = await self.db.execute(text("SELECT measurement_code, usl, lsl, target FROM measurement_specs"))
+            return [tuple(row) for row in result]
+    
     async def update_equipment_status(
         self,
         equipment_code: str,
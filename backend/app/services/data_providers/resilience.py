@@ -0,0 +1,230 @@
+"""
+Per-data-source circuit breaker and bulkhead.
+
+One slow or failing plant database must not hold DB sessions and worker
+slots for every other tenant, so each data_source_id gets its own breaker
+(fail fast while open, single half-open probe) and a bounded concurrency
+slot pool.
+"""
+import asyncio
+import logging
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple, Type
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import InterfaceError as SQLAlchemyInterfaceError
+from sqlalchemy.exc import OperationalError as SQLAlchemyOperationalError
+
+from app.core.config import settings
+from app.core.security import CircuitBreakerState
+
+logger = logging.getLogger(__name__)
+
+
+def _connectivity_error_types() -> Tuple[Type[BaseException], ...]:
+    """Exception types that mean the data source itself is unreachable or broken."""
+    types = [OSError, asyncio.TimeoutError, SQLAlchemyOperationalError, SQLAlchemyInterfaceError]
+    try:
+        import asyncpg
+        types += [asyncpg.PostgresConnectionError, asyncpg.InterfaceError]
+    except ImportError:
+        pass
+    try:
+        import pyodbc
+        types += [pyodbc.OperationalError, pyodbc.InterfaceError]
+    except ImportError:
+        pass
+    try:
+        import httpx
+        types.append(httpx.TransportError)
+    except ImportError:
+        pass
+    return tuple(types)
+
+
+CONNECTIVITY_ERRORS = _connectivity_error_types()
+
+
+def is_connectivity_error(error: BaseException) -> bool:
+    """
+    Whether an exception (or one it was raised from) is a connectivity failure.
+    
+    Client errors (ValueError, HTTPException) never count, even when caused by a
+    driver error, so bad parameters or expired watermarks cannot open the breaker.
+    """
+    seen = 0
+    while error is not None and seen < 10:
+        if isinstance(error, (ValueError, HTTPException)):
+            return False
+        if isinstance(error, CONNECTIVITY_ERRORS):
+            return True
+        error = error.__cause__ or error.__context__
+        seen += 1
+    return False
+
+
+class DataSourceUnavailableError(HTTPException):
+    """Raised without touching the data source when its breaker is open or its bulkhead is full."""
+    
+    def __init__(self, data_source_id: str, reason: str, retry_after: float):
+        self.data_source_id = data_source_id
+        self.reason = reason
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Data source {data_source_id} is temporarily unavailable ({reason})",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
+
+class DataSourceCircuitBreaker:
+    """Consecutive-failure circuit breaker with a single half-open probe."""
+    
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitBreakerState.CLOSED
+        self.failure_count = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.times_opened = 0
+    
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+    
+    def try_acquire(self) -> bool:
+        """Whether a call may proceed; moves OPEN -> HALF_OPEN once the timeout elapsed."""
+        if self.state == CircuitBreakerState.CLOSED:
+            return True
+        if self.state == CircuitBreakerState.OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.state = CircuitBreakerState.HALF_OPEN
+            self._probe_in_flight = False
+        # HALF_OPEN: only one probe call at a time
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+    
+    def release_probe(self):
+        """Give up a half-open probe slot without recording an outcome."""
+        self._probe_in_flight = False
+    
+    def record_success(self):
+        if self.state != CircuitBreakerState.CLOSED:
+            logger.info("Data source circuit breaker closed after successful probe")
+        self.state = CircuitBreakerState.CLOSED
+        self.failure_count = 0
+        self._probe_in_flight = False
+    
+    def record_failure(self):
+        self.failure_count += 1
+        self._probe_in_flight = False
+        if self.state == CircuitBreakerState.HALF_OPEN or self.failure_count >= self.failure_threshold:
+            if self.state != CircuitBreakerState.OPEN:
+                self.times_opened += 1
+            self.state = CircuitBreakerState.OPEN
+            self.opened_at = time.monotonic()
+
+
+class DataSourceGuard:
+    """Circuit breaker + concurrency bulkhead for one data source."""
+    
+    def __init__(self, data_source_id: str):
+        self.data_source_id = data_source_id
+        self.breaker = DataSourceCircuitBreaker(
+            failure_threshold=settings.DATA_SOURCE_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.DATA_SOURCE_BREAKER_RESET_SECONDS
+        )
+        self.max_concurrency = settings.DATA_SOURCE_MAX_CONCURRENCY
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.in_flight = 0
+        self.calls = {
+            "success": 0,
+            "failure": 0,
+            "error": 0,  # request/query errors that do not count against the breaker
+            "rejected_open": 0,
+            "rejected_bulkhead": 0
+        }
+    
+    @asynccontextmanager
+    async def call(self):
+        """Guard one provider call (fail fast when open or saturated)."""
+        if not self.breaker.try_acquire():
+            self.calls["rejected_open"] += 1
+            raise DataSourceUnavailableError(self.data_source_id, "circuit open", self.breaker.retry_after())
+        
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=settings.DATA_SOURCE_BULKHEAD_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            # Saturation is not the data source's fault; don't count it as a breaker failure
+            self.breaker.release_probe()
+            self.calls["rejected_bulkhead"] += 1
+            raise DataSourceUnavailableError(
+                self.data_source_id, "too many concurrent requests", settings.DATA_SOURCE_BULKHEAD_TIMEOUT_SECONDS
+            )
+        
+        self.in_flight += 1
+        try:
+            yield
+        except asyncio.CancelledError:
+            self.breaker.release_probe()
+            raise
+        except Exception as e:
+            if not is_connectivity_error(e):
+                self.calls["error"] += 1
+                self.breaker.release_probe()
+                raise
+            self.calls["failure"] += 1
+            was_open = self.breaker.state == CircuitBreakerState.OPEN
+            self.breaker.record_failure()
+            if not was_open and self.breaker.state == CircuitBreakerState.OPEN:
+                logger.warning(
+                    f"Circuit breaker OPENED for data source {self.data_source_id} "
+                    f"after {self.breaker.failure_count} consecutive failures"
+                )
+            raise
+        else:
+            self.calls["success"] += 1
+            self.breaker.record_success()
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state.value,
+            "failure_count": self.breaker.failure_count,
+            "times_opened": self.breaker.times_opened,
+            "retry_after_seconds": round(self.breaker.retry_after(), 1)
+            if self.breaker.state == CircuitBreakerState.OPEN else 0,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "calls": dict(self.calls)
+        }
+
+
+class DataSourceGuardRegistry:
+    """data_source_id -> DataSourceGuard"""
+    
+    def __init__(self):
+        self._guards: Dict[str, DataSourceGuard] = {}
+    
+    def get(self, data_source_id: Any) -> DataSourceGuard:
+        key = str(data_source_id)
+        guard = self._guards.get(key)
+        if guard is None:
+            guard = self._guards[key] = DataSourceGuard(key)
+        return guard
+    
+    def find(self, data_source_id: Any) -> Optional[DataSourceGuard]:
+        return self._guards.get(str(data_source_id))
+    
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {key: guard.get_stats() for key, guard in self._guards.items()}
+
+
+# Global guard registry
+data_source_guards = DataSourceGuardRegistry()
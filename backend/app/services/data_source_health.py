@@ -0,0 +1,388 @@
+"""
+데이터 소스 상태 모니터
+활성화된 data_source_configs 를 주기적으로 점검하고, 상태 조회 API 는
+매번 연결을 새로 만드는 대신 메모리에 유지되는 최근 점검 결과를 반환합니다.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import deque
+from urllib.parse import urlsplit
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import text
+
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from .performance_monitor import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+# 가용성/지연 시간 통계에 사용하는 최근 점검 결과 수
+PROBE_HISTORY_SIZE = 120
+
+# 동시에 점검하는 데이터 소스 수
+PROBE_CONCURRENCY = 5
+
+_CONFIG_QUERY = """
+    SELECT
+        id, workspace_id, config_name, source_type,
+        api_url, api_key, api_headers, mssql_connection_string
+    FROM data_source_configs
+    WHERE is_active = true
+"""
+
+
+@dataclass
+class ProbeResult:
+    """단일 점검 결과"""
+    timestamp: float
+    success: bool
+    latency_ms: float
+    error: Optional[str] = None
+
+
+def mask_api_url(url: Optional[str]) -> str:
+    """API URL 에서 경로/쿼리/계정 정보를 제외한 scheme://host[:port] 만 남김 (토큰이 URL 에 포함되는 경우 대비)"""
+    try:
+        parts = urlsplit(url or "")
+        host = parts.hostname
+        port = parts.port
+    except ValueError:
+        return "Unknown"
+    if not parts.scheme or not host:
+        return "Unknown"
+    return f"{parts.scheme}://{host}:{port}" if port else f"{parts.scheme}://{host}"
+
+
+@dataclass
+class DataSourceTarget:
+    """점검 대상 데이터 소스 (복호화된 접속 정보 포함)"""
+    source_id: str
+    workspace_id: str
+    config_name: Optional[str]
+    source_type: str
+    connection_string: Optional[str] = None
+    api_key: Optional[str] = None
+    headers: Optional[Dict[str, str]] = None
+    
+    @property
+    def fingerprint(self) -> str:
+        """접속 정보 변경 감지용 해시"""
+        raw = json.dumps([self.source_type, self.connection_string, self.api_key, self.headers], sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    @property
+    def connection_info(self) -> str:
+        if self.source_type == "postgresql":
+            return "Current PostgreSQL database"
+        if self.source_type == "mssql":
+            server_match = re.search(r'server=([^;]+)', self.connection_string or "", re.IGNORECASE)
+            database_match = re.search(r'database=([^;]+)', self.connection_string or "", re.IGNORECASE)
+            server = server_match.group(1) if server_match else "Unknown"
+            database = database_match.group(1) if database_match else "Unknown"
+            return f"MSSQL Server: {server}, Database: {database}"
+        if self.source_type == "api":
+            return f"API Endpoint: {mask_api_url(self.connection_string)}"
+        return self.source_type
+
+
+@dataclass
+class DataSourceHealth:
+    """데이터 소스별 상태와 최근 점검 이력"""
+    target: DataSourceTarget
+    history: Deque[ProbeResult] = field(default_factory=lambda: deque(maxlen=PROBE_HISTORY_SIZE))
+    consecutive_failures: int = 0
+    last_success: Optional[datetime] = None
+    snapshot: Optional[Dict[str, Any]] = None
+    
+    def record(self, result: ProbeResult):
+        """점검 결과 반영 후 조회용 스냅샷 갱신"""
+        self.history.append(result)
+        if result.success:
+            self.consecutive_failures = 0
+            self.last_success = datetime.fromtimestamp(result.timestamp)
+        else:
+            self.consecutive_failures += 1
+        
+        latencies = LatencyHistogram()
+        successes = 0
+        for probe in self.history:
+            if probe.success:
+                successes += 1
+                latencies.record(probe.latency_ms)
+        
+        self.snapshot = {
+            "id": self.target.source_id,
+            "source_type": self.target.source_type,
+            "status": "connected" if result.success else "error",
+            "connection_info": self.target.connection_info if result.success else "Connection failed",
+            "last_checked": datetime.fromtimestamp(result.timestamp).isoformat(),
+            "error": result.error,
+            "health": {
+                "latency_ms": round(result.latency_ms, 3),
+                "availability": round(successes / len(self.history), 4),
+                "probes": len(self.history),
+                "consecutive_failures": self.consecutive_failures,
+                "last_success": self.last_success.isoformat() if self.last_success else None,
+                "latency_p50_ms": round(latencies.percentile(50), 3),
+                "latency_p95_ms": round(latencies.percentile(95), 3)
+            }
+        }
+
+
+class DataSourceHealthMonitor:
+    """활성 데이터 소스 주기 점검기
+    
+    MSSQL 은 ConnectionPoolManager 의 데이터 소스별 공유 aioodbc 풀을, API 는 공용 httpx
+    클라이언트를 재사용하므로 점검마다 풀을 생성/해제하지 않는다.
+    """
+    
+    def __init__(self):
+        self._health: Dict[str, DataSourceHealth] = {}
+        self._providers: Dict[str, Any] = {}
+        self._provider_fingerprints: Dict[str, str] = {}
+        self._http_client = None
+        self._task: Optional[asyncio.Task] = None
+        self._semaphore = asyncio.Semaphore(PROBE_CONCURRENCY)
+    
+    # ------------------------------------------------------------------
+    # 설정 로드
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _decrypt(value: Optional[str]) -> Optional[str]:
+        """암호화 값 복호화 (실패 시 평문으로 간주)"""
+        if not value:
+            return None
+        from ..core.security import decrypt_connection_string
+        return decrypt_connection_string(value)
+    
+    def _build_target(self, row: Any) -> DataSourceTarget:
+        source_type = row.source_type.lower() if row.source_type else "postgresql"
+        headers = row.api_headers
+        if isinstance(headers, str):
+            headers = json.loads(headers) if headers else None
+        
+        connection_string = None
+        if source_type == "api":
+            connection_string = self._decrypt(row.api_url)
+        elif source_type == "mssql":
+            connection_string = self._decrypt(row.mssql_connection_string)
+        
+        return DataSourceTarget(
+            source_id=str(row.id),
+            workspace_id=str(row.workspace_id),
+            config_name=row.config_name,
+            source_type=source_type,
+            connection_string=connection_string,
+            api_key=self._decrypt(row.api_key) if source_type == "api" else None,
+            headers=headers
+        )
+    
+    async def refresh_sources(self) -> int:
+        """활성 데이터 소스 목록 갱신 (비활성/삭제된 소스는 정리)"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(text(_CONFIG_QUERY))
+            rows = result.fetchall()
+        
+        active = set()
+        for row in rows:
+            target = self._build_target(row)
+            active.add(target.source_id)
+            health = self._health.get(target.source_id)
+            if health is None:
+                self._health[target.source_id] = DataSourceHealth(target=target)
+            elif health.target.fingerprint != target.fingerprint:
+                health.target = target
+                await self._release_provider(target.source_id)
+        
+        for source_id in list(self._health):
+            if source_id not in active:
+                del self._health[source_id]
+                await self._release_provider(source_id)
+        
+        return len(active)
+    
+    async def _load_target(self, source_id: str) -> Optional[DataSourceTarget]:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                text(_CONFIG_QUERY + " AND id = :id"), {"id": source_id}
+            )
+            row = result.fetchone()
+        return self._build_target(row) if row else None
+    
+    # ------------------------------------------------------------------
+    # 점검
+    # ------------------------------------------------------------------
+    
+    async def _get_mssql_provider(self, target: DataSourceTarget):
+        """소스별 점검용 MSSQL 프로바이더 (풀 유지)"""
+        provider = self._providers.get(target.source_id)
+        if provider is not None and self._provider_fingerprints.get(target.source_id) == target.fingerprint:
+            return provider
+        await self._release_provider(target.source_id)
+        
+        from .data_providers.mssql import MSSQLProvider
+        provider = MSSQLProvider(
+            connection_string=target.connection_string,
+            workspace_id=target.workspace_id,
+            data_source_id=target.source_id
+        )
+        self._providers[target.source_id] = provider
+        self._provider_fingerprints[target.source_id] = target.fingerprint
+        return provider
+    
+    async def get_mssql_provider(self, source_id: str):
+        """연결 테스트 등에서 재사용할 수 있는 소스별 MSSQL 프로바이더"""
+        health = self._health.get(source_id)
+        target = health.target if health else await self._load_target(source_id)
+        if target is None or target.source_type != "mssql":
+            return None
+        return await self._get_mssql_provider(target)
+    
+    async def _release_provider(self, source_id: str):
+        provider = self._providers.pop(source_id, None)
+        self._provider_fingerprints.pop(source_id, None)
+        if provider is not None:
+            try:
+                await provider.disconnect()
+            except Exception as e:
+                logger.debug(f"Failed to close health probe provider for {source_id}: {e}")
+    
+    def _get_http_client(self):
+        if self._http_client is None:
+            import httpx
+            self._http_client = httpx.AsyncClient(timeout=settings.DATA_SOURCE_PROBE_TIMEOUT_SECONDS)
+        return self._http_client
+    
+    async def _check(self, target: DataSourceTarget):
+        """소스 유형별 연결 확인 (실패 시 예외)"""
+        if target.source_type == "postgresql":
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(text("SELECT 1"))
+                if result.scalar() != 1:
+                    raise RuntimeError("Unexpected result from SELECT 1")
+        
+        elif target.source_type == "mssql":
+            if not target.connection_string:
+                raise RuntimeError("No connection string configured")
+            provider = await self._get_mssql_provider(target)
+            async with provider.get_connection() as cursor:
+                await cursor.execute("SELECT 1")
+                await cursor.fetchone()
+        
+        elif target.source_type == "api":
+            if not target.connection_string:
+                raise RuntimeError("No API URL configured")
+            headers = dict(target.headers or {})
+            if target.api_key:
+                headers["Authorization"] = f"Bearer {target.api_key}"
+            response = await self._get_http_client().get(target.connection_string, headers=headers)
+            if response.status_code >= 400:
+                raise RuntimeError(f"API responded with HTTP {response.status_code}")
+        
+        else:
+            raise RuntimeError(f"Unsupported source type: {target.source_type}")
+    
+    async def probe(self, source_id: str) -> Optional[Dict[str, Any]]:
+        """단일 데이터 소스 즉시 점검 후 스냅샷 반환 (미등록 소스는 DB 에서 로드)"""
+        health = self._health.get(source_id)
+        if health is None:
+            target = await self._load_target(source_id)
+            if target is None:
+                return None
+            health = self._health.setdefault(source_id, DataSourceHealth(target=target))
+        
+        async with self._semaphore:
+            start = time.perf_counter()
+            error = None
+            try:
+                await asyncio.wait_for(self._check(health.target), timeout=settings.DATA_SOURCE_PROBE_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                error = f"Probe timed out after {settings.DATA_SOURCE_PROBE_TIMEOUT_SECONDS}s"
+            except Exception as e:
+                error = str(e)
+            latency_ms = (time.perf_counter() - start) * 1000
+        
+        health.record(ProbeResult(time.time(), error is None, latency_ms, error))
+        if error:
+            logger.warning(f"Data source {source_id} ({health.target.source_type}) probe failed: {error}")
+        return health.snapshot
+    
+    async def probe_all(self):
+        """등록된 모든 데이터 소스 점검"""
+        await asyncio.gather(*(self.probe(source_id) for source_id in list(self._health)))
+    
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    
+    def get_status(self, source_id: str) -> Optional[Dict[str, Any]]:
+        """최근 점검 스냅샷 (점검 이력이 없으면 None)"""
+        health = self._health.get(source_id)
+        return health.snapshot if health else None
+    
+    def get_statuses(self, workspace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [
+            health.snapshot for health in self._health.values()
+            if health.snapshot and (workspace_id is None or health.target.workspace_id == workspace_id)
+        ]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        statuses = [health.snapshot for health in self._health.values() if health.snapshot]
+        return {
+            "sources": len(self._health),
+            "connected": sum(1 for s in statuses if s["status"] == "connected"),
+            "failing": sum(1 for s in statuses if s["status"] != "connected"),
+            "warm_pools": len(self._providers),
+            "running": self._task is not None and not self._task.done()
+        }
+    
+    # ------------------------------------------------------------------
+    # 백그라운드 실행
+    # ------------------------------------------------------------------
+    
+    async def _run(self, interval: float):
+        while True:
+            try:
+                await self.refresh_sources()
+                await self.probe_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Data source health check cycle failed: {e}")
+            await asyncio.sleep(interval)
+    
+    def start(self, interval: Optional[float] = None):
+        """주기 점검 시작 (애플리케이션 시작 시)"""
+        if self._task is not None and not self._task.done():
+            return
+        interval = interval or settings.DATA_SOURCE_HEALTH_INTERVAL_SECONDS
+        self._task = asyncio.create_task(self._run(interval))
+        logger.info(f"Data source health monitor started (interval: {interval}s)")
+    
+    async def stop(self):
+        """주기 점검 중지 및 점검용 연결 정리"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        
+        for source_id in list(self._providers):
+            await self._release_provider(source_id)
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+
+# 전역 데이터 소스 상태 모니터 인스턴스
+data_source_health_monitor = DataSourceHealthMonitor()
@@ -2,25 +2,100 @@
 Data Source Mapping Service
 Handles mapping between external data sources and internal system codes
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import json
 import logging
-from datetime import datetime
+import time
 import uuid
 
 logger = logging.getLogger(__name__)
 
 
+class MappingCacheEntry:
+    """Cached mappings of one (workspace, data source, mapping type) plus a source -> target code index"""
+    
+    __slots__ = ("workspace_id", "data_source_id", "mappings", "targets", "loaded_at")
+    
+    def __init__(self, workspace_id: str, data_source_id: str, mappings: Dict[str, Dict[str, Any]]):
+        self.workspace_id = workspace_id
+        self.data_source_id = data_source_id
+        self.mappings = mappings
+        # mapping_type -> {source_code: target_code}, built once per load
+        self.targets: Dict[str, Dict[str, str]] = {}
+        for mapping in mappings.values():
+            self.targets.setdefault(mapping["mapping_type"], {})[mapping["source_code"]] = mapping["target_code"]
+        self.loaded_at = time.monotonic()
+
+
+class MappingCache:
+    """Process-wide mapping cache shared by every MappingService instance, with a TTL per entry"""
+    
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, MappingCacheEntry] = {}
+        # Bumped on invalidation so a load that started before it cannot store its stale result
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "stale_puts": 0}
+    
+    @staticmethod
+    def make_key(workspace_id: str, data_source_id: str, mapping_type: Optional[str]) -> str:
+        return f"{workspace_id}:{data_source_id}:{mapping_type or 'all'}"
+    
+    def get(self, key: str) -> Optional[MappingCacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        if time.monotonic() - entry.loaded_at >= self.ttl_seconds:
+            self._entries.pop(key, None)
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return entry
+    
+    def generation(self, data_source_id: str) -> Tuple[int, int]:
+        """Token to take before loading and pass to put()"""
+        return self._epoch, self._generations.get(str(data_source_id), 0)
+    
+    def put(self, key: str, entry: MappingCacheEntry, generation: Tuple[int, int]) -> None:
+        """Store a loaded entry unless its data source was invalidated while it was loading"""
+        if generation != self.generation(entry.data_source_id):
+            self.stats["stale_puts"] += 1
+            return
+        self._entries[key] = entry
+    
+    def invalidate(self, workspace_id: Optional[str] = None, data_source_id: Optional[str] = None) -> None:
+        """Drop entries of a data source and/or workspace (everything when both are None)"""
+        if workspace_id is None and data_source_id is None:
+            self._entries.clear()
+        else:
+            for key, entry in list(self._entries.items()):
+                if (data_source_id is None or entry.data_source_id == str(data_source_id)) and \
+                        (workspace_id is None or entry.workspace_id == str(workspace_id)):
+                    del self._entries[key]
+        if data_source_id is None:
+            self._epoch += 1
+        else:
+            key = str(data_source_id)
+            self._generations[key] = self._generations.get(key, 0) + 1
+        self.stats["invalidations"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._entries), "ttl_seconds": self.ttl_seconds}
+
+
+# Global mapping cache
+mapping_cache = MappingCache()
+
+
 class MappingService:
     """Service for managing data source mappings"""
     
     def __init__(self, db: AsyncSession):
         self.db = db
-        self._mapping_cache: Dict[str, Dict[str, str]] = {}
-        self._cache_timestamp: Optional[datetime] = None
-        self._cache_ttl_seconds = 300  # 5 minutes cache
     
     async def get_mappings(
         self, 
@@ -33,12 +108,25 @@ class MappingService:
         Get all mappings for a data source.
         Returns dict: {source_code: {target_code, transform_rules, ...}}
         """
-        cache_key = f"{workspace_id}:{data_source_id}:{mapping_type or 'all'}"
+        entry = await self._get_entry(workspace_id, data_source_id, mapping_type, use_cache)
+        return entry.mappings if entry else {}
+    
+    async def _get_entry(
+        self,
+        workspace_id: str,
+        data_source_id: str,
+        mapping_type: Optional[str],
+        use_cache: bool = True
+    ) -> Optional[MappingCacheEntry]:
+        cache_key = MappingCache.make_key(workspace_id, data_source_id, mapping_type)
         
         # Check cache
-        if use_cache and self._is_cache_valid() and cache_key in self._mapping_cache:
-            return self._mapping_cache[cache_key]
+        if use_cache:
+            entry = mapping_cache.get(cache_key)
+            if entry is not None:
+                return entry
         
+        generation = mapping_cache.generation(data_source_id)
         try:
             query = """
                 SELECT 
@@ -81,14 +169,14 @@ class MappingService:
                 }
             
             # Update cache
-            self._mapping_cache[cache_key] = mappings
-            self._cache_timestamp = datetime.now()
+            entry = MappingCacheEntry(str(workspace_id), str(data_source_id), mappings)
+            mapping_cache.put(cache_key, entry, generation)
             
-            return mappings
+            return entry
             
         except Exception as e:
             logger.error(f"Error getting mappings: {e}")
-            return {}
+            return None
     
     async def map_equipment_code(
         self,
@@ -98,13 +186,7 @@ class MappingService:
         default: Optional[str] = None
     ) -> str:
         """Map external equipment code to internal code"""
-        mappings = await self.get_mappings(workspace_id, data_source_id, "equipment")
-        key = f"equipment:{source_code}"
-        
-        if key in mappings:
-            return mappings[key]["target_code"]
-        
-        return default or source_code
+        return await self._map_code(workspace_id, data_source_id, "equipment", source_code, default)
     
     async def map_measurement_code(
         self,
@@ -114,11 +196,20 @@ class MappingService:
         default: Optional[str] = None
     ) -> str:
         """Map external measurement code to internal code"""
-        mappings = await self.get_mappings(workspace_id, data_source_id, "measurement")
-        key = f"measurement:{source_code}"
-        
-        if key in mappings:
-            return mappings[key]["target_code"]
+        return await self._map_code(workspace_id, data_source_id, "measurement", source_code, default)
+    
+    async def _map_code(
+        self,
+        workspace_id: str,
+        data_source_id: str,
+        mapping_type: str,
+        source_code: str,
+        default: Optional[str]
+    ) -> str:
+        entry = await self._get_entry(workspace_id, data_source_id, mapping_type)
+        target = entry.targets.get(mapping_type, {}).get(source_code) if entry else None
+        if target is not None:
+            return target
         
         return default or source_code
     
@@ -216,7 +307,7 @@ class MappingService:
             await self.db.commit()
             
             # Invalidate cache
-            self._invalidate_cache()
+            self._invalidate_cache(data_source_id=data_source_id)
             
             return mapping_id
             
@@ -284,7 +375,7 @@ class MappingService:
             await self.db.commit()
             
             # Invalidate cache
-            self._invalidate_cache()
+            self._invalidate_cache(data_source_id=data_source_id)
             
             return result.rowcount > 0
             
@@ -293,15 +384,6 @@ class MappingService:
             await self.db.rollback()
             return False
     
-    def _is_cache_valid(self) -> bool:
-        """Check if cache is still valid"""
-        if not self._cache_timestamp:
-            return False
-        
-        age = (datetime.now() - self._cache_timestamp).total_seconds()
-        return age < self._cache_ttl_seconds
-    
-    def _invalidate_cache(self):
-        """Invalidate the mapping cache"""
-        self._mapping_cache.clear()
-        self._cache_timestamp = None
\ No newline at end of file
+    def _invalidate_cache(self, workspace_id: Optional[str] = None, data_source_id: Optional[str] = None):
+        """Invalidate the shared mapping cache for a data source"""
+        mapping_cache.invalidate(workspace_id, data_source_id)
@@ -0,0 +1,157 @@
+"""
+Downsampling Service
+측정 시계열을 (설비, 측정 코드)별로 목표 포인트 수에 맞게 줄이는 서비스 (LTTB / min-max / 평균 버킷)
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import logging
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+DOWNSAMPLE_METHODS = ("lttb", "minmax", "avg")
+
+# SQL 버킷 집계로 데이터베이스에 위임할 수 있는 방식 (LTTB는 순차 알고리즘이라 Python에서 처리)
+SQL_BUCKET_METHODS = ("minmax", "avg")
+
+
+def to_local_naive(value: datetime) -> datetime:
+    """timezone 정보가 있으면 로컬 시간으로 바꾼 뒤 제거 (MSSQL datetime 파라미터용)"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+@dataclass
+class DownsampleRequest:
+    """
+    다운샘플링 요청
+    
+    points는 시리즈(설비+측정 코드)당 목표 포인트 수이며, minmax는 버킷마다 2개를 반환하므로 points/2개 버킷을 사용합니다.
+    """
+    points: int
+    method: str = "lttb"
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    
+    def __post_init__(self):
+        if self.method not in DOWNSAMPLE_METHODS:
+            raise ValueError(f"Unsupported downsampling method: {self.method}")
+        if self.points < 3:
+            raise ValueError("Downsampling needs at least 3 points per series")
+    
+    @property
+    def bucket_count(self) -> int:
+        return max(1, self.points // 2) if self.method == "minmax" else self.points
+    
+    def resolve_range(self, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """조회 구간 (종료 시각 기본값은 현재, 시작 시각 기본값은 DOWNSAMPLE_DEFAULT_RANGE_HOURS 이전)"""
+        end = self.end_time or now or datetime.now()
+        start = self.start_time or end - timedelta(hours=settings.DOWNSAMPLE_DEFAULT_RANGE_HOURS)
+        return start, end
+    
+    def bucket_seconds(self, start: datetime, end: datetime) -> float:
+        return max((end.timestamp() - start.timestamp()) / self.bucket_count, 0.001)
+
+
+def lttb_indices(times: Sequence[float], values: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets로 남길 포인트 인덱스 선택
+    
+    Args:
+        times: 오름차순 시각 (epoch 초)
+        values: 측정값
+        threshold: 목표 포인트 수 (첫/마지막 포인트 포함)
+    """
+    count = len(times)
+    if threshold >= count or threshold < 3:
+        return list(range(count))
+    
+    selected = [0]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        
+        # 다음 버킷 평균점 (마지막 버킷은 마지막 포인트)
+        next_start = end
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        if next_start >= next_end:
+            next_start, next_end = count - 1, count
+        span = next_end - next_start
+        avg_time = sum(times[next_start:next_end]) / span
+        avg_value = sum(values[next_start:next_end]) / span
+        
+        prev_time, prev_value = times[previous], values[previous]
+        best, best_area = start, -1.0
+        for index in range(start, end):
+            area = abs(
+                (prev_time - avg_time) * (values[index] - prev_value)
+                - (prev_time - times[index]) * (avg_value - prev_value)
+            )
+            if area > best_area:
+                best, best_area = index, area
+        selected.append(best)
+        previous = best
+    
+    selected.append(count - 1)
+    return selected
+
+
+def _bucket_records(series: List[Any], method: str, origin: float, width: float, last_bucket: int) -> List[Any]:
+    """시간 버킷별 min/max 원본 행 또는 평균 행 생성 (종료 시각의 행은 마지막 버킷에 포함)"""
+    buckets: Dict[int, List[Any]] = {}
+    for record in series:
+        bucket = min(int((record.timestamp.timestamp() - origin) // width), last_bucket)
+        buckets.setdefault(bucket, []).append(record)
+    
+    result = []
+    for rows in buckets.values():
+        if method == "minmax":
+            low = min(rows, key=lambda row: row.measurement_value)
+            high = max(rows, key=lambda row: row.measurement_value)
+            result.extend(sorted({id(low): low, id(high): high}.values(), key=lambda row: row.timestamp))
+        else:
+            # 버킷 첫 행을 기준으로 값만 평균으로 교체 (규격 판정은 이후 spec engine이 다시 수행)
+            first = rows[0]
+            average = type(first)(**first.to_dict())
+            average.measurement_value = sum(row.measurement_value for row in rows) / len(rows)
+            result.append(average)
+    return result
+
+
+def downsample_records(records: Sequence[Any], request: DownsampleRequest) -> List[Any]:
+    """
+    측정 레코드를 (equipment_code, measurement_code) 시리즈별로 다운샘플링
+    
+    Returns:
+        List: 조회 구간 안의 레코드만, 기존 응답과 같이 timestamp 내림차순
+    """
+    start, end = request.resolve_range()
+    origin, until = start.timestamp(), end.timestamp()
+    
+    series: Dict[Tuple[str, str], List[Any]] = {}
+    for record in records:
+        if origin <= record.timestamp.timestamp() <= until:
+            series.setdefault((record.equipment_code, record.measurement_code), []).append(record)
+    
+    width = request.bucket_seconds(start, end)
+    result = []
+    for rows in series.values():
+        rows.sort(key=lambda row: row.timestamp)
+        if request.method == "lttb":
+            indices = lttb_indices(
+                [row.timestamp.timestamp() for row in rows],
+                [row.measurement_value for row in rows],
+                request.points
+            )
+            result.extend(rows[index] for index in indices)
+        else:
+            result.extend(_bucket_records(rows, request.method, origin, width, request.bucket_count - 1))
+    
+    result.sort(key=lambda row: row.timestamp, reverse=True)
+    logger.debug(f"Downsampled {len(records)} measurements to {len(result)} points ({request.method})")
+    return result
@@ -0,0 +1,464 @@
+"""
+Measurement Ingest Service
+측정 데이터 일괄 적재 서비스 (JSON 배열 / NDJSON / CSV 스트림 → 배치 단위 일괄 검증 → COPY 또는 다중 행 INSERT, 그룹 커밋)
+"""
+import codecs
+import csv
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..core.measurement_partitions import MEASUREMENT_TABLE, measurement_partition_manager
+
+# ijson이 없으면 JSON 배열 본문은 한 번에 읽어서 파싱 (MEASUREMENT_INGEST_MAX_JSON_BYTES 제한)
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+INGEST_COLUMNS = (
+    "equipment_type", "equipment_code", "measurement_code",
+    "measurement_desc", "measurement_value", "timestamp"
+)
+
+# 문자열 컬럼 길이 제한 (migrations/create_personal_test_tables.sql, INGEST_COLUMNS 순서)
+TEXT_LIMITS = {
+    "equipment_type": 20,
+    "equipment_code": 30,
+    "measurement_code": 30,
+    "measurement_desc": 100,
+}
+
+CSV_REQUIRED_COLUMNS = ("equipment_type", "equipment_code", "measurement_code", "measurement_value")
+
+# measurement_value DECIMAL(20,3)의 정수부 최대 자릿수
+MAX_ABS_VALUE = 1e17
+
+# 응답에 담을 거부 행 최대 개수
+MAX_REPORTED_ERRORS = 100
+
+INGEST_FORMATS = {
+    "application/json": "json",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+INSERT_SQL = f"""
+    INSERT INTO {MEASUREMENT_TABLE}
+    (equipment_type, equipment_code, measurement_code, measurement_desc, measurement_value, "timestamp")
+    SELECT * FROM unnest(
+        CAST(:equipment_type AS VARCHAR[]),
+        CAST(:equipment_code AS VARCHAR[]),
+        CAST(:measurement_code AS VARCHAR[]),
+        CAST(:measurement_desc AS VARCHAR[]),
+        CAST(:measurement_value AS NUMERIC[]),
+        CAST(:timestamp AS TIMESTAMPTZ[])
+    )
+"""
+
+
+class IngestFormatError(ValueError):
+    """본문 형식 오류 (행 단위가 아니라 요청 전체를 처리할 수 없는 경우)"""
+
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """format 쿼리 파라미터 또는 Content-Type으로 본문 형식 결정 (지정이 없으면 json)"""
+    if requested:
+        if requested not in ("json", "ndjson", "csv"):
+            raise IngestFormatError(f"Unsupported ingest format: {requested}")
+        return requested
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if not media_type:
+        return "json"
+    if media_type not in INGEST_FORMATS:
+        raise IngestFormatError(f"Unsupported content type: {media_type} (use JSON array, NDJSON or CSV)")
+    return INGEST_FORMATS[media_type]
+
+
+def _parse_timestamp(value: Any, default: datetime) -> datetime:
+    """ISO 문자열 또는 epoch 초 (timezone이 없으면 서버 로컬 시간으로 간주)"""
+    if value is None or value == "":
+        return default
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        try:
+            return datetime.fromtimestamp(value, timezone.utc)
+        except (OverflowError, OSError) as e:
+            # 1e20 같은 범위 밖 epoch 값은 적재 전체를 중단하지 않고 행만 거부
+            raise ValueError(f"timestamp out of range: {value!r}") from e
+    elif isinstance(value, str):
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    else:
+        raise ValueError(f"invalid timestamp: {value!r}")
+    try:
+        return parsed if parsed.tzinfo is not None else parsed.astimezone()
+    except (OverflowError, OSError) as e:
+        raise ValueError(f"timestamp out of range: {value!r}") from e
+
+
+def validate_row(row: Any, default_timestamp: datetime) -> Tuple[Any, ...]:
+    """
+    원본 행을 적재용 튜플(INGEST_COLUMNS 순서)로 변환
+    
+    Raises:
+        ValueError, TypeError: 필수 값 누락, 길이/범위 초과, 숫자/시간 변환 실패
+    """
+    if not isinstance(row, Mapping):
+        raise ValueError("row must be an object")
+    values: List[Any] = []
+    for column, limit in TEXT_LIMITS.items():
+        raw = row.get(column)
+        value = "" if raw is None else str(raw).strip()
+        if not value and column != "measurement_desc":
+            raise ValueError(f"{column} is required")
+        if len(value) > limit:
+            raise ValueError(f"{column} is longer than {limit} characters")
+        values.append(value)
+    
+    raw_value = row.get("measurement_value")
+    if raw_value is None or raw_value == "" or isinstance(raw_value, bool):
+        raise ValueError("measurement_value is required")
+    number = float(raw_value)
+    if not math.isfinite(number) or abs(number) >= MAX_ABS_VALUE:
+        raise ValueError(f"measurement_value out of range: {raw_value}")
+    values.append(Decimal(str(number)))
+    values.append(_parse_timestamp(row.get("timestamp"), default_timestamp))
+    return tuple(values)
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """바이트 청크를 줄 단위로 (청크 경계에 걸친 줄/멀티바이트 문자, UTF-8 BOM 처리)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        lines = pending.split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def _json_array_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    started = False
+    if IJSON_AVAILABLE:
+        sink = ijson.sendable_list()
+        parser = ijson.items_coro(sink, "item", use_float=True)
+        index = 0
+        try:
+            async for chunk in chunks:
+                if not started and chunk.strip():
+                    if not chunk.lstrip().startswith(b"["):
+                        raise IngestFormatError("JSON body must be an array of measurements")
+                    started = True
+                parser.send(chunk)
+                for row in sink:
+                    yield index, row
+                    index += 1
+                del sink[:]
+            if not started:
+                return  # 빈 본문
+            parser.close()
+        except ijson.JSONError as e:
+            raise IngestFormatError(f"Invalid JSON body: {e}")
+        for row in sink:
+            yield index, row
+            index += 1
+        return
+    
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > settings.MEASUREMENT_INGEST_MAX_JSON_BYTES:
+            raise IngestFormatError("JSON body too large; send NDJSON or CSV for large loads")
+    try:
+        data = json.loads(bytes(body) or b"[]")
+    except ValueError as e:
+        raise IngestFormatError(f"Invalid JSON body: {e}")
+    if not isinstance(data, list):
+        raise IngestFormatError("JSON body must be an array of measurements")
+    for index, row in enumerate(data):
+        yield index, row
+
+
+async def _ndjson_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    line_number = 0
+    async for line in _lines(chunks):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            row = ValueError(f"invalid JSON: {e}")
+        yield line_number, row
+
+
+async def _csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Any]]:
+    header: Optional[List[str]] = None
+    buffered: List[str] = []
+    line_number = first_line = 0
+    async for line in _lines(chunks):
+        line_number += 1
+        if not buffered:
+            first_line = line_number
+        buffered.append(line)
+        record = "\n".join(buffered)
+        if record.count('"') % 2:
+            continue  # 따옴표 안의 줄바꿈: 다음 줄까지 이어서 읽음
+        buffered = []
+        if not record.strip():
+            continue
+        fields = next(csv.reader([record]))
+        if header is None:
+            header = [name.strip() for name in fields]
+            missing = [column for column in CSV_REQUIRED_COLUMNS if column not in header]
+            if missing:
+                raise IngestFormatError(f"CSV header is missing columns: {', '.join(missing)}")
+            continue
+        if len(fields) != len(header):
+            yield first_line, ValueError(f"expected {len(header)} fields, got {len(fields)}")
+            continue
+        yield first_line, dict(zip(header, fields))
+    if buffered:
+        yield first_line, ValueError("unterminated quoted field")
+
+
+def iter_raw_rows(chunks: AsyncIterator[bytes], ingest_format: str) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    본문 스트림에서 (행 번호, 원본 행)을 순서대로 추출
+    
+    행 번호는 JSON 배열이면 0부터 시작하는 인덱스, NDJSON/CSV면 1부터 시작하는 줄 번호입니다.
+    파싱할 수 없는 행은 원본 대신 ValueError를 돌려주고, 본문 전체가 잘못된 경우 IngestFormatError를 발생시킵니다.
+    """
+    if ingest_format == "ndjson":
+        return _ndjson_rows(chunks)
+    if ingest_format == "csv":
+        return _csv_rows(chunks)
+    return _json_array_rows(chunks)
+
+
+@dataclass
+class BatchStats:
+    """배치 1개의 처리 결과"""
+    batch: int
+    received: int
+    inserted: int
+    rejected: int
+    method: str
+    write_ms: float
+    committed: bool = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "batch": self.batch,
+            "received": self.received,
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "method": self.method,
+            "write_ms": round(self.write_ms, 2),
+            "committed": self.committed
+        }
+
+
+@dataclass
+class IngestResult:
+    """일괄 적재 결과 (inserted는 커밋된 행만 집계)"""
+    received: int = 0
+    rejected: int = 0
+    commits: int = 0
+    elapsed: float = 0.0
+    batches: List[BatchStats] = field(default_factory=list)
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    error_type: Optional[str] = None
+    
+    @property
+    def inserted(self) -> int:
+        return sum(batch.inserted for batch in self.batches if batch.committed)
+    
+    def reject(self, line: int, message: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+    
+    def to_dict(self) -> Dict[str, Any]:
+        inserted = self.inserted
+        payload = {
+            "received": self.received,
+            "inserted": inserted,
+            "rejected": self.rejected,
+            "commits": self.commits,
+            "elapsed_ms": round(self.elapsed * 1000, 2),
+            "rows_per_second": round(inserted / self.elapsed, 1) if self.elapsed > 0 else 0.0,
+            "batches": [batch.to_dict() for batch in self.batches],
+            "errors": self.errors
+        }
+        if self.error:
+            payload["error"] = self.error
+        return payload
+
+
+class MeasurementIngestService:
+    """측정 데이터 일괄 적재 (배치마다 검증 → 설비 코드 일괄 확인 → COPY, 커밋은 commit_rows 단위로 묶음)"""
+    
+    async def _known_equipment(self, session: AsyncSession, codes: Set[str]) -> Set[str]:
+        result = await session.execute(
+            text("SELECT equipment_code FROM personal_test_equipment_status WHERE equipment_code = ANY(:codes)"),
+            {"codes": list(codes)}
+        )
+        return {row[0] for row in result.fetchall()}
+    
+    async def _write(self, session: AsyncSession, rows: List[Tuple[Any, ...]], use_copy: bool = True) -> str:
+        """asyncpg 연결이면 COPY, 아니면 unnest 배열을 이용한 다중 행 INSERT 1회"""
+        if use_copy:
+            connection = await session.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver_connection = getattr(raw_connection, "driver_connection", None)
+            if hasattr(driver_connection, "copy_records_to_table"):
+                # 설비 코드 확인 쿼리로 이미 시작된 세션 트랜잭션 안에서 실행됨
+                await driver_connection.copy_records_to_table(
+                    MEASUREMENT_TABLE, records=rows, columns=list(INGEST_COLUMNS)
+                )
+                return "copy"
+        
+        columns = list(zip(*rows))
+        await session.execute(
+            text(INSERT_SQL),
+            {column: list(values) for column, values in zip(INGEST_COLUMNS, columns)}
+        )
+        return "insert"
+    
+    async def _ensure_partitions(self, rows: List[Tuple[Any, ...]]) -> None:
+        """클라이언트가 보낸 과거/미래 시각의 구간 파티션을 기록 전에 생성"""
+        await measurement_partition_manager.ensure_for_timestamps(row[5] for row in rows)
+    
+    async def _flush(
+        self,
+        session: AsyncSession,
+        batch: List[Tuple[int, Any]],
+        result: IngestResult,
+        use_copy: bool
+    ) -> BatchStats:
+        """배치 하나를 검증하고 기록 (커밋하지 않음)"""
+        default_timestamp = datetime.now(timezone.utc)
+        valid: List[Tuple[int, Tuple[Any, ...]]] = []
+        for line, row in batch:
+            if isinstance(row, Exception):
+                result.reject(line, str(row))
+                continue
+            try:
+                valid.append((line, validate_row(row, default_timestamp)))
+            except (TypeError, ValueError) as e:
+                result.reject(line, str(e))
+        
+        rows: List[Tuple[Any, ...]] = []
+        if valid:
+            # 외래 키 위반으로 COPY 전체가 실패하지 않도록 설비 코드를 배치 단위로 한 번에 확인
+            known = await self._known_equipment(session, {record[1] for _, record in valid})
+            for line, record in valid:
+                if record[1] in known:
+                    rows.append(record)
+                else:
+                    result.reject(line, f"unknown equipment_code: {record[1]}")
+        
+        started = time.perf_counter()
+        if rows:
+            await self._ensure_partitions(rows)
+        method = await self._write(session, rows, use_copy) if rows else "none"
+        stats = BatchStats(
+            batch=len(result.batches) + 1,
+            received=len(batch),
+            inserted=len(rows),
+            rejected=len(batch) - len(rows),
+            method=method,
+            write_ms=(time.perf_counter() - started) * 1000
+        )
+        result.batches.append(stats)
+        result.received += len(batch)
+        return stats
+    
+    async def _commit(self, session: AsyncSession, result: IngestResult, pending: List[BatchStats]) -> None:
+        await session.commit()
+        if any(stats.inserted for stats in pending):
+            result.commits += 1
+        for stats in pending:
+            stats.committed = True
+        pending.clear()
+    
+    async def ingest(
+        self,
+        session: AsyncSession,
+        rows: AsyncIterator[Tuple[int, Any]],
+        batch_size: Optional[int] = None,
+        commit_rows: Optional[int] = None,
+        atomic: bool = False,
+        use_copy: bool = True
+    ) -> IngestResult:
+        """
+        원본 행 스트림을 batch_size개씩 검증/기록하고 commit_rows행마다 커밋
+        
+        Args:
+            session: 애플리케이션 DB 세션
+            rows: iter_raw_rows()가 돌려주는 (행 번호, 원본 행) 스트림
+            batch_size: 검증/COPY 1회 행 수 (기본값 MEASUREMENT_INGEST_BATCH_SIZE)
+            commit_rows: 그룹 커밋 행 수 (기본값 MEASUREMENT_INGEST_COMMIT_ROWS)
+            atomic: True면 마지막에 한 번만 커밋 (오류 시 전체 롤백)
+            use_copy: False면 COPY 대신 다중 행 INSERT 사용
+        
+        Returns:
+            IngestResult: 형식/DB 오류로 중단된 경우 error가 채워지고, 그 전에 커밋된 배치는 유지됩니다
+        """
+        batch_size = batch_size or settings.MEASUREMENT_INGEST_BATCH_SIZE
+        commit_rows = commit_rows or settings.MEASUREMENT_INGEST_COMMIT_ROWS
+        result = IngestResult()
+        pending: List[BatchStats] = []
+        batch: List[Tuple[int, Any]] = []
+        started = time.perf_counter()
+        
+        try:
+            async for line, row in rows:
+                batch.append((line, row))
+                if len(batch) < batch_size:
+                    continue
+                pending.append(await self._flush(session, batch, result, use_copy))
+                batch = []
+                if not atomic and sum(stats.inserted for stats in pending) >= commit_rows:
+                    await self._commit(session, result, pending)
+            if batch:
+                pending.append(await self._flush(session, batch, result, use_copy))
+            await self._commit(session, result, pending)
+        except Exception as e:
+            await session.rollback()
+            result.error = str(e)
+            result.error_type = "format" if isinstance(e, IngestFormatError) else "database"
+            logger.error(f"Measurement ingest aborted after {result.received} rows: {e}")
+        
+        result.elapsed = time.perf_counter() - started
+        logger.info(
+            f"Ingested {result.inserted}/{result.received} measurements in {len(result.batches)} batches "
+            f"({result.commits} commits, {result.rejected} rejected, {result.elapsed:.2f}s)"
+        )
+        return result
+
+
+# 전역 측정 데이터 적재 서비스
+measurement_ingest = MeasurementIngestService()
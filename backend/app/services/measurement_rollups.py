@@ -0,0 +1,457 @@
+"""
+Measurement Rollup Service
+측정 데이터를 1분/1시간 버킷(건수, 최소, 최대, 합계, 규격 이탈 건수)으로 미리 집계하고
+구간 집계 조회를 가장 굵은 롤업에서 처리하는 서비스
+"""
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.commit_horizon import next_horizon
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from .spec_engine import SPEC_ABOVE_SPEC, SPEC_BELOW_SPEC
+
+logger = logging.getLogger(__name__)
+
+MEASUREMENT_TABLE = "personal_test_measurement_data"
+ROLLUP_STATE_TABLE = "personal_test_measurement_rollup_state"
+
+# 동기화 작업 간 중복 집계를 막는 advisory lock 키
+ROLLUP_LOCK_KEY = 746201
+
+# 자동 버킷 크기 후보 (초)
+AUTO_INTERVALS = (60, 300, 900, 1800, 3600, 10800, 21600, 43200, 86400, 604800)
+
+_INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+@dataclass(frozen=True)
+class RollupLevel:
+    """롤업 테이블 단위"""
+    name: str
+    seconds: int
+    
+    @property
+    def table(self) -> str:
+        return f"personal_test_measurement_rollup_{self.name}"
+
+
+# 굵은 단위부터 (조회 시 이 순서로 사용 가능한 롤업을 선택)
+ROLLUP_LEVELS: Tuple[RollupLevel, ...] = (RollupLevel("1h", 3600), RollupLevel("1m", 60))
+
+
+def covers_data_source(config: Dict[str, Any]) -> bool:
+    """롤업이 해당 데이터 소스 설정의 측정 데이터를 집계하는지 (내장 DB의 측정 테이블을 읽는 PostgreSQL 소스만 해당)"""
+    if config.get("source_type", "postgresql") != "postgresql" or config.get("connection_string"):
+        return False
+    custom_query_info = (config.get("custom_queries") or {}).get("measurement_data", {})
+    custom_query = custom_query_info.get("query") if isinstance(custom_query_info, dict) else None
+    return not custom_query or MEASUREMENT_TABLE in custom_query
+
+
+def parse_interval(value: str) -> int:
+    """'15m', '1h', '1d' 형식의 버킷 크기를 초로 변환"""
+    match = re.fullmatch(r"\s*(\d+)\s*([smhdw])\s*", value or "")
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError(f"Invalid aggregate interval: {value!r} (use e.g. 30s, 15m, 1h, 1d)")
+    return int(match.group(1)) * _INTERVAL_UNITS[match.group(2)]
+
+
+def auto_interval(start: datetime, end: datetime, max_buckets: Optional[int] = None) -> int:
+    """버킷 수가 max_buckets 이하가 되는 가장 작은 후보 크기"""
+    max_buckets = max_buckets or settings.MEASUREMENT_AGGREGATE_MAX_BUCKETS
+    span = max((end - start).total_seconds(), 1)
+    for seconds in AUTO_INTERVALS:
+        if span / seconds <= max_buckets:
+            return seconds
+    return AUTO_INTERVALS[-1]
+
+
+def to_aware(value: datetime) -> datetime:
+    """timezone이 없으면 로컬 시간으로 간주 (epoch 정렬 계산과 TIMESTAMPTZ 비교를 일치시키기 위함)"""
+    return value if value.tzinfo is not None else value.astimezone()
+
+
+def _floor(value: datetime, seconds: int) -> datetime:
+    epoch = int(value.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % seconds, tz=timezone.utc)
+
+
+def _ceil(value: datetime, seconds: int) -> datetime:
+    floored = _floor(value, seconds)
+    return floored if floored.timestamp() == value.timestamp() else floored + timedelta(seconds=seconds)
+
+
+def plan_segments(
+    start: datetime,
+    end: datetime,
+    interval_seconds: int,
+    levels: Sequence[RollupLevel] = ROLLUP_LEVELS
+) -> List[Tuple[Optional[RollupLevel], datetime, datetime]]:
+    """
+    [start, end) 구간을 읽을 소스별 구간으로 분할
+    
+    버킷 크기를 나누어떨어지게 하는 가장 굵은 롤업으로 정렬된 안쪽 구간을 읽고,
+    정렬되지 않은 양 끝은 더 가는 롤업 또는 원본(None)으로 채웁니다.
+    """
+    if start >= end:
+        return []
+    usable = [level for level in levels if interval_seconds % level.seconds == 0]
+    if not usable:
+        return [(None, start, end)]
+    
+    level, finer = usable[0], usable[1:]
+    inner_start, inner_end = _ceil(start, level.seconds), _floor(end, level.seconds)
+    if inner_start >= inner_end:
+        return plan_segments(start, end, interval_seconds, finer)
+    return (
+        plan_segments(start, inner_start, interval_seconds, finer)
+        + [(level, inner_start, inner_end)]
+        + plan_segments(inner_end, end, interval_seconds, finer)
+    )
+
+
+def _bucket_sql(column: str, seconds: int) -> str:
+    """epoch 기준 버킷 시작 시각 (세션 timezone과 무관)"""
+    return f"TO_TIMESTAMP(FLOOR(EXTRACT(EPOCH FROM {column}) / {int(seconds)}) * {int(seconds)})"
+
+
+_OUT_OF_SPEC_SQL = f"CASE WHEN spec_status IN ({SPEC_BELOW_SPEC}, {SPEC_ABOVE_SPEC}) THEN 1 ELSE 0 END"
+
+# 한 문장(같은 스냅샷)에서 읽는 트랜잭션 경계와 보이는 최대 id
+_HORIZON_SQL = f"""
+    SELECT
+        pg_snapshot_xmin(s)::text::bigint AS snapshot_xmin,
+        pg_snapshot_xmax(s)::text::bigint AS snapshot_xmax,
+        (SELECT MAX(id) FROM {MEASUREMENT_TABLE}) AS max_id
+    FROM pg_current_snapshot() s
+"""
+
+
+class MeasurementRollupService:
+    """측정 데이터 롤업 유지 및 구간 집계 조회"""
+    
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+    
+    # ------------------------------------------------------------------
+    # 테이블
+    # ------------------------------------------------------------------
+    
+    async def ensure_tables(self, session: AsyncSession):
+        """롤업/상태 테이블 생성 (migrations/create_measurement_rollup_tables.sql과 동일)"""
+        for level in ROLLUP_LEVELS:
+            await session.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {level.table} (
+                    equipment_code VARCHAR(30) NOT NULL,
+                    measurement_code VARCHAR(30) NOT NULL,
+                    bucket TIMESTAMPTZ NOT NULL,
+                    equipment_type VARCHAR(20),
+                    sample_count BIGINT NOT NULL DEFAULT 0,
+                    min_value DOUBLE PRECISION,
+                    max_value DOUBLE PRECISION,
+                    sum_value DOUBLE PRECISION NOT NULL DEFAULT 0,
+                    out_of_spec_count BIGINT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (equipment_code, measurement_code, bucket)
+                )
+            """))
+            await session.execute(text(
+                f"CREATE INDEX IF NOT EXISTS idx_{level.table}_bucket ON {level.table} (bucket)"
+            ))
+        await session.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {ROLLUP_STATE_TABLE} (
+                name VARCHAR(50) PRIMARY KEY,
+                last_measurement_id BIGINT NOT NULL DEFAULT 0,
+                pending_measurement_id BIGINT,
+                pending_xmax BIGINT,
+                updated_at TIMESTAMPTZ DEFAULT NOW()
+            )
+        """))
+        for column in ("pending_measurement_id", "pending_xmax"):
+            await session.execute(text(
+                f"ALTER TABLE {ROLLUP_STATE_TABLE} ADD COLUMN IF NOT EXISTS {column} BIGINT"
+            ))
+        await session.execute(text(
+            f"INSERT INTO {ROLLUP_STATE_TABLE} (name) VALUES ('{MEASUREMENT_TABLE}') ON CONFLICT (name) DO NOTHING"
+        ))
+        await session.commit()
+    
+    async def get_watermark(self, session: AsyncSession) -> int:
+        """롤업에 반영된 마지막 측정 데이터 id"""
+        result = await session.execute(
+            text(f"SELECT last_measurement_id FROM {ROLLUP_STATE_TABLE} WHERE name = :name"),
+            {"name": MEASUREMENT_TABLE}
+        )
+        return int(result.scalar() or 0)
+    
+    # ------------------------------------------------------------------
+    # 증분 동기화 / 재계산
+    # ------------------------------------------------------------------
+    
+    def _upsert_sql(self, level: RollupLevel, where: str) -> str:
+        return f"""
+            INSERT INTO {level.table} AS r (
+                equipment_code, measurement_code, bucket, equipment_type,
+                sample_count, min_value, max_value, sum_value, out_of_spec_count
+            )
+            SELECT
+                equipment_code, measurement_code, {_bucket_sql('"timestamp"', level.seconds)},
+                MAX(equipment_type), COUNT(*), MIN(measurement_value), MAX(measurement_value),
+                SUM(measurement_value), SUM({_OUT_OF_SPEC_SQL})
+            FROM {MEASUREMENT_TABLE}
+            WHERE {where} AND measurement_value IS NOT NULL AND "timestamp" IS NOT NULL
+            GROUP BY 1, 2, 3
+            ON CONFLICT (equipment_code, measurement_code, bucket) DO UPDATE SET
+                equipment_type = EXCLUDED.equipment_type,
+                sample_count = r.sample_count + EXCLUDED.sample_count,
+                min_value = LEAST(r.min_value, EXCLUDED.min_value),
+                max_value = GREATEST(r.max_value, EXCLUDED.max_value),
+                sum_value = r.sum_value + EXCLUDED.sum_value,
+                out_of_spec_count = r.out_of_spec_count + EXCLUDED.out_of_spec_count,
+                updated_at = NOW()
+        """
+    
+    async def sync(self, session: AsyncSession, batch_size: Optional[int] = None) -> int:
+        """
+        워터마크 이후 커밋이 확정된 측정 데이터를 롤업에 반영
+        
+        워터마크는 next_horizon()이 확정한 id까지만 전진하므로 늦게 커밋된 작은 id의 행도
+        누락되지 않습니다. 다른 동기화가 진행 중이면 건너뜁니다 (조회 API가 워터마크 이후
+        원본 행을 함께 읽으므로 결과는 동일).
+        
+        Returns:
+            int: 반영한 측정 데이터 행 수
+        """
+        batch_size = batch_size or settings.MEASUREMENT_ROLLUP_BATCH_SIZE
+        synced = 0
+        while True:
+            locked = await session.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY})
+            if not locked.scalar():
+                await session.rollback()
+                return synced
+            
+            state = (await session.execute(
+                text(f"""
+                    SELECT last_measurement_id, pending_measurement_id, pending_xmax
+                    FROM {ROLLUP_STATE_TABLE} WHERE name = :name
+                """),
+                {"name": MEASUREMENT_TABLE}
+            )).fetchone()
+            watermark = int(state.last_measurement_id) if state else 0
+            horizon = (await session.execute(text(_HORIZON_SQL))).fetchone()
+            safe_upper, pending_id, pending_xmax = next_horizon(
+                watermark,
+                state.pending_measurement_id if state else None,
+                state.pending_xmax if state else None,
+                horizon.snapshot_xmin,
+                horizon.snapshot_xmax,
+                horizon.max_id
+            )
+            
+            bounds = (await session.execute(text(f"""
+                SELECT MAX(id) AS upper, COUNT(*) AS row_count
+                FROM (
+                    SELECT id FROM {MEASUREMENT_TABLE}
+                    WHERE id > :watermark AND id <= :safe_upper ORDER BY id LIMIT :batch_size
+                ) batch
+            """), {"watermark": watermark, "safe_upper": safe_upper, "batch_size": batch_size})).fetchone()
+            # 반영할 행이 없어도 확정된 상한까지는 전진 (롤백된 id 구간)
+            upper = bounds.upper if bounds.row_count == batch_size else safe_upper
+            
+            if bounds.row_count:
+                params = {"watermark": watermark, "upper": upper}
+                for level in ROLLUP_LEVELS:
+                    await session.execute(text(self._upsert_sql(level, "id > :watermark AND id <= :upper")), params)
+            await session.execute(text(f"""
+                UPDATE {ROLLUP_STATE_TABLE}
+                SET last_measurement_id = :upper, pending_measurement_id = :pending_id,
+                    pending_xmax = :pending_xmax, updated_at = NOW()
+                WHERE name = :name
+            """), {"upper": upper, "pending_id": pending_id, "pending_xmax": pending_xmax, "name": MEASUREMENT_TABLE})
+            await session.commit()
+            
+            synced += bounds.row_count
+            if bounds.row_count < batch_size:
+                return synced
+    
+    async def rebuild(self, session: AsyncSession, start: datetime, end: datetime) -> Dict[str, Any]:
+        """
+        구간의 롤업을 원본에서 다시 계산 (초기 적재, 늦게 커밋된 행/수정·삭제 반영용)
+        
+        구간은 가장 굵은 롤업 단위로 넓혀서 버킷 단위로 통째로 교체합니다.
+        """
+        coarsest = max(level.seconds for level in ROLLUP_LEVELS)
+        params = {"start": _floor(to_aware(start), coarsest), "end": _ceil(to_aware(end), coarsest)}
+        
+        await session.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY})
+        watermark = await self.get_watermark(session)
+        params["watermark"] = watermark
+        for level in ROLLUP_LEVELS:
+            await session.execute(
+                text(f"DELETE FROM {level.table} WHERE bucket >= :start AND bucket < :end"),
+                {"start": params["start"], "end": params["end"]}
+            )
+            # 워터마크 이후 행은 다음 sync()가 반영
+            await session.execute(text(self._upsert_sql(
+                level, '"timestamp" >= :start AND "timestamp" < :end AND id <= :watermark'
+            )), params)
+        await session.commit()
+        
+        logger.info(f"Rebuilt measurement rollups for {params['start']} ~ {params['end']}")
+        return {"start": params["start"], "end": params["end"], "watermark": watermark}
+    
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+    
+    async def aggregate(
+        self,
+        session: AsyncSession,
+        start: datetime,
+        end: datetime,
+        interval_seconds: Optional[int] = None,
+        equipment_code: Optional[str] = None,
+        equipment_codes: Optional[str] = None,
+        measurement_code: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        [start, end) 구간을 interval_seconds 버킷으로 집계
+        
+        Returns:
+            Dict: interval_seconds, sources(구간별 사용 소스), buckets(설비/측정 코드/버킷 순)
+        """
+        start, end = to_aware(start), to_aware(end)
+        interval_seconds = interval_seconds or auto_interval(start, end)
+        segments = plan_segments(start, end, interval_seconds)
+        
+        params: Dict[str, Any] = {}
+        filters = []
+        if equipment_code:
+            filters.append("equipment_code = :equipment_code")
+            params["equipment_code"] = equipment_code
+        elif equipment_codes:
+            code_list = [code.strip() for code in equipment_codes.split(',') if code.strip()]
+            placeholders = ','.join(f':equipment_code_{i}' for i in range(len(code_list)))
+            filters.append(f"equipment_code IN ({placeholders})")
+            params.update({f"equipment_code_{i}": code for i, code in enumerate(code_list)})
+        if measurement_code:
+            filters.append("measurement_code = :measurement_code")
+            params["measurement_code"] = measurement_code
+        filter_sql = "".join(f" AND {condition}" for condition in filters)
+        
+        parts = []
+        rolled_ranges = []
+        for index, (level, segment_start, segment_end) in enumerate(segments):
+            params[f"start_{index}"], params[f"end_{index}"] = segment_start, segment_end
+            if level is None:
+                raw_range = f'"timestamp" >= :start_{index} AND "timestamp" < :end_{index}'
+                parts.append(f"""
+                    SELECT equipment_code, measurement_code, "timestamp" AS bucket, 1 AS sample_count,
+                           measurement_value AS min_value, measurement_value AS max_value,
+                           measurement_value AS sum_value, {_OUT_OF_SPEC_SQL} AS out_of_spec_count
+                    FROM {MEASUREMENT_TABLE}
+                    WHERE {raw_range} AND measurement_value IS NOT NULL{filter_sql}
+                """)
+            else:
+                parts.append(f"""
+                    SELECT equipment_code, measurement_code, bucket, sample_count,
+                           min_value, max_value, sum_value, out_of_spec_count
+                    FROM {level.table}
+                    WHERE bucket >= :start_{index} AND bucket < :end_{index}{filter_sql}
+                """)
+                rolled_ranges.append(f'("timestamp" >= :start_{index} AND "timestamp" < :end_{index})')
+        
+        if not parts:
+            return {"interval_seconds": interval_seconds, "sources": [], "buckets": []}
+        
+        if rolled_ranges:
+            # 아직 롤업에 반영되지 않은 최근 행
+            params["watermark"] = await self.get_watermark(session)
+            parts.append(f"""
+                SELECT equipment_code, measurement_code, "timestamp", 1,
+                       measurement_value, measurement_value, measurement_value, {_OUT_OF_SPEC_SQL}
+                FROM {MEASUREMENT_TABLE}
+                WHERE id > :watermark AND ({' OR '.join(rolled_ranges)})
+                  AND measurement_value IS NOT NULL{filter_sql}
+            """)
+        
+        query = f"""
+            SELECT
+                equipment_code, measurement_code, {_bucket_sql('bucket', interval_seconds)} AS bucket,
+                SUM(sample_count) AS sample_count, MIN(min_value) AS min_value, MAX(max_value) AS max_value,
+                SUM(sum_value) / NULLIF(SUM(sample_count), 0) AS avg_value,
+                SUM(out_of_spec_count) AS out_of_spec_count
+            FROM ({' UNION ALL '.join(parts)}) source
+            GROUP BY 1, 2, 3
+            ORDER BY 1, 2, 3
+        """
+        result = await session.execute(text(query), params)
+        
+        buckets = [
+            {
+                "equipment_code": row.equipment_code,
+                "measurement_code": row.measurement_code,
+                "bucket": row.bucket,
+                "count": int(row.sample_count),
+                "min": float(row.min_value) if row.min_value is not None else None,
+                "max": float(row.max_value) if row.max_value is not None else None,
+                "avg": float(row.avg_value) if row.avg_value is not None else None,
+                "out_of_spec_count": int(row.out_of_spec_count)
+            }
+            for row in result
+        ]
+        return {
+            "interval_seconds": interval_seconds,
+            "sources": [
+                {"source": level.table if level else MEASUREMENT_TABLE, "start": segment_start, "end": segment_end}
+                for level, segment_start, segment_end in segments
+            ],
+            "buckets": buckets
+        }
+    
+    # ------------------------------------------------------------------
+    # 백그라운드 실행
+    # ------------------------------------------------------------------
+    
+    async def _run(self, interval: float):
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    synced = await self.sync(session)
+                if synced:
+                    logger.debug(f"Rolled up {synced} measurement rows")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Measurement rollup sync failed: {e}")
+            await asyncio.sleep(interval)
+    
+    def start(self, interval: Optional[float] = None):
+        """주기 동기화 시작 (MEASUREMENT_ROLLUP_SYNC_INTERVAL_SECONDS가 0이면 비활성)"""
+        interval = interval or settings.MEASUREMENT_ROLLUP_SYNC_INTERVAL_SECONDS
+        if not interval or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._run(interval))
+        logger.info(f"Measurement rollup sync started (interval: {interval}s)")
+    
+    async def stop(self):
+        """주기 동기화 중지"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+# 전역 측정 데이터 롤업 서비스
+measurement_rollups = MeasurementRollupService()
@@ -0,0 +1,485 @@
+"""
+통합 메트릭 레지스트리
+흩어져 있는 성능 카운터를 Prometheus 텍스트 포맷(/metrics)으로 노출합니다.
+
+- 프로세스 로컬 수집기: 워커마다 값이 다른 카운터/게이지 (풀 사용량, 캐시 적중 등).
+  PERFORMANCE_METRICS_DIR 가 설정된 경우 워커 스냅샷에 함께 기록되어
+  카운터는 합산, 게이지는 pid 라벨로 구분되어 노출된다.
+- 전역 수집기: 스크레이프 시점에 한 번만 계산하면 되는 값 (DB 서버 상태, Redis 지연).
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .performance_monitor import performance_monitor, LatencyHistogram, PerformanceMetrics
+
+logger = logging.getLogger(__name__)
+
+# 지연 시간 히스토그램 버킷 (ms)
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# 전역 수집기 결과 캐시 시간 (초) - 짧은 간격의 스크레이프가 DB 에 부하를 주지 않도록
+GLOBAL_COLLECTOR_TTL_SECONDS = 15
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+@dataclass
+class MetricFamily:
+    """동일 이름의 메트릭 샘플 묶음"""
+    name: str
+    type: str  # counter, gauge, histogram
+    help: str
+    samples: List[Sample] = field(default_factory=list)
+    
+    def add(self, value: float, suffix: str = "", **labels: Any) -> "MetricFamily":
+        self.samples.append((suffix, {k: str(v) for k, v in labels.items()}, float(value)))
+        return self
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "type": self.type,
+            "help": self.help,
+            "samples": [[suffix, labels, value] for suffix, labels, value in self.samples]
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MetricFamily":
+        family = cls(data["name"], data["type"], data["help"])
+        family.samples = [(suffix, labels, value) for suffix, labels, value in data["samples"]]
+        return family
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def render_families(families: List[MetricFamily]) -> str:
+    """Prometheus 텍스트 포맷 (0.0.4) 렌더링"""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.type}")
+        for suffix, labels, value in family.samples:
+            label_str = ""
+            if labels:
+                label_str = "{" + ",".join(
+                    f'{key}="{_escape_label(val)}"' for key, val in labels.items()
+                ) + "}"
+            lines.append(f"{family.name}{suffix}{label_str} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def merge_worker_families(local: List[MetricFamily],
+                          workers: List[Tuple[int, List[MetricFamily]]]) -> List[MetricFamily]:
+    """워커별 메트릭 병합: counter/histogram 은 합산, gauge 는 pid 라벨 추가"""
+    all_workers = [(os.getpid(), local), *workers]
+    merged: Dict[str, MetricFamily] = {}
+    sums: Dict[str, Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float]] = {}
+    
+    for pid, families in all_workers:
+        for family in families:
+            target = merged.setdefault(family.name, MetricFamily(family.name, family.type, family.help))
+            if family.type == "gauge":
+                for suffix, labels, value in family.samples:
+                    target.samples.append((suffix, {**labels, "pid": str(pid)}, value))
+            else:
+                bucket = sums.setdefault(family.name, {})
+                for suffix, labels, value in family.samples:
+                    key = (suffix, tuple(labels.items()))
+                    bucket[key] = bucket.get(key, 0.0) + value
+    
+    for name, bucket in sums.items():
+        merged[name].samples = [(suffix, dict(labels), value) for (suffix, labels), value in bucket.items()]
+    return list(merged.values())
+
+
+def histogram_family(name: str, help_text: str,
+                     histograms: Dict[Tuple[Tuple[str, str], ...], LatencyHistogram]) -> MetricFamily:
+    """ms 단위 LatencyHistogram 을 초 단위 Prometheus 히스토그램으로 변환"""
+    family = MetricFamily(name, "histogram", help_text)
+    for label_items, histogram in histograms.items():
+        labels = dict(label_items)
+        for bound, count in zip(LATENCY_BUCKETS_MS, histogram.cumulative_counts(LATENCY_BUCKETS_MS)):
+            family.add(count, "_bucket", **labels, le=_format_value(bound / 1000))
+        family.add(histogram.count, "_bucket", **labels, le="+Inf")
+        family.add(histogram.total / 1000, "_sum", **labels)
+        family.add(histogram.count, "_count", **labels)
+    return family
+
+
+class MetricsRegistry:
+    """메트릭 수집기 레지스트리"""
+    
+    def __init__(self):
+        self._local_collectors: Dict[str, Callable[[], List[MetricFamily]]] = {}
+        self._global_collectors: Dict[str, Callable[[], Awaitable[List[MetricFamily]]]] = {}
+        self._global_cache: Optional[Tuple[float, List[MetricFamily]]] = None
+        self._global_lock = asyncio.Lock()
+        performance_monitor.register_snapshot_provider("metric_families", self._local_snapshot)
+    
+    def register_local(self, name: str, collector: Callable[[], List[MetricFamily]]):
+        """프로세스 로컬 수집기 등록 (동기, 가벼워야 함)"""
+        self._local_collectors[name] = collector
+    
+    def register_global(self, name: str, collector: Callable[[], Awaitable[List[MetricFamily]]]):
+        """전역 수집기 등록 (비동기, 스크레이프 시 캐시와 함께 실행)"""
+        self._global_collectors[name] = collector
+    
+    def collect_local(self) -> List[MetricFamily]:
+        families = []
+        for name, collector in self._local_collectors.items():
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {name} failed: {e}")
+        return families
+    
+    def _local_snapshot(self) -> List[Dict[str, Any]]:
+        return [family.to_dict() for family in self.collect_local()]
+    
+    async def collect_global(self) -> List[MetricFamily]:
+        async with self._global_lock:
+            now = time.monotonic()
+            if self._global_cache and now - self._global_cache[0] < GLOBAL_COLLECTOR_TTL_SECONDS:
+                return self._global_cache[1]
+            
+            families = []
+            for name, collector in self._global_collectors.items():
+                try:
+                    families.extend(await collector())
+                except Exception as e:
+                    logger.warning(f"Metrics collector {name} failed: {e}")
+            self._global_cache = (now, families)
+            return families
+    
+    def _collect_latency(self, metrics: PerformanceMetrics) -> List[MetricFamily]:
+        """요청/쿼리 지연 시간 히스토그램 (워커 병합 완료된 메트릭 기준)"""
+        requests = {}
+        for endpoint, histogram in metrics.endpoint_metrics.items():
+            method, _, route = endpoint.partition(" ")
+            if not route:
+                method, route = "", endpoint
+            requests[(("method", method), ("route", route))] = histogram.total
+        
+        queries = {
+            (("query_type", query_type),): histogram.total
+            for query_type, histogram in metrics.query_metrics.items()
+        }
+        
+        cache = MetricFamily("maxlab_cache_operations_total", "counter",
+                             "Permission cache operations recorded by the performance monitor")
+        for operation, count in metrics.cache_operations.items():
+            cache.add(count, operation=operation)
+        
+        errors = MetricFamily("maxlab_errors_total", "counter", "Errors recorded by the performance monitor")
+        for error_type, count in metrics.error_counts.items():
+            errors.add(count, error_type=error_type)
+        
+        return [
+            histogram_family("maxlab_http_request_duration_seconds",
+                             "HTTP request latency by route template", requests),
+            histogram_family("maxlab_query_duration_seconds",
+                             "Monitored query latency by query type", queries),
+            cache,
+            errors,
+        ]
+    
+    async def render(self) -> str:
+        """전체 메트릭을 Prometheus 텍스트 포맷으로 렌더링"""
+        workers = [
+            (pid, [MetricFamily.from_dict(item) for item in data])
+            for pid, data in performance_monitor.load_worker_extras("metric_families")
+        ]
+        
+        families = self._collect_latency(performance_monitor.get_aggregated_metrics())
+        families += merge_worker_families(self.collect_local(), workers)
+        families += await self.collect_global()
+        
+        uptime = MetricFamily("maxlab_process_uptime_seconds", "gauge", "Seconds since metrics started")
+        uptime.add(time.time() - _STARTED_AT)
+        families.append(uptime)
+        return render_families(families)
+
+
+_STARTED_AT = time.time()
+
+# 전역 레지스트리 인스턴스
+metrics_registry = MetricsRegistry()
+
+
+def counter_family(name: str, help_text: str, stats: Dict[str, Any], label: str,
+                   metric_type: str = "counter") -> MetricFamily:
+    """{라벨값: 숫자} 형태의 통계 딕셔너리를 메트릭으로 변환"""
+    family = MetricFamily(name, metric_type, help_text)
+    for key, value in stats.items():
+        if isinstance(value, (int, float)):
+            family.add(value, **{label: key})
+    return family
+
+
+def _collect_sqlalchemy_pool() -> List[MetricFamily]:
+    """기본 DB 엔진 커넥션 풀 사용량"""
+    from ..core.database import engine
+    
+    pool = engine.pool
+    family = MetricFamily("maxlab_db_pool_connections", "gauge", "Primary database pool connections by state")
+    family.add(pool.size(), state="size")
+    family.add(pool.checkedout(), state="checked_out")
+    family.add(pool.checkedin(), state="checked_in")
+    family.add(max(pool.overflow(), 0), state="overflow")
+    return [family]
+
+
+def _collect_data_source_pools() -> List[MetricFamily]:
+    """외부 데이터 소스 커넥션 풀 사용량"""
+    from .data_providers.connection_pool import connection_pool_manager
+    
+    stats = connection_pool_manager.get_stats()
+    connections = MetricFamily("maxlab_datasource_pool_connections", "gauge",
+                               "Data source pool connections by state")
+    usage = MetricFamily("maxlab_datasource_pool_lookups_total", "counter",
+                         "Pool lookups from the data source pool manager")
+    checkouts = MetricFamily("maxlab_datasource_pool_checkouts_total", "counter",
+                             "Connection checkouts per data source pool")
+    wait = MetricFamily("maxlab_datasource_pool_checkout_wait_seconds_total", "counter",
+                        "Cumulative connection checkout wait per data source pool")
+    for info in stats["pools"].values():
+        labels = {"data_source_id": info["data_source_id"], "source_type": info["source_type"]}
+        for state in ("capacity", "pool_size", "checked_out", "overflow"):
+            connections.add(info[state], state=state, **labels)
+        usage.add(info["usage_count"], **labels)
+        checkouts.add(info["checkouts"], **labels)
+        wait.add(info["checkout_wait_ms_total"] / 1000, **labels)
+    
+    total = MetricFamily("maxlab_datasource_pools", "gauge", "Number of open data source pools")
+    total.add(stats["total_pools"])
+    budget = MetricFamily("maxlab_datasource_pool_budget_connections", "gauge",
+                          "Global data source connection budget and reserved capacity")
+    budget.add(stats["max_connections"], kind="max")
+    budget.add(stats["reserved_connections"], kind="reserved")
+    evictions = MetricFamily("maxlab_datasource_pool_evictions_total", "counter",
+                             "Idle pools evicted to stay within the connection budget")
+    evictions.add(stats["evictions"])
+    return [connections, usage, checkouts, wait, total, budget, evictions]
+
+
+def _collect_oauth() -> List[MetricFamily]:
+    """OAuth 검증/그룹 조회 카운터와 서킷 브레이커 상태"""
+    from ..core.security import performance_metrics, oauth_circuit_breaker
+    
+    raw = performance_metrics.metrics
+    requests = MetricFamily("maxlab_oauth_requests_total", "counter", "OAuth server calls by operation and outcome")
+    duration = MetricFamily("maxlab_oauth_request_duration_seconds_total", "counter",
+                            "Cumulative OAuth server call time by operation")
+    for operation in ("verify", "groups"):
+        requests.add(raw[f"oauth_{operation}_success"], operation=operation, outcome="success")
+        requests.add(raw[f"oauth_{operation}_failures"], operation=operation, outcome="failure")
+        duration.add(raw[f"oauth_{operation}_total_time"] / 1000, operation=operation)
+    
+    breaker = MetricFamily("maxlab_oauth_circuit_open", "gauge", "1 if the OAuth circuit breaker is not closed")
+    breaker.add(0 if oauth_circuit_breaker.state.value == "closed" else 1)
+    return [requests, duration, breaker]
+
+
+def _collect_permission_cache() -> List[MetricFamily]:
+    """권한 캐시 적중률"""
+    from .permission_service import permission_service
+    
+    stats = permission_service.get_cache_stats()
+    lookups = MetricFamily("maxlab_permission_cache_lookups_total", "counter", "Permission cache lookups by result")
+    lookups.add(stats["cache_hits"], result="hit")
+    lookups.add(stats["cache_misses"], result="miss")
+    size = MetricFamily("maxlab_permission_cache_entries", "gauge", "Permission cache entries")
+    size.add(stats["cache_size"])
+    ratio = MetricFamily("maxlab_permission_cache_hit_ratio", "gauge", "Permission cache hit ratio")
+    ratio.add(stats["hit_rate"])
+    return [lookups, size, ratio]
+
+
+def _collect_query_builders() -> List[MetricFamily]:
+    """최적화 쿼리 빌더 통계"""
+    from . import query_builder
+    
+    family = MetricFamily("maxlab_query_builder_operations_total", "counter",
+                          "Optimized query builder operations by level and kind")
+    for level in ("minimal", "standard", "aggressive"):
+        builder = getattr(query_builder, f"{level}_query_builder")
+        for kind, value in builder.get_query_stats().items():
+            family.add(value, level=level, kind=kind)
+    return [family]
+
+
+def _collect_sql_instrumentation() -> List[MetricFamily]:
+    """엔진 이벤트 기반 SQL 구문/요청 추적 카운터"""
+    from ..core.sql_instrumentation import sql_instrumentation
+    
+    stats = sql_instrumentation.get_stats()
+    events = counter_family("maxlab_sql_events_total", "SQL instrumentation events by kind",
+                            {key: stats[key] for key in sql_instrumentation.counters}, "kind")
+    fingerprints = MetricFamily("maxlab_sql_tracked_fingerprints", "gauge", "Distinct statement fingerprints tracked")
+    fingerprints.add(stats["tracked_fingerprints"])
+    return [events, fingerprints]
+
+
+def _collect_data_source_health() -> List[MetricFamily]:
+    """데이터 소스 상태 모니터 점검 결과"""
+    from .data_source_health import data_source_health_monitor
+    
+    up = MetricFamily("maxlab_data_source_up", "gauge", "1 if the last data source probe succeeded")
+    availability = MetricFamily("maxlab_data_source_availability_ratio", "gauge",
+                                "Share of successful recent data source probes")
+    latency = MetricFamily("maxlab_data_source_probe_seconds", "gauge", "Latency of the last data source probe")
+    for status in data_source_health_monitor.get_statuses():
+        labels = {"data_source_id": status["id"], "source_type": status["source_type"]}
+        up.add(1 if status["status"] == "connected" else 0, **labels)
+        availability.add(status["health"]["availability"], **labels)
+        latency.add(status["health"]["latency_ms"] / 1000, **labels)
+    return [up, availability, latency]
+
+
+def _collect_data_source_config_cache() -> List[MetricFamily]:
+    """데이터 소스 설정 캐시 적중률"""
+    from .data_providers.config_cache import data_source_config_cache
+    
+    stats = data_source_config_cache.get_stats()
+    lookups = counter_family("maxlab_data_source_config_cache_events_total", "Data source config cache events",
+                             {k: v for k, v in stats.items() if k not in ("entries", "workspace_slugs")}, "event")
+    entries = MetricFamily("maxlab_data_source_config_cache_entries", "gauge", "Cached data source configs")
+    entries.add(stats["entries"])
+    return [lookups, entries]
+
+
+def _collect_mapping_cache() -> List[MetricFamily]:
+    """데이터 소스 코드 매핑 캐시 적중률"""
+    from .data_source_mapping import mapping_cache
+    
+    stats = mapping_cache.get_stats()
+    events = counter_family("maxlab_data_source_mapping_cache_events_total", "Data source mapping cache events",
+                            {k: v for k, v in stats.items() if k not in ("entries", "ttl_seconds")}, "event")
+    entries = MetricFamily("maxlab_data_source_mapping_cache_entries", "gauge", "Cached data source mapping sets")
+    entries.add(stats["entries"])
+    return [events, entries]
+
+
+def _collect_spec_cache() -> List[MetricFamily]:
+    """데이터 소스별 측정 규격 캐시"""
+    from .spec_engine import spec_cache
+    
+    stats = spec_cache.get_stats()
+    events = counter_family("maxlab_spec_cache_events_total", "Measurement spec cache events",
+                            {k: v for k, v in stats.items() if k not in ("entries", "ttl_seconds")}, "event")
+    entries = MetricFamily("maxlab_spec_cache_entries", "gauge", "Cached measurement spec tables")
+    entries.add(stats["entries"])
+    return [events, entries]
+
+
+def _collect_api_conditional_cache() -> List[MetricFamily]:
+    """외부 API 조건부 요청(ETag/Last-Modified) 캐시"""
+    from .data_providers.api_fetch import conditional_cache
+    
+    stats = conditional_cache.get_stats()
+    events = counter_family("maxlab_api_conditional_cache_events_total", "API data source conditional request events",
+                            {k: v for k, v in stats.items() if k not in ("entries", "max_entries")}, "event")
+    entries = MetricFamily("maxlab_api_conditional_cache_entries", "gauge", "Cached API responses with validators")
+    entries.add(stats["entries"])
+    return [events, entries]
+
+
+_BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _collect_data_source_guards() -> List[MetricFamily]:
+    """데이터 소스별 circuit breaker/bulkhead 상태"""
+    from .data_providers.resilience import data_source_guards
+    
+    state = MetricFamily("maxlab_data_source_breaker_state", "gauge",
+                         "Data source circuit breaker state (0=closed, 1=half_open, 2=open)")
+    opened = MetricFamily("maxlab_data_source_breaker_opened_total", "counter", "Times the data source breaker opened")
+    in_flight = MetricFamily("maxlab_data_source_in_flight", "gauge", "Concurrent provider calls per data source")
+    calls = MetricFamily("maxlab_data_source_calls_total", "counter", "Guarded provider calls by outcome")
+    for data_source_id, stats in data_source_guards.get_stats().items():
+        state.add(_BREAKER_STATE_VALUES[stats["state"]], data_source_id=data_source_id)
+        opened.add(stats["times_opened"], data_source_id=data_source_id)
+        in_flight.add(stats["in_flight"], data_source_id=data_source_id)
+        for outcome, value in stats["calls"].items():
+            calls.add(value, data_source_id=data_source_id, outcome=outcome)
+    return [state, opened, in_flight, calls]
+
+
+async def _collect_database_server() -> List[MetricFamily]:
+    """PostgreSQL 서버 연결/캐시 상태 (DatabaseMonitor)"""
+    from ..core.database import AsyncSessionLocal
+    from ..core.db_monitoring import db_monitor
+    
+    async with AsyncSessionLocal() as session:
+        connection_stats = await db_monitor.get_connection_stats(session)
+        database_stats = await db_monitor.get_database_stats(session)
+    
+    connections = MetricFamily("maxlab_pg_connections", "gauge", "PostgreSQL server connections by state")
+    connections.add(connection_stats.active_connections, state="active")
+    connections.add(connection_stats.idle_connections, state="idle")
+    connections.add(connection_stats.idle_in_transaction, state="idle_in_transaction")
+    connections.add(connection_stats.waiting_connections, state="waiting")
+    connections.add(connection_stats.max_connections, state="max")
+    
+    size = MetricFamily("maxlab_pg_database_size_bytes", "gauge", "PostgreSQL database size")
+    size.add(database_stats.database_size_bytes, database=database_stats.database_name)
+    cache = MetricFamily("maxlab_pg_cache_hit_ratio", "gauge", "PostgreSQL buffer cache hit ratio")
+    cache.add(database_stats.cache_hit_ratio / 100, database=database_stats.database_name)
+    return [connections, size, cache]
+
+
+_redis_client = None
+
+
+async def _collect_redis() -> List[MetricFamily]:
+    """Redis 응답 지연 (PING 왕복 시간)"""
+    global _redis_client
+    import redis
+    from ..core.config import settings
+    
+    if _redis_client is None:
+        _redis_client = redis.from_url(settings.REDIS_URL, socket_timeout=1, socket_connect_timeout=1)
+    
+    up = MetricFamily("maxlab_redis_up", "gauge", "1 if Redis answered PING")
+    latency = MetricFamily("maxlab_redis_ping_seconds", "gauge", "Redis PING round-trip time")
+    start = time.perf_counter()
+    try:
+        await asyncio.to_thread(_redis_client.ping)
+        latency.add(time.perf_counter() - start)
+        up.add(1)
+    except redis.RedisError as e:
+        logger.debug(f"Redis ping failed: {e}")
+        up.add(0)
+    return [up, latency]
+
+
+def register_default_collectors():
+    """기본 수집기 등록 (애플리케이션 시작 시 1회)"""
+    metrics_registry.register_local("db_pool", _collect_sqlalchemy_pool)
+    metrics_registry.register_local("datasource_pools", _collect_data_source_pools)
+    metrics_registry.register_local("oauth", _collect_oauth)
+    metrics_registry.register_local("permission_cache", _collect_permission_cache)
+    metrics_registry.register_local("query_builders", _collect_query_builders)
+    metrics_registry.register_local("sql_instrumentation", _collect_sql_instrumentation)
+    metrics_registry.register_local("data_source_health", _collect_data_source_health)
+    metrics_registry.register_local("data_source_guards", _collect_data_source_guards)
+    metrics_registry.register_local("data_source_config_cache", _collect_data_source_config_cache)
+    metrics_registry.register_local("mapping_cache", _collect_mapping_cache)
+    metrics_registry.register_local("api_conditional_cache", _collect_api_conditional_cache)
+    metrics_registry.register_local("spec_cache", _collect_spec_cache)
+    metrics_registry.register_global("database_server", _collect_database_server)
+    metrics_registry.register_global("redis", _collect_redis)
@@ -4,46 +4,264 @@ API 응답 시간, 쿼리 성능, 캐시 효율성 등을 모니터링
 """
 import time
 import asyncio
-from typing import Dict, Any, List, Optional, Callable
+import json
+import math
+import os
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Iterable, Tuple
 from datetime import datetime, timedelta
-from collections import deque, defaultdict
+from collections import defaultdict
 import logging
 from contextlib import asynccontextmanager
 from functools import wraps
-import statistics
+
+from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+class LatencyHistogram:
+    """고정 메모리 지연 시간 히스토그램
+    
+    HDR 히스토그램처럼 로그 간격 버킷(상대 오차 약 1%)에 카운트만 누적하므로
+    샘플 수와 무관하게 메모리가 일정하고, 같은 버킷 구성끼리 그대로 병합할 수 있다.
+    """
+    
+    GROWTH = 1.02
+    MIN_VALUE_MS = 0.01
+    MAX_VALUE_MS = 600_000.0  # 10분 이상은 마지막 버킷에 누적
+    _LOG_GROWTH = math.log(GROWTH)
+    MAX_INDEX = int(math.log(MAX_VALUE_MS / MIN_VALUE_MS) / _LOG_GROWTH) + 1
+    
+    __slots__ = ("counts", "count", "total", "min", "max")
+    
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+    
+    @classmethod
+    def bucket_index(cls, value: float) -> int:
+        """값이 속하는 버킷 인덱스"""
+        if value <= cls.MIN_VALUE_MS:
+            return 0
+        return min(int(math.log(value / cls.MIN_VALUE_MS) / cls._LOG_GROWTH) + 1, cls.MAX_INDEX)
+    
+    @classmethod
+    def bucket_value(cls, index: int) -> float:
+        """버킷 대표값 (버킷 경계의 기하 평균)"""
+        if index == 0:
+            return cls.MIN_VALUE_MS
+        return cls.MIN_VALUE_MS * cls.GROWTH ** (index - 0.5)
+    
+    def record(self, value: float, index: Optional[int] = None):
+        """값 기록 (index 를 미리 계산했다면 재사용)"""
+        if index is None:
+            index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """다른 히스토그램을 현재 히스토그램에 병합"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+    
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0
+    
+    def percentile(self, percentile: float) -> float:
+        """백분위수 근사값"""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * percentile / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(self.bucket_value(index), self.min), self.max)
+        return self.max
+    
+    def cumulative_counts(self, bounds: Iterable[float]) -> List[int]:
+        """각 상한(bound) 이하 샘플 수 (Prometheus 히스토그램 le 버킷용, 버킷 경계 기준 근사)"""
+        ordered = sorted(self.counts.items())
+        result = []
+        for bound in bounds:
+            if bound < self.MIN_VALUE_MS:
+                threshold = -1
+            else:
+                threshold = int(math.log(bound / self.MIN_VALUE_MS) / self._LOG_GROWTH + 1e-9)
+            result.append(sum(count for index, count in ordered if index <= threshold))
+        return result
+    
+    def summary(self, percentiles: Iterable[int] = (50, 95, 99)) -> Dict[str, Any]:
+        """통계 요약"""
+        if not self.count:
+            return {"count": 0}
+        result = {"count": self.count, "mean": self.mean, "min": self.min, "max": self.max}
+        for p in percentiles:
+            result[f"p{p}"] = self.percentile(p)
+        return result
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "counts": {str(k): v for k, v in self.counts.items()},
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(k): v for k, v in data.get("counts", {}).items()}
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0.0)
+        histogram.min = data["min"] if data.get("min") is not None else math.inf
+        histogram.max = data.get("max", 0.0)
+        return histogram
+
+
+class RollingHistogram:
+    """시간 슬롯 링 버퍼로 구성된 이동 윈도우 히스토그램"""
+    
+    __slots__ = ("slot_seconds", "slots", "epochs")
+    
+    def __init__(self, slot_seconds: int, slot_count: int):
+        self.slot_seconds = slot_seconds
+        self.slots: List[Optional[LatencyHistogram]] = [None] * slot_count
+        self.epochs: List[int] = [-1] * slot_count
+    
+    def record(self, value: float, index: int, now: float):
+        epoch = int(now // self.slot_seconds)
+        pos = epoch % len(self.slots)
+        if self.epochs[pos] != epoch:
+            self.slots[pos] = LatencyHistogram()
+            self.epochs[pos] = epoch
+        self.slots[pos].record(value, index)
+    
+    def window(self, seconds: int, now: float) -> LatencyHistogram:
+        """최근 seconds 초 동안의 히스토그램"""
+        current = int(now // self.slot_seconds)
+        oldest = current - max(1, seconds // self.slot_seconds) + 1
+        merged = LatencyHistogram()
+        for epoch, slot in zip(self.epochs, self.slots):
+            if slot is not None and oldest <= epoch <= current:
+                merged.merge(slot)
+        return merged
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            str(epoch): slot.to_dict()
+            for epoch, slot in zip(self.epochs, self.slots) if slot is not None
+        }
+    
+    def merge_dict(self, data: Dict[str, Any]):
+        """다른 프로세스의 슬롯 병합 (같은 epoch 끼리만, 더 오래된 슬롯은 무시)"""
+        for epoch_key, slot_data in data.items():
+            epoch = int(epoch_key)
+            pos = epoch % len(self.slots)
+            if self.epochs[pos] > epoch:
+                continue
+            if self.epochs[pos] < epoch:
+                self.slots[pos] = LatencyHistogram()
+                self.epochs[pos] = epoch
+            self.slots[pos].merge(LatencyHistogram.from_dict(slot_data))
+
+
+# 통계 조회용 이동 윈도우 (이름 -> 초)
+METRIC_WINDOWS = {"1m": 60, "5m": 300, "1h": 3600}
+
+# 다른 워커의 스냅샷을 집계에서 제외하는 기준 (초)
+SNAPSHOT_STALE_SECONDS = 3600
+
+
+class TimedHistogram:
+    """누적 + 1분/5분/1시간 이동 윈도우 히스토그램
+    
+    5분 이하는 10초 슬롯, 1시간은 1분 슬롯으로 관리하여 기록 시 버킷 계산은 한 번만 한다.
+    """
+    
+    __slots__ = ("total", "fine", "coarse")
+    
+    def __init__(self):
+        self.total = LatencyHistogram()
+        self.fine = RollingHistogram(slot_seconds=10, slot_count=30)
+        self.coarse = RollingHistogram(slot_seconds=60, slot_count=60)
+    
+    def record(self, value: float, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        index = LatencyHistogram.bucket_index(value)
+        self.total.record(value, index)
+        self.fine.record(value, index, now)
+        self.coarse.record(value, index, now)
+    
+    def window(self, name: str, now: Optional[float] = None) -> LatencyHistogram:
+        now = time.time() if now is None else now
+        seconds = METRIC_WINDOWS[name]
+        source = self.fine if seconds <= 300 else self.coarse
+        return source.window(seconds, now)
+    
+    def window_summaries(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.time() if now is None else now
+        return {name: self.window(name, now).summary() for name in METRIC_WINDOWS}
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total.to_dict(),
+            "fine": self.fine.to_dict(),
+            "coarse": self.coarse.to_dict()
+        }
+    
+    def merge_dict(self, data: Dict[str, Any]):
+        self.total.merge(LatencyHistogram.from_dict(data["total"]))
+        self.fine.merge_dict(data.get("fine", {}))
+        self.coarse.merge_dict(data.get("coarse", {}))
+
+
 class PerformanceMetrics:
-    """성능 메트릭 데이터 클래스"""
+    """성능 메트릭 데이터 클래스
+    
+    응답/쿼리 시간은 원본 샘플 대신 고정 메모리 히스토그램으로 누적하며,
+    snapshot()/merge_snapshot() 으로 여러 워커 프로세스의 값을 합칠 수 있다.
+    """
     
-    def __init__(self, max_history: int = 1000):
-        self.max_history = max_history
-        self.response_times: deque = deque(maxlen=max_history)
-        self.query_times: deque = deque(maxlen=max_history)
+    def __init__(self):
+        self.response_times = TimedHistogram()
+        self.endpoint_metrics: Dict[str, TimedHistogram] = defaultdict(TimedHistogram)
+        self.query_metrics: Dict[str, TimedHistogram] = defaultdict(TimedHistogram)
         self.cache_operations = {
             "hits": 0,
             "misses": 0,
             "sets": 0,
             "invalidations": 0
         }
-        self.endpoint_metrics: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
         self.error_counts: Dict[str, int] = defaultdict(int)
         self.start_time = datetime.now()
+        self.worker_count = 1
     
     def add_response_time(self, endpoint: str, duration_ms: float):
         """응답 시간 추가"""
-        self.response_times.append(duration_ms)
-        self.endpoint_metrics[endpoint].append(duration_ms)
+        now = time.time()
+        self.response_times.record(duration_ms, now)
+        self.endpoint_metrics[endpoint].record(duration_ms, now)
     
     def add_query_time(self, query_type: str, duration_ms: float):
         """쿼리 시간 추가"""
-        self.query_times.append({
-            "type": query_type,
-            "duration_ms": duration_ms,
-            "timestamp": datetime.now()
-        })
+        self.query_metrics[query_type].record(duration_ms)
     
     def record_cache_hit(self):
         """캐시 히트 기록"""
@@ -68,37 +286,30 @@ class PerformanceMetrics:
     def get_statistics(self) -> Dict[str, Any]:
         """통계 정보 반환"""
         uptime = datetime.now() - self.start_time
+        now = time.time()
         
         # 응답 시간 통계
         response_stats = {}
-        if self.response_times:
+        if self.response_times.total.count:
+            total = self.response_times.total
             response_stats = {
-                "count": len(self.response_times),
-                "mean": statistics.mean(self.response_times),
-                "median": statistics.median(self.response_times),
-                "p95": self._calculate_percentile(list(self.response_times), 95),
-                "p99": self._calculate_percentile(list(self.response_times), 99),
-                "min": min(self.response_times),
-                "max": max(self.response_times)
+                "count": total.count,
+                "mean": total.mean,
+                "median": total.percentile(50),
+                "p95": total.percentile(95),
+                "p99": total.percentile(99),
+                "min": total.min,
+                "max": total.max,
+                "windows": self.response_times.window_summaries(now)
             }
         
         # 캐시 효율성
         total_cache_ops = self.cache_operations["hits"] + self.cache_operations["misses"]
         cache_hit_rate = (
-            self.cache_operations["hits"] / total_cache_ops * 100 
+            self.cache_operations["hits"] / total_cache_ops * 100
             if total_cache_ops > 0 else 0
         )
         
-        # 엔드포인트별 통계
-        endpoint_stats = {}
-        for endpoint, times in self.endpoint_metrics.items():
-            if times:
-                endpoint_stats[endpoint] = {
-                    "count": len(times),
-                    "mean": statistics.mean(times),
-                    "p95": self._calculate_percentile(list(times), 95)
-                }
-        
         return {
             "uptime_seconds": uptime.total_seconds(),
             "response_times": response_stats,
@@ -106,37 +317,59 @@ class PerformanceMetrics:
                 **self.cache_operations,
                 "hit_rate_percentage": cache_hit_rate
             },
-            "endpoints": endpoint_stats,
+            "endpoints": self._summarize(self.endpoint_metrics, now),
             "errors": dict(self.error_counts),
-            "query_performance": self._get_query_statistics()
+            "query_performance": self._summarize(self.query_metrics, now)
         }
     
-    def _calculate_percentile(self, data: List[float], percentile: int) -> float:
-        """백분위수 계산"""
-        if not data:
-            return 0
-        sorted_data = sorted(data)
-        index = int(len(sorted_data) * percentile / 100)
-        return sorted_data[min(index, len(sorted_data) - 1)]
-    
-    def _get_query_statistics(self) -> Dict[str, Any]:
-        """쿼리 통계 정보"""
-        if not self.query_times:
-            return {}
-        
-        query_stats = defaultdict(list)
-        for query in self.query_times:
-            query_stats[query["type"]].append(query["duration_ms"])
-        
+    def _summarize(self, histograms: Dict[str, TimedHistogram], now: float) -> Dict[str, Any]:
+        """키별 누적 통계와 이동 윈도우 통계"""
         result = {}
-        for query_type, times in query_stats.items():
-            result[query_type] = {
-                "count": len(times),
-                "mean": statistics.mean(times),
-                "p95": self._calculate_percentile(times, 95)
-            }
-        
+        for key, histogram in histograms.items():
+            if histogram.total.count:
+                result[key] = {
+                    "count": histogram.total.count,
+                    "mean": histogram.total.mean,
+                    "p95": histogram.total.percentile(95),
+                    "p99": histogram.total.percentile(99),
+                    "windows": histogram.window_summaries(now)
+                }
         return result
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """프로세스 간 집계를 위한 직렬화 가능한 스냅샷"""
+        return {
+            "pid": os.getpid(),
+            "start_time": self.start_time.isoformat(),
+            "response_times": self.response_times.to_dict(),
+            "endpoints": {k: v.to_dict() for k, v in self.endpoint_metrics.items()},
+            "queries": {k: v.to_dict() for k, v in self.query_metrics.items()},
+            "cache": dict(self.cache_operations),
+            "errors": dict(self.error_counts)
+        }
+    
+    def merge_snapshot(self, snapshot: Dict[str, Any]):
+        """다른 프로세스의 스냅샷 병합"""
+        self.response_times.merge_dict(snapshot["response_times"])
+        for key, data in snapshot.get("endpoints", {}).items():
+            self.endpoint_metrics[key].merge_dict(data)
+        for key, data in snapshot.get("queries", {}).items():
+            self.query_metrics[key].merge_dict(data)
+        for key, value in snapshot.get("cache", {}).items():
+            self.cache_operations[key] = self.cache_operations.get(key, 0) + value
+        for key, value in snapshot.get("errors", {}).items():
+            self.error_counts[key] += value
+        
+        start_time = datetime.fromisoformat(snapshot["start_time"])
+        self.start_time = min(self.start_time, start_time)
+        self.worker_count += 1
+    
+    @classmethod
+    def from_snapshot(cls, snapshot: Dict[str, Any]) -> "PerformanceMetrics":
+        metrics = cls()
+        metrics.merge_snapshot(snapshot)
+        metrics.worker_count = 1
+        return metrics
 
 
 class PerformanceMonitor:
@@ -145,6 +378,8 @@ class PerformanceMonitor:
     def __init__(self):
         self.metrics = PerformanceMetrics()
         self._monitoring_enabled = True
+        self._snapshot_task: Optional[asyncio.Task] = None
+        self._snapshot_providers: Dict[str, Callable[[], Any]] = {}
     
     @asynccontextmanager
     async def monitor_request(self, endpoint: str):
@@ -200,9 +435,118 @@ class PerformanceMonitor:
             self.metrics.record_error(error_type)
             logger.error(f"Error recorded: {error_type}")
     
-    def get_statistics(self) -> Dict[str, Any]:
-        """통계 정보 반환"""
-        return self.metrics.get_statistics()
+    def get_statistics(self, aggregate: bool = True) -> Dict[str, Any]:
+        """통계 정보 반환
+        
+        PERFORMANCE_METRICS_DIR 가 설정되어 있으면 다른 워커 프로세스의
+        스냅샷과 병합한 전체 통계를 반환한다.
+        """
+        if not aggregate or not settings.PERFORMANCE_METRICS_DIR:
+            return self.metrics.get_statistics()
+        
+        merged = self.get_aggregated_metrics()
+        stats = merged.get_statistics()
+        stats["workers"] = merged.worker_count
+        return stats
+    
+    def get_aggregated_metrics(self) -> PerformanceMetrics:
+        """모든 워커 프로세스의 메트릭을 병합한 결과 (단일 프로세스면 현재 메트릭)"""
+        if not settings.PERFORMANCE_METRICS_DIR:
+            return self.metrics
+        
+        merged = PerformanceMetrics.from_snapshot(self.metrics.snapshot())
+        for snapshot in self._load_worker_snapshots():
+            merged.merge_snapshot(snapshot)
+        return merged
+    
+    def register_snapshot_provider(self, name: str, provider: Callable[[], Any]):
+        """워커 스냅샷에 함께 기록할 추가 데이터 등록 (JSON 직렬화 가능해야 함)"""
+        self._snapshot_providers[name] = provider
+    
+    def load_worker_extras(self, name: str) -> List[Tuple[int, Any]]:
+        """다른 워커 스냅샷에 기록된 추가 데이터 목록 (pid, 데이터)"""
+        if not settings.PERFORMANCE_METRICS_DIR:
+            return []
+        return [
+            (snapshot["pid"], snapshot["extras"][name])
+            for snapshot in self._load_worker_snapshots()
+            if name in snapshot.get("extras", {})
+        ]
+    
+    def _snapshot_path(self, pid: Optional[int] = None) -> Path:
+        return Path(settings.PERFORMANCE_METRICS_DIR) / f"perf_{pid or os.getpid()}.json"
+    
+    def build_snapshot(self) -> Dict[str, Any]:
+        """현재 프로세스의 히스토그램 스냅샷과 추가 데이터 (이벤트 루프에서 호출)"""
+        snapshot = self.metrics.snapshot()
+        snapshot["extras"] = {}
+        for name, provider in self._snapshot_providers.items():
+            try:
+                snapshot["extras"][name] = provider()
+            except Exception as e:
+                logger.warning(f"Snapshot provider {name} failed: {e}")
+        return snapshot
+    
+    def _write_snapshot_file(self, snapshot: Dict[str, Any]):
+        """직렬화 후 공유 디렉토리에 기록 (원자적 교체, 스레드에서 실행 가능)"""
+        path = self._snapshot_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        payload = json.dumps(snapshot)
+        with open(tmp_path, "w") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    
+    def write_snapshot(self):
+        """현재 프로세스의 스냅샷을 공유 디렉토리에 기록"""
+        self._write_snapshot_file(self.build_snapshot())
+    
+    def _load_worker_snapshots(self) -> Iterable[Dict[str, Any]]:
+        """다른 워커 프로세스의 최근 스냅샷 로드 (1시간 이상 갱신되지 않은 파일은 제외)"""
+        directory = Path(settings.PERFORMANCE_METRICS_DIR)
+        if not directory.is_dir():
+            return
+        
+        own_path = self._snapshot_path()
+        stale_before = time.time() - SNAPSHOT_STALE_SECONDS
+        for path in directory.glob("perf_*.json"):
+            if path == own_path:
+                continue
+            try:
+                if path.stat().st_mtime < stale_before:
+                    continue
+                with open(path) as f:
+                    yield json.load(f)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Skipping unreadable metrics snapshot {path}: {e}")
+    
+    async def _snapshot_loop(self, interval: float):
+        while True:
+            try:
+                # 메트릭과 제공자 상태는 루프에서만 변경되므로 스냅샷은 루프에서 만들고 직렬화/파일 기록만 스레드로
+                await asyncio.to_thread(self._write_snapshot_file, self.build_snapshot())
+            except Exception as e:
+                logger.warning(f"Failed to write performance snapshot: {e}")
+            await asyncio.sleep(interval)
+    
+    def start_snapshot_exporter(self, interval: float = 10.0):
+        """워커 간 통계 집계를 위한 주기적 스냅샷 기록 시작"""
+        if not settings.PERFORMANCE_METRICS_DIR or self._snapshot_task is not None:
+            return
+        self._snapshot_task = asyncio.create_task(self._snapshot_loop(interval))
+        logger.info(f"Performance snapshot exporter started: {settings.PERFORMANCE_METRICS_DIR}")
+    
+    async def stop_snapshot_exporter(self):
+        """스냅샷 기록 중지 및 프로세스 스냅샷 제거"""
+        if self._snapshot_task is None:
+            return
+        self._snapshot_task.cancel()
+        try:
+            await self._snapshot_task
+        except asyncio.CancelledError:
+            pass
+        self._snapshot_task = None
+        self._snapshot_path().unlink(missing_ok=True)
     
     def reset_metrics(self):
         """메트릭 초기화"""
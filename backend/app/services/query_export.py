@@ -0,0 +1,197 @@
+"""
+Query Export Service
+쿼리 결과를 CSV / NDJSON / Parquet 바이트 스트림으로 인코딩하는 서비스
+"""
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from datetime import date, datetime, time
+from decimal import Decimal
+import csv
+import io
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# pyarrow를 선택적으로 import (Parquet 내보내기용)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+    pa = None
+    pq = None
+
+# 형식별 (media type, 파일 확장자)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+RowBatches = AsyncIterator[Tuple[List[str], List[tuple]]]
+
+
+def _plain_value(value: Any) -> Any:
+    """JSON/CSV로 표현 가능한 값으로 변환"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    plain = _plain_value(value)
+    if plain is value:
+        return str(value)
+    return plain
+
+
+async def _encode_csv(batches: RowBatches) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+    
+    async for columns, rows in batches:
+        if not header_written:
+            # Excel이 UTF-8로 인식하도록 BOM 추가
+            buffer.write("\ufeff")
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows([_plain_value(value) for value in row] for row in rows)
+        
+        chunk = buffer.getvalue()
+        if chunk:
+            yield chunk.encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+async def _encode_ndjson(batches: RowBatches) -> AsyncIterator[bytes]:
+    dumps = json.JSONEncoder(ensure_ascii=False, default=_json_default).encode
+    async for columns, rows in batches:
+        if rows:
+            yield "".join(dumps(dict(zip(columns, row))) + "\n" for row in rows).encode("utf-8")
+
+
+class _ChunkSink:
+    """ParquetWriter 출력 버퍼 (tell()은 누적 오프셋 유지, drain() 시 비움)"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+        self.closed = False
+    
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._position
+    
+    def flush(self):
+        pass
+    
+    def close(self):
+        self.closed = True
+    
+    def writable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return False
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema(columns: List[str], rows: List[tuple]):
+    """첫 배치에서 스키마 추론 (값이 전부 NULL인 컬럼은 문자열로 취급)"""
+    table = pa.Table.from_pydict(_columnar(columns, rows))
+    return pa.schema([
+        pa.field(field.name, pa.string() if pa.types.is_null(field.type) else field.type)
+        for field in table.schema
+    ])
+
+
+def _arrow_value(value: Any) -> Any:
+    # pyarrow가 직접 변환하지 못하거나 배치마다 타입이 달라지는 값만 변환
+    # (Decimal은 첫 배치의 precision/scale로 고정되면 이후 배치가 실패하므로 float64로 기록)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, memoryview):
+        return bytes(value)
+    return value
+
+
+def _columnar(columns: List[str], rows: List[tuple], string_columns: Optional[set] = None) -> Dict[str, list]:
+    data = {}
+    for index, name in enumerate(columns):
+        if string_columns and name in string_columns:
+            data[name] = [None if row[index] is None else str(_plain_value(row[index])) for row in rows]
+        else:
+            data[name] = [_arrow_value(row[index]) for row in rows]
+    return data
+
+
+async def _encode_parquet(batches: RowBatches) -> AsyncIterator[bytes]:
+    sink = _ChunkSink()
+    writer = None
+    schema = None
+    string_columns: set = set()
+    columns: List[str] = []
+    
+    try:
+        async for columns, rows in batches:
+            if not rows:
+                continue
+            if writer is None:
+                schema = _parquet_schema(columns, rows)
+                string_columns = {field.name for field in schema if pa.types.is_string(field.type)}
+                writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+            # 배치마다 row group 하나로 기록하고 바로 전송
+            writer.write_table(pa.Table.from_pydict(_columnar(columns, rows, string_columns), schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+        
+        if writer is None:
+            # 결과가 비어 있어도 헤더(스키마)만 있는 유효한 Parquet 파일을 반환
+            schema = pa.schema([pa.field(name, pa.string()) for name in columns])
+            writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+        writer.close()
+        writer = None
+        yield sink.drain()
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def encode_export(batches: RowBatches, export_format: str) -> AsyncIterator[bytes]:
+    """
+    행 배치 스트림을 지정한 형식의 바이트 스트림으로 변환
+    
+    Raises:
+        ValueError: 지원하지 않는 형식이거나 pyarrow가 없는 경우 (Parquet)
+    """
+    if export_format == "csv":
+        return _encode_csv(batches)
+    if export_format == "ndjson":
+        return _encode_ndjson(batches)
+    if export_format == "parquet":
+        if not PYARROW_AVAILABLE:
+            raise ValueError("Parquet export requires pyarrow, which is not installed")
+        return _encode_parquet(batches)
+    raise ValueError(f"Unsupported export format: {export_format}")
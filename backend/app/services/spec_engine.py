@@ -0,0 +1,227 @@
+"""
+Spec Engine Service
+측정값의 USL/LSL 규격 판정을 배치 단위로 수행하는 서비스
+"""
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+import math
+import time
+
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# numpy를 선택적으로 import (없으면 순수 Python으로 판정)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+# 규격 판정 코드 (프론트엔드와 공유)
+SPEC_IN_SPEC = 0
+SPEC_BELOW_SPEC = 1
+SPEC_ABOVE_SPEC = 2
+SPEC_NO_SPEC = 9
+
+SPEC_STATUS_CODES = {
+    "IN_SPEC": SPEC_IN_SPEC,
+    "BELOW_SPEC": SPEC_BELOW_SPEC,
+    "ABOVE_SPEC": SPEC_ABOVE_SPEC,
+    "NO_SPEC": SPEC_NO_SPEC,
+}
+
+# (measurement_code, usl, lsl, target)
+SpecRow = Tuple[str, Optional[float], Optional[float], Optional[float]]
+SpecLoader = Callable[[], Awaitable[Optional[Iterable[SpecRow]]]]
+
+_NAN = float("nan")
+
+
+def coerce_spec_status(value: Any, default: int = SPEC_IN_SPEC) -> int:
+    """프로바이더가 반환한 spec_status(정수, 숫자 문자열, IN_SPEC 등)를 정수 코드로 변환"""
+    if value is None:
+        return default
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        code = SPEC_STATUS_CODES.get(value.strip().upper())
+        if code is not None:
+            return code
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _to_float(value: Any) -> float:
+    if value is None:
+        return _NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return _NAN
+
+
+def _from_float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def evaluate_spec_status(values: Sequence[float], usl: Sequence[float], lsl: Sequence[float]) -> List[int]:
+    """
+    측정값 배열을 USL/LSL 배열과 한 번에 비교 (NaN은 한계 없음)
+    
+    Returns:
+        List[int]: 상한 초과 > 하한 미만 > 규격 내 순으로 판정, 한계가 모두 없으면 NO_SPEC
+    """
+    if NUMPY_AVAILABLE:
+        values = np.asarray(values, dtype=np.float64)
+        usl = np.asarray(usl, dtype=np.float64)
+        lsl = np.asarray(lsl, dtype=np.float64)
+        status = np.full(values.shape, SPEC_NO_SPEC, dtype=np.int8)
+        status[~(np.isnan(usl) & np.isnan(lsl))] = SPEC_IN_SPEC
+        # NaN과의 비교는 항상 False이므로 한계가 없는 쪽은 자동으로 제외
+        status[values < lsl] = SPEC_BELOW_SPEC
+        status[values > usl] = SPEC_ABOVE_SPEC
+        return status.tolist()
+    
+    result = []
+    for value, upper, lower in zip(values, usl, lsl):
+        if value > upper:
+            result.append(SPEC_ABOVE_SPEC)
+        elif value < lower:
+            result.append(SPEC_BELOW_SPEC)
+        elif math.isnan(upper) and math.isnan(lower):
+            result.append(SPEC_NO_SPEC)
+        else:
+            result.append(SPEC_IN_SPEC)
+    return result
+
+
+class SpecTable:
+    """데이터 소스 하나의 measurement_specs를 측정 코드 인덱스와 한계값 배열로 보관"""
+    
+    __slots__ = ("index", "usl", "lsl", "target", "loaded_at")
+    
+    def __init__(self, specs: Optional[Iterable[SpecRow]] = None):
+        self.index: Dict[str, int] = {}
+        usl, lsl, target = [], [], []
+        for code, upper, lower, target_value in specs or ():
+            self.index[str(code)] = len(usl)
+            usl.append(_to_float(upper))
+            lsl.append(_to_float(lower))
+            target.append(_to_float(target_value))
+        # 마지막 NaN은 규격이 없는 코드(-1 인덱스)용
+        usl.append(_NAN)
+        lsl.append(_NAN)
+        target.append(_NAN)
+        if NUMPY_AVAILABLE:
+            self.usl, self.lsl, self.target = (np.asarray(column, dtype=np.float64) for column in (usl, lsl, target))
+        else:
+            self.usl, self.lsl, self.target = usl, lsl, target
+        self.loaded_at = time.monotonic()
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    def _limits(self, measurements: Sequence[Any]):
+        """행에 있는 한계값을 우선하고 없으면 규격 테이블 값 사용"""
+        index = self.index
+        positions = [index.get(m.measurement_code, -1) for m in measurements]
+        row_usl = [_to_float(m.usl) for m in measurements]
+        row_lsl = [_to_float(m.lsl) for m in measurements]
+        row_target = [_to_float(m.target) for m in measurements]
+        
+        if NUMPY_AVAILABLE:
+            positions = np.asarray(positions, dtype=np.intp)
+            columns = []
+            for row_values, table_values in ((row_usl, self.usl), (row_lsl, self.lsl), (row_target, self.target)):
+                row_values = np.asarray(row_values, dtype=np.float64)
+                columns.append(np.where(np.isnan(row_values), table_values[positions], row_values))
+            return columns
+        
+        return [
+            [table_values[p] if math.isnan(v) else v for v, p in zip(row_values, positions)]
+            for row_values, table_values in ((row_usl, self.usl), (row_lsl, self.lsl), (row_target, self.target))
+        ]
+    
+    def apply(self, measurements: List[Any]) -> List[Any]:
+        """
+        측정 데이터 목록에 규격 한계와 spec_status를 일괄 적용
+        
+        한계값이 전혀 없는 행은 프로바이더가 준 spec_status를 그대로 유지합니다.
+        
+        Args:
+            measurements: MeasurementRecord 목록 (제자리 수정)
+        
+        Returns:
+            List: 같은 목록
+        """
+        if not measurements:
+            return measurements
+        
+        usl, lsl, target = self._limits(measurements)
+        values = [_to_float(m.measurement_value) for m in measurements]
+        statuses = evaluate_spec_status(values, usl, lsl)
+        if NUMPY_AVAILABLE:
+            usl, lsl, target = usl.tolist(), lsl.tolist(), target.tolist()
+        
+        for measurement, status, upper, lower, target_value in zip(measurements, statuses, usl, lsl, target):
+            if status == SPEC_NO_SPEC:
+                continue
+            measurement.spec_status = status
+            measurement.usl = _from_float(upper)
+            measurement.lsl = _from_float(lower)
+            measurement.target = _from_float(target_value)
+        return measurements
+
+
+class SpecCache:
+    """워크스페이스/데이터 소스별 SpecTable 캐시 (항목별 TTL)"""
+    
+    def __init__(self, ttl_seconds: float = 300):
+        self.ttl_seconds = ttl_seconds
+        self._tables: Dict[str, Tuple[str, str, SpecTable]] = {}
+        self.stats = {"hits": 0, "misses": 0, "load_errors": 0, "invalidations": 0}
+    
+    async def get_table(self, workspace_id: Any, data_source_id: Any, loader: Optional[SpecLoader]) -> SpecTable:
+        """캐시된 규격 테이블 반환 (없거나 만료되면 loader로 다시 로드)"""
+        key = f"{workspace_id}:{data_source_id}"
+        cached = self._tables.get(key)
+        if cached is not None and time.monotonic() - cached[2].loaded_at < self.ttl_seconds:
+            self.stats["hits"] += 1
+            return cached[2]
+        
+        self.stats["misses"] += 1
+        specs = None
+        if loader is not None:
+            try:
+                specs = await loader()
+            except Exception as e:
+                # 규격 테이블이 없는 데이터 소스도 있으므로 빈 테이블로 캐시 (TTL 후 재시도)
+                self.stats["load_errors"] += 1
+                logger.warning(f"Failed to load measurement specs for data source {data_source_id}: {e}")
+        
+        table = SpecTable(specs)
+        self._tables[key] = (str(workspace_id), str(data_source_id), table)
+        logger.debug(f"Loaded {len(table)} measurement specs for data source {data_source_id}")
+        return table
+    
+    def invalidate(self, workspace_id: Optional[str] = None, data_source_id: Optional[str] = None) -> None:
+        """워크스페이스 및/또는 데이터 소스의 규격 캐시 삭제 (둘 다 None이면 전체)"""
+        if workspace_id is None and data_source_id is None:
+            self._tables.clear()
+        else:
+            for key, (cached_workspace, cached_source, _) in list(self._tables.items()):
+                if (data_source_id is None or cached_source == str(data_source_id)) and \
+                        (workspace_id is None or cached_workspace == str(workspace_id)):
+                    del self._tables[key]
+        self.stats["invalidations"] += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "entries": len(self._tables), "ttl_seconds": self.ttl_seconds}
+
+
+# 전역 규격 캐시
+spec_cache = SpecCache(settings.SPEC_CACHE_TTL_SECONDS)
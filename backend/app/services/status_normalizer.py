@@ -2,13 +2,91 @@
 Status Normalizer Service
 설비 상태값을 표준 형태로 정규화하는 서비스
 """
-from typing import Dict, Optional, Set
+from typing import Callable, Dict, Iterable, List, Optional, Set
 import logging
+import re
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+
 logger = logging.getLogger(__name__)
 
+# 부분 매칭 키워드 (우선순위 순: ACTIVE > PAUSE > STOP)
+PARTIAL_MATCH_KEYWORDS = (
+    ("ACTIVE", ("RUN", "ACTIVE", "ON", "START", "WORK", "OPER")),
+    ("PAUSE", ("PAUSE", "IDLE", "WAIT", "HOLD", "STAND")),
+    ("STOP", ("STOP", "OFF", "DOWN", "ERROR", "FAULT", "FAIL", "MAINT")),
+)
+
+# 키워드 -> (우선순위, 상태)
+_KEYWORD_STATUS = {
+    keyword: (priority, status)
+    for priority, (status, keywords) in enumerate(PARTIAL_MATCH_KEYWORDS)
+    for keyword in keywords
+}
+
+# 모든 키워드를 한 번에 찾는 매처 (lookahead로 겹치는 위치도 모두 검색)
+_KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in _KEYWORD_STATUS) + "))"
+)
+
+# 워크스페이스별 원본값 -> 정규화 결과 메모 최대 크기
+MEMO_MAX_SIZE = 10000
+
+
+class StatusTable:
+    """워크스페이스별로 미리 병합한 상태 매핑 테이블 (기본 + 사용자 정의) 및 결과 메모"""
+    
+    def __init__(self, mappings: Dict[str, str]):
+        self.mappings = mappings
+        self.memo: Dict[str, str] = {}
+    
+    def normalize(self, raw_status) -> str:
+        if raw_status is None:
+            return "STOP"
+        key = raw_status if isinstance(raw_status, str) else str(raw_status)
+        result = self.memo.get(key)
+        if result is not None:
+            return result
+        
+        normalized_input = key.upper().strip()
+        result = self.mappings.get(normalized_input)
+        if result is None:
+            result = partial_match(normalized_input)
+            if result is None:
+                # 매핑되지 않은 상태는 STOP으로 기본값 설정 (메모 덕분에 값당 한 번만 경고)
+                if normalized_input:
+                    logger.warning(f"Unknown status '{key}' normalized to STOP")
+                result = "STOP"
+        
+        if len(self.memo) >= MEMO_MAX_SIZE:
+            self.memo.clear()
+        self.memo[key] = result
+        return result
+
+
+def partial_match(status: str) -> Optional[str]:
+    """
+    키워드 기반 부분 매칭 (문자열 한 번 스캔, 우선순위가 가장 높은 키워드의 상태 반환)
+    
+    Args:
+        status: 대문자로 변환된 상태값
+    
+    Returns:
+        str: 매칭된 상태값 또는 None
+    """
+    best = None
+    for match in _KEYWORD_PATTERN.finditer(status):
+        candidate = _KEYWORD_STATUS[match.group(1)]
+        if best is None or candidate < best:
+            best = candidate
+            if best[0] == 0:
+                break
+    return best[1] if best else None
+
 
 class StatusNormalizer:
     """설비 상태값 정규화 서비스"""
@@ -53,16 +131,25 @@ class StatusNormalizer:
         "BROKEN": "STOP",
     }
     
-    def __init__(self, db_session: Optional[AsyncSession] = None):
+    def __init__(
+        self,
+        db_session: Optional[AsyncSession] = None,
+        session_factory: Optional[Callable[[], AsyncSession]] = None
+    ):
         """
         상태 정규화 서비스 초기화
         
         Args:
-            db_session: 데이터베이스 세션 (사용자 정의 매핑 로드용)
+            db_session: 데이터베이스 세션 (사용자 정의 매핑 로드/추가용)
+            session_factory: db_session이 없을 때 매핑 로드마다 짧게 여는 세션 팩토리
         """
         self.db_session = db_session
+        self._session_factory = session_factory
         self._custom_mappings: Dict[str, Dict[str, str]] = {}  # workspace_id -> {source_status -> target_status}
         self._cache_loaded: Set[str] = set()  # 캐시 로드 완료된 workspace_id 목록
+        self._checked_at: Dict[str, float] = {}  # workspace_id -> 마지막 로드/재확인 시각 (monotonic)
+        self._tables: Dict[Optional[str], StatusTable] = {}  # workspace_id -> 병합된 매핑 테이블
+        self._generation = 0  # 무효화 횟수 (로드 중 무효화되면 읽어 온 이전 매핑을 캐시에 넣지 않음)
     
     async def normalize_status(self, raw_status: str, workspace_id: Optional[str] = None) -> str:
         """
@@ -75,36 +162,49 @@ class StatusNormalizer:
         Returns:
             str: 정규화된 상태값 (ACTIVE, PAUSE, STOP 중 하나)
         """
-        if not raw_status:
-            return "STOP"
-        
-        # 대소문자 구분 없이 처리
-        normalized_input = raw_status.upper().strip()
+        table = await self.prepare(workspace_id)
+        return table.normalize(raw_status)
+    
+    async def prepare(self, workspace_id: Optional[str] = None) -> StatusTable:
+        """
+        워크스페이스 매핑 테이블 준비 (사용자 정의 매핑은 STATUS_MAPPING_REVALIDATE_SECONDS마다 다시 확인)
         
-        # 사용자 정의 매핑 확인 (우선순위 높음)
-        if workspace_id and self.db_session:
+        Args:
+            workspace_id: 워크스페이스 ID
+            
+        Returns:
+            StatusTable: 기본 + 사용자 정의 매핑이 병합된 테이블
+        """
+        if workspace_id and (self.db_session or self._session_factory) and not self._is_fresh(workspace_id):
             await self._load_custom_mappings(workspace_id)
-            custom_mapping = self._custom_mappings.get(workspace_id, {})
-            if normalized_input in custom_mapping:
-                result = custom_mapping[normalized_input]
-                logger.debug(f"Status normalized using custom mapping: {raw_status} -> {result} (workspace: {workspace_id})")
-                return result
-        
-        # 기본 매핑 테이블 확인
-        if normalized_input in self.DEFAULT_STATUS_MAPPINGS:
-            result = self.DEFAULT_STATUS_MAPPINGS[normalized_input]
-            logger.debug(f"Status normalized using default mapping: {raw_status} -> {result}")
-            return result
+        return self._get_table(workspace_id)
+    
+    def normalize_many(self, raw_statuses: Iterable, workspace_id: Optional[str] = None) -> List[str]:
+        """
+        여러 상태값을 한 번에 정규화 (동기)
         
-        # 부분 매칭 시도 (키워드 기반)
-        result = self._partial_match(normalized_input)
-        if result:
-            logger.debug(f"Status normalized using partial matching: {raw_status} -> {result}")
-            return result
+        사용자 정의 매핑을 적용하려면 먼저 ``await prepare(workspace_id)``를 호출해야 함.
         
-        # 매핑되지 않은 상태는 STOP으로 기본값 설정
-        logger.warning(f"Unknown status '{raw_status}' normalized to STOP")
-        return "STOP"
+        Args:
+            raw_statuses: 원본 상태값 목록
+            workspace_id: 워크스페이스 ID
+            
+        Returns:
+            List[str]: 입력 순서대로 정규화된 상태값 목록
+        """
+        normalize = self._get_table(workspace_id).normalize
+        return [normalize(raw_status) for raw_status in raw_statuses]
+    
+    def _get_table(self, workspace_id: Optional[str]) -> StatusTable:
+        key = workspace_id if workspace_id in self._cache_loaded else None
+        table = self._tables.get(key)
+        if table is None:
+            mappings = dict(self.DEFAULT_STATUS_MAPPINGS)
+            if key is not None:
+                # 사용자 정의 매핑이 기본 매핑보다 우선
+                mappings.update(self._custom_mappings.get(key, {}))
+            table = self._tables[key] = StatusTable(mappings)
+        return table
     
     def _partial_match(self, status: str) -> Optional[str]:
         """
@@ -116,74 +216,82 @@ class StatusNormalizer:
         Returns:
             str: 매칭된 상태값 또는 None
         """
-        # Active 관련 키워드
-        active_keywords = ["RUN", "ACTIVE", "ON", "START", "WORK", "OPER"]
-        for keyword in active_keywords:
-            if keyword in status:
-                return "ACTIVE"
-        
-        # Pause 관련 키워드
-        pause_keywords = ["PAUSE", "IDLE", "WAIT", "HOLD", "STAND"]
-        for keyword in pause_keywords:
-            if keyword in status:
-                return "PAUSE"
-        
-        # Stop 관련 키워드
-        stop_keywords = ["STOP", "OFF", "DOWN", "ERROR", "FAULT", "FAIL", "MAINT"]
-        for keyword in stop_keywords:
-            if keyword in status:
-                return "STOP"
-        
-        return None
+        return partial_match(status)
+    
+    def _is_fresh(self, workspace_id: str) -> bool:
+        if workspace_id not in self._cache_loaded:
+            return False
+        checked_at = self._checked_at.get(workspace_id)
+        return checked_at is not None and time.monotonic() - checked_at < settings.STATUS_MAPPING_REVALIDATE_SECONDS
     
     async def _load_custom_mappings(self, workspace_id: str) -> None:
         """
         워크스페이스별 사용자 정의 매핑 로드
         
+        다른 워커나 DB에서 직접 바꾼 매핑은 clear_cache()가 호출되지 않으므로,
+        재확인 주기가 지나면 다시 조회해 바뀐 경우에만 테이블을 교체합니다.
+        
         Args:
             workspace_id: 워크스페이스 ID
         """
-        if workspace_id in self._cache_loaded:
+        if self._is_fresh(workspace_id):
             return
         
+        revalidating = workspace_id in self._cache_loaded
+        if revalidating:
+            # 재확인 중 동시 요청은 기존 테이블로 처리
+            self._checked_at[workspace_id] = time.monotonic()
+        generation = self._generation
         try:
-            # workspace_id가 UUID 형식인지 확인
-            import uuid
-            try:
-                uuid.UUID(workspace_id)
-                # UUID인 경우 직접 사용
-                query = text("""
-                    SELECT source_status, target_status
-                    FROM status_mappings
-                    WHERE workspace_id = :workspace_id AND is_active = true
-                """)
-                result = await self.db_session.execute(query, {"workspace_id": workspace_id})
-            except ValueError:
-                # UUID가 아닌 경우 workspace lookup
-                query = text("""
-                    SELECT sm.source_status, sm.target_status
-                    FROM status_mappings sm
-                    INNER JOIN workspaces w ON sm.workspace_id = w.id
-                    WHERE (w.slug = :workspace_id OR w.name = :workspace_id) AND sm.is_active = true
-                """)
-                result = await self.db_session.execute(query, {"workspace_id": workspace_id})
-            mappings = {}
-            
-            for row in result:
-                source_status = row.source_status.upper().strip()
-                target_status = row.target_status.upper().strip()
-                mappings[source_status] = target_status
-            
-            self._custom_mappings[workspace_id] = mappings
-            self._cache_loaded.add(workspace_id)
-            
+            if self.db_session is not None:
+                mappings = await self._query_custom_mappings(self.db_session, workspace_id)
+            else:
+                async with self._session_factory() as session:
+                    mappings = await self._query_custom_mappings(session, workspace_id)
             logger.info(f"Loaded {len(mappings)} custom status mappings for workspace {workspace_id}")
-            
         except Exception as e:
             logger.error(f"Failed to load custom status mappings for workspace {workspace_id}: {e}")
+            if revalidating:
+                # 재확인 실패 시 기존 매핑 유지
+                return
             # 실패 시 빈 매핑으로 설정
-            self._custom_mappings[workspace_id] = {}
-            self._cache_loaded.add(workspace_id)
+            mappings = {}
+        
+        if self._generation != generation:
+            return
+        self._checked_at[workspace_id] = time.monotonic()
+        if revalidating and self._custom_mappings.get(workspace_id) == mappings:
+            return  # 변경 없음: 정규화 결과 메모 유지
+        self._custom_mappings[workspace_id] = mappings
+        self._cache_loaded.add(workspace_id)
+        self._tables.pop(workspace_id, None)
+    
+    async def _query_custom_mappings(self, session: AsyncSession, workspace_id: str) -> Dict[str, str]:
+        # workspace_id가 UUID 형식인지 확인
+        import uuid
+        try:
+            uuid.UUID(workspace_id)
+            # UUID인 경우 직접 사용
+            query = text("""
+                SELECT source_status, target_status
+                FROM status_mappings
+                WHERE workspace_id = :workspace_id AND is_active = true
+            """)
+            result = await session.execute(query, {"workspace_id": workspace_id})
+        except ValueError:
+            # UUID가 아닌 경우 workspace lookup
+            query = text("""
+                SELECT sm.source_status, sm.target_status
+                FROM status_mappings sm
+                INNER JOIN workspaces w ON sm.workspace_id = w.id
+                WHERE (w.slug = :workspace_id OR w.name = :workspace_id) AND sm.is_active = true
+            """)
+            result = await session.execute(query, {"workspace_id": workspace_id})
+        
+        mappings = {}
+        for row in result:
+            mappings[row.source_status.upper().strip()] = row.target_status.upper().strip()
+        return mappings
     
     async def add_custom_mapping(
         self,
@@ -222,7 +330,7 @@ class StatusNormalizer:
                 DO UPDATE SET
                     target_status = EXCLUDED.target_status,
                     is_active = EXCLUDED.is_active,
-                    created_at = NOW()
+                    updated_at = NOW()
             """)
             
             await self.db_session.execute(query, {
@@ -234,10 +342,8 @@ class StatusNormalizer:
             
             await self.db_session.commit()
             
-            # 캐시 무효화
-            if workspace_id in self._cache_loaded:
-                self._cache_loaded.remove(workspace_id)
-                self._custom_mappings.pop(workspace_id, None)
+            # 캐시 무효화 (공유 정규화기 포함)
+            self.clear_cache(workspace_id)
             
             logger.info(f"Added custom status mapping: {source_status} -> {target_status} (workspace: {workspace_id})")
             return True
@@ -278,9 +384,22 @@ class StatusNormalizer:
         """
         if workspace_id:
             self._cache_loaded.discard(workspace_id)
+            self._checked_at.pop(workspace_id, None)
             self._custom_mappings.pop(workspace_id, None)
+            self._tables.pop(workspace_id, None)
         else:
             self._cache_loaded.clear()
+            self._checked_at.clear()
             self._custom_mappings.clear()
+            self._tables.clear()
+        self._generation += 1
         
-        logger.info(f"Status normalizer cache cleared for workspace: {workspace_id or 'ALL'}")
\ No newline at end of file
+        # 요청 세션으로 만든 인스턴스에서 매핑을 바꿔도 프로세스 공유 인스턴스에 반영
+        if self is not status_normalizer:
+            status_normalizer.clear_cache(workspace_id)
+        
+        logger.info(f"Status normalizer cache cleared for workspace: {workspace_id or 'ALL'}")
+
+
+# 프로세스 공유 상태 정규화기 (워크스페이스별 매핑 테이블을 데이터 프로바이더 간에 공유)
+status_normalizer = StatusNormalizer(session_factory=AsyncSessionLocal)
\ No newline at end of file
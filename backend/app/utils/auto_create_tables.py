@@ -5,6 +5,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import logging
 
+from app.core.measurement_partitions import measurement_partition_manager
+from app.services.measurement_rollups import measurement_rollups
+from app.services.data_providers.change_feed import install_change_triggers
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 async def ensure_tables_exist(db: AsyncSession):
@@ -155,6 +160,26 @@ async def ensure_tables_exist(db: AsyncSession):
     except Exception as e:
         logger.error(f"Error adding custom_queries column: {e}")
     
+    # Add statement_timeout_seconds column to data_source_configs if it doesn't exist
+    try:
+        await db.execute(text("""
+            ALTER TABLE data_source_configs 
+            ADD COLUMN IF NOT EXISTS statement_timeout_seconds INTEGER
+        """))
+        await db.commit()
+    except Exception as e:
+        logger.error(f"Error adding statement_timeout_seconds column: {e}")
+    
+    # Add pagination_config column to data_source_endpoint_mappings if the table exists
+    try:
+        await db.execute(text("""
+            ALTER TABLE IF EXISTS data_source_endpoint_mappings 
+            ADD COLUMN IF NOT EXISTS pagination_config JSONB
+        """))
+        await db.commit()
+    except Exception as e:
+        logger.error(f"Error adding pagination_config column: {e}")
+    
     # Check and change workspace_id from UUID to VARCHAR if needed
     try:
         check_workspace_id_type = """
@@ -197,4 +222,27 @@ async def ensure_tables_exist(db: AsyncSession):
             await db.commit()
             logger.info("Changed workspace_id to VARCHAR in data_source_mappings")
     except Exception as e:
-        logger.error(f"Error changing workspace_id type in mappings table: {e}")
\ No newline at end of file
+        logger.error(f"Error changing workspace_id type in mappings table: {e}")
+    
+    # Make sure upcoming partitions exist when measurement data is range-partitioned
+    try:
+        await measurement_partition_manager.ensure_partitions(db)
+    except Exception as e:
+        logger.error(f"Error ensuring measurement partitions: {e}")
+        await db.rollback()
+    
+    # Create measurement rollup tables (1-minute / 1-hour aggregates)
+    try:
+        await measurement_rollups.ensure_tables(db)
+    except Exception as e:
+        logger.error(f"Error creating measurement rollup tables: {e}")
+        await db.rollback()
+    
+    # Install LISTEN/NOTIFY triggers for the PostgreSQL change feed
+    if settings.PG_CHANGE_FEED_ENABLED:
+        try:
+            if await install_change_triggers(db):
+                logger.info("Change feed triggers installed")
+        except Exception as e:
+            logger.error(f"Error installing change feed triggers: {e}")
+            await db.rollback()
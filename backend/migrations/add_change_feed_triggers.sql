@@ -0,0 +1,57 @@
+-- LISTEN/NOTIFY change feed (app/services/data_providers/change_feed.py)
+-- Publishes equipment status and measurement changes on the 'maxlab_changes' channel.
+-- Payload: {"table": ..., "op": "INSERT" | "UPDATE", "row": {...}}
+
+-- Equipment status: one notification per changed row (low volume)
+CREATE OR REPLACE FUNCTION notify_equipment_status_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify(
+        'maxlab_changes',
+        json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'row', row_to_json(NEW))::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Measurements: statement level, one notification per series with the newest row of the statement
+-- so bulk inserts do not flood the channel (NOTIFY payloads are limited to 8000 bytes each)
+CREATE OR REPLACE FUNCTION notify_measurement_change()
+RETURNS TRIGGER AS $$
+DECLARE
+    latest RECORD;
+BEGIN
+    FOR latest IN
+        SELECT DISTINCT ON (equipment_code, measurement_code) *
+        FROM new_rows
+        ORDER BY equipment_code, measurement_code, "timestamp" DESC
+    LOOP
+        PERFORM pg_notify(
+            'maxlab_changes',
+            json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'row', row_to_json(latest))::text
+        );
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS equipment_status_change_notify ON personal_test_equipment_status;
+CREATE TRIGGER equipment_status_change_notify
+AFTER INSERT OR UPDATE ON personal_test_equipment_status
+FOR EACH ROW
+EXECUTE FUNCTION notify_equipment_status_change();
+
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS measurement_insert_notify ON personal_test_measurement_data;
+CREATE TRIGGER measurement_insert_notify
+AFTER INSERT ON personal_test_measurement_data
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_measurement_change();
+
+DROP TRIGGER IF EXISTS measurement_update_notify ON personal_test_measurement_data;
+CREATE TRIGGER measurement_update_notify
+AFTER UPDATE ON personal_test_measurement_data
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_measurement_change();
@@ -0,0 +1,11 @@
+-- Add pagination_config column to data_source_endpoint_mappings table
+-- API 엔드포인트별 페이지네이션 설정 (NULL이면 단일 요청)
+-- 예: {"strategy": "offset", "page_size": 500, "concurrency": 4}
+--     {"strategy": "cursor", "cursor_param": "cursor", "cursor_path": "$.meta.next_cursor"}
+--     {"strategy": "link"}
+
+ALTER TABLE data_source_endpoint_mappings 
+ADD COLUMN IF NOT EXISTS pagination_config JSONB;
+
+-- 컬럼 설명 추가
+COMMENT ON COLUMN data_source_endpoint_mappings.pagination_config IS 'Pagination for API endpoints: strategy (offset, page, cursor, link), page_size, concurrency, max_pages and parameter/response paths. NULL fetches a single page.';
@@ -0,0 +1,8 @@
+-- Add statement_timeout_seconds column to data_source_configs table
+-- 데이터 소스별 임시 쿼리 실행 타임아웃 (NULL이면 DATA_SOURCE_STATEMENT_TIMEOUT_SECONDS 사용)
+
+ALTER TABLE data_source_configs 
+ADD COLUMN IF NOT EXISTS statement_timeout_seconds INTEGER;
+
+-- 컬럼 설명 추가
+COMMENT ON COLUMN data_source_configs.statement_timeout_seconds IS 'Statement timeout in seconds for ad-hoc queries (execute-query / preview). NULL uses the server default.';
@@ -0,0 +1,50 @@
+-- Pre-aggregated measurement rollups (1-minute / 1-hour buckets)
+-- Maintained incrementally by app/services/measurement_rollups.py; buckets are epoch aligned.
+CREATE TABLE IF NOT EXISTS personal_test_measurement_rollup_1m (
+    equipment_code VARCHAR(30) NOT NULL,
+    measurement_code VARCHAR(30) NOT NULL,
+    bucket TIMESTAMPTZ NOT NULL,
+    equipment_type VARCHAR(20),
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    min_value DOUBLE PRECISION,
+    max_value DOUBLE PRECISION,
+    sum_value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    out_of_spec_count BIGINT NOT NULL DEFAULT 0, -- rows with spec_status 1 or 2 (out of spec)
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (equipment_code, measurement_code, bucket)
+);
+
+CREATE TABLE IF NOT EXISTS personal_test_measurement_rollup_1h (
+    equipment_code VARCHAR(30) NOT NULL,
+    measurement_code VARCHAR(30) NOT NULL,
+    bucket TIMESTAMPTZ NOT NULL,
+    equipment_type VARCHAR(20),
+    sample_count BIGINT NOT NULL DEFAULT 0,
+    min_value DOUBLE PRECISION,
+    max_value DOUBLE PRECISION,
+    sum_value DOUBLE PRECISION NOT NULL DEFAULT 0,
+    out_of_spec_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (equipment_code, measurement_code, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_personal_test_measurement_rollup_1m_bucket ON personal_test_measurement_rollup_1m (bucket);
+CREATE INDEX IF NOT EXISTS idx_personal_test_measurement_rollup_1h_bucket ON personal_test_measurement_rollup_1h (bucket);
+
+-- Highest measurement id already folded into the rollups.
+-- pending_measurement_id is the next candidate watermark; it is confirmed once the snapshot
+-- xmin reaches pending_xmax, i.e. every transaction that could still commit a lower id has ended.
+CREATE TABLE IF NOT EXISTS personal_test_measurement_rollup_state (
+    name VARCHAR(50) PRIMARY KEY,
+    last_measurement_id BIGINT NOT NULL DEFAULT 0,
+    pending_measurement_id BIGINT,
+    pending_xmax BIGINT,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+ALTER TABLE personal_test_measurement_rollup_state ADD COLUMN IF NOT EXISTS pending_measurement_id BIGINT;
+ALTER TABLE personal_test_measurement_rollup_state ADD COLUMN IF NOT EXISTS pending_xmax BIGINT;
+
+INSERT INTO personal_test_measurement_rollup_state (name)
+VALUES ('personal_test_measurement_data')
+ON CONFLICT (name) DO NOTHING;
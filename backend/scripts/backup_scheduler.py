@@ -8,7 +8,7 @@ import sys
 import os
 import logging
 import signal
-from datetime import datetime, time
+from datetime import datetime, time, timedelta
 from pathlib import Path
 from typing import Optional
 
@@ -39,14 +39,36 @@ class BackupScheduler:
         self.backup_minute = 0
         self.cleanup_enabled = True
         self.max_retries = 3
+        self.incremental_enabled = True  # 전체 백업 주기 사이에는 증분 백업 실행
+        self.full_interval_days = settings.BACKUP_FULL_INTERVAL_DAYS
         
-    async def run_scheduled_backup(self) -> bool:
+    def _full_backup_due(self) -> bool:
+        """마지막 전체 백업 이후 전체 백업 주기가 지났는지 확인"""
+        full_backups = [
+            b for b in backup_manager.backup_history
+            if b.backup_type == BackupType.FULL
+            and b.status in [BackupStatus.COMPLETED, BackupStatus.VERIFIED]
+            and (b.metadata.get("format") == "basebackup") == (settings.BACKUP_INCREMENTAL_MODE == "wal")
+        ]
+        if not full_backups:
+            return True
+        latest = max(b.timestamp for b in full_backups)
+        return datetime.now() - latest >= timedelta(days=self.full_interval_days)
+    
+    async def run_scheduled_backup(self, incremental: Optional[bool] = None) -> bool:
         """예약된 백업 실행"""
         try:
-            logger.info("Starting scheduled backup...")
+            if incremental is None:
+                incremental = self.incremental_enabled and not self._full_backup_due()
+            logger.info(f"Starting scheduled {'incremental' if incremental else 'full'} backup...")
             
             # 백업 실행
-            backup_info = await backup_manager.create_full_backup(compress=True)
+            if incremental:
+                backup_info = await backup_manager.create_incremental_backup()
+            elif settings.BACKUP_INCREMENTAL_MODE == "wal":
+                backup_info = await backup_manager.create_base_backup()
+            else:
+                backup_info = await backup_manager.create_full_backup(compress=True)
             
             if backup_info.status in [BackupStatus.COMPLETED, BackupStatus.VERIFIED]:
                 logger.info(f"Scheduled backup completed successfully: {backup_info.backup_id}")
@@ -71,12 +93,12 @@ class BackupScheduler:
             logger.error(f"Scheduled backup failed with exception: {e}")
             return False
     
-    async def run_with_retry(self) -> bool:
+    async def run_with_retry(self, incremental: Optional[bool] = None) -> bool:
         """재시도 로직을 포함한 백업 실행"""
         for attempt in range(1, self.max_retries + 1):
             try:
                 logger.info(f"Backup attempt {attempt}/{self.max_retries}")
-                success = await self.run_scheduled_backup()
+                success = await self.run_scheduled_backup(incremental)
                 
                 if success:
                     return True
@@ -133,10 +155,10 @@ class BackupScheduler:
 # 전역 스케줄러 인스턴스
 scheduler = BackupScheduler()
 
-async def manual_backup():
+async def manual_backup(incremental: bool = False):
     """수동 백업 실행"""
     logger.info("Starting manual backup...")
-    return await scheduler.run_with_retry()
+    return await scheduler.run_with_retry(incremental)
 
 async def restore_backup_command(backup_id: str, target_database: Optional[str] = None):
     """백업 복원 명령"""
@@ -150,6 +172,30 @@ async def restore_backup_command(backup_id: str, target_database: Optional[str]
     
     return success
 
+async def point_in_time_restore_command(target_time: str, target_database: Optional[str] = None,
+                                       restore_dir: Optional[str] = None):
+    """특정 시점 복원 명령"""
+    target = datetime.fromisoformat(target_time)
+    
+    if settings.BACKUP_INCREMENTAL_MODE == "wal":
+        if not restore_dir:
+            logger.error("--pitr-dir is required for WAL based point-in-time restore")
+            return False
+        result = await backup_manager.prepare_point_in_time_restore(target, restore_dir)
+        logger.info(f"Recovery data directory prepared: {result['data_directory']}")
+        logger.info("Start PostgreSQL with this data directory to replay WAL up to the target time")
+        return True
+    
+    logger.info(f"Starting point-in-time restore to {target} -> {target_database or 'current database'}")
+    success = await backup_manager.restore_point_in_time(target, target_database)
+    
+    if success:
+        logger.info("Point-in-time restore completed successfully")
+    else:
+        logger.error("Point-in-time restore failed")
+    
+    return success
+
 def show_backup_status():
     """백업 상태 출력"""
     stats = backup_manager.get_backup_statistics()
@@ -177,6 +223,7 @@ def show_backup_status():
     print(f"  Free: {disk['free_gb']:.1f} GB")
     
     print(f"\nRetention: {stats['retention_days']} days")
+    print(f"Incremental mode: {stats['incremental_mode']} ({stats['incremental_backups']} incremental backups)")
     print(f"Current backup running: {stats['current_backup_running']}")
 
 def list_backups(limit: int = 10):
@@ -221,8 +268,11 @@ async def main():
     
     parser = argparse.ArgumentParser(description="Database backup scheduler")
     parser.add_argument("--backup", action="store_true", help="Run manual backup")
+    parser.add_argument("--incremental", action="store_true", help="Run incremental backup instead of full")
     parser.add_argument("--restore", type=str, help="Restore backup by ID")
     parser.add_argument("--target-db", type=str, help="Target database for restore")
+    parser.add_argument("--pitr", type=str, help="Point-in-time restore target (ISO 8601)")
+    parser.add_argument("--pitr-dir", type=str, help="Data directory to prepare for WAL based restore")
     parser.add_argument("--status", action="store_true", help="Show backup status")
     parser.add_argument("--list", type=int, default=10, help="List recent backups")
     parser.add_argument("--cleanup", action="store_true", help="Cleanup old backups")
@@ -245,9 +295,14 @@ async def main():
     try:
         if args.backup:
             # 수동 백업
-            success = await manual_backup()
+            success = await manual_backup(args.incremental)
             sys.exit(0 if success else 1)
-            
+        
+        elif args.pitr:
+            # 특정 시점 복원
+            success = await point_in_time_restore_command(args.pitr, args.target_db, args.pitr_dir)
+            sys.exit(0 if success else 1)
+        
         elif args.restore:
             # 백업 복원
             success = await restore_backup_command(args.restore, args.target_db)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+측정 데이터 일괄 적재 벤치마크
+행마다 INSERT + COMMIT(기존 POST /measurements 방식), 다중 행 INSERT, COPY 경로의 지속 적재 속도(rows/sec) 비교
+
+실제 DB(DATABASE_URL)에 기록하며, 벤치마크 행은 measurement_code가 BENCH_로 시작하고 종료 시 삭제됩니다.
+
+사용법:
+    python scripts/benchmark_measurement_ingest.py --rows 200000 --batch-size 5000
+    python scripts/benchmark_measurement_ingest.py --methods copy --rows 2000000 --commit-rows 100000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sqlalchemy import text
+
+from app.core.database import AsyncSessionLocal
+from app.core.measurement_partitions import MEASUREMENT_TABLE
+from app.services.measurement_ingest import measurement_ingest
+from app.services.measurement_rollups import ROLLUP_LEVELS
+
+BENCH_PREFIX = "BENCH_"
+BENCH_PATTERN = "BENCH\\_%"  # LIKE에서 _를 문자 그대로 비교
+
+SINGLE_INSERT_SQL = f"""
+    INSERT INTO {MEASUREMENT_TABLE}
+    (equipment_type, equipment_code, measurement_code, measurement_desc, measurement_value, "timestamp")
+    VALUES (:equipment_type, :equipment_code, :measurement_code, :measurement_desc, :measurement_value, :timestamp)
+"""
+
+
+async def load_equipment(limit: int) -> List[Tuple[str, str]]:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text("SELECT equipment_type, equipment_code FROM personal_test_equipment_status ORDER BY equipment_code LIMIT :limit"),
+            {"limit": limit}
+        )
+        return [(row.equipment_type, row.equipment_code) for row in result.fetchall()]
+
+
+async def synthetic_rows(count: int, equipment: List[Tuple[str, str]]) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+    """수집기가 NDJSON으로 보내는 형태의 행 (timestamp는 ISO 문자열)"""
+    base_time = datetime.now(timezone.utc) - timedelta(seconds=count)
+    for i in range(count):
+        equipment_type, equipment_code = equipment[i % len(equipment)]
+        yield i + 1, {
+            "equipment_type": equipment_type,
+            "equipment_code": equipment_code,
+            "measurement_code": f"{BENCH_PREFIX}{i % 8}",
+            "measurement_desc": "ingest benchmark",
+            "measurement_value": 50.0 + (i % 17) * 0.25,
+            "timestamp": (base_time + timedelta(seconds=i)).isoformat(),
+        }
+
+
+async def run_single(count: int, equipment: List[Tuple[str, str]]) -> float:
+    """행마다 INSERT + COMMIT"""
+    async with AsyncSessionLocal() as session:
+        started = time.perf_counter()
+        async for _, row in synthetic_rows(count, equipment):
+            await session.execute(
+                text(SINGLE_INSERT_SQL),
+                {**row, "timestamp": datetime.fromisoformat(row["timestamp"])}
+            )
+            await session.commit()
+        elapsed = time.perf_counter() - started
+    rate = count / elapsed
+    print(f"{'single':>7}: {count:>9} rows in {elapsed:7.2f}s  sustained {rate:10.0f} rows/s")
+    return rate
+
+
+async def run_bulk(method: str, count: int, equipment: List[Tuple[str, str]], batch_size: int, commit_rows: int) -> float:
+    """measurement_ingest 경로 (copy / insert)"""
+    async with AsyncSessionLocal() as session:
+        result = await measurement_ingest.ingest(
+            session,
+            synthetic_rows(count, equipment),
+            batch_size=batch_size,
+            commit_rows=commit_rows,
+            use_copy=method == "copy"
+        )
+    if result.error:
+        raise RuntimeError(f"{method} ingest failed: {result.error}")
+
+    # 배치별 기록 속도 (검증/커밋 제외) 중앙값과 가장 느린 배치
+    batch_rates = [batch.inserted / (batch.write_ms / 1000) for batch in result.batches if batch.write_ms > 0]
+    rate = result.inserted / result.elapsed
+    written = {batch.method for batch in result.batches}
+    print(
+        f"{method:>7}: {result.inserted:>9} rows in {result.elapsed:7.2f}s  sustained {rate:10.0f} rows/s  "
+        f"(write median {statistics.median(batch_rates):10.0f} rows/s, slowest batch {min(batch_rates):10.0f} rows/s, "
+        f"{len(result.batches)} batches, {result.commits} commits, via {'/'.join(sorted(written))})"
+    )
+    return rate
+
+
+async def cleanup():
+    """벤치마크 행과 롤업 삭제"""
+    async with AsyncSessionLocal() as session:
+        for table in [MEASUREMENT_TABLE] + [level.table for level in ROLLUP_LEVELS]:
+            result = await session.execute(
+                text(f"DELETE FROM {table} WHERE measurement_code LIKE :pattern"),
+                {"pattern": BENCH_PATTERN}
+            )
+            print(f"cleanup: {result.rowcount} rows deleted from {table}")
+        await session.commit()
+
+
+async def run(args: argparse.Namespace):
+    equipment = await load_equipment(args.equipment)
+    if not equipment:
+        print("No rows in personal_test_equipment_status; create equipment before benchmarking")
+        return
+
+    methods = [method.strip() for method in args.methods.split(",") if method.strip()]
+    print(f"rows={args.rows} single_rows={args.single_rows} batch_size={args.batch_size} "
+          f"commit_rows={args.commit_rows} equipment={len(equipment)}")
+    results = {}
+    try:
+        for method in methods:
+            if method == "single":
+                results[method] = await run_single(args.single_rows, equipment)
+            else:
+                results[method] = await run_bulk(method, args.rows, equipment, args.batch_size, args.commit_rows)
+    finally:
+        if not args.keep:
+            await cleanup()
+
+    if "single" in results:
+        for method, rate in results.items():
+            if method != "single":
+                print(f"{method} vs single: {rate / results['single']:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measurement bulk ingest benchmark")
+    parser.add_argument("--rows", type=int, default=200000, help="rows per bulk method")
+    parser.add_argument("--single-rows", type=int, default=2000, help="rows for the row-at-a-time baseline")
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows validated and written per batch")
+    parser.add_argument("--commit-rows", type=int, default=50000, help="rows per group commit")
+    parser.add_argument("--methods", default="single,insert,copy", help="comma separated: single, insert, copy")
+    parser.add_argument("--equipment", type=int, default=20, help="equipment codes to spread rows over")
+    parser.add_argument("--keep", action="store_true", help="keep benchmark rows")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
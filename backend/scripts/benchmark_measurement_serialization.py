@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+측정 데이터 응답 직렬화 벤치마크
+기존 경로(행마다 Pydantic 모델 3회 생성/검증)와 MeasurementRecord + fast_json 경로의 행당 비용 비교
+
+사용법:
+    python scripts/benchmark_measurement_serialization.py --rows 1000 --repeat 50
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from pydantic import TypeAdapter
+
+from app.core.fast_json import ORJSON_AVAILABLE, dumps
+from app.services.data_providers.base import MeasurementData, MeasurementRecord
+
+
+def make_rows(count: int) -> List[dict]:
+    """DB 드라이버가 반환하는 형태의 측정 행 생성"""
+    base_time = datetime(2025, 1, 1, 8, 0, 0)
+    return [
+        {
+            "id": i,
+            "equipment_type": "REACTOR",
+            "equipment_code": f"EQ-{i % 40:03d}",
+            "measurement_code": f"TEMP_{i % 8}",
+            "measurement_desc": "Reactor temperature",
+            "measurement_value": 50.0 + (i % 17),
+            "timestamp": base_time + timedelta(seconds=i),
+            "spec_status": "IN_SPEC",
+            "usl": 80.0,
+            "lsl": 20.0,
+            "target": 50.0,
+        }
+        for i in range(count)
+    ]
+
+
+_response_adapter = TypeAdapter(List[MeasurementData])
+
+
+def legacy_path(rows: List[dict]) -> bytes:
+    """프로바이더 모델 -> dict 변환 -> 라우터 모델 재생성 -> response_model 검증 -> json.dumps"""
+    provider_models = [
+        MeasurementData(**{**row, "spec_status": 0}) for row in rows
+    ]
+    dicts = [model.model_dump() for model in provider_models]
+    router_models = [MeasurementData(**item) for item in dicts]
+    validated = _response_adapter.validate_python([model.model_dump() for model in router_models])
+    return json.dumps(_response_adapter.dump_python(validated, mode="json")).encode("utf-8")
+
+
+def fast_path(rows: List[dict]) -> bytes:
+    """프로바이더 경계에서 from_row() 1회 -> to_dict() -> dumps()"""
+    records = [MeasurementRecord.from_row(row) for row in rows]
+    return dumps([record.to_dict() for record in records])
+
+
+def measure(func, rows: List[dict], repeat: int) -> List[float]:
+    func(rows)  # warm-up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(rows)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measurement serialization benchmark")
+    parser.add_argument("--rows", type=int, default=1000, help="rows per response")
+    parser.add_argument("--repeat", type=int, default=50, help="timed iterations per path")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    assert json.loads(legacy_path(rows[:3])) == json.loads(fast_path(rows[:3])), "payloads differ"
+
+    print(f"rows={args.rows} repeat={args.repeat} orjson={ORJSON_AVAILABLE}")
+    results = {}
+    for name, func in (("legacy", legacy_path), ("fast", fast_path)):
+        timings = measure(func, rows, args.repeat)
+        per_row_us = statistics.median(timings) / args.rows * 1_000_000
+        results[name] = per_row_us
+        print(f"{name:>7}: median {statistics.median(timings) * 1000:8.2f} ms/response  {per_row_us:6.2f} us/row")
+
+    print(f"speedup: {results['legacy'] / results['fast']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+측정 데이터 파티션 관리 스크립트
+
+사용 예:
+    python scripts/measurement_partitions.py status
+    python scripts/measurement_partitions.py migrate [--drop-legacy]
+    python scripts/measurement_partitions.py maintain   # cron 등에서 매일 실행
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import AsyncSessionLocal
+from app.core.measurement_partitions import measurement_partition_manager, MEASUREMENT_TABLE
+import logging
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+async def show_status():
+    """파티션 상태 출력"""
+    async with AsyncSessionLocal() as session:
+        if not await measurement_partition_manager.is_partitioned(session):
+            logger.info(f"{MEASUREMENT_TABLE} is not partitioned (run 'migrate' to convert it)")
+            return
+        
+        partitions = await measurement_partition_manager.list_partitions(session)
+        logger.info(f"{MEASUREMENT_TABLE}: {len(partitions)} {measurement_partition_manager.interval} partitions")
+        for name in partitions:
+            logger.info(f"  {name}")
+
+async def migrate(drop_legacy: bool):
+    """기존 테이블을 파티션 테이블로 전환"""
+    async with AsyncSessionLocal() as session:
+        result = await measurement_partition_manager.migrate(session, drop_legacy=drop_legacy)
+        logger.info(f"Migration completed: {result}")
+
+async def maintain():
+    """다가올 파티션 생성 및 만료 파티션 삭제"""
+    async with AsyncSessionLocal() as session:
+        result = await measurement_partition_manager.run_maintenance(session)
+        logger.info(f"Partition maintenance: {result}")
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Measurement data partition management")
+    parser.add_argument("command", choices=["status", "migrate", "maintain"])
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop the original table after migration")
+    args = parser.parse_args()
+    
+    if args.command == "status":
+        asyncio.run(show_status())
+    elif args.command == "migrate":
+        asyncio.run(migrate(args.drop_legacy))
+    else:
+        asyncio.run(maintain())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+측정 데이터 롤업 관리 스크립트
+
+사용 예:
+    python scripts/measurement_rollups.py sync
+    python scripts/measurement_rollups.py rebuild --days 30
+    python scripts/measurement_rollups.py rebuild --start 2025-01-01T00:00:00 --end 2025-02-01T00:00:00
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.database import AsyncSessionLocal
+from app.services.measurement_rollups import measurement_rollups
+import logging
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+async def sync():
+    """워터마크 이후 측정 데이터를 롤업에 반영"""
+    async with AsyncSessionLocal() as session:
+        await measurement_rollups.ensure_tables(session)
+        synced = await measurement_rollups.sync(session)
+        logger.info(f"Rolled up {synced} measurement rows")
+
+async def rebuild(start: datetime, end: datetime):
+    """구간 롤업을 원본에서 다시 계산한 뒤 남은 행 동기화"""
+    async with AsyncSessionLocal() as session:
+        await measurement_rollups.ensure_tables(session)
+        result = await measurement_rollups.rebuild(session, start, end)
+        logger.info(f"Rebuild completed: {result}")
+        synced = await measurement_rollups.sync(session)
+        logger.info(f"Rolled up {synced} measurement rows")
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Measurement rollup management")
+    parser.add_argument("command", choices=["sync", "rebuild"])
+    parser.add_argument("--start", type=datetime.fromisoformat, help="Rebuild range start (ISO 8601)")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="Rebuild range end (ISO 8601, default: now)")
+    parser.add_argument("--days", type=int, default=7, help="Rebuild the last N days when --start is omitted")
+    args = parser.parse_args()
+    
+    if args.command == "sync":
+        asyncio.run(sync())
+    else:
+        end = args.end or datetime.now()
+        asyncio.run(rebuild(args.start or end - timedelta(days=args.days), end))
@@ -19,6 +19,7 @@ from app.core.db_performance import (
     optimize_workspace_queries,
     performance_monitor
 )
+from app.core.measurement_partitions import measurement_partition_manager
 import logging
 
 # 로깅 설정
@@ -38,16 +39,21 @@ async def main():
             logger.info("Creating performance indexes...")
             await create_performance_indexes(session)
             
-            # 2. 워크스페이스 쿼리 최적화
+            # 2. 측정 데이터 파티션 생성/보존 기간 정리 (파티션 테이블로 전환된 경우)
+            logger.info("Maintaining measurement partitions...")
+            partition_results = await measurement_partition_manager.run_maintenance(session)
+            logger.info(f"Partition maintenance: {partition_results}")
+            
+            # 3. 워크스페이스 쿼리 최적화
             logger.info("Optimizing workspace queries...")
             await optimize_workspace_queries(session)
             
-            # 3. 데이터베이스 설정 최적화
+            # 4. 데이터베이스 설정 최적화
             logger.info("Optimizing database settings...")
             optimization_results = await optimize_database_settings(session)
             logger.info(f"Optimization results: {optimization_results}")
             
-            # 4. 성능 분석 실행
+            # 5. 성능 분석 실행
             logger.info("Analyzing database performance...")
             performance_analysis = await analyze_database_performance(session)
             
@@ -0,0 +1,157 @@
+"""
+애드혹 쿼리 실행 단위 테스트
+"""
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.data_providers import adhoc_query
+from app.services.data_providers.adhoc_query import (
+    AdhocQueryError, resolve_statement_timeout, run_adhoc_query, stream_adhoc_query
+)
+
+
+class FakeCursor:
+    """aioodbc 커서 대역: 단계별 지연을 줄 수 있고 SQLCancel 호출을 기록"""
+
+    def __init__(self, rows, delays=None):
+        self.rows = list(rows)
+        self.delays = delays or {}
+        self.description = None
+        self.cancelled = False
+
+    async def _step(self, name):
+        await asyncio.sleep(self.delays.get(name, 0))
+
+    async def execute(self, query):
+        await self._step("execute")
+        self.description = [("id",), ("value",)]
+
+    async def fetchall(self):
+        await self._step("fetch")
+        rows, self.rows = self.rows, []
+        return rows
+
+    async def fetchmany(self, size):
+        await self._step("fetch")
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def cancel(self):
+        self.cancelled = True
+
+
+@pytest.fixture
+def cursor(monkeypatch):
+    cursor = FakeCursor([(1, 1.5), (2, 2.5), (3, 3.5)])
+
+    class FakeProvider:
+        def __init__(self, connection_string, data_source_id):
+            pass
+
+        @asynccontextmanager
+        async def get_connection(self):
+            yield cursor
+
+    # aioodbc 없이 실행되도록 MSSQL 프로바이더 모듈을 대체
+    monkeypatch.setitem(sys.modules, "app.services.data_providers.mssql", SimpleNamespace(MSSQLProvider=FakeProvider))
+    monkeypatch.setattr(adhoc_query, "DEADLINE_GRACE_SECONDS", 0)
+    monkeypatch.setattr(adhoc_query, "DISCONNECT_POLL_SECONDS", 0.01)
+    return cursor
+
+
+async def _collect(batches):
+    return [batch async for batch in batches]
+
+
+class TestStatementTimeout:
+    """데이터 소스별 타임아웃 해석 테스트"""
+
+    @pytest.mark.parametrize("configured", [None, 0, -5, "abc"])
+    def test_invalid_values_fall_back_to_default(self, configured):
+        assert resolve_statement_timeout(configured) == settings.DATA_SOURCE_STATEMENT_TIMEOUT_SECONDS
+
+    def test_configured_value_wins(self):
+        assert resolve_statement_timeout("12.5") == 12.5
+
+
+class TestRunAdhocQuery:
+    """단건 실행의 타임아웃/취소 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_mssql_result(self, cursor):
+        result = await run_adhoc_query("ds-1", "MSSQL", "dsn", "SELECT id, value FROM t")
+
+        assert result.columns == ["id", "value"]
+        assert result.rows == [(1, 1.5), (2, 2.5), (3, 3.5)]
+
+    @pytest.mark.asyncio
+    async def test_mssql_deadline_cancels_statement(self, cursor):
+        cursor.delays["execute"] = 1
+
+        with pytest.raises(AdhocQueryError, match="statement timeout"):
+            await run_adhoc_query("ds-1", "mssql", "dsn", "SELECT 1", statement_timeout=0.05)
+        assert cursor.cancelled
+
+    @pytest.mark.asyncio
+    async def test_client_disconnect_cancels_statement(self, cursor):
+        cursor.delays["execute"] = 1
+        request = SimpleNamespace(is_disconnected=lambda: asyncio.sleep(0, result=True))
+
+        with pytest.raises(AdhocQueryError, match="Client disconnected"):
+            await run_adhoc_query("ds-1", "mssql", "dsn", "SELECT 1", request=request)
+        assert cursor.cancelled
+
+    @pytest.mark.asyncio
+    async def test_primary_database_uses_local_timeout(self):
+        executed = []
+
+        class FakeSession:
+            async def execute(self, statement):
+                executed.append(str(statement))
+                return SimpleNamespace(keys=lambda: ["n"], fetchall=lambda: [(1,)])
+
+        result = await run_adhoc_query("ds-1", "postgresql", None, "SELECT 1 AS n", 1.5, db=FakeSession())
+
+        assert executed == ["SET LOCAL statement_timeout = 1500", "SELECT 1 AS n"]
+        assert result.rows == [(1,)]
+
+    @pytest.mark.asyncio
+    async def test_unsupported_source_type(self):
+        with pytest.raises(AdhocQueryError):
+            await run_adhoc_query("ds-1", "api", "https://example.com", "SELECT 1")
+
+
+class TestStreamAdhocQuery:
+    """스트리밍 내보내기 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_mssql_streams_header_then_batches(self, cursor):
+        batches = await _collect(stream_adhoc_query("ds-1", "mssql", "dsn", "SELECT id, value FROM t", batch_size=2))
+
+        assert batches == [
+            (["id", "value"], []),
+            (["id", "value"], [(1, 1.5), (2, 2.5)]),
+            (["id", "value"], [(3, 3.5)]),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_mssql_stalled_fetch_hits_deadline(self, cursor):
+        cursor.delays["fetch"] = 1
+
+        with pytest.raises(AdhocQueryError, match="statement timeout"):
+            await _collect(stream_adhoc_query("ds-1", "mssql", "dsn", "SELECT 1", statement_timeout=0.05))
+        assert cursor.cancelled
+
+    @pytest.mark.asyncio
+    async def test_closing_stream_early_does_not_cancel(self, cursor):
+        batches = stream_adhoc_query("ds-1", "mssql", "dsn", "SELECT id, value FROM t", batch_size=1)
+        await batches.__anext__()
+        await batches.__anext__()
+        await batches.aclose()
+
+        assert not cursor.cancelled
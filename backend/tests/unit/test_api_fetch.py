@@ -0,0 +1,144 @@
+"""
+외부 API 페이지네이션 / 조건부 요청 / 증분 파싱 단위 테스트
+"""
+import asyncio
+import json
+
+import pytest
+
+from app.services.data_providers.api_fetch import (
+    ConditionalRequestCache, PaginationConfig, fetch_paginated, parse_json_stream
+)
+from app.services.data_providers.field_mapping import compile_path
+
+RECORDS = [{"id": i} for i in range(23)]
+EXTRACT = compile_path("$.data")
+
+
+class FakeUpstream:
+    """offset/page/cursor/link 방식을 모두 지원하는 가짜 API"""
+
+    def __init__(self, report_total=True):
+        self.report_total = report_total
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, params, url):
+        self.requests.append(url or params)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+
+        if url:
+            params = dict(part.split("=") for part in url.split("?")[1].split("&"))
+        size = int(params.get("limit", 100))
+        if "page" in params:
+            start = (int(params["page"]) - 1) * size
+        else:
+            start = int(params.get("offset", params.get("cursor", 0)))
+        data = RECORDS[start:start + size]
+        end = start + len(data)
+
+        payload = {"data": data}
+        if self.report_total:
+            payload["total"] = len(RECORDS)
+        payload["next_cursor"] = end if end < len(RECORDS) else None
+        next_url = f"/items?offset={end}&limit={size}" if end < len(RECORDS) else None
+        return payload, next_url
+
+
+class TestFetchPaginated:
+    """페이지네이션 전략 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_offset_pages_fetched_concurrently_when_total_known(self):
+        upstream = FakeUpstream()
+        pagination = PaginationConfig.from_mapping({"strategy": "offset", "page_size": 5, "concurrency": 3})
+
+        result = await fetch_paginated(upstream, pagination, EXTRACT, {"status": "RUN"}, limit=100, offset=2)
+
+        assert [item["id"] for item in result.items] == list(range(2, 23))
+        assert result.total == 23 and result.has_more is False
+        assert len(upstream.requests) == 5
+        assert all(request["status"] == "RUN" for request in upstream.requests)
+        assert upstream.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_offset_without_total_stops_at_short_page(self):
+        upstream = FakeUpstream(report_total=False)
+        pagination = PaginationConfig.from_mapping({"strategy": "offset", "page_size": 5, "concurrency": 2})
+
+        result = await fetch_paginated(upstream, pagination, EXTRACT, {}, limit=1000)
+
+        assert len(result.items) == 23
+        assert result.has_more is False
+        assert len(upstream.requests) == 5  # pages 0-1, 2-3, 4(short) - 마지막 wave에서 중단
+
+    @pytest.mark.asyncio
+    async def test_page_strategy_trims_partial_first_page(self):
+        upstream = FakeUpstream()
+        pagination = PaginationConfig.from_mapping({"strategy": "page", "page_size": 10})
+
+        result = await fetch_paginated(upstream, pagination, EXTRACT, {}, limit=8, offset=7)
+
+        assert [item["id"] for item in result.items] == list(range(7, 15))
+        assert [request["page"] for request in upstream.requests] == [1, 2]
+        assert result.has_more is True
+
+    @pytest.mark.parametrize("config", [
+        {"strategy": "cursor", "page_size": 6},
+        {"strategy": "link", "page_size": 6},
+    ])
+    @pytest.mark.asyncio
+    async def test_sequential_strategies_follow_until_limit(self, config):
+        upstream = FakeUpstream()
+        result = await fetch_paginated(upstream, PaginationConfig.from_mapping(config), EXTRACT, {}, limit=10, offset=3)
+
+        assert [item["id"] for item in result.items] == list(range(3, 13))
+        assert len(upstream.requests) == 3
+        assert result.has_more is True
+
+    @pytest.mark.asyncio
+    async def test_no_pagination_sends_params_as_is(self):
+        upstream = FakeUpstream()
+        result = await fetch_paginated(upstream, PaginationConfig.from_mapping(None), EXTRACT, {"limit": 4}, limit=4)
+
+        assert len(result.items) == 4
+        assert upstream.requests == [{"limit": 4}]
+
+
+class TestConditionalRequestCache:
+    """ETag 캐시 테스트"""
+
+    def test_stores_only_responses_with_validators_and_evicts_lru(self):
+        cache = ConditionalRequestCache(max_entries=2)
+        cache.store("a", "ds", {"etag": '"1"'}, {"data": []}, None)
+        cache.store("b", "ds", {}, {"data": []}, None)
+        cache.store("c", "other", {"last-modified": "Wed, 01 Jan 2025 00:00:00 GMT"}, {}, None)
+        cache.get("a")
+        cache.store("d", "ds", {"etag": '"2"'}, {}, None)
+
+        assert cache.get("b") is None and cache.get("c") is None
+        assert cache.get("a").validators() == {"If-None-Match": '"1"'}
+
+        cache.invalidate("ds")
+        assert cache.get_stats()["entries"] == 0
+
+
+class TestParseJsonStream:
+    """증분 JSON 파싱 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_keeps_only_requested_paths(self):
+        pytest.importorskip("ijson")
+        body = json.dumps({"data": RECORDS, "meta": {"next_cursor": "abc", "debug": "x" * 100}, "total": 23}).encode()
+
+        async def chunks():
+            for start in range(0, len(body), 64):
+                yield body[start:start + 64]
+
+        document = await parse_json_stream(chunks(), ["$.data", "$.total", "$.meta.next_cursor", "$.missing"])
+
+        assert document == {"data": RECORDS, "total": 23, "meta": {"next_cursor": "abc"}}
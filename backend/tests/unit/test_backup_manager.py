@@ -0,0 +1,210 @@
+"""
+데이터베이스 백업 관리자 단위 테스트
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import BackgroundTasks, HTTPException
+
+from app.api.v1.endpoints import backup as backup_endpoints
+from app.api.v1.endpoints.backup import RestoreRequest
+from app.core import backup_manager as backup_module
+from app.core.backup_manager import (
+    INCREMENTAL_TABLES, BackupInfo, BackupStatus, BackupType, DatabaseBackupManager
+)
+
+MEASUREMENTS = next(table for table in INCREMENTAL_TABLES if table.cursor_column)
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return DatabaseBackupManager(backup_dir=str(tmp_path))
+
+
+def _horizons(manager, *snapshots):
+    """_get_cursor_horizon이 차례로 돌려줄 (xmin, xmax, max_id) 스냅샷"""
+    remaining = list(snapshots)
+
+    async def get_cursor_horizon(db_name, table):
+        return remaining.pop(0) if len(remaining) > 1 else remaining[0]
+
+    manager._get_cursor_horizon = get_cursor_horizon
+
+
+async def _no_sleep(_):
+    pass
+
+
+class TestIncrementalCursors:
+    """증분 백업 id 커서 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_chain_without_cursor_exports_by_change_time(self, manager):
+        _horizons(manager, (100, 105, 40))
+
+        condition, state = await manager._cursor_condition("db", MEASUREMENTS, None, "changed")
+
+        assert condition == "changed"
+        # 진행 중 트랜잭션이 있으므로 40은 보류 후 다음 증분에서 확정
+        assert state == {"confirmed": None, "pending_id": 40, "pending_xmax": 105}
+
+    @pytest.mark.asyncio
+    async def test_pending_id_is_confirmed_once_older_transactions_end(self, manager):
+        state = {"confirmed": 10, "pending_id": 40, "pending_xmax": 105}
+
+        _horizons(manager, (103, 110, 55))
+        condition, still_pending = await manager._cursor_condition("db", MEASUREMENTS, state, "changed")
+        assert condition == "id > 10"
+        assert still_pending == state
+
+        _horizons(manager, (106, 112, 60))
+        condition, confirmed = await manager._cursor_condition("db", MEASUREMENTS, state, "changed")
+        assert condition == "id > 10"
+        assert confirmed == {"confirmed": 40, "pending_id": 60, "pending_xmax": 112}
+
+    @pytest.mark.asyncio
+    async def test_settle_waits_for_open_transactions(self, manager, monkeypatch):
+        monkeypatch.setattr(backup_module.asyncio, "sleep", _no_sleep)
+        _horizons(manager, (100, 105, 40), (101, 106, 41), (105, 107, 42))
+
+        cursors = await manager._settle_cursors("db")
+
+        assert cursors[MEASUREMENTS.name] == {"confirmed": 40, "pending_id": None, "pending_xmax": None}
+
+    @pytest.mark.asyncio
+    async def test_settle_gives_up_after_deadline(self, manager, monkeypatch):
+        monkeypatch.setattr(backup_module, "CURSOR_SETTLE_SECONDS", 0)
+        _horizons(manager, (100, 105, 40))
+
+        cursors = await manager._settle_cursors("db")
+
+        assert cursors[MEASUREMENTS.name]["confirmed"] is None
+
+
+
+def _backup(backup_id, backup_type, minute, base_backup_id=None):
+    return BackupInfo(
+        backup_id=backup_id, backup_type=backup_type, timestamp=T0 + timedelta(minutes=minute),
+        file_path=f"/backups/{backup_id}", file_size=0, compression=True, checksum="",
+        status=BackupStatus.COMPLETED, duration_seconds=0, database_name="db",
+        metadata={"until": (T0 + timedelta(minutes=minute)).isoformat(), "base_backup_id": base_backup_id}
+    )
+
+
+class FakeProcess:
+    """pg_restore 프로세스 대역 (verbose 출력을 stderr로 흘려줌)"""
+
+    def __init__(self, stderr_lines, returncode=0):
+        self.stderr = asyncio.StreamReader()
+        for line in stderr_lines:
+            self.stderr.feed_data(line.encode() + b"\n")
+        self.stderr.feed_eof()
+        self.returncode = returncode
+
+    async def wait(self):
+        return self.returncode
+
+
+@pytest.fixture
+def chain(manager, monkeypatch):
+    """전체 백업 1개 + 증분 2개 체인, 복원 단계는 호출 기록만 남김"""
+    manager.backup_history = [
+        _backup("full", BackupType.FULL, 0),
+        _backup("incr-1", BackupType.INCREMENTAL, 10, "full"),
+        _backup("incr-2", BackupType.INCREMENTAL, 20, "full"),
+    ]
+    monkeypatch.setattr(manager, "_parse_database_url", lambda: ("localhost", "5432", "postgres", "", "db"))
+    calls = []
+
+    async def restore_full(backup_id, progress):
+        calls.append(("full", backup_id, progress.parallel_jobs))
+        return True
+
+    async def verify(backup_info):
+        return True
+
+    async def apply(backup_info, db_name, target_time):
+        calls.append(("apply", backup_info.backup_id))
+
+    monkeypatch.setattr(manager, "_restore_full_backup", restore_full)
+    monkeypatch.setattr(manager, "_verify_backup", verify)
+    monkeypatch.setattr(manager, "_apply_table_incremental", apply)
+    return calls
+
+
+class TestRestore:
+    """복원 선점/결과 기록/병렬 복원/증분 체인 테스트"""
+
+    def test_claim_is_exclusive(self, manager, monkeypatch):
+        monkeypatch.setattr(manager, "_parse_database_url", lambda: ("localhost", "5432", "postgres", "", "db"))
+        first = manager.claim_restore("full", None, 4)
+
+        assert first is not None and first.parallel_jobs == 4
+        assert manager.claim_restore("other") is None
+
+    @pytest.mark.asyncio
+    async def test_endpoint_claims_before_scheduling(self, manager, chain, monkeypatch):
+        monkeypatch.setattr(backup_endpoints, "backup_manager", manager)
+        tasks = BackgroundTasks()
+
+        await backup_endpoints.restore_backup(RestoreRequest(backup_id="full"), tasks, admin_user={})
+        with pytest.raises(HTTPException) as conflict:
+            await backup_endpoints.restore_backup(RestoreRequest(backup_id="full"), BackgroundTasks(), admin_user={})
+        assert conflict.value.status_code == 409
+
+        await tasks()
+        assert manager.current_restore is None
+        assert manager.get_restore_history()[0]["phase"] == "completed"
+
+    @pytest.mark.asyncio
+    async def test_failed_restore_is_recorded(self, manager, chain, monkeypatch):
+        async def restore_full(backup_id, progress):
+            return False
+
+        monkeypatch.setattr(manager, "_restore_full_backup", restore_full)
+
+        assert not await manager.restore_backup("full", progress=manager.claim_restore("full"))
+        history = manager.get_restore_history()
+        assert history[0]["phase"] == "failed" and history[0]["error"] == "Restore failed"
+        assert manager.current_restore is None
+
+    @pytest.mark.asyncio
+    async def test_parallel_restore_runs_pg_restore_jobs(self, manager, monkeypatch):
+        monkeypatch.setattr(manager, "_parse_database_url", lambda: ("localhost", "5432", "postgres", "", "db"))
+        commands = []
+
+        async def count_objects(archive_path, env):
+            return 2
+
+        async def create_subprocess_exec(*command, **kwargs):
+            commands.append(command)
+            return FakeProcess([
+                "pg_restore: creating TABLE public.a",
+                "pg_restore: processing data for table public.a",
+            ])
+
+        monkeypatch.setattr(manager, "_count_archive_objects", count_objects)
+        monkeypatch.setattr(backup_module.asyncio, "create_subprocess_exec", create_subprocess_exec)
+        progress = manager.claim_restore("full", None, 6)
+
+        assert await manager._run_parallel_restore("/tmp/archive.dump", "db", progress)
+        assert "--jobs=6" in commands[0] and commands[0][-1] == "/tmp/archive.dump"
+        assert progress.to_dict()["objects_percent"] == 100
+
+    @pytest.mark.asyncio
+    async def test_incremental_backup_restores_base_then_chain(self, manager, chain):
+        assert await manager.restore_backup("incr-1", parallel_jobs=3)
+
+        assert chain == [("full", "full", 3), ("apply", "incr-1")]
+        assert manager.get_restore_history()[0]["backup_id"] == "incr-1"
+
+    @pytest.mark.asyncio
+    async def test_point_in_time_cuts_chain_at_target(self, manager, chain):
+        target = T0 + timedelta(minutes=15)
+
+        assert await manager.restore_point_in_time(target_time=target)
+
+        # 목표 시각을 처음 넘는 증분까지 적용하고 넘어선 변경은 적용 시 잘라냄
+        assert chain == [("full", "full", manager.restore_jobs), ("apply", "incr-1"), ("apply", "incr-2")]
@@ -0,0 +1,132 @@
+"""
+PostgreSQL 변경 피드(LISTEN/NOTIFY) 단위 테스트
+"""
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.services.data_providers import change_feed
+from app.services.data_providers.change_feed import (
+    ChangeFeedManager, _SourceFeed, listener_dsn, parse_notification
+)
+from app.services.data_providers.latest_cache import LatestMeasurementCache
+
+MEASUREMENT_ROW = {
+    "id": 7, "equipment_type": "REACTOR", "equipment_code": "EQ-1", "measurement_code": "TEMP",
+    "measurement_desc": "Temperature", "measurement_value": 12.5,
+    "timestamp": "2025-01-01T08:00:00.12345+09:00", "spec_status": 0
+}
+
+
+def _payload(table, row, op="INSERT"):
+    return json.dumps({"table": table, "op": op, "row": row})
+
+
+class FakeProvider:
+    workspace_id = "ws"
+
+    def __init__(self):
+        self.calls = []
+
+    async def _load_config(self):
+        return {"data_source_id": "ds-1"}
+
+    async def fetch_latest_since(self, since):
+        self.calls.append(since)
+        return []
+
+
+class TestParseNotification:
+    """트리거 payload 해석 테스트"""
+
+    def test_measurement_payload(self):
+        event = parse_notification(_payload("personal_test_measurement_data", MEASUREMENT_ROW))
+
+        assert event.kind == "measurement"
+        record = event.to_measurement()
+        assert record.measurement_value == 12.5
+        assert record.timestamp.utcoffset().total_seconds() == 9 * 3600
+
+    def test_equipment_status_payload(self):
+        event = parse_notification(_payload(
+            "personal_test_equipment_status", {"equipment_code": "EQ-1", "status": "STOP"}, op="UPDATE"
+        ))
+
+        assert event.to_dict() == {"kind": "equipment_status", "op": "UPDATE", "data": {"equipment_code": "EQ-1", "status": "STOP"}}
+
+    @pytest.mark.parametrize("payload", ["not json", "[]", _payload("other_table", {}), json.dumps({"table": "personal_test_equipment_status"})])
+    def test_malformed_payload(self, payload):
+        assert parse_notification(payload) is None
+
+    def test_listener_dsn_strips_driver(self):
+        assert listener_dsn("postgresql+asyncpg://u:p@host/db") == "postgresql://u:p@host/db"
+        assert listener_dsn("postgres://u:p@host/db") == "postgresql://u:p@host/db"
+
+
+class TestChangeFeedDispatch:
+    """캐시/구독자 전달 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_pushed_measurement_updates_loaded_snapshot(self, monkeypatch):
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_REFRESH_SECONDS", 0.0)
+        cache = LatestMeasurementCache()
+        monkeypatch.setattr(change_feed, "latest_measurement_cache", cache)
+        manager = ChangeFeedManager()
+        feed = _SourceFeed("ds-1", "postgresql://host/db", live_measurements=True)
+        provider = FakeProvider()
+
+        # 첫 적재 전에는 반영하지 않음 (부분 스냅샷으로 증분 조회가 되는 것 방지)
+        manager.dispatch(feed, _payload("personal_test_measurement_data", MEASUREMENT_ROW))
+        assert await cache.get_latest(provider) == []
+
+        manager._set_connected(feed, True)
+        await cache.get_latest(provider)  # 연결 직후 한 번 따라잡기
+        manager.dispatch(feed, _payload("personal_test_measurement_data", MEASUREMENT_ROW))
+        latest = await cache.get_latest(provider)
+
+        assert [record.measurement_value for record in latest] == [12.5]
+        assert len(provider.calls) == 2  # 이후에는 push만으로 유지
+        assert cache.get_stats()["pushed"] == 1
+
+        manager._set_connected(feed, False)
+        await cache.get_latest(provider)
+        assert len(provider.calls) == 3  # 리스너가 끊기면 폴링 재개
+
+    @pytest.mark.asyncio
+    async def test_source_without_trigger_keeps_polling(self, monkeypatch):
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_REFRESH_SECONDS", 3600.0)
+        cache = LatestMeasurementCache()
+        monkeypatch.setattr(change_feed, "latest_measurement_cache", cache)
+        manager = ChangeFeedManager()
+        feed = _SourceFeed("ds-1", "postgresql://host/db", live_measurements=False)
+
+        manager._set_connected(feed, True)
+
+        assert cache.get_stats()["live_sources"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_gets_resync(self, monkeypatch):
+        monkeypatch.setattr(settings, "PG_CHANGE_FEED_QUEUE_SIZE", 2)
+        monkeypatch.setattr(change_feed, "latest_measurement_cache", LatestMeasurementCache())
+        manager = ChangeFeedManager()
+        feed = _SourceFeed("ds-1", "postgresql://host/db")
+        manager._feeds["ds-1"] = feed
+        queue = manager.subscribe("ds-1")
+
+        for value in range(3):
+            manager.dispatch(feed, _payload("personal_test_equipment_status", {"equipment_code": f"EQ-{value}"}))
+
+        assert queue.qsize() == 1
+        assert queue.get_nowait().kind == "resync"
+        assert manager.get_stats()["dropped"] == 2
+
+        manager.unsubscribe("ds-1", queue)
+        assert manager.get_stats()["subscribers"] == 0
+
+    def test_disabled_feed_is_not_started(self, monkeypatch):
+        monkeypatch.setattr(settings, "PG_CHANGE_FEED_ENABLED", False)
+        manager = ChangeFeedManager()
+
+        assert manager.ensure("ds-1", "postgresql://host/db") is False
+        assert manager.get_stats()["sources"] == 0
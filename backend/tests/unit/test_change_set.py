@@ -0,0 +1,166 @@
+"""
+증분 조회 워터마크/ChangeSet 단위 테스트
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.services.data_providers.base import (
+    ChangeSet, EquipmentData, IDataProvider, MeasurementRecord, Watermark, WatermarkExpiredError,
+    WATERMARK_ROWVERSION, WATERMARK_TIMESTAMP
+)
+
+T0 = datetime(2025, 1, 1, 8, 0, 0)
+
+
+def _record(minute, value=1.0, id=None):
+    return MeasurementRecord(
+        id=minute if id is None else id, equipment_type="REACTOR", equipment_code="EQ-1", measurement_code="TEMP",
+        measurement_desc="", measurement_value=value, timestamp=T0 + timedelta(minutes=minute)
+    )
+
+
+def _inclusive_query(rows, since):
+    """커스텀 쿼리 흉내: timestamp >= {{since}} ORDER BY timestamp, id LIMIT {{limit}}"""
+    async def fetch(limit):
+        matched = [row for row in rows if since is None or row.timestamp >= since.value]
+        return sorted(matched, key=lambda row: (row.timestamp, row.id))[:limit]
+    return fetch
+
+
+class NewestFirstSource:
+    """since를 지원하지 않고 최신 limit개만 돌려주는 데이터 소스"""
+
+    def __init__(self, records):
+        self.records = records
+        self.limits = []
+
+    async def get_measurement_data(self, equipment_code=None, equipment_type=None, limit=1000):
+        self.limits.append(limit)
+        return sorted(self.records, key=lambda record: (record.timestamp, record.id), reverse=True)[:limit]
+
+    async def changes(self, since, limit):
+        return await IDataProvider.get_measurement_changes(self, since=since, limit=limit)
+
+
+class TestWatermark:
+    """워터마크 토큰 테스트"""
+
+    @pytest.mark.parametrize("watermark", [
+        Watermark(WATERMARK_TIMESTAMP, T0),
+        Watermark(WATERMARK_TIMESTAMP, T0.replace(tzinfo=timezone.utc)),
+        Watermark(WATERMARK_ROWVERSION, 123456789),
+        Watermark(WATERMARK_TIMESTAMP, T0, "42"),
+        Watermark(WATERMARK_TIMESTAMP, T0, "EQ|1"),
+    ])
+    def test_round_trip(self, watermark):
+        assert Watermark.decode(watermark.encode()) == watermark
+
+    @pytest.mark.parametrize("token", ["", "timestamp:", "rowversion:abc", "xmin:1"])
+    def test_invalid_tokens(self, token):
+        with pytest.raises(ValueError):
+            Watermark.decode(token)
+
+
+class TestChangeSet:
+    """증분 결과 워터마크 계산 테스트"""
+
+    def test_filter_since_keeps_newer_rows_oldest_first(self):
+        records = [_record(3), _record(1), _record(2)]
+        changes = ChangeSet.filter_since(records, Watermark(WATERMARK_TIMESTAMP, T0 + timedelta(minutes=1)), "timestamp")
+
+        assert [r.id for r in changes.items] == [2, 3]
+        assert changes.watermark == Watermark(WATERMARK_TIMESTAMP, T0 + timedelta(minutes=3))
+        assert changes.incremental is False
+
+    def test_empty_result_keeps_previous_watermark(self):
+        since = Watermark(WATERMARK_TIMESTAMP, T0)
+        assert ChangeSet.from_items([], since, "timestamp").watermark == since
+        assert ChangeSet.from_items([], None, "timestamp").watermark is None
+
+    def test_rowversion_watermark(self):
+        changes = ChangeSet.from_items([_record(1), _record(2)], None, "timestamp", versions=[2001, 2005])
+        assert changes.watermark == Watermark(WATERMARK_ROWVERSION, 2005)
+        assert changes.to_dict()["watermark"] == "rowversion:2005"
+
+    def test_equipment_last_run_time(self):
+        items = [
+            EquipmentData(equipment_type="R", equipment_code="EQ-1", equipment_name="A", status="ACTIVE", last_run_time=None),
+            EquipmentData(equipment_type="R", equipment_code="EQ-2", equipment_name="B", status="STOP", last_run_time=T0),
+        ]
+        changes = ChangeSet.filter_since(items, None, "last_run_time")
+        assert [item.equipment_code for item in changes.items] == ["EQ-1", "EQ-2"]
+        assert changes.watermark == Watermark(WATERMARK_TIMESTAMP, T0)
+
+
+class TestCompoundWatermark:
+    """(timestamp, key) 워터마크 페이지 경계 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_rows_sharing_timestamp_survive_page_boundaries(self):
+        rows = [_record(0, id=row_id) for row_id in range(1, 8)] + [_record(1, id=8)]
+        since, pages = None, []
+        for _ in range(10):
+            changes = await ChangeSet.fetch_overlapping(_inclusive_query(rows, since), since, "timestamp", "id", 2)
+            if not changes.items:
+                break
+            pages.append([record.id for record in changes.items])
+            since = changes.watermark
+
+        assert pages == [[1, 2], [3, 4], [5, 6], [7, 8]]
+        assert since == Watermark(WATERMARK_TIMESTAMP, T0 + timedelta(minutes=1), "8")
+
+    @pytest.mark.asyncio
+    async def test_integer_keys_compare_numerically(self):
+        since = Watermark.decode(Watermark(WATERMARK_TIMESTAMP, T0, "9").encode())
+        rows = [_record(0, id=9), _record(0, id=10)]
+        changes = await ChangeSet.fetch_overlapping(_inclusive_query(rows, since), since, "timestamp", "id", 100)
+
+        assert [record.id for record in changes.items] == [10]
+
+    @pytest.mark.asyncio
+    async def test_watermark_without_key_is_strict(self):
+        since = Watermark(WATERMARK_TIMESTAMP, T0)
+        rows = [_record(0, id=1), _record(1, id=2)]
+        changes = await ChangeSet.fetch_overlapping(_inclusive_query(rows, since), since, "timestamp", "id", 100)
+
+        assert [record.id for record in changes.items] == [2]
+        assert changes.watermark.key == "2"
+
+    def test_from_items_uses_key_as_tie_breaker(self):
+        changes = ChangeSet.from_items([_record(0, id=5), _record(0, id=3)], None, "timestamp", key_field="id")
+        assert changes.watermark == Watermark(WATERMARK_TIMESTAMP, T0, "5")
+
+
+class TestFallbackChanges:
+    """since 미지원 소스의 기본 증분 조회 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_widens_window_back_to_watermark_and_pages_oldest_first(self):
+        source = NewestFirstSource([_record(minute) for minute in range(1, 21)])
+        since = Watermark(WATERMARK_TIMESTAMP, T0 + timedelta(minutes=2), "2")
+
+        first = await source.changes(since, 5)
+        second = await source.changes(first.watermark, 5)
+
+        assert [r.id for r in first.items] == [3, 4, 5, 6, 7] and first.has_more
+        assert [r.id for r in second.items] == [8, 9, 10, 11, 12]
+        assert source.limits[:2] == [5, 20]  # 최신 5개는 워터마크에 닿지 않아 넓혀 다시 읽음
+
+    @pytest.mark.asyncio
+    async def test_first_call_starts_from_newest_window(self):
+        source = NewestFirstSource([_record(minute) for minute in range(1, 21)])
+
+        changes = await source.changes(None, 5)
+
+        assert [r.id for r in changes.items] == [16, 17, 18, 19, 20] and not changes.has_more
+
+    @pytest.mark.asyncio
+    async def test_watermark_out_of_reach_is_expired(self, monkeypatch):
+        monkeypatch.setattr(settings, "CHANGES_FALLBACK_MAX_ROWS", 8)
+        source = NewestFirstSource([_record(minute) for minute in range(1, 21)])
+
+        with pytest.raises(WatermarkExpiredError):
+            await source.changes(Watermark(WATERMARK_TIMESTAMP, T0, "0"), 2)
+        assert source.limits == [2, 8]
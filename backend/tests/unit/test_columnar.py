@@ -0,0 +1,73 @@
+"""
+컬럼 형식 응답 인코딩 단위 테스트
+"""
+import json
+from datetime import datetime
+
+import pytest
+
+from app.services import columnar
+from app.services.columnar import ColumnarBatch, encode_columnar, negotiate_columnar_format
+
+ROWS = [
+    {"equipment_code": f"EQ-{i % 2}", "measurement_value": float(i), "timestamp": datetime(2025, 1, 1, 8, 0, i)}
+    for i in range(6)
+]
+
+
+class TestNegotiation:
+    """Accept 헤더 협상 테스트"""
+
+    @pytest.mark.parametrize("accept, expected", [
+        (None, None),
+        ("*/*", None),
+        ("application/vnd.maxlab.columnar+json", "json"),
+        ("application/json, application/vnd.maxlab.columnar+json", None),
+        ("application/json;q=0.5, application/vnd.maxlab.columnar+json", "json"),
+        ("application/vnd.apache.arrow.stream;q=0.9, application/x-msgpack;q=0", None),
+    ])
+    def test_picks_highest_quality_supported_format(self, accept, expected, monkeypatch):
+        monkeypatch.setattr(columnar, "PYARROW_AVAILABLE", False)
+        assert negotiate_columnar_format(accept) == expected
+
+    def test_skips_formats_not_allowed_for_endpoint(self, monkeypatch):
+        monkeypatch.setattr(columnar, "PYARROW_AVAILABLE", True)
+        accept = "application/vnd.apache.arrow.stream, application/vnd.maxlab.columnar+json;q=0.8"
+        assert negotiate_columnar_format(accept) == "arrow"
+        assert negotiate_columnar_format(accept, allowed=("json", "msgpack")) == "json"
+
+
+class TestEncoding:
+    """컬럼 배열 인코딩 테스트"""
+
+    def test_json_document_dictionary_encodes_repeated_strings(self):
+        document = json.loads(encode_columnar({"measurements": ColumnarBatch.from_rows(ROWS), "total": 6}, "json"))
+        batch = document["measurements"]
+
+        assert batch["row_count"] == 6 and document["total"] == 6
+        assert batch["dictionaries"] == {"equipment_code": ["EQ-0", "EQ-1"]}
+        assert batch["columns"]["equipment_code"] == [0, 1, 0, 1, 0, 1]
+        assert batch["columns"]["measurement_value"] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+        assert batch["columns"]["timestamp"][0] == "2025-01-01T08:00:00"
+
+    def test_unique_strings_stay_plain(self):
+        rows = [{"name": f"item-{i}"} for i in range(4)] + [{"name": None}]
+        document = ColumnarBatch.from_rows(rows).to_document()
+        assert document["dictionaries"] == {}
+        assert document["columns"]["name"][-1] is None
+
+    def test_arrow_stream_round_trip(self):
+        pa = pytest.importorskip("pyarrow")
+        rows = ROWS + [{"equipment_code": None, "measurement_value": "n/a", "timestamp": None}]
+        payload = encode_columnar(ColumnarBatch.from_rows(rows), "arrow")
+        table = pa.ipc.open_stream(payload).read_all()
+
+        assert pa.types.is_dictionary(table.schema.field("equipment_code").type)
+        assert table.column("equipment_code").to_pylist() == [f"EQ-{i % 2}" for i in range(6)] + [None]
+        assert table.column("measurement_value").to_pylist()[-1] == "n/a"  # 섞인 타입은 문자열로
+        assert pa.types.is_timestamp(table.schema.field("timestamp").type)
+
+    def test_msgpack_matches_json_document(self):
+        msgpack = pytest.importorskip("msgpack")
+        batch = ColumnarBatch.from_rows(ROWS)
+        assert msgpack.unpackb(encode_columnar(batch, "msgpack")) == json.loads(encode_columnar(batch, "json"))
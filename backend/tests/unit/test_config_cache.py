@@ -0,0 +1,119 @@
+"""
+데이터 소스 설정 캐시 단위 테스트
+"""
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.services.data_providers import config_cache as cache_module
+from app.services.data_providers.config_cache import DataSourceConfigCache
+
+WORKSPACE_ID = str(uuid.uuid4())
+DATA_SOURCE_ID = str(uuid.uuid4())
+
+
+class FakeRow(SimpleNamespace):
+    @property
+    def _mapping(self):
+        return vars(self)
+
+
+class FakeSession:
+    """쿼리 종류별 응답과 실행 횟수를 관리하는 세션"""
+
+    def __init__(self):
+        self.updated_at = datetime(2025, 1, 1)
+        self.executed = []
+
+    async def execute(self, query, params=None):
+        self.executed.append(query)
+        if query is cache_module._WORKSPACE_BY_SLUG:
+            row = FakeRow(id=WORKSPACE_ID) if params["workspace_id"] == "plant-a" else None
+        elif query in (cache_module._VERSION_BY_ID, cache_module._VERSION_BY_WORKSPACE):
+            row = FakeRow(id=DATA_SOURCE_ID, updated_at=self.updated_at)
+        elif params.get("data_source_id", DATA_SOURCE_ID) == DATA_SOURCE_ID:
+            row = FakeRow(
+                data_source_id=DATA_SOURCE_ID, workspace_id=WORKSPACE_ID, source_type="MSSQL", api_url=None,
+                mssql_connection_string="encrypted", api_key=None, api_headers='{"X-Plant": "a"}',
+                is_active=True, custom_queries=None, updated_at=self.updated_at
+            )
+        else:
+            row = None
+        return SimpleNamespace(fetchone=lambda: row)
+
+    def count(self, query):
+        return sum(1 for executed in self.executed if executed is query)
+
+
+@pytest.fixture
+def session():
+    return FakeSession()
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(cache_module, "decrypt_connection_string", lambda value: f"decrypted:{value}")
+    monkeypatch.setattr(settings, "DATA_SOURCE_CONFIG_REVALIDATE_SECONDS", 30)
+    return DataSourceConfigCache()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+class TestDataSourceConfigCache:
+    """설정 캐시 적중/재검증/무효화 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_config_is_decrypted_once_and_copied(self, cache, session, clock):
+        config = await cache.get_config(session, WORKSPACE_ID, DATA_SOURCE_ID)
+        config["connection_string"] = "mutated"
+        again = await cache.get_config(session, WORKSPACE_ID, DATA_SOURCE_ID)
+
+        assert again["connection_string"] == "decrypted:encrypted"
+        assert again["source_type"] == "mssql" and again["headers"] == {"X-Plant": "a"}
+        assert session.count(cache_module._CONFIG_BY_ID) == 1
+        assert cache.get_stats()["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_revalidation_reloads_only_changed_configs(self, cache, session, clock):
+        await cache.get_config(session, WORKSPACE_ID, DATA_SOURCE_ID)
+        clock[0] += 31
+        await cache.get_config(session, WORKSPACE_ID, DATA_SOURCE_ID)
+        assert session.count(cache_module._VERSION_BY_ID) == 1
+        assert session.count(cache_module._CONFIG_BY_ID) == 1
+
+        session.updated_at = datetime(2025, 1, 2)
+        clock[0] += 31
+        await cache.get_config(session, WORKSPACE_ID, DATA_SOURCE_ID)
+        assert session.count(cache_module._CONFIG_BY_ID) == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_by_workspace_drops_both_keys(self, cache, session, clock):
+        await cache.get_config(session, WORKSPACE_ID, DATA_SOURCE_ID)
+        await cache.get_config(session, WORKSPACE_ID)
+
+        cache.invalidate(workspace_id=WORKSPACE_ID)
+        assert cache.get_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_workspace_slug_is_memoised(self, cache, session, clock):
+        assert await cache.resolve_workspace_id(session, "plant-a") == WORKSPACE_ID
+        assert await cache.resolve_workspace_id(session, "plant-a") == WORKSPACE_ID
+        assert session.count(cache_module._WORKSPACE_BY_SLUG) == 1
+
+        clock[0] += cache_module.SLUG_CACHE_TTL_SECONDS
+        await cache.resolve_workspace_id(session, "plant-a")
+        assert session.count(cache_module._WORKSPACE_BY_SLUG) == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_data_source_raises(self, cache, session, clock):
+        with pytest.raises(ValueError):
+            await cache.get_config(session, WORKSPACE_ID, str(uuid.uuid4()))
+        assert cache.get_stats()["entries"] == 0
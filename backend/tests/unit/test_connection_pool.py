@@ -0,0 +1,126 @@
+"""
+데이터 소스 커넥션 풀 관리자 단위 테스트
+"""
+import asyncio
+
+import pytest
+
+from app.services.data_providers.connection_pool import ConnectionPoolManager, PoolBudgetExceededError
+
+
+class FakeOdbcPool:
+    """aioodbc 풀 대역 (size/freesize, close/wait_closed)"""
+
+    def __init__(self, dsn, maxsize):
+        self.dsn = dsn
+        self.size = maxsize
+        self.freesize = maxsize
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+@pytest.fixture
+def manager():
+    instance = object.__new__(ConnectionPoolManager)
+    instance.__init__()
+    instance._lock = asyncio.Lock()
+    instance._max_connections = 10
+    # 유휴 풀 정리 태스크는 테스트에서 띄우지 않음
+    instance._cleanup_task = object()
+    return instance
+
+
+class FakeConnector:
+    """풀 생성 대역: dsn별로 대기시키거나 연결 실패를 낼 수 있음"""
+
+    def __init__(self):
+        self.calls = []
+        self.gates = {}
+
+    def __call__(self, dsn, maxsize):
+        async def build(conn_info):
+            self.calls.append(dsn)
+            if dsn in self.gates:
+                await self.gates[dsn].wait()
+            if dsn.startswith("unreachable"):
+                raise ConnectionRefusedError(dsn)
+            conn_info.odbc_pool = FakeOdbcPool(dsn, maxsize)
+        return build
+
+
+@pytest.fixture
+def connector():
+    return FakeConnector()
+
+
+def _get(manager, connector, data_source_id, dsn, maxsize=2):
+    return manager._get_or_create(
+        data_source_id, manager._pool_key(data_source_id, dsn), "mssql", maxsize, connector(dsn, maxsize)
+    )
+
+
+class TestConnectionPoolManager:
+    """풀 생성/교체/예산 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_creation(self, manager, connector):
+        connector.gates["dsn-a"] = asyncio.Event()
+        waiters = [asyncio.create_task(_get(manager, connector, "ds-1", "dsn-a")) for _ in range(3)]
+        await asyncio.sleep(0)
+        connector.gates["dsn-a"].set()
+        results = await asyncio.gather(*waiters)
+
+        assert connector.calls == ["dsn-a"]
+        assert all(result is results[0] for result in results)
+
+    @pytest.mark.asyncio
+    async def test_slow_creation_does_not_block_other_sources(self, manager, connector):
+        connector.gates["dsn-slow"] = asyncio.Event()
+        slow = asyncio.create_task(_get(manager, connector, "ds-slow", "dsn-slow"))
+        await asyncio.sleep(0)
+
+        other = await asyncio.wait_for(_get(manager, connector, "ds-2", "dsn-b"), timeout=1)
+        assert other.odbc_pool.dsn == "dsn-b"
+        assert not manager._lock.locked()
+
+        connector.gates["dsn-slow"].set()
+        await slow
+        assert manager.get_stats()["reserved_connections"] == 4
+
+    @pytest.mark.asyncio
+    async def test_failed_creation_is_shared_and_released(self, manager, connector):
+        connector.gates["unreachable"] = asyncio.Event()
+        waiters = [asyncio.create_task(_get(manager, connector, "ds-1", "unreachable")) for _ in range(2)]
+        await asyncio.sleep(0)
+        connector.gates["unreachable"].set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        assert all(isinstance(result, ConnectionRefusedError) for result in results)
+        assert connector.calls == ["unreachable"]
+        assert manager._creating == {} and manager._capacity_in_use() == 0
+
+    @pytest.mark.asyncio
+    async def test_changed_connection_string_closes_old_pool(self, manager, connector):
+        old = await _get(manager, connector, "ds-1", "dsn-old")
+        new = await _get(manager, connector, "ds-1", "dsn-new")
+
+        assert old.odbc_pool.closed and not new.odbc_pool.closed
+        assert manager.get_stats()["total_pools"] == 1
+
+    @pytest.mark.asyncio
+    async def test_budget_evicts_idle_pool_and_rejects_when_all_busy(self, manager, connector):
+        first = await _get(manager, connector, "ds-1", "dsn-1", 6)
+        second = await _get(manager, connector, "ds-2", "dsn-2", 6)
+        assert first.odbc_pool.closed
+        assert manager.get_stats()["evictions"] == 1
+
+        second.odbc_pool.freesize = 0  # 모든 연결 사용 중
+        with pytest.raises(PoolBudgetExceededError):
+            await _get(manager, connector, "ds-3", "dsn-3", 6)
+        assert not second.odbc_pool.closed
+        assert manager.get_stats()["total_pools"] == 1
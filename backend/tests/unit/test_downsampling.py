@@ -0,0 +1,160 @@
+"""
+측정 시계열 다운샘플링 단위 테스트
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.services.data_providers.base import MeasurementRecord
+from app.services.data_providers.dynamic import DynamicProvider
+from app.services.data_providers.resilience import DataSourceGuard
+from app.services.downsampling import DownsampleRequest, downsample_records, lttb_indices
+
+START = datetime(2025, 1, 1, 0, 0, 0)
+END = START + timedelta(seconds=100)
+
+
+def _record(equipment_code, measurement_code, second, value):
+    return MeasurementRecord(
+        id=second, equipment_type="REACTOR", equipment_code=equipment_code, measurement_code=measurement_code,
+        measurement_desc="", measurement_value=float(value), timestamp=START + timedelta(seconds=second)
+    )
+
+
+def _series(equipment_code="EQ-1", measurement_code="TEMP", spike_at=None):
+    return [
+        _record(equipment_code, measurement_code, second, 100 if second == spike_at else second % 5)
+        for second in range(100)
+    ]
+
+
+class TestLttb:
+    """LTTB 알고리즘 테스트"""
+
+    def test_keeps_endpoints_and_spike(self):
+        values = [0.0] * 200
+        values[123] = 50.0
+        indices = lttb_indices([float(i) for i in range(200)], values, 20)
+
+        assert len(indices) == 20
+        assert indices[0] == 0 and indices[-1] == 199
+        assert 123 in indices
+        assert indices == sorted(indices)
+
+    def test_short_series_returned_as_is(self):
+        assert lttb_indices([0.0, 1.0, 2.0], [1.0, 2.0, 3.0], 10) == [0, 1, 2]
+
+
+class TestDownsampleRecords:
+    """시리즈별 다운샘플링 테스트"""
+
+    def test_lttb_per_series_sorted_newest_first(self):
+        records = _series("EQ-1", spike_at=42) + _series("EQ-2")
+        result = downsample_records(records, DownsampleRequest(points=10, start_time=START, end_time=END))
+
+        assert len([r for r in result if r.equipment_code == "EQ-1"]) == 10
+        assert len([r for r in result if r.equipment_code == "EQ-2"]) == 10
+        assert any(r.measurement_value == 100 for r in result)
+        assert [r.timestamp for r in result] == sorted((r.timestamp for r in result), reverse=True)
+
+    def test_minmax_keeps_original_extremes_per_bucket(self):
+        request = DownsampleRequest(points=10, method="minmax", start_time=START, end_time=END)
+        result = downsample_records(_series(spike_at=42), request)
+
+        assert len(result) <= 10
+        assert any(r.measurement_value == 100 and r.id == 42 for r in result)
+
+    def test_avg_buckets_and_range_filter(self):
+        request = DownsampleRequest(points=4, method="avg", start_time=START, end_time=START + timedelta(seconds=39))
+        result = downsample_records(_series(), request)
+
+        assert len(result) == 4
+        assert [r.id for r in result] == [30, 20, 10, 0]  # 버킷 첫 행 기준
+        assert all(r.measurement_value == 2.0 for r in result)
+
+    def test_invalid_request(self):
+        with pytest.raises(ValueError):
+            DownsampleRequest(points=10, method="median")
+
+
+class FakeSource:
+    """구간 조회 지원 여부를 고를 수 있는 데이터 소스 대역 (행은 최신순으로 반환)"""
+
+    def __init__(self, rows, supports_range):
+        self.rows = sorted(rows, key=lambda row: row.timestamp, reverse=True)
+        self.supports_range = supports_range
+        self.range_calls = []
+
+    async def get_bucketed_measurements(self, request, **filters):
+        return None
+
+    async def get_measurements_in_range(self, start_time, end_time, limit=1000, **filters):
+        if not self.supports_range:
+            return None
+        self.range_calls.append((start_time, end_time))
+        return [row for row in self.rows if start_time <= row.timestamp <= end_time][:limit]
+
+    async def get_measurement_data(self, equipment_code=None, equipment_type=None, limit=1000):
+        return self.rows[:limit]
+
+
+def _dynamic(source):
+    provider = DynamicProvider(None, "ws")
+    guard = DataSourceGuard("ds-test")
+
+    async def get_provider():
+        return source
+
+    async def get_guard():
+        return guard
+
+    async def apply_specs(_, measurements):
+        return measurements
+
+    provider._get_provider, provider._guard, provider._apply_specs = get_provider, get_guard, apply_specs
+    return provider
+
+
+class TestPythonFallbackRange:
+    """Python 다운샘플링 폴백의 조회 구간 처리 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_historical_range_is_fetched_from_source(self, monkeypatch):
+        monkeypatch.setattr(settings, "DOWNSAMPLE_MAX_SOURCE_ROWS", 50)
+        # 요청 구간(0~100초) 이후에 새 행이 많이 쌓인 경우
+        source = FakeSource(_series() + [_record("EQ-1", "TEMP", 1000 + i, 1) for i in range(200)], True)
+        provider = _dynamic(source)
+
+        result = await provider.get_measurement_records(
+            downsample=DownsampleRequest(points=10, method="lttb", start_time=START, end_time=END)
+        )
+
+        assert source.range_calls == [(START, END)]
+        assert len(result) == 10
+        assert provider.downsample_truncated
+
+    @pytest.mark.asyncio
+    async def test_unbounded_fetch_flags_truncated_range(self, monkeypatch):
+        monkeypatch.setattr(settings, "DOWNSAMPLE_MAX_SOURCE_ROWS", 50)
+        source = FakeSource(_series() + [_record("EQ-1", "TEMP", 1000 + i, 1) for i in range(200)], False)
+        provider = _dynamic(source)
+
+        result = await provider.get_measurement_records(
+            downsample=DownsampleRequest(points=10, method="lttb", start_time=START, end_time=END)
+        )
+
+        assert result == []
+        assert provider.downsample_truncated
+
+    @pytest.mark.asyncio
+    async def test_unbounded_fetch_covering_range_is_not_truncated(self, monkeypatch):
+        monkeypatch.setattr(settings, "DOWNSAMPLE_MAX_SOURCE_ROWS", 500)
+        provider = _dynamic(FakeSource(_series(), False))
+
+        result = await provider.get_measurement_records(
+            downsample=DownsampleRequest(points=10, method="lttb", start_time=START, end_time=END)
+        )
+
+        assert len(result) == 10
+        assert not provider.downsample_truncated
@@ -0,0 +1,63 @@
+"""
+API 필드 매핑 컴파일 단위 테스트
+"""
+from datetime import datetime, timezone
+
+from app.services.data_providers import field_mapping
+from app.services.data_providers.field_mapping import (
+    CompiledFieldMapping, compile_path, get_compiled_field_mapping, invalidate_compiled_mappings
+)
+
+FIELD_MAPPINGS = {
+    "equipment_code": {"source_field": "code"},
+    "status": {"source_field": "state", "default_value": "STOP"},
+    "value": {"source_field": "val", "data_type_conversion": "float"},
+    "timestamp": {"source_field": "ts", "data_type_conversion": "datetime"},
+}
+
+
+class TestCompiledFieldMapping:
+    """필드 매핑 변환 테스트"""
+
+    def test_map_records_applies_defaults_and_conversions(self):
+        mapper = CompiledFieldMapping(FIELD_MAPPINGS)
+        records = mapper.map_records([
+            {"code": "EQ-1", "state": "RUN", "val": "1.5", "ts": "2024-01-01T00:00:00Z"},
+            {"code": "EQ-2", "val": "n/a", "ts": 42},
+        ])
+
+        assert records[0] == {
+            "equipment_code": "EQ-1",
+            "status": "RUN",
+            "value": 1.5,
+            "timestamp": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        }
+        # 변환 실패 시 원래 값 유지, 값이 없으면 기본값 사용
+        assert records[1] == {"equipment_code": "EQ-2", "status": "STOP", "value": "n/a", "timestamp": 42}
+
+    def test_compiled_mapping_reused_until_rows_change(self):
+        invalidate_compiled_mappings()
+        first = get_compiled_field_mapping("ds", "equipment_status", FIELD_MAPPINGS)
+        assert get_compiled_field_mapping("ds", "equipment_status", dict(FIELD_MAPPINGS)) is first
+
+        changed = {**FIELD_MAPPINGS, "extra": {"source_field": "x"}}
+        assert get_compiled_field_mapping("ds", "equipment_status", changed) is not first
+
+        invalidate_compiled_mappings("ds")
+        assert field_mapping._compiled_cache == {}
+
+
+class TestCompilePath:
+    """응답 경로 접근자 테스트"""
+
+    def test_paths_match_previous_extraction_rules(self):
+        response = {"data": [1, 2], "result": {"items": [3], "one": {"a": 1}}}
+
+        assert compile_path("$")(response) == [response]
+        assert compile_path(None)([1]) == [1]
+        assert compile_path("$.data")(response) == [1, 2]
+        assert compile_path("$.missing")(response) == []
+        assert compile_path("$.result.items")(response) == [3]
+        assert compile_path("$.result.one")(response) == [{"a": 1}]
+        assert compile_path("$.data.x")(response) == []
+        assert compile_path("$.data") is compile_path("$.data")
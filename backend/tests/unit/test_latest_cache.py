@@ -0,0 +1,114 @@
+"""
+최신 측정값 캐시 단위 테스트
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.services.data_providers.base import MeasurementRecord
+from app.services.data_providers.latest_cache import LatestMeasurementCache
+
+T0 = datetime(2025, 1, 1, 8, 0, 0)
+
+
+def _record(equipment_code, measurement_code, minute, value):
+    return MeasurementRecord(
+        id=minute, equipment_type="REACTOR", equipment_code=equipment_code, measurement_code=measurement_code,
+        measurement_desc="", measurement_value=float(value), timestamp=T0 + timedelta(minutes=minute)
+    )
+
+
+class FakeProvider:
+    """since 이후 행을 돌려주는 DynamicProvider 대역"""
+
+    workspace_id = "ws"
+
+    def __init__(self, rows, supported=True):
+        self.rows = rows
+        self.supported = supported
+        self.calls = []
+
+    async def _load_config(self):
+        return {"data_source_id": "ds-1"}
+
+    async def fetch_latest_since(self, since):
+        self.calls.append(since)
+        if not self.supported:
+            return None
+        return [row for row in self.rows if since is None or row.timestamp >= since]
+
+
+class TestLatestMeasurementCache:
+    """워터마크 증분 갱신 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_incremental_refresh_uses_watermark(self, monkeypatch):
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_REFRESH_SECONDS", 0.0)
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_OVERLAP_SECONDS", 0.0)
+        cache = LatestMeasurementCache()
+        provider = FakeProvider([_record("EQ-1", "TEMP", 0, 10), _record("EQ-2", "TEMP", 1, 20)])
+
+        first = await cache.get_latest(provider, ["EQ-1"])
+        assert [r.measurement_value for r in first] == [10.0]
+
+        provider.rows.append(_record("EQ-1", "TEMP", 5, 11))
+        second = await cache.get_latest(provider, ["EQ-1", "EQ-2"])
+
+        assert provider.calls == [None, T0 + timedelta(minutes=1)]
+        assert sorted(r.measurement_value for r in second) == [11.0, 20.0]
+
+    @pytest.mark.asyncio
+    async def test_late_committed_row_within_overlap_is_picked_up(self, monkeypatch):
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_REFRESH_SECONDS", 0.0)
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_OVERLAP_SECONDS", 600.0)
+        cache = LatestMeasurementCache()
+        provider = FakeProvider([_record("EQ-1", "TEMP", 0, 10), _record("EQ-2", "TEMP", 9, 20)])
+        await cache.get_latest(provider)
+
+        # 워터마크(9분)보다 이른 타임스탬프로 늦게 커밋된 행
+        provider.rows.append(_record("EQ-1", "TEMP", 4, 11))
+        result = await cache.get_latest(provider, ["EQ-1"])
+
+        assert provider.calls[-1] == T0 - timedelta(minutes=1)
+        assert [r.measurement_value for r in result] == [11.0]
+        assert cache.get_stats()["refreshes"] == 1
+
+    @pytest.mark.asyncio
+    async def test_full_reload_catches_rows_older_than_overlap(self, monkeypatch):
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_REFRESH_SECONDS", 0.0)
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_OVERLAP_SECONDS", 0.0)
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_FULL_RELOAD_SECONDS", 0.0)
+        cache = LatestMeasurementCache()
+        provider = FakeProvider([_record("EQ-1", "TEMP", 0, 10), _record("EQ-2", "TEMP", 30, 20)])
+        await cache.get_latest(provider)
+
+        provider.rows.append(_record("EQ-1", "TEMP", 5, 11))
+        result = await cache.get_latest(provider, ["EQ-1"])
+
+        assert provider.calls == [None, None]
+        assert [r.measurement_value for r in result] == [11.0]
+
+    @pytest.mark.asyncio
+    async def test_fresh_snapshot_is_served_from_memory(self, monkeypatch):
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_REFRESH_SECONDS", 3600.0)
+        cache = LatestMeasurementCache()
+        provider = FakeProvider([_record("EQ-1", "TEMP", 0, 10)])
+
+        await cache.get_latest(provider)
+        result = await cache.get_latest(provider)
+        result[0].measurement_value = 99.0  # 반환값은 복사본
+
+        assert provider.calls == [None]
+        assert (await cache.get_latest(provider))[0].measurement_value == 10.0
+        assert cache.get_stats()["hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_unsupported_source_returns_none(self, monkeypatch):
+        monkeypatch.setattr(settings, "LATEST_MEASUREMENT_REFRESH_SECONDS", 0.0)
+        cache = LatestMeasurementCache()
+        provider = FakeProvider([], supported=False)
+
+        assert await cache.get_latest(provider, ["EQ-1"]) is None
+        assert await cache.get_latest(provider, ["EQ-1"]) is None
+        assert provider.calls == [None]
@@ -0,0 +1,94 @@
+"""
+데이터 소스 매핑 캐시 단위 테스트
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import data_source_mapping
+from app.services.data_source_mapping import MappingService, mapping_cache
+
+
+class FakeSession:
+    """매핑 조회 쿼리 수를 세는 세션"""
+
+    def __init__(self, rows, on_query=None):
+        self.rows = rows
+        self.queries = 0
+        self.on_query = on_query
+
+    async def execute(self, query, params=None):
+        self.queries += 1
+        if self.on_query:
+            self.on_query()
+        mapping_type = (params or {}).get("mapping_type")
+        return [row for row in self.rows if mapping_type in (None, row.mapping_type)]
+
+
+def _row(mapping_type, source_code, target_code):
+    return SimpleNamespace(
+        mapping_type=mapping_type, source_code=source_code, source_name=None, source_type=None,
+        target_code=target_code, target_name=None, target_type=None, transform_rules=None
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    mapping_cache.invalidate()
+    yield
+    mapping_cache.invalidate()
+
+
+class TestMappingCache:
+
+    @pytest.mark.asyncio
+    async def test_mapping_shares_cache_across_services(self):
+        session = FakeSession([_row("equipment", "EXT-1", "EQ-001"), _row("measurement", "T1", "TEMP")])
+
+        first = await MappingService(session).map_equipment_code("ws", "ds", "EXT-1")
+        second = await MappingService(session).map_equipment_code("ws", "ds", "EXT-2")
+
+        assert first == "EQ-001"
+        assert second == "EXT-2"
+        assert session.queries == 1
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_independently(self, monkeypatch):
+        session = FakeSession([_row("equipment", "EXT-1", "EQ-001"), _row("measurement", "T1", "TEMP")])
+        service = MappingService(session)
+        clock = [1000.0]
+        monkeypatch.setattr(data_source_mapping.time, "monotonic", lambda: clock[0])
+
+        await service.map_equipment_code("ws", "ds", "EXT-1")
+        clock[0] += mapping_cache.ttl_seconds - 10
+        await service.map_measurement_code("ws", "ds", "T1")
+        clock[0] += 20
+        # equipment 항목만 만료되고 measurement 항목은 유지
+        await service.map_measurement_code("ws", "ds", "T1")
+        assert session.queries == 2
+        await service.map_equipment_code("ws", "ds", "EXT-1")
+        assert session.queries == 3
+
+    @pytest.mark.asyncio
+    async def test_invalidate_drops_only_that_data_source(self):
+        session = FakeSession([_row("equipment", "EXT-1", "EQ-001")])
+        service = MappingService(session)
+        await service.map_equipment_code("ws", "ds-a", "EXT-1")
+        await service.map_equipment_code("ws", "ds-b", "EXT-1")
+
+        mapping_cache.invalidate(data_source_id="ds-a")
+        await service.map_equipment_code("ws", "ds-a", "EXT-1")
+        await service.map_equipment_code("ws", "ds-b", "EXT-1")
+        assert session.queries == 3
+
+    @pytest.mark.asyncio
+    async def test_load_racing_invalidation_is_not_cached(self):
+        rows = [_row("equipment", "EXT-1", "EQ-001")]
+        # 조회 중 매핑이 바뀌어 무효화된 경우 (읽은 결과는 이미 오래된 값)
+        session = FakeSession(rows, on_query=lambda: mapping_cache.invalidate(data_source_id="ds"))
+        await MappingService(session).map_equipment_code("ws", "ds", "EXT-1")
+
+        session.on_query = None
+        await MappingService(session).map_equipment_code("ws", "ds", "EXT-1")
+        assert session.queries == 2
+        assert mapping_cache.get_stats()["stale_puts"] == 1
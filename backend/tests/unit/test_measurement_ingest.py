@@ -0,0 +1,211 @@
+"""
+측정 데이터 일괄 적재 단위 테스트
+"""
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from app.services import measurement_ingest as ingest_module
+from app.services.measurement_ingest import (
+    IngestFormatError, MeasurementIngestService, detect_format, iter_raw_rows, validate_row
+)
+
+NOW = datetime(2025, 1, 1, 0, 0, tzinfo=timezone.utc)
+
+
+async def _chunks(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def _collect(data: bytes, ingest_format: str, size: int = 7):
+    return [item async for item in iter_raw_rows(_chunks(data, size), ingest_format)]
+
+
+def _row(code="EQ-1", value=1.5, **extra):
+    return {"equipment_type": "REACTOR", "equipment_code": code, "measurement_code": "TEMP", "measurement_value": value, **extra}
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+class FakeIngestService(MeasurementIngestService):
+    """설비 코드 확인/기록을 메모리에서 처리하는 대역"""
+
+    def __init__(self, known=("EQ-1",), fail_on_batch=None):
+        self.known = set(known)
+        self.fail_on_batch = fail_on_batch
+        self.written = []
+        self.ensured = []
+
+    async def _known_equipment(self, session, codes):
+        return codes & self.known
+
+    async def _ensure_partitions(self, rows):
+        self.ensured.append((len(self.written), {row[5] for row in rows}))
+
+    async def _write(self, session, rows, use_copy=True):
+        if self.fail_on_batch is not None and len(self.written) + 1 == self.fail_on_batch:
+            raise RuntimeError("connection lost")
+        self.written.append(rows)
+        return "copy"
+
+
+class TestValidateRow:
+    """행 검증 테스트"""
+
+    def test_converts_to_copy_tuple(self):
+        row = validate_row(_row(value="12.5", timestamp="2025-01-01T09:00:00+09:00"), NOW)
+
+        assert row[:4] == ("REACTOR", "EQ-1", "TEMP", "")
+        assert row[4] == Decimal("12.5")
+        assert row[5] == NOW
+
+    def test_default_timestamp(self):
+        assert validate_row(_row(), NOW)[5] is NOW
+
+    @pytest.mark.parametrize("row, message", [
+        (_row(code=""), "equipment_code is required"),
+        (_row(code="X" * 31), "longer than 30"),
+        (_row(value=None), "measurement_value is required"),
+        (_row(value=float("nan")), "out of range"),
+        (_row(value=True), "measurement_value is required"),
+        (_row(timestamp=1e20), "timestamp out of range"),
+        (_row(timestamp=float("inf")), "timestamp out of range"),
+        ([1, 2], "must be an object"),
+    ])
+    def test_rejects_invalid_rows(self, row, message):
+        with pytest.raises(ValueError, match=message):
+            validate_row(row, NOW)
+
+    def test_detect_format(self):
+        assert detect_format("application/x-ndjson; charset=utf-8") == "ndjson"
+        assert detect_format("application/json", "csv") == "csv"
+        assert detect_format(None) == "json"
+        with pytest.raises(IngestFormatError):
+            detect_format("application/xml")
+
+
+class TestParsing:
+    """본문 스트림 파싱 테스트 (청크 경계에 걸친 행)"""
+
+    @pytest.mark.asyncio
+    async def test_ndjson_with_bad_line(self):
+        body = "\n".join([json.dumps(_row()), "", "{broken", json.dumps(_row(code="EQ-2"))]).encode()
+        rows = await _collect(body, "ndjson")
+
+        assert [line for line, _ in rows] == [1, 3, 4]
+        assert isinstance(rows[1][1], ValueError)
+        assert rows[2][1]["equipment_code"] == "EQ-2"
+
+    @pytest.mark.asyncio
+    async def test_csv_with_bom_quotes_and_multibyte(self):
+        body = (
+            "\ufeffequipment_type,equipment_code,measurement_code,measurement_desc,measurement_value\r\n"
+            "REACTOR,EQ-1,TEMP,\"온도, 상부\",1.5\r\n"
+            "REACTOR,EQ-1,TEMP,\"두 줄\n설명\",2.5\r\n"
+            "REACTOR,EQ-1\r\n"
+        ).encode("utf-8")
+        rows = await _collect(body, "csv", size=5)
+
+        assert rows[0] == (2, {**_row(value="1.5"), "measurement_desc": "온도, 상부"})
+        assert rows[1][0] == 3 and rows[1][1]["measurement_desc"] == "두 줄\n설명"
+        assert rows[2][0] == 5 and isinstance(rows[2][1], ValueError)
+
+    @pytest.mark.asyncio
+    async def test_csv_missing_columns(self):
+        with pytest.raises(IngestFormatError, match="measurement_value"):
+            await _collect(b"equipment_type,equipment_code,measurement_code\n", "csv")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("ijson_available", [True, False])
+    async def test_json_array(self, monkeypatch, ijson_available):
+        if ijson_available and not ingest_module.IJSON_AVAILABLE:
+            pytest.skip("ijson not installed")
+        monkeypatch.setattr(ingest_module, "IJSON_AVAILABLE", ijson_available)
+
+        rows = await _collect(json.dumps([_row(), _row(code="EQ-2")]).encode(), "json")
+        assert [(index, row["equipment_code"]) for index, row in rows] == [(0, "EQ-1"), (1, "EQ-2")]
+        assert await _collect(b"", "json") == []
+        with pytest.raises(IngestFormatError):
+            await _collect(json.dumps(_row()).encode(), "json")
+
+
+class TestIngest:
+    """배치/그룹 커밋 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_batches_rejects_and_group_commits(self):
+        service = FakeIngestService()
+        session = FakeSession()
+        rows = [_row() for _ in range(5)] + [_row(code="EQ-9"), _row(value="abc")]
+        body = "\n".join(json.dumps(row) for row in rows).encode()
+
+        result = await service.ingest(session, iter_raw_rows(_chunks(body), "ndjson"), batch_size=2, commit_rows=4)
+        payload = result.to_dict()
+
+        assert [len(rows) for rows in service.written] == [2, 2, 1]
+        assert (payload["received"], payload["inserted"], payload["rejected"]) == (7, 5, 2)
+        assert [error["line"] for error in payload["errors"]] == [6, 7]
+        assert "unknown equipment_code" in payload["errors"][0]["error"]
+        # 4행 이상 쌓인 뒤 한 번, 마지막에 한 번
+        assert payload["commits"] == 2 and session.commits == 2
+        assert all(batch["committed"] for batch in payload["batches"])
+
+    @pytest.mark.asyncio
+    async def test_out_of_range_epoch_rejects_row_only(self):
+        service = FakeIngestService()
+        session = FakeSession()
+        body = "\n".join(json.dumps(row) for row in [_row(), _row(timestamp=1e20), _row()]).encode()
+
+        result = await service.ingest(session, iter_raw_rows(_chunks(body), "ndjson"), batch_size=10)
+
+        assert result.error is None
+        assert (result.inserted, [error["line"] for error in result.to_dict()["errors"]]) == (2, [2])
+
+    @pytest.mark.asyncio
+    async def test_partitions_ensured_before_each_write(self):
+        service = FakeIngestService()
+        session = FakeSession()
+        stamps = ["2019-03-01T00:00:00+00:00", "2031-07-01T00:00:00+00:00", "2031-07-02T00:00:00+00:00"]
+        body = "\n".join(json.dumps(_row(timestamp=stamp)) for stamp in stamps).encode()
+
+        await service.ingest(session, iter_raw_rows(_chunks(body), "ndjson"), batch_size=2)
+
+        # 배치를 기록하기 전에 (기록된 배치 수 0, 1) 해당 배치의 시각으로 호출
+        assert [(written, sorted(ts.year for ts in stamps)) for written, stamps in service.ensured] == [
+            (0, [2019, 2031]), (1, [2031])
+        ]
+
+    @pytest.mark.asyncio
+    async def test_database_error_keeps_committed_batches(self):
+        service = FakeIngestService(fail_on_batch=3)
+        session = FakeSession()
+        body = "\n".join(json.dumps(_row()) for _ in range(6)).encode()
+
+        result = await service.ingest(session, iter_raw_rows(_chunks(body), "ndjson"), batch_size=2, commit_rows=2)
+
+        assert result.error == "connection lost" and result.error_type == "database"
+        assert result.inserted == 4
+        assert session.rollbacks == 1
+
+    @pytest.mark.asyncio
+    async def test_atomic_commits_once(self):
+        service = FakeIngestService()
+        session = FakeSession()
+        body = "\n".join(json.dumps(_row()) for _ in range(6)).encode()
+
+        result = await service.ingest(session, iter_raw_rows(_chunks(body), "ndjson"), batch_size=2, commit_rows=2, atomic=True)
+
+        assert result.inserted == 6 and session.commits == 1
@@ -0,0 +1,63 @@
+"""
+측정 데이터 파티션 이름/구간 계산 단위 테스트
+"""
+from datetime import date, datetime
+
+import pytest
+
+from app.core.measurement_partitions import (
+    DEFAULT_PARTITION, MeasurementPartitionManager, next_period, parse_partition_name, partition_name, partition_ranges
+)
+
+
+class TestPartitionRanges:
+    """파티션 구간 계산 테스트"""
+
+    def test_monthly_ranges_cross_year(self):
+        ranges = partition_ranges(date(2024, 11, 15), date(2025, 1, 3), "month")
+
+        assert [name for name, _, _ in ranges] == [
+            "personal_test_measurement_data_p202411",
+            "personal_test_measurement_data_p202412",
+            "personal_test_measurement_data_p202501",
+        ]
+        assert ranges[1][1:] == (date(2024, 12, 1), date(2025, 1, 1))
+
+    def test_daily_ranges_are_contiguous(self):
+        ranges = partition_ranges(datetime(2024, 2, 28, 13, 0), date(2024, 3, 1), "day")
+
+        assert [start for _, start, _ in ranges] == [date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1)]
+        assert all(end == next_start for (_, _, end), (_, next_start, _) in zip(ranges, ranges[1:]))
+
+    @pytest.mark.parametrize("interval, start", [("month", date(2025, 12, 1)), ("day", date(2025, 12, 31))])
+    def test_name_round_trip(self, interval, start):
+        assert parse_partition_name(partition_name(start, interval), interval) == start
+        assert next_period(start, interval) == date(2026, 1, 1)
+
+    def test_foreign_names_are_ignored(self):
+        assert parse_partition_name("personal_test_measurement_data_legacy", "month") is None
+        assert parse_partition_name("personal_test_measurement_data_pdefault", "day") is None
+        # 기본 파티션은 보존 기간 정리 대상이 아님
+        assert parse_partition_name(DEFAULT_PARTITION, "month") is None
+
+
+class TestPartitionManager:
+    """파티션 관리자 설정 테스트"""
+
+    def test_premakes_future_partitions(self):
+        manager = MeasurementPartitionManager(interval="month", premake=2, retention_days=0, brin_pages_per_range=32)
+        ranges = manager._upcoming_ranges(date(2025, 1, 1), now=datetime(2025, 3, 10))
+
+        assert [start for _, start, _ in ranges][-1] == date(2025, 5, 1)
+        assert len(ranges) == 5
+
+    @pytest.mark.asyncio
+    async def test_known_periods_skip_database(self):
+        manager = MeasurementPartitionManager(interval="month", premake=0, retention_days=0, brin_pages_per_range=32)
+        manager._known_periods.add(date(2025, 1, 1))
+
+        assert await manager.ensure_for_timestamps([datetime(2025, 1, 5), datetime(2025, 1, 31, 23)]) == []
+
+    def test_rejects_unknown_interval(self):
+        with pytest.raises(ValueError):
+            MeasurementPartitionManager(interval="week")
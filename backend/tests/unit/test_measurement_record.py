@@ -0,0 +1,75 @@
+"""
+MeasurementRecord / fast_json 직렬화 단위 테스트
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.core import fast_json
+from app.services.data_providers.base import MEASUREMENT_FIELDS, MeasurementData, MeasurementRecord
+
+ROW = {
+    "id": "7",
+    "equipment_type": "REACTOR",
+    "equipment_code": "EQ-001",
+    "measurement_code": "TEMP",
+    "measurement_desc": None,
+    "measurement_value": Decimal("81.5"),
+    "timestamp": "2025-01-01T08:00:00Z",
+    "spec_status": "ABOVE_SPEC",
+    "upper_spec_limit": Decimal("80"),
+    "lsl": 20,
+}
+
+
+class TestMeasurementRecord:
+    """프로바이더 경계 변환 테스트"""
+
+    def test_from_row_coerces_types_and_spec_aliases(self):
+        record = MeasurementRecord.from_row(ROW)
+
+        assert record.id == 7
+        assert record.measurement_desc == ""
+        assert record.measurement_value == 81.5 and isinstance(record.measurement_value, float)
+        assert record.timestamp == datetime.fromisoformat("2025-01-01T08:00:00+00:00")
+        assert (record.spec_status, record.usl, record.lsl, record.target) == (2, 80.0, 20.0, None)
+
+    def test_to_dict_matches_pydantic_model(self):
+        record = MeasurementRecord.from_row(ROW)
+        assert tuple(record.to_dict()) == MEASUREMENT_FIELDS
+        assert MeasurementData(**record.to_dict()).model_dump() == record.to_dict()
+
+    def test_invalid_value_raises(self):
+        with pytest.raises(ValueError):
+            MeasurementRecord.from_row({**ROW, "measurement_value": "n/a"})
+
+
+class TestFastJson:
+    """fast_json 인코더 테스트"""
+
+    @pytest.fixture(params=[True, False], ids=["orjson", "json"])
+    def encoder_mode(self, request, monkeypatch):
+        if request.param and not fast_json.ORJSON_AVAILABLE:
+            pytest.skip("orjson is not installed")
+        monkeypatch.setattr(fast_json, "ORJSON_AVAILABLE", request.param)
+
+    def test_dumps_records_and_special_types(self, encoder_mode):
+        record = MeasurementRecord.from_row(ROW)
+        payload = json.loads(fast_json.dumps({"items": [record], "total": Decimal("1.5")}))
+
+        assert payload["total"] == 1.5
+        assert payload["items"][0]["timestamp"] == "2025-01-01T08:00:00+00:00"
+        assert payload["items"][0]["measurement_desc"] == ""
+
+    def test_non_finite_floats_become_null(self, encoder_mode):
+        record = MeasurementRecord.from_row(ROW)
+        record.usl = float("inf")
+        payload = json.loads(fast_json.dumps({
+            "values": [float("nan"), 1.0, (float("-inf"),)], "spec": Decimal("NaN"), "items": [record]
+        }))
+
+        assert payload["values"] == [None, 1.0, [None]]
+        assert payload["spec"] is None
+        assert payload["items"][0]["usl"] is None
@@ -0,0 +1,182 @@
+"""
+측정 데이터 롤업 조회 계획 단위 테스트
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.commit_horizon import next_horizon
+from app.services.measurement_rollups import auto_interval, covers_data_source, parse_interval, plan_segments
+
+UTC = timezone.utc
+
+
+def _sources(segments):
+    return [(level.name if level else "raw", start.strftime("%H:%M:%S"), end.strftime("%H:%M:%S"))
+            for level, start, end in segments]
+
+
+class SimulatedTable:
+    """id 발급 순서와 커밋 순서가 다른 트랜잭션을 흉내 내는 측정 테이블"""
+
+    def __init__(self):
+        self.next_id = 1
+        self.next_xid = 100
+        self.rows = {}
+        self.in_flight = set()
+        self.committed = set()
+        self.state = (0, None, None)
+        self.rolled = []
+
+    def begin(self):
+        xid = self.next_xid
+        self.next_xid += 1
+        self.in_flight.add(xid)
+        return xid
+
+    def insert(self, xid):
+        row_id = self.next_id
+        self.next_id += 1
+        self.rows[row_id] = xid
+        return row_id
+
+    def end(self, xid, commit=True):
+        self.in_flight.discard(xid)
+        if commit:
+            self.committed.add(xid)
+
+    def sync(self):
+        """MeasurementRollupService.sync()와 같은 순서로 상한 계산 후 반영"""
+        visible = [row_id for row_id, xid in self.rows.items() if xid in self.committed]
+        snapshot_xmin = min(self.in_flight) if self.in_flight else self.next_xid
+        safe_upper, pending_id, pending_xmax = next_horizon(
+            *self.state, snapshot_xmin, self.next_xid, max(visible, default=None)
+        )
+        self.rolled.extend(sorted(row_id for row_id in visible if self.state[0] < row_id <= safe_upper))
+        self.state = (safe_upper, pending_id, pending_xmax)
+
+
+class TestParseInterval:
+    """버킷 크기 파싱 테스트"""
+
+    @pytest.mark.parametrize("value, expected", [("30s", 30), ("15m", 900), ("1h", 3600), ("2d", 172800)])
+    def test_units(self, value, expected):
+        assert parse_interval(value) == expected
+
+    @pytest.mark.parametrize("value", ["", "0m", "5", "1y", "-1h"])
+    def test_invalid(self, value):
+        with pytest.raises(ValueError):
+            parse_interval(value)
+
+    def test_auto_interval_limits_bucket_count(self):
+        start = datetime(2025, 1, 1, tzinfo=UTC)
+        assert auto_interval(start, start + timedelta(days=30), max_buckets=1000) == 3600
+        assert auto_interval(start, start + timedelta(hours=1), max_buckets=1000) == 60
+
+
+class TestCoversDataSource:
+    """롤업 집계 대상 데이터 소스 판별 테스트"""
+
+    @pytest.mark.parametrize("config, expected", [
+        ({"source_type": "postgresql"}, True),
+        ({"source_type": "postgresql", "custom_queries": {
+            "measurement_data": {"query": "SELECT * FROM personal_test_measurement_data"}
+        }}, True),
+        ({"source_type": "postgresql", "custom_queries": {
+            "measurement_data": {"query": "SELECT * FROM plant.readings"}
+        }}, False),
+        ({"source_type": "postgresql", "connection_string": "postgresql://plant/db"}, False),
+        ({"source_type": "mssql", "connection_string": "DRIVER=..."}, False),
+    ])
+    def test_only_builtin_measurement_table(self, config, expected):
+        assert covers_data_source(config) is expected
+
+
+class TestPlanSegments:
+    """롤업 소스 선택 테스트"""
+
+    def test_aligned_range_uses_hourly_rollup_only(self):
+        start = datetime(2025, 1, 1, tzinfo=UTC)
+        segments = plan_segments(start, start + timedelta(days=30), 86400)
+        assert _sources(segments) == [("1h", "00:00:00", "00:00:00")]
+
+    def test_unaligned_edges_fall_back_to_finer_sources(self):
+        start = datetime(2025, 1, 1, 8, 15, 30, tzinfo=UTC)
+        end = datetime(2025, 1, 1, 12, 40, 10, tzinfo=UTC)
+        segments = plan_segments(start, end, 3600)
+
+        assert _sources(segments) == [
+            ("raw", "08:15:30", "08:16:00"),
+            ("1m", "08:16:00", "09:00:00"),
+            ("1h", "09:00:00", "12:00:00"),
+            ("1m", "12:00:00", "12:40:00"),
+            ("raw", "12:40:00", "12:40:10"),
+        ]
+        assert all(a[2] == b[1] for a, b in zip(segments, segments[1:]))
+
+    def test_interval_not_divisible_by_rollup_reads_raw(self):
+        start = datetime(2025, 1, 1, tzinfo=UTC)
+        assert _sources(plan_segments(start, start + timedelta(minutes=10), 90)) == [
+            ("raw", "00:00:00", "00:10:00")
+        ]
+
+
+class TestRollupHorizon:
+    """워터마크 전진 조건 테스트"""
+
+    def test_rows_committed_out_of_order_are_not_skipped(self):
+        table = SimulatedTable()
+        slow = table.begin()
+        table.insert(slow)  # id 1, 아직 커밋 전
+        fast = table.begin()
+        table.insert(fast)  # id 2
+        table.end(fast)
+
+        table.sync()
+        table.sync()
+        assert table.rolled == [] and table.state[0] == 0  # id 2가 보여도 id 1이 진행 중이면 보류
+
+        table.end(slow)
+        table.sync()
+        assert table.rolled == [1, 2] and table.state[0] == 2
+
+        table.sync()
+        assert table.rolled == [1, 2]  # 같은 행을 두 번 반영하지 않음
+
+    def test_rolled_back_ids_do_not_stall_watermark(self):
+        table = SimulatedTable()
+        aborted = table.begin()
+        table.insert(aborted)
+        table.end(aborted, commit=False)
+        committed = table.begin()
+        table.insert(committed)
+        table.end(committed)
+
+        table.sync()
+        table.sync()
+
+        assert table.rolled == [2] and table.state == (2, None, None)
+
+    def test_pending_bound_is_kept_under_continuous_load(self):
+        table = SimulatedTable()
+        first = table.begin()
+        table.insert(first)
+        table.end(first)
+        table.sync()
+
+        long_running = table.begin()
+        table.insert(long_running)
+        for _ in range(3):
+            xid = table.begin()
+            table.insert(xid)
+            table.end(xid)
+            table.sync()
+
+        # 보류 당시 진행 중인 트랜잭션이 없었으므로 id 1은 확정되고, 새 보류 경계(id 3)는 고정
+        assert table.rolled == [1]
+        assert table.state[1] == 3
+
+        table.end(long_running)
+        table.sync()
+        table.sync()
+        assert table.rolled == [1, 2, 3, 4, 5]
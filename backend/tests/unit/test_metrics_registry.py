@@ -0,0 +1,100 @@
+"""
+통합 메트릭 레지스트리 단위 테스트
+"""
+import pytest
+
+from app.services import metrics_registry as registry_module
+from app.services.metrics_registry import (
+    MetricFamily, MetricsRegistry, histogram_family, merge_worker_families, render_families
+)
+from app.services.performance_monitor import LatencyHistogram, performance_monitor
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # 새 레지스트리가 전역 모니터의 스냅샷 제공자를 덮어쓰지 않도록 격리
+    monkeypatch.setattr(performance_monitor, "_snapshot_providers", {})
+    return MetricsRegistry()
+
+
+class TestRendering:
+    """Prometheus 텍스트 포맷 렌더링 테스트"""
+
+    def test_render_escapes_labels_and_formats_values(self):
+        family = MetricFamily("maxlab_test_total", "counter", "Test counter")
+        family.add(3.0, route='/a"b\\c')
+        family.add(0.25, route="/d")
+
+        assert render_families([family]).splitlines() == [
+            "# HELP maxlab_test_total Test counter",
+            "# TYPE maxlab_test_total counter",
+            'maxlab_test_total{route="/a\\"b\\\\c"} 3',
+            'maxlab_test_total{route="/d"} 0.25',
+        ]
+
+    def test_histogram_buckets_are_cumulative_seconds(self):
+        histogram = LatencyHistogram()
+        for value in (3, 40, 40, 20000):
+            histogram.record(value)
+        family = histogram_family("maxlab_latency_seconds", "Latency", {(("route", "/a"),): histogram})
+        samples = {(suffix, labels.get("le")): value for suffix, labels, value in family.samples}
+
+        assert samples[("_bucket", "0.005")] == 1
+        assert samples[("_bucket", "0.05")] == 3
+        assert samples[("_bucket", "10")] == 3
+        assert samples[("_bucket", "+Inf")] == 4
+        assert samples[("_count", None)] == 4
+        assert samples[("_sum", None)] == pytest.approx(20.083, rel=0.02)
+
+
+class TestWorkerMerge:
+    """워커 스냅샷 병합 테스트"""
+
+    def test_counters_are_summed_and_gauges_keep_pid(self, monkeypatch):
+        monkeypatch.setattr(registry_module.os, "getpid", lambda: 100)
+
+        def families(hits, in_use):
+            return [
+                MetricFamily("maxlab_hits_total", "counter", "Hits").add(hits, result="hit"),
+                MetricFamily("maxlab_in_use", "gauge", "In use").add(in_use),
+            ]
+
+        merged = {family.name: family for family in merge_worker_families(families(2, 1), [(200, families(5, 4))])}
+
+        assert merged["maxlab_hits_total"].samples == [("", {"result": "hit"}, 7.0)]
+        assert merged["maxlab_in_use"].samples == [("", {"pid": "100"}, 1.0), ("", {"pid": "200"}, 4.0)]
+
+    def test_snapshot_round_trip(self):
+        family = MetricFamily("maxlab_in_use", "gauge", "In use").add(2, state="busy")
+
+        assert MetricFamily.from_dict(family.to_dict()) == family
+
+
+class TestCollectors:
+    """수집기 실행/캐시 테스트"""
+
+    def test_failing_local_collector_is_skipped(self, registry):
+        registry.register_local("broken", lambda: 1 / 0)
+        registry.register_local("ok", lambda: [MetricFamily("maxlab_ok", "gauge", "OK").add(1)])
+
+        assert [family.name for family in registry.collect_local()] == ["maxlab_ok"]
+
+    @pytest.mark.asyncio
+    async def test_global_collectors_are_cached_between_scrapes(self, registry, monkeypatch):
+        calls = []
+        clock = [1000.0]
+        monkeypatch.setattr(registry_module.time, "monotonic", lambda: clock[0])
+
+        async def collect():
+            calls.append(clock[0])
+            return [MetricFamily("maxlab_pg_up", "gauge", "Up").add(1)]
+
+        registry.register_global("database_server", collect)
+        await registry.collect_global()
+        clock[0] += registry_module.GLOBAL_COLLECTOR_TTL_SECONDS - 1
+        await registry.collect_global()
+        assert len(calls) == 1
+
+        clock[0] += 2
+        await registry.collect_global()
+        assert len(calls) == 2
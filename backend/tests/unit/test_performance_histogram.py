@@ -0,0 +1,130 @@
+"""
+성능 모니터 히스토그램 단위 테스트
+"""
+import asyncio
+import json
+import random
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.services.performance_monitor import (
+    LatencyHistogram,
+    PerformanceMetrics,
+    PerformanceMonitor,
+    TimedHistogram,
+)
+
+
+class TestLatencyHistogram:
+    """고정 메모리 히스토그램 테스트"""
+    
+    def test_percentiles_within_relative_error(self):
+        """백분위수가 정확한 값 대비 약 1% 이내"""
+        rng = random.Random(42)
+        values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+        histogram = LatencyHistogram()
+        for value in values:
+            histogram.record(value)
+        
+        ordered = sorted(values)
+        for p in (50, 95, 99):
+            exact = ordered[int(len(ordered) * p / 100) - 1]
+            assert histogram.percentile(p) == pytest.approx(exact, rel=0.02)
+        assert histogram.count == len(values)
+        assert histogram.mean == pytest.approx(sum(values) / len(values))
+    
+    def test_bucket_count_is_bounded(self):
+        """샘플 수와 무관하게 버킷 수가 제한됨"""
+        histogram = LatencyHistogram()
+        for i in range(100000):
+            histogram.record((i % 5000) * 0.37)
+        histogram.record(10 ** 9)
+        assert len(histogram.counts) <= LatencyHistogram.MAX_INDEX + 1
+        assert max(histogram.counts) == LatencyHistogram.MAX_INDEX
+    
+    def test_merge_matches_single_histogram(self):
+        """분할 기록 후 병합 결과가 단일 기록과 동일"""
+        values = [i * 0.5 + 0.1 for i in range(1000)]
+        single, left, right = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i, value in enumerate(values):
+            single.record(value)
+            (left if i % 2 else right).record(value)
+        
+        merged = left.merge(right)
+        assert merged.counts == single.counts
+        assert merged.percentile(99) == single.percentile(99)
+        assert (merged.min, merged.max) == (single.min, single.max)
+    
+    def test_round_trip_serialization(self):
+        histogram = LatencyHistogram()
+        for value in (0.001, 1.5, 250.0):
+            histogram.record(value)
+        restored = LatencyHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+        assert restored.counts == histogram.counts
+        assert restored.summary() == histogram.summary()
+
+
+class TestTimedHistogram:
+    """이동 윈도우 히스토그램 테스트"""
+    
+    def test_window_expires_old_samples(self):
+        histogram = TimedHistogram()
+        histogram.record(10.0, now=1000.0)
+        histogram.record(20.0, now=1100.0)
+        
+        assert histogram.window("1m", now=1100.0).count == 1
+        assert histogram.window("5m", now=1100.0).count == 2
+        assert histogram.window("5m", now=1500.0).count == 0
+        assert histogram.window("1h", now=1500.0).count == 2
+        assert histogram.total.count == 2
+
+
+class TestPerformanceMetricsSnapshot:
+    """워커 스냅샷 병합 테스트"""
+    
+    def test_merge_snapshot_combines_workers(self):
+        first, second = PerformanceMetrics(), PerformanceMetrics()
+        for value in range(1, 101):
+            first.add_response_time("GET /a", float(value))
+            second.add_response_time("GET /a", float(value + 100))
+        second.add_query_time("select", 5.0)
+        second.record_cache_hit()
+        
+        aggregated = PerformanceMetrics.from_snapshot(json.loads(json.dumps(first.snapshot())))
+        aggregated.merge_snapshot(json.loads(json.dumps(second.snapshot())))
+        stats = aggregated.get_statistics()
+        
+        assert aggregated.worker_count == 2
+        assert stats["response_times"]["count"] == 200
+        assert stats["response_times"]["median"] == pytest.approx(100, rel=0.02)
+        assert stats["endpoints"]["GET /a"]["count"] == 200
+        assert stats["query_performance"]["select"]["count"] == 1
+        assert stats["cache"]["hits"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_snapshot_built_on_loop_and_written_in_thread(self, tmp_path, monkeypatch):
+        """스냅샷 수집(제공자 포함)은 루프 스레드, 파일 기록만 작업 스레드"""
+        monkeypatch.setattr(settings, "PERFORMANCE_METRICS_DIR", str(tmp_path))
+        monitor = PerformanceMonitor()
+        monitor.metrics.add_response_time("GET /a", 12.0)
+        provider_threads, writer_threads = [], []
+        monitor.register_snapshot_provider("probe", lambda: provider_threads.append(threading.get_ident()) or "ok")
+        write_file = monitor._write_snapshot_file
+        monkeypatch.setattr(
+            monitor, "_write_snapshot_file",
+            lambda snapshot: writer_threads.append(threading.get_ident()) or write_file(snapshot)
+        )
+        
+        task = asyncio.create_task(monitor._snapshot_loop(3600))
+        for _ in range(100):
+            if monitor._snapshot_path().exists():
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        
+        assert provider_threads == [threading.get_ident()]
+        assert writer_threads and writer_threads[0] != threading.get_ident()
+        written = json.loads(monitor._snapshot_path().read_text())
+        assert written["extras"] == {"probe": "ok"}
@@ -0,0 +1,70 @@
+"""
+쿼리 결과 스트리밍 내보내기 단위 테스트
+"""
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.services.query_export import encode_export
+
+COLUMNS = ["equipment_code", "timestamp", "measurement_value", "note"]
+
+
+def _batches(batch_count=3, batch_size=4):
+    async def generate():
+        yield COLUMNS, []
+        for batch in range(batch_count):
+            yield COLUMNS, [
+                (f"EQ{batch}-{i}", datetime(2024, 1, 1, 0, 0, i), Decimal("1.5") * i, None if batch == 0 else "ok")
+                for i in range(batch_size)
+            ]
+    return generate()
+
+
+async def _collect(batches, export_format):
+    return [chunk async for chunk in encode_export(batches, export_format)]
+
+
+class TestQueryExport:
+    """CSV / NDJSON / Parquet 인코딩 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_csv_streams_one_chunk_per_batch(self):
+        chunks = await _collect(_batches(), "csv")
+        lines = b"".join(chunks).decode("utf-8-sig").splitlines()
+
+        assert len(chunks) == 4  # header + 3 batches
+        assert lines[0] == ",".join(COLUMNS)
+        assert lines[1] == "EQ0-0,2024-01-01T00:00:00,0.0,"
+        assert len(lines) == 13
+
+    @pytest.mark.asyncio
+    async def test_ndjson_rows_are_json_objects(self):
+        body = b"".join(await _collect(_batches(), "ndjson")).decode("utf-8")
+        rows = [json.loads(line) for line in body.splitlines()]
+
+        assert len(rows) == 12
+        assert rows[5] == {
+            "equipment_code": "EQ1-1",
+            "timestamp": "2024-01-01T00:00:01",
+            "measurement_value": 1.5,
+            "note": "ok"
+        }
+
+    @pytest.mark.asyncio
+    async def test_parquet_writes_row_group_per_batch(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        body = b"".join(await _collect(_batches(), "parquet"))
+        parquet_file = pq.ParquetFile(io.BytesIO(body))
+
+        assert parquet_file.metadata.num_rows == 12
+        assert parquet_file.num_row_groups == 3
+        # 첫 배치에서 전부 NULL이던 컬럼은 문자열로 기록
+        assert str(parquet_file.schema_arrow.field("note").type) == "string"
+
+    def test_unknown_format_is_rejected(self):
+        with pytest.raises(ValueError):
+            encode_export(_batches(), "xlsx")
@@ -0,0 +1,101 @@
+"""
+데이터 소스 서킷 브레이커/벌크헤드 단위 테스트
+"""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.security import CircuitBreakerState
+from app.services.data_providers.base import WatermarkExpiredError
+from app.services.data_providers.resilience import (
+    DataSourceGuard, DataSourceUnavailableError, is_connectivity_error
+)
+
+
+@pytest.fixture
+def guard(monkeypatch):
+    monkeypatch.setattr(settings, "DATA_SOURCE_BREAKER_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "DATA_SOURCE_BREAKER_RESET_SECONDS", 30)
+    monkeypatch.setattr(settings, "DATA_SOURCE_MAX_CONCURRENCY", 1)
+    monkeypatch.setattr(settings, "DATA_SOURCE_BULKHEAD_TIMEOUT_SECONDS", 0.01)
+    return DataSourceGuard("ds-1")
+
+
+async def _fail(guard, error):
+    with pytest.raises(type(error)):
+        async with guard.call():
+            raise error
+
+
+class TestConnectivityErrors:
+    """브레이커에 집계할 예외 분류 테스트"""
+
+    @pytest.mark.parametrize("error, expected", [
+        (ConnectionRefusedError(), True),
+        (asyncio.TimeoutError(), True),
+        (OperationalError("SELECT 1", {}, Exception("server closed the connection")), True),
+        (ValueError("bad limit"), False),
+        (WatermarkExpiredError("watermark expired"), False),
+        (HTTPException(status_code=400), False),
+        (KeyError("column"), False),
+    ])
+    def test_classification(self, error, expected):
+        assert is_connectivity_error(error) is expected
+
+    def test_wrapped_driver_error_counts(self):
+        try:
+            try:
+                raise ConnectionResetError()
+            except ConnectionResetError as e:
+                raise RuntimeError("query failed") from e
+        except RuntimeError as wrapped:
+            assert is_connectivity_error(wrapped)
+
+
+class TestDataSourceGuard:
+    """가드 호출 결과별 브레이커 상태 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_client_errors_never_open_breaker(self, guard):
+        for _ in range(5):
+            await _fail(guard, WatermarkExpiredError("watermark expired"))
+            await _fail(guard, HTTPException(status_code=400))
+
+        assert guard.breaker.state == CircuitBreakerState.CLOSED
+        assert guard.calls["error"] == 10 and guard.calls["failure"] == 0
+
+    @pytest.mark.asyncio
+    async def test_connectivity_failures_open_breaker(self, guard):
+        await _fail(guard, ConnectionRefusedError())
+        await _fail(guard, asyncio.TimeoutError())
+
+        assert guard.breaker.state == CircuitBreakerState.OPEN
+        with pytest.raises(DataSourceUnavailableError):
+            async with guard.call():
+                pass
+        assert guard.calls["rejected_open"] == 1
+
+    @pytest.mark.asyncio
+    async def test_half_open_probe_released_on_client_error(self, guard):
+        await _fail(guard, ConnectionRefusedError())
+        await _fail(guard, ConnectionRefusedError())
+        guard.breaker.opened_at -= 60
+
+        await _fail(guard, ValueError("bad parameter"))
+        # 프로브 슬롯이 반환되어 다음 호출이 프로브가 되고, 성공하면 닫힘
+        async with guard.call():
+            pass
+        assert guard.breaker.state == CircuitBreakerState.CLOSED
+
+    @pytest.mark.asyncio
+    async def test_bulkhead_rejects_without_failure(self, guard):
+        async with guard.call():
+            with pytest.raises(DataSourceUnavailableError):
+                async with guard.call():
+                    pass
+
+        assert guard.calls["rejected_bulkhead"] == 1
+        assert guard.breaker.failure_count == 0
@@ -0,0 +1,102 @@
+"""
+측정 규격 판정 엔진 단위 테스트
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import spec_engine
+from app.services.spec_engine import (
+    SPEC_ABOVE_SPEC, SPEC_BELOW_SPEC, SPEC_IN_SPEC, SPEC_NO_SPEC,
+    SpecCache, SpecTable, coerce_spec_status, evaluate_spec_status
+)
+
+NAN = float("nan")
+SPECS = [("TEMP", 80, 20, 50), ("PRESS", 10, None, None), ("FLOW", None, None, None)]
+
+
+def _measurement(code, value, usl=None, lsl=None, spec_status=0):
+    return SimpleNamespace(
+        measurement_code=code, measurement_value=value, usl=usl, lsl=lsl, target=None, spec_status=spec_status
+    )
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def numpy_mode(request, monkeypatch):
+    if request.param and not spec_engine.NUMPY_AVAILABLE:
+        pytest.skip("numpy is not installed")
+    monkeypatch.setattr(spec_engine, "NUMPY_AVAILABLE", request.param)
+    return request.param
+
+
+class TestSpecEvaluation:
+    """배치 판정 테스트"""
+
+    def test_evaluate_matches_view_rules(self, numpy_mode):
+        statuses = evaluate_spec_status(
+            [90, 10, 50, 5, 5],
+            [80, 80, 80, NAN, NAN],
+            [20, 20, 20, 1, NAN]
+        )
+        assert statuses == [SPEC_ABOVE_SPEC, SPEC_BELOW_SPEC, SPEC_IN_SPEC, SPEC_IN_SPEC, SPEC_NO_SPEC]
+
+    def test_apply_fills_limits_and_keeps_row_overrides(self, numpy_mode):
+        measurements = [
+            _measurement("TEMP", 85.0),
+            _measurement("TEMP", 85.0, usl=100),  # 행 한계값 우선
+            _measurement("PRESS", 11.0),
+            _measurement("FLOW", 1.0, spec_status=1),  # 한계 없음 -> 기존 값 유지
+            _measurement("UNKNOWN", 1.0),
+        ]
+        SpecTable(SPECS).apply(measurements)
+
+        assert [m.spec_status for m in measurements] == [SPEC_ABOVE_SPEC, SPEC_IN_SPEC, SPEC_ABOVE_SPEC, 1, 0]
+        assert (measurements[0].usl, measurements[0].lsl, measurements[0].target) == (80.0, 20.0, 50.0)
+        assert (measurements[1].usl, measurements[1].lsl) == (100.0, 20.0)
+        assert measurements[2].lsl is None
+        assert measurements[4].usl is None
+
+    def test_empty_table_uses_row_limits_only(self, numpy_mode):
+        measurements = [_measurement("TEMP", 5.0, lsl=10.0), _measurement("TEMP", 5.0)]
+        SpecTable().apply(measurements)
+        assert [m.spec_status for m in measurements] == [SPEC_BELOW_SPEC, 0]
+
+    @pytest.mark.parametrize("value, expected", [
+        ("ABOVE_SPEC", 2), ("below_spec", 1), ("9", 9), (1, 1), (None, 0), ("?", 0),
+    ])
+    def test_coerce_spec_status(self, value, expected):
+        assert coerce_spec_status(value) == expected
+
+
+class TestSpecCache:
+    """규격 캐시 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_tables_cached_per_data_source_until_invalidated(self):
+        cache = SpecCache(ttl_seconds=300)
+        loads = []
+
+        async def loader():
+            loads.append(1)
+            return SPECS
+
+        first = await cache.get_table("ws", "ds-a", loader)
+        assert await cache.get_table("ws", "ds-a", loader) is first
+        await cache.get_table("ws", "ds-b", loader)
+        assert len(loads) == 2
+
+        cache.invalidate(data_source_id="ds-a")
+        await cache.get_table("ws", "ds-a", loader)
+        await cache.get_table("ws", "ds-b", loader)
+        assert len(loads) == 3
+
+    @pytest.mark.asyncio
+    async def test_loader_failure_caches_empty_table(self):
+        cache = SpecCache()
+
+        async def failing_loader():
+            raise RuntimeError("Invalid object name 'measurement_specs'")
+
+        table = await cache.get_table("ws", "ds", failing_loader)
+        assert len(table) == 0
+        assert cache.get_stats()["load_errors"] == 1
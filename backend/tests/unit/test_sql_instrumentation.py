@@ -0,0 +1,79 @@
+"""
+SQL 실행 계측 단위 테스트
+"""
+import pytest
+
+from app.core import sql_instrumentation as instrumentation_module
+from app.core.sql_instrumentation import SQLInstrumentation, fingerprint
+from app.services.performance_monitor import PerformanceMetrics, performance_monitor
+
+
+@pytest.fixture
+def instrumentation(monkeypatch):
+    # 구문 지연 시간이 전역 성능 모니터에 누적되지 않도록 격리
+    monkeypatch.setattr(performance_monitor, "metrics", PerformanceMetrics())
+    return SQLInstrumentation()
+
+
+class TestFingerprint:
+    """구문 정규화 테스트"""
+
+    @pytest.mark.parametrize("statement, expected", [
+        ("SELECT * FROM t WHERE id = 42", "SELECT * FROM t WHERE id = ?"),
+        ("SELECT * FROM t WHERE name = 'o''brien' -- lookup", "SELECT * FROM t WHERE name = ?"),
+        ("SELECT * FROM t WHERE id = :id AND w = $1", "SELECT * FROM t WHERE id = ? AND w = ?"),
+        ("SELECT * FROM t WHERE id IN (1, 2, 3)", "SELECT * FROM t WHERE id IN (...)"),
+        ("SELECT col1, t2.x::text\n  FROM t2", "SELECT col1, t2.x::text FROM t2"),
+    ])
+    def test_literals_and_params_are_normalized(self, statement, expected):
+        assert fingerprint(statement) == expected
+
+
+class TestRequestTracing:
+    """요청 단위 추적/N+1/느린 요청 테스트"""
+
+    def test_repeated_statement_is_flagged(self, instrumentation):
+        token = instrumentation.start_request("GET", "/api/v1/flows")
+        instrumentation.record_statement("primary", "SELECT * FROM flows", 2.0, 10)
+        for flow_id in range(instrumentation_module.REPEATED_STATEMENT_THRESHOLD):
+            instrumentation.record_statement("primary", f"SELECT * FROM nodes WHERE flow_id = {flow_id}", 1.0, 3)
+        instrumentation.finish_request(token, 50.0, route="/api/v1/flows")
+
+        assert instrumentation.counters["requests_with_repeated_statements"] == 1
+        assert instrumentation.counters["slow_requests"] == 0
+        assert instrumentation.get_top_statements(order_by="count")[0] == {
+            "fingerprint": "SELECT * FROM nodes WHERE flow_id = ?",
+            "count": 5, "total_ms": 5.0, "mean_ms": 1.0, "max_ms": 1.0, "rows": 15
+        }
+
+    def test_slow_request_report_breaks_down_statements(self, instrumentation):
+        token = instrumentation.start_request("POST", "/api/v1/query")
+        instrumentation.record_statement("primary", "SELECT 1", 5.0, 1)
+        instrumentation.record_statement("datasource", "SELECT * FROM big", 900.0, 1000)
+        instrumentation.record_checkout("primary", 12.0)
+        instrumentation.finish_request(token, instrumentation_module.SLOW_REQUEST_THRESHOLD_MS + 1)
+
+        report = instrumentation.get_slow_request_report()[0]
+        assert report["statement_count"] == 2 and report["db_time_ms"] == 905.0
+        assert report["checkout_wait_ms"] == 12.0 and report["checkouts"] == 1
+        assert report["engines"] == {"primary": 1, "datasource": 1}
+        assert report["statements"][0]["fingerprint"] == "SELECT * FROM big"
+
+    def test_statements_outside_requests_only_update_totals(self, instrumentation):
+        instrumentation.record_statement("primary", "SELECT 1", 1.0, 1)
+        token = instrumentation.start_request("GET", "/health")
+        instrumentation.finish_request(token, 5000.0)
+
+        assert instrumentation.counters["statements"] == 1
+        assert instrumentation.counters["requests_traced"] == 0
+        assert instrumentation.get_slow_request_report() == []
+
+    def test_tracked_fingerprints_are_bounded(self, instrumentation, monkeypatch):
+        monkeypatch.setattr(instrumentation_module, "MAX_TRACKED_FINGERPRINTS", 2)
+        instrumentation.record_statement("primary", "SELECT a FROM t", 1.0, 0)
+        instrumentation.record_statement("primary", "SELECT b FROM t", 1.0, 0)
+        instrumentation.record_statement("primary", "SELECT a FROM t", 1.0, 0)
+        instrumentation.record_statement("primary", "SELECT c FROM t", 1.0, 0)
+
+        # 가장 오래 사용되지 않은 구문부터 제거
+        assert list(instrumentation.statement_stats) == ["SELECT a FROM t", "SELECT c FROM t"]
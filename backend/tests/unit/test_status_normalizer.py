@@ -0,0 +1,155 @@
+"""
+상태 정규화 배치 처리 단위 테스트
+"""
+import pytest
+
+from app.core.config import settings
+from app.services import status_normalizer as normalizer_module
+from app.services.status_normalizer import StatusNormalizer, partial_match
+
+
+class FakeRow:
+    def __init__(self, source_status, target_status):
+        self.source_status = source_status
+        self.target_status = target_status
+
+
+class FakeSession:
+    """status_mappings 조회/추가를 메모리에서 처리하는 세션 대역"""
+
+    def __init__(self, rows, on_query=None):
+        self.rows = rows
+        self.on_query = on_query
+
+    async def execute(self, query, params=None):
+        if "INSERT" in str(query):
+            self.rows[params["source_status"]] = params["target_status"]
+            return None
+        if self.on_query:
+            self.on_query()
+        return [FakeRow(source, target) for source, target in self.rows.items()]
+
+    async def commit(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class TestPartialMatch:
+    """다중 키워드 매처 테스트"""
+
+    @pytest.mark.parametrize("status, expected", [
+        ("MACHINE_RUNNING", "ACTIVE"),
+        ("STANDING_BY", "PAUSE"),
+        ("MAINTENANCE_MODE", "STOP"),
+        # 여러 그룹의 키워드가 섞이면 ACTIVE > PAUSE > STOP 우선순위 유지
+        ("STOPPED_THEN_RUN", "ACTIVE"),
+        ("IDLE_AFTER_FAULT", "PAUSE"),
+        ("UNKNOWN", None),
+    ])
+    def test_priority_matches_keyword_groups(self, status, expected):
+        assert partial_match(status) == expected
+
+
+class TestNormalizeMany:
+    """배치 정규화 테스트"""
+
+    def test_matches_default_and_partial_rules(self):
+        normalizer = StatusNormalizer()
+        result = normalizer.normalize_many(["running", " idle ", None, "", "Line_Down", "???", 1])
+        assert result == ["ACTIVE", "PAUSE", "STOP", "STOP", "STOP", "STOP", "STOP"]
+
+    def test_results_are_memoised_per_raw_value(self):
+        normalizer = StatusNormalizer()
+        normalizer.normalize_many(["RUN"] * 1000 + ["pause"] * 1000)
+        assert normalizer._get_table(None).memo == {"RUN": "ACTIVE", "pause": "PAUSE"}
+
+    @pytest.mark.asyncio
+    async def test_custom_mappings_override_defaults(self):
+        normalizer = StatusNormalizer()
+        normalizer._custom_mappings["ws"] = {"RUN": "PAUSE", "가동": "ACTIVE"}
+        normalizer._cache_loaded.add("ws")
+
+        await normalizer.prepare("ws")
+        assert normalizer.normalize_many(["run", "가동", "stop"], "ws") == ["PAUSE", "ACTIVE", "STOP"]
+        # 다른 워크스페이스는 기본 매핑 사용
+        assert normalizer.normalize_many(["run"], "other") == ["ACTIVE"]
+        assert await normalizer.normalize_status("run", "ws") == "PAUSE"
+
+        normalizer.clear_cache("ws")
+        assert normalizer.normalize_many(["run"], "ws") == ["ACTIVE"]
+
+
+class TestSharedNormalizer:
+    """프로세스 공유 정규화기 캐시 무효화 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_request_scoped_mapping_invalidates_shared_instance(self, monkeypatch):
+        rows = {"RUN": "PAUSE"}
+        shared = StatusNormalizer(session_factory=lambda: FakeSession(rows))
+        monkeypatch.setattr(normalizer_module, "status_normalizer", shared)
+
+        assert await shared.normalize_status("run", "ws") == "PAUSE"
+        assert await StatusNormalizer(FakeSession(rows)).add_custom_mapping("ws", "run", "stop")
+
+        assert await shared.normalize_status("run", "ws") == "STOP"
+
+    @pytest.mark.asyncio
+    async def test_load_racing_invalidation_is_not_cached(self):
+        rows = {"RUN": "PAUSE"}
+        normalizer = StatusNormalizer(session_factory=lambda: FakeSession(rows, on_query=lambda: normalizer.clear_cache("ws")))
+
+        await normalizer.prepare("ws")
+
+        assert "ws" not in normalizer._cache_loaded
+
+
+class TestRevalidation:
+    """재확인 주기에 따른 매핑 갱신 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_external_edit_is_seen_after_revalidate_interval(self, monkeypatch):
+        rows = {"RUN": "PAUSE"}
+        queries = []
+        normalizer = StatusNormalizer(session_factory=lambda: FakeSession(rows, on_query=lambda: queries.append(1)))
+        monkeypatch.setattr(settings, "STATUS_MAPPING_REVALIDATE_SECONDS", 3600.0)
+
+        assert await normalizer.normalize_status("run", "ws") == "PAUSE"
+        rows["RUN"] = "STOP"  # 다른 워커/DB에서 직접 수정
+        assert await normalizer.normalize_status("run", "ws") == "PAUSE"
+        assert len(queries) == 1
+
+        monkeypatch.setattr(settings, "STATUS_MAPPING_REVALIDATE_SECONDS", 0.0)
+        assert await normalizer.normalize_status("run", "ws") == "STOP"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_mappings_keep_memo(self, monkeypatch):
+        rows = {"RUN": "PAUSE"}
+        normalizer = StatusNormalizer(session_factory=lambda: FakeSession(rows))
+        monkeypatch.setattr(settings, "STATUS_MAPPING_REVALIDATE_SECONDS", 0.0)
+
+        table = await normalizer.prepare("ws")
+        table.normalize("run")
+
+        assert await normalizer.prepare("ws") is table
+        assert table.memo == {"run": "PAUSE"}
+
+    @pytest.mark.asyncio
+    async def test_failed_revalidation_keeps_previous_mappings(self, monkeypatch):
+        rows = {"RUN": "PAUSE"}
+        failing = []
+
+        def on_query():
+            if failing:
+                raise ConnectionError("database unavailable")
+
+        normalizer = StatusNormalizer(session_factory=lambda: FakeSession(rows, on_query=on_query))
+        monkeypatch.setattr(settings, "STATUS_MAPPING_REVALIDATE_SECONDS", 0.0)
+        await normalizer.prepare("ws")
+
+        failing.append(True)
+        assert await normalizer.normalize_status("run", "ws") == "PAUSE"